@@ -0,0 +1,854 @@
+"""在模拟桌面上运行的延迟/CPU 基准测试
+
+用法：python benchmarks/desktop_benchmarks.py [--label v1.1] [--output result.json]
+
+结果为 JSON，可以在不同版本之间直接比较，不需要 Windows 桌面。
+"""
+import argparse
+import json
+import os
+import platform
+import socket
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.window_manager import WindowManager
+from modules.animation_controller import AnimationController
+from modules.input_handler import InputHandler
+from modules.simulated_backend import SimulatedDesktop
+from modules.command_server import CommandServer
+from modules.hide_strategies import STRATEGIES
+from modules.input_trace import TraceRecorder, TraceReplay
+from modules.window_state import PEEKING
+
+WINDOW_RECT = (400, 200, 1200, 800)
+INTERIOR = (960, 540)
+
+
+class Session:
+    """在模拟桌面上运行的一套完整的 WindowManager/AnimationController/InputHandler"""
+
+    def __init__(self, call_latency=0.0, animation=True, frame_rate=60, cursor_mode='hybrid', metrics=False):
+        latency = {'*': call_latency} if call_latency else None
+        self.desktop = SimulatedDesktop(latency=latency, cursor_mode=cursor_mode)
+        self.window_manager = WindowManager(self.desktop)
+        if metrics:
+            self.window_manager.metrics.enable(self.desktop)
+        self.animation_controller = AnimationController(self.window_manager)
+        self.animation_controller.set_animation_enabled(animation)
+        self.animation_controller.set_animation_quality(frame_rate)
+        self.input_handler = InputHandler(self.window_manager, self.animation_controller)
+        self.window_manager.start()
+        self.input_handler.start()
+        self.command_server = CommandServer(self.input_handler)
+        self.command_server.start()
+        self.desktop.move_cursor(*INTERIOR)
+
+    def close(self):
+        self.command_server.stop()
+        self.input_handler.stop()
+        self.animation_controller.stop()
+        self.window_manager.stop()
+
+    def wait_idle(self, timeout=5.0):
+        """等待所有动画结束、边缘检测器的停留/宽限期结束、所有排队的边缘事件处理完"""
+        deadline = time.monotonic() + timeout
+        scheduler = self.animation_controller.scheduler
+        detector = self.input_handler.edge_detector
+
+        def idle():
+            return not scheduler.animations and not detector.pending() and self.input_handler.actions.idle()
+
+        while time.monotonic() < deadline:
+            if idle():
+                # 再等一小段时间，让动画结束回调排入的事件也处理完
+                time.sleep(0.01)
+                if idle():
+                    return True
+            time.sleep(0.002)
+        return False
+
+    def hotkey(self, direction):
+        """按下并释放 Shift+方向键"""
+        self.desktop.press_key('shift')
+        self.desktop.press_key(direction)
+        self.desktop.release_key(direction)
+        self.desktop.release_key('shift')
+
+    def toggle(self, hwnd, direction='left'):
+        """激活窗口并按快捷键隐藏/恢复它"""
+        self.desktop.activate(hwnd)
+        self.hotkey(direction)
+        self.wait_idle()
+
+    def command(self, request):
+        """通过命令通道发送一个请求，返回收到的全部响应"""
+        address = self.command_server.address
+        family = socket.AF_UNIX if isinstance(address, str) else socket.AF_INET
+        with socket.socket(family, socket.SOCK_STREAM) as sock:
+            sock.connect(address)
+            stream = sock.makefile('rwb')
+            stream.write(json.dumps(request).encode('utf-8') + b'\n')
+            stream.flush()
+            responses = []
+            while True:
+                line = stream.readline()
+                if not line:
+                    return responses
+                response = json.loads(line)
+                responses.append(response)
+                if response.get('id') == request.get('id') and (
+                        response.get('done') or response.get('ok') is False or 'windows' in response):
+                    return responses
+
+    def edge_point(self, hwnd):
+        """左边缘上正对隐藏窗口的光标位置"""
+        left, top, right, bottom = self.desktop.windows[hwnd].rect
+        return 0, (top + bottom) // 2
+
+
+def summarize(samples):
+    """汇总样本（毫秒）"""
+    if not samples:
+        return {'count': 0}
+    ordered = sorted(samples)
+
+    def percentile(p):
+        return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+    return {
+        'count': len(ordered),
+        'min': round(ordered[0], 3),
+        'median': round(statistics.median(ordered), 3),
+        'mean': round(statistics.fmean(ordered), 3),
+        'p95': round(percentile(95), 3),
+        'max': round(ordered[-1], 3),
+    }
+
+
+def bench_keypress(session, iterations):
+    """按下快捷键到窗口第一次移动的延迟（隐藏和恢复各算一次）"""
+    desktop = session.desktop
+    hwnd = desktop.create_window('Keypress', WINDOW_RECT)
+    samples = []
+    for _ in range(iterations):
+        for _ in ('hide', 'restore'):
+            desktop.activate(hwnd)
+            since = len(desktop.moves)
+            started = time.monotonic()
+            session.hotkey('left')
+            moved_at = desktop.wait_for_move(hwnd, since)
+            if moved_at is not None:
+                samples.append((moved_at - started) * 1000)
+            session.wait_idle()
+    desktop.destroy_window(hwnd)
+    session.wait_idle()
+    return summarize(samples)
+
+
+def bench_reveal(session, iterations):
+    """光标碰到边缘到隐藏窗口第一次移动的延迟"""
+    desktop = session.desktop
+    hwnd = desktop.create_window('Reveal', WINDOW_RECT)
+    session.toggle(hwnd)
+    edge_x, edge_y = session.edge_point(hwnd)
+    samples = []
+    for _ in range(iterations):
+        desktop.move_cursor(*INTERIOR)
+        session.wait_idle()
+        since = len(desktop.moves)
+        started = time.monotonic()
+        desktop.move_cursor(edge_x, edge_y)
+        moved_at = desktop.wait_for_move(hwnd, since)
+        if moved_at is not None:
+            samples.append((moved_at - started) * 1000)
+        session.wait_idle()
+        desktop.move_cursor(1800, 540)
+        session.wait_idle()
+    desktop.move_cursor(*INTERIOR)
+    session.toggle(hwnd)
+    desktop.destroy_window(hwnd)
+    session.wait_idle()
+    return summarize(samples)
+
+
+def count_changes(before, after):
+    """两次统计之间各项计数的增量"""
+    return {key: value - before.get(key, 0) for key, value in after.items() if value != before.get(key, 0)}
+
+
+def bench_thrash(session, cycles=20, interval=0.03):
+    """光标在边缘和屏幕内部之间快速来回（每 interval 秒一次）时的状态转换、被丢弃的请求和窗口移动次数"""
+    desktop = session.desktop
+    transitions = session.window_manager.transitions
+    hwnd = desktop.create_window('Thrash', WINDOW_RECT)
+    session.toggle(hwnd)
+    desktop.move_cursor(*INTERIOR)
+    session.wait_idle()
+    edge_x, edge_y = session.edge_point(hwnd)
+    before = transitions.stats()
+    calls_before = desktop.calls['SetWindowPos'] + desktop.calls['DeferWindowPos']
+    for _ in range(cycles):
+        desktop.move_cursor(edge_x, edge_y)
+        time.sleep(interval)
+        desktop.move_cursor(1800, 540)
+        time.sleep(interval)
+    session.wait_idle()
+    after = transitions.stats()
+    result = {
+        'cycles': cycles,
+        'transitions': count_changes(before['transitions'], after['transitions']),
+        'dropped': count_changes(before['dropped'], after['dropped']),
+        'window_moves': desktop.calls['SetWindowPos'] + desktop.calls['DeferWindowPos'] - calls_before,
+        'durations': after['durations'],
+    }
+    desktop.move_cursor(*INTERIOR)
+    session.toggle(hwnd)
+    desktop.destroy_window(hwnd)
+    session.wait_idle()
+    return result
+
+
+def play_path(desktop, points, step=0.008):
+    """按 step 秒的间隔依次移动光标，返回每个点的时间"""
+    times = []
+    for x, y in points:
+        times.append(time.monotonic())
+        desktop.move_cursor(x, y)
+        time.sleep(step)
+    return times
+
+
+def approach(start_x, y, speed, step=0.008):
+    """从 start_x 水平匀速移向左边缘 x=0 的路径，speed 为像素/秒"""
+    stride = max(1, int(speed * step))
+    return [(x, y) for x in range(start_x, 0, -stride)] + [(0, y)]
+
+
+def bench_intent(session, iterations):
+    """边缘意图判断：擦过边缘、快速/慢速撞向边缘、掠过临时显示窗口的边框"""
+    desktop = session.desktop
+    transitions = session.window_manager.transitions
+    hwnd = desktop.create_window('Intent', WINDOW_RECT)
+    session.toggle(hwnd)
+    _, edge_y = session.edge_point(hwnd)
+    trigger = session.window_manager.edge_trigger_size
+
+    def reveals():
+        return transitions.stats()['transitions'].get('hidden->revealing', 0)
+
+    def reset_cursor():
+        desktop.move_cursor(*INTERIOR)
+        session.wait_idle()
+
+    results = {}
+    reset_cursor()
+    before = reveals()
+    for _ in range(iterations):
+        # 斜着擦过左边缘：只有一两个采样点落在触发带内
+        play_path(desktop, [(40 - abs(i) * 8, edge_y + i * 8) for i in range(-5, 6)])
+        reset_cursor()
+    results['brush'] = {'passes': iterations, 'reveals': reveals() - before}
+
+    for name, speed in (('fast_approach', 3000), ('slow_approach', 300)):
+        samples = []
+        for _ in range(iterations):
+            points = approach(min(600, int(speed * 0.4)), edge_y, speed)
+            since = len(desktop.moves)
+            times = play_path(desktop, points)
+            arrived = next(t for t, (x, _) in zip(times, points) if x < trigger)
+            moved_at = desktop.wait_for_move(hwnd, since)
+            if moved_at is not None:
+                samples.append((moved_at - arrived) * 1000)
+            session.wait_idle()
+            reset_cursor()
+        results[name] = {'speed_px_per_s': speed, 'reveal_after_arrival_ms': summarize(samples)}
+
+    # 临时显示后光标从窗口内侧掠出边框 4 像素，约 60 毫秒后回来
+    edge_x, _ = session.edge_point(hwnd)
+    since = len(desktop.moves)
+    desktop.move_cursor(edge_x, edge_y)
+    desktop.wait_for_move(hwnd, since)
+    session.wait_idle()
+    left, top, right, bottom = desktop.windows[hwnd].rect
+    inside = (right - 20, (top + bottom) // 2)
+    desktop.move_cursor(*inside)
+    session.wait_idle()
+    hides_before = transitions.stats()['transitions'].get('peeking->hiding', 0)
+    for _ in range(iterations):
+        play_path(desktop, [(right + 4, inside[1])] * 8 + [inside])
+    session.wait_idle()
+    results['border_skim'] = {
+        'skims': iterations,
+        'hides': transitions.stats()['transitions'].get('peeking->hiding', 0) - hides_before,
+    }
+    results['detector'] = session.input_handler.edge_detector.stats()
+    reset_cursor()
+    session.toggle(hwnd)
+    desktop.destroy_window(hwnd)
+    session.wait_idle()
+    return results
+
+
+def wait_phase(window_manager, hwnd, phase, timeout=2.0):
+    """等待隐藏窗口进入 phase 状态，返回到达时间，超时返回 None"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if window_manager.get_phase(hwnd) == phase:
+            return time.monotonic()
+        time.sleep(0.0005)
+    return None
+
+
+def bench_strategies(session, iterations):
+    """各隐藏方式：每次隐藏/临时显示/移回/恢复的窗口移动、重绘像素和系统调用，
+    隐藏期间程序仍在渲染和 DWM 合成的面积，以及光标快速到达边缘后窗口完全显示的延迟"""
+    desktop = session.desktop
+    window_manager = session.window_manager
+    rules = window_manager.rules
+    results = {}
+    for strategy in STRATEGIES:
+        process = f'{strategy}.exe'
+        rules.assign_strategy(strategy, process=process)
+        hwnd = desktop.create_window(f'Strategy {strategy}', WINDOW_RECT, process=process)
+        totals = {}
+
+        def measure(name, action):
+            moves = len(desktop.moves)
+            repainted = desktop.repainted[hwnd]
+            calls = count_calls(session, action)
+            total = totals.setdefault(name, {'count': 0, 'moves': 0, 'repainted_px': 0, 'syscalls': 0})
+            total['count'] += 1
+            total['moves'] += sum(1 for _, moved, _, _ in desktop.moves[moves:] if moved == hwnd)
+            total['repainted_px'] += desktop.repainted[hwnd] - repainted
+            total['syscalls'] += sum(calls.values())
+
+        measure('hide', lambda: session.toggle(hwnd))
+        parked = {
+            'rendering_px': desktop.rendering_pixels([hwnd]),
+            'composited_px': desktop.composited_pixels([hwnd]),
+        }
+        _, edge_y = session.edge_point(hwnd)
+        samples = []
+        for _ in range(iterations):
+            desktop.move_cursor(*INTERIOR)
+            session.wait_idle()
+
+            def reveal():
+                points = approach(600, edge_y, 3000)
+                times = play_path(desktop, points)
+                shown_at = wait_phase(window_manager, hwnd, PEEKING)
+                if shown_at is not None:
+                    samples.append((shown_at - times[-1]) * 1000)
+
+            measure('reveal', reveal)
+            measure('conceal', lambda: desktop.move_cursor(1800, 540))
+        desktop.move_cursor(*INTERIOR)
+        session.wait_idle()
+        measure('restore', lambda: session.toggle(hwnd))
+        results[strategy] = {
+            'parked': parked,
+            'reveal_ms': summarize(samples),
+            'per_operation': {name: {key: round(value / total['count'], 3)
+                                     for key, value in total.items() if key != 'count'}
+                              for name, total in totals.items()},
+            'restored_visible': desktop.windows[hwnd].composited,
+        }
+        rules.assign_strategy(None, process=process)
+        desktop.destroy_window(hwnd)
+        session.wait_idle()
+    return results
+
+
+def bench_rules(session, iterations, count=200):
+    """窗口规则：编译 count 条规则的耗时，单个窗口求值/读缓存的耗时（微秒），
+    反复隐藏/临时显示/恢复时的求值次数（每个窗口应只求值一次），以及规则是否生效"""
+    desktop = session.desktop
+    window_manager = session.window_manager
+    rules = window_manager.rules
+    specs = [{'process': f'app{number}.exe', 'title': f'*document {number}*', 'animate': False}
+             for number in range(count - 2)]
+    specs.append({'process': 'locked.exe', 'hide': False})
+    specs.append({'class': 'Console*', 'visible_part': 2, 'animate': False})
+    started = time.perf_counter()
+    rules.set_rules(specs)
+    compile_ms = (time.perf_counter() - started) * 1000
+
+    plain = desktop.create_window('Rules plain', WINDOW_RECT)
+    locked = desktop.create_window('Rules locked', WINDOW_RECT, process='locked.exe')
+    console = desktop.create_window('Rules console', WINDOW_RECT, class_name='ConsoleWindowClass')
+    evaluations = rules.evaluations
+    strips = {}
+    for hwnd in (plain, console):
+        for _ in range(iterations):
+            session.toggle(hwnd)
+            strips[hwnd] = desktop.windows[hwnd].rect[2]
+            _, edge_y = session.edge_point(hwnd)
+            desktop.move_cursor(0, edge_y)
+            session.wait_idle()
+            desktop.move_cursor(*INTERIOR)
+            session.wait_idle()
+            session.toggle(hwnd)
+    session.toggle(locked)
+    evaluated = rules.evaluations - evaluations
+
+    def per_call(action, repeats=200):
+        started = time.perf_counter()
+        for _ in range(repeats):
+            action()
+        return round((time.perf_counter() - started) / repeats * 1e6, 3)
+
+    # 与快捷键处理时一样传入已读取的标题
+    def evaluate():
+        rules.forget(plain)
+        rules.profile(plain, 'Rules plain')
+
+    results = {
+        'rules': count,
+        'compile_ms': round(compile_ms, 3),
+        'evaluate_us': per_call(evaluate),
+        'cached_us': per_call(lambda: rules.profile(plain, 'Rules plain')),
+        'evaluations_per_window': round(evaluated / 3, 3),
+        'visible_part_px': {'default': strips.get(plain), 'console': strips.get(console)},
+        'never_hide_refused': window_manager.find_hidden(locked) is None,
+    }
+    rules.set_rules([])
+    for hwnd in (plain, locked, console):
+        desktop.destroy_window(hwnd)
+    session.wait_idle()
+    return results
+
+
+def bench_virtual_desktops(session, iterations):
+    """虚拟桌面：两个桌面的同一边缘各自叠放，在另一个桌面上悬停不会拖出原桌面的窗口，
+    以及边缘悬停和切换桌面时查询虚拟桌面的次数"""
+    desktop = session.desktop
+    window_manager = session.window_manager
+    queries = ('GetCurrentVirtualDesktop', 'GetWindowDesktopId')
+    home = desktop.current_desktop
+    other = desktop.add_desktop()
+    first = desktop.create_window('Desktop one', WINDOW_RECT)
+    session.toggle(first)
+    _, edge_y = session.edge_point(first)
+    desktop.switch_desktop(other)
+    session.wait_idle()
+    second = desktop.create_window('Desktop two', WINDOW_RECT)
+    session.toggle(second)
+
+    revealed = []
+
+    def hover():
+        for _ in range(iterations):
+            desktop.move_cursor(0, edge_y)
+            revealed.append(wait_phase(window_manager, second, PEEKING) is not None)
+            session.wait_idle()
+            desktop.move_cursor(*INTERIOR)
+            session.wait_idle()
+
+    moves = len(desktop.moves)
+    hover_calls = count_calls(session, hover)
+    dragged = sum(1 for _, hwnd, _, _ in desktop.moves[moves:] if hwnd == first)
+    switch_calls = count_calls(session, lambda: desktop.switch_desktop(home))
+    results = {
+        'independent_stacks': window_manager.find_hidden(first)[-1] == 0 == window_manager.find_hidden(second)[-1],
+        'hovers': iterations,
+        'own_window_reveals': sum(revealed),
+        'other_desktop_windows_dragged': dragged,
+        'queries_per_hover': round(sum(hover_calls.get(name, 0) for name in queries) / iterations, 3),
+        'queries_per_switch': sum(switch_calls.get(name, 0) for name in queries),
+        'membership': window_manager.desktops.stats(),
+    }
+    session.toggle(first)
+    desktop.switch_desktop(other)
+    session.wait_idle()
+    session.toggle(second)
+    desktop.switch_desktop(home)
+    for hwnd in (first, second):
+        desktop.destroy_window(hwnd)
+    session.wait_idle()
+    return results
+
+
+def transition_counts(window_manager, before=None):
+    """各状态转换的次数，给出 before 时返回之后新增的次数"""
+    counts = window_manager.transitions.stats()['transitions']
+    if before is None:
+        return counts
+    return {name: count - before.get(name, 0) for name, count in counts.items() if count != before.get(name, 0)}
+
+
+def bench_trace(session, iterations, speeds=(1, 4)):
+    """输入轨迹：录制隐藏、从边缘显示再离开、恢复的一段操作，按原速和加速重放，
+    比较重放得到的窗口位置和状态转换与录制时是否一致"""
+    desktop = session.desktop
+    window_manager = session.window_manager
+    hwnd = desktop.create_window('Trace', WINDOW_RECT)
+    recorder = TraceRecorder(session.input_handler)
+    before = transition_counts(window_manager)
+    with tempfile.TemporaryDirectory() as directory:
+        path = recorder.start(os.path.join(directory, 'session.ahwt'))
+        session.toggle(hwnd)
+        _, edge_y = session.edge_point(hwnd)
+        for _ in range(iterations):
+            play_path(desktop, approach(INTERIOR[0], edge_y, 3000))
+            wait_phase(window_manager, hwnd, PEEKING)
+            session.wait_idle()
+            play_path(desktop, [(x, edge_y) for x in range(0, WINDOW_RECT[2] + 200, 100)])
+            session.wait_idle()
+        session.toggle(hwnd)
+        recorder.stop()
+        recorded = {'rect': list(desktop.windows[hwnd].rect), 'transitions': transition_counts(window_manager, before)}
+        results = {
+            'records': recorder.records,
+            'bytes': os.path.getsize(path),
+            'recorded_transitions': recorded['transitions'],
+        }
+        for speed in speeds:
+            report = TraceReplay(path, speed).run()
+            replayed = report['windows'].get(str(hwnd), {})
+            results[f'replay_{speed}x'] = {
+                'trace_s': report['trace_s'],
+                'replay_s': report['replay_s'],
+                'lag_max_ms': report['lag_ms']['max'],
+                'moves': report['moves'],
+                'matches_recording': (replayed.get('rect') == recorded['rect']
+                                      and report['transitions'] == recorded['transitions']),
+            }
+    desktop.destroy_window(hwnd)
+    session.wait_idle()
+    return results
+
+
+def bench_hook_callback(session, iterations, slow_call=0.05):
+    """窗口操作很慢（每次前台激活/窗口移动耗时 slow_call 秒）时键盘钩子回调本身的耗时（微秒）"""
+    desktop = session.desktop
+    hwnd = desktop.create_window('Hook', WINDOW_RECT)
+    saved = dict(desktop.latency)
+    desktop.latency.update({'SetForegroundWindow': slow_call, 'SetWindowPos': slow_call})
+    samples = []
+    try:
+        for _ in range(iterations):
+            for _ in ('hide', 'restore'):
+                desktop.activate(hwnd)
+                desktop.press_key('shift')
+                started = time.perf_counter()
+                desktop.press_key('left')
+                samples.append((time.perf_counter() - started) * 1e6)
+                desktop.release_key('left')
+                desktop.release_key('shift')
+                session.wait_idle()
+    finally:
+        desktop.latency = saved
+    if session.window_manager.find_hidden(hwnd) is not None:
+        session.toggle(hwnd)
+    desktop.destroy_window(hwnd)
+    session.wait_idle()
+    return summarize(samples)
+
+
+def bench_key_repeat(session, repeats=30, rate=30):
+    """按住 Shift+左 不放（系统自动重复 repeats 次）时触发的操作次数和窗口移动次数"""
+    desktop = session.desktop
+    hotkeys = session.input_handler.hotkeys
+    hwnd = desktop.create_window('Repeat', WINDOW_RECT)
+    desktop.activate(hwnd)
+    fired_before, suppressed_before = hotkeys.fired, hotkeys.suppressed
+    since = len(desktop.moves)
+    desktop.press_key('shift')
+    for _ in range(repeats + 1):
+        desktop.press_key('left')
+        time.sleep(1.0 / rate)
+    desktop.release_key('left')
+    desktop.release_key('shift')
+    session.wait_idle()
+    result = {
+        'key_events': repeats + 1,
+        'actions': hotkeys.fired - fired_before,
+        'suppressed': hotkeys.suppressed - suppressed_before,
+        'window_moves': sum(1 for _, moved_hwnd, _, _ in desktop.moves[since:] if moved_hwnd == hwnd),
+    }
+    if session.window_manager.find_hidden(hwnd) is not None:
+        session.toggle(hwnd)
+    desktop.destroy_window(hwnd)
+    session.wait_idle()
+    return result
+
+
+def bench_uncooperative(session):
+    """隐藏后被所属程序不断移回原处的窗口：放弃前的校正次数和耗时，以及期间另一个窗口的快捷键延迟"""
+    desktop = session.desktop
+    reconciler = session.animation_controller.reconciler
+    hwnd = desktop.create_window('Stubborn', WINDOW_RECT)
+    other = desktop.create_window('Bystander', WINDOW_RECT)
+    session.toggle(hwnd)
+    corrections_before = reconciler.corrections
+    # 程序把窗口拉回原处，并在每次被移走后立即拉回
+    desktop.pin_window(hwnd, WINDOW_RECT[0], WINDOW_RECT[1])
+    started = time.monotonic()
+    desktop.apply_move(hwnd, WINDOW_RECT[0], WINDOW_RECT[1])
+    desktop.activate(other)
+    since = len(desktop.moves)
+    pressed = time.monotonic()
+    session.hotkey('left')
+    moved = desktop.wait_for_move(other, since)
+    while session.window_manager.find_hidden(hwnd) is not None and time.monotonic() - started < 5:
+        time.sleep(0.005)
+    given_up = time.monotonic()
+    session.wait_idle()
+    result = {
+        'given_up_after_ms': round((given_up - started) * 1000, 3),
+        'corrections': reconciler.corrections - corrections_before,
+        'uncooperative': reconciler.is_uncooperative(hwnd),
+        'hotkey_during_fight_ms': round((moved - pressed) * 1000, 3) if moved is not None else None,
+    }
+    desktop.pin_window(hwnd, None, None)
+    session.toggle(other)
+    desktop.destroy_window(hwnd)
+    desktop.destroy_window(other)
+    session.wait_idle()
+    return result
+
+
+def bench_frame_jitter(session, iterations):
+    """动画帧间隔相对计划帧间隔的偏差"""
+    desktop = session.desktop
+    controller = session.animation_controller
+    scheduler = controller.scheduler
+    hwnd = desktop.create_window('Jitter', WINDOW_RECT)
+    interval = controller.get_frame_interval() or 1.0 / session.window_manager.get_refresh_rate()
+    dropped_before = scheduler.dropped_frames
+    intervals = []
+    x = WINDOW_RECT[0]
+    for i in range(iterations):
+        target = x + (600 if i % 2 == 0 else -600)
+        since = len(desktop.moves)
+        controller.animate_window(hwnd, x, WINDOW_RECT[1], target, WINDOW_RECT[1]).wait(5)
+        times = [moved_at for moved_at, moved_hwnd, _, _ in desktop.moves[since:] if moved_hwnd == hwnd]
+        intervals.extend((b - a) * 1000 for a, b in zip(times, times[1:]))
+        x = target
+    desktop.destroy_window(hwnd)
+    session.wait_idle()
+    deviations = [abs(value - interval * 1000) for value in intervals]
+    return {
+        'target_interval_ms': round(interval * 1000, 3),
+        'interval_ms': summarize(intervals),
+        'deviation_ms': summarize(deviations),
+        'stdev_ms': round(statistics.pstdev(intervals), 3) if intervals else None,
+        'dropped_frames': scheduler.dropped_frames - dropped_before,
+    }
+
+
+def count_calls(session, action):
+    """执行 action 并等待空闲，返回期间的系统调用次数"""
+    desktop = session.desktop
+    before = dict(desktop.calls)
+    action()
+    session.wait_idle()
+    after = dict(desktop.calls)
+    return {name: after[name] - before.get(name, 0)
+            for name in sorted(after) if after[name] != before.get(name, 0)}
+
+
+def per_operation(counts, operations):
+    total = sum(counts.values())
+    return {
+        'total': round(total / operations, 3),
+        'by_api': {name: round(value / operations, 3) for name, value in counts.items()},
+    }
+
+
+def bench_syscalls(session):
+    """每种操作的系统调用次数"""
+    desktop = session.desktop
+    hwnd = desktop.create_window('Syscalls', WINDOW_RECT)
+    results = {}
+
+    desktop.activate(hwnd)
+    results['hide'] = per_operation(count_calls(session, lambda: session.hotkey('left')), 1)
+    edge_x, edge_y = session.edge_point(hwnd)
+    results['reveal'] = per_operation(
+        count_calls(session, lambda: desktop.move_cursor(edge_x, edge_y)), 1)
+    results['temp_hide'] = per_operation(
+        count_calls(session, lambda: desktop.move_cursor(1800, 540)), 1)
+
+    desktop.move_cursor(*INTERIOR)
+    session.wait_idle()
+    results['idle_second'] = per_operation(count_calls(session, lambda: time.sleep(1.0)), 1)
+
+    desktop.activate(hwnd)
+    results['restore'] = per_operation(count_calls(session, lambda: session.hotkey('left')), 1)
+    desktop.destroy_window(hwnd)
+    session.wait_idle()
+    return results
+
+
+def bench_activation(session, iterations):
+    """前台激活：各种前台锁下每次激活的系统调用次数和耗时，以及各激活方式的胜率"""
+    desktop = session.desktop
+    window_manager = session.window_manager
+    other = desktop.create_window('Other', WINDOW_RECT, process='other.exe')
+    results = {}
+    for process, lock in (('free.exe', None), ('attach.exe', 'attach'), ('topmost.exe', 'topmost')):
+        if lock is not None:
+            desktop.foreground_lock[process] = lock
+        hwnd = desktop.create_window(process, WINDOW_RECT, process=process)
+        samples = []
+        counts = {}
+        for _ in range(iterations):
+            desktop.activate(other)
+            started = time.perf_counter()
+            calls = count_calls(session, lambda: window_manager.force_foreground_window(hwnd))
+            samples.append((time.perf_counter() - started) * 1000)
+            for name, value in calls.items():
+                counts[name] = counts.get(name, 0) + value
+        results[process] = {
+            'latency_ms': summarize(samples),
+            'syscalls': per_operation(counts, iterations),
+            'foreground': desktop.foreground == hwnd,
+        }
+        desktop.destroy_window(hwnd)
+        desktop.foreground_lock.pop(process, None)
+    hwnd = desktop.create_window('Already', WINDOW_RECT)
+    results['already_foreground'] = {
+        'syscalls': per_operation(count_calls(session, lambda: window_manager.force_foreground_window(hwnd)), 1),
+    }
+    desktop.destroy_window(hwnd)
+    desktop.destroy_window(other)
+    session.wait_idle()
+    results['tiers'] = window_manager.activator.report()
+    return results
+
+
+def bench_bulk_hide(session, count):
+    """隐藏 count 个窗口再全部恢复：逐个按快捷键 与 通过命令通道一次请求"""
+    desktop = session.desktop
+    results = {}
+    for mode in ('hotkeys', 'command'):
+        hwnds = [desktop.create_window(f'Bulk {i}', WINDOW_RECT, process='bulk.exe') for i in range(count)]
+        started = time.monotonic()
+        if mode == 'hotkeys':
+            counts = count_calls(session, lambda: [session.toggle(hwnd) for hwnd in hwnds])
+        else:
+            counts = count_calls(session, lambda: session.command(
+                {'id': 1, 'op': 'hide', 'edge': 'left', 'process': 'bulk.exe'}))
+        elapsed = time.monotonic() - started
+        session.command({'id': 2, 'op': 'restore_all'})
+        session.wait_idle()
+        for hwnd in hwnds:
+            desktop.destroy_window(hwnd)
+        session.wait_idle()
+        results[mode] = {
+            'windows': count,
+            'hide_ms': round(elapsed * 1000, 3),
+            'syscalls': sum(counts.values()),
+            'by_api': counts,
+        }
+    return results
+
+
+def measure_idle(session, seconds):
+    """测量一段空闲时间内的 CPU 时间和唤醒次数"""
+    wakeups = session.window_manager.wakeups
+    since = wakeups.snapshot()
+    cpu_before = time.process_time()
+    wall_before = time.monotonic()
+    time.sleep(seconds)
+    cpu = time.process_time() - cpu_before
+    wall = time.monotonic() - wall_before
+    return {
+        'measured_seconds': round(wall, 3),
+        'cpu_seconds_per_minute': round(cpu * 60 / wall, 6),
+        'wakeups_per_second': {source: round(rate, 3) for source, rate in wakeups.rates(since).items()},
+    }
+
+
+def bench_idle(session, seconds):
+    """空闲状态：没有隐藏窗口 / 有隐藏窗口且光标远离边缘 / 有隐藏窗口且光标靠近边缘"""
+    desktop = session.desktop
+    results = {'nothing_hidden': measure_idle(session, seconds)}
+    hwnd = desktop.create_window('Idle', WINDOW_RECT)
+    session.toggle(hwnd)
+    desktop.move_cursor(*INTERIOR)
+    session.wait_idle()
+    results['hidden_cursor_far'] = measure_idle(session, seconds)
+    desktop.move_cursor(100, INTERIOR[1])
+    session.wait_idle()
+    results['hidden_cursor_near_edge'] = measure_idle(session, seconds)
+    desktop.move_cursor(*INTERIOR)
+    session.toggle(hwnd)
+    desktop.destroy_window(hwnd)
+    session.wait_idle()
+    return results
+
+
+def run(args):
+    results = {}
+    session = Session(call_latency=args.call_latency_ms / 1000, frame_rate=args.frame_rate,
+                      cursor_mode=args.cursor, metrics=args.metrics)
+    try:
+        results['keypress_to_first_move_ms'] = bench_keypress(session, args.iterations)
+        results['reveal_from_edge_ms'] = bench_reveal(session, args.iterations)
+        results['frame_jitter'] = bench_frame_jitter(session, args.iterations)
+        results['key_repeat'] = bench_key_repeat(session)
+        results['uncooperative_window'] = bench_uncooperative(session)
+        results['reveal_hide_thrash'] = bench_thrash(session)
+        results['edge_intent'] = bench_intent(session, args.iterations)
+        results['hide_strategies'] = bench_strategies(session, args.iterations)
+        results['window_rules'] = bench_rules(session, args.iterations)
+        results['virtual_desktops'] = bench_virtual_desktops(session, args.iterations)
+        results['input_trace'] = bench_trace(session, args.iterations)
+        results['hook_callback_us'] = bench_hook_callback(session, args.iterations)
+        results['syscalls_per_operation'] = bench_syscalls(session)
+        results['activation'] = bench_activation(session, args.iterations)
+        results['bulk_hide'] = bench_bulk_hide(session, args.bulk_windows)
+        results['idle'] = bench_idle(session, args.idle_seconds)
+        if args.metrics:
+            results['metrics'] = session.window_manager.metrics.snapshot()
+    finally:
+        session.close()
+    return {
+        'label': args.label,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'config': {
+            'iterations': args.iterations,
+            'cursor': args.cursor,
+            'idle_seconds': args.idle_seconds,
+            'call_latency_ms': args.call_latency_ms,
+            'frame_rate': args.frame_rate,
+            'bulk_windows': args.bulk_windows,
+            'metrics': args.metrics,
+        },
+        'results': results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='模拟桌面上的延迟/CPU 基准测试')
+    parser.add_argument('--label', default='', help='结果标签，例如版本号')
+    parser.add_argument('--output', help='结果写入的文件，默认输出到标准输出')
+    parser.add_argument('--iterations', type=int, default=10, help='每项延迟测试的重复次数')
+    parser.add_argument('--cursor', choices=('hybrid', 'poll', 'hook'), default='hybrid',
+                        help='光标事件源：钩子驱动、靠近边缘时轮询（与 Windows 下一致），自适应轮询，或逐点推送（模拟鼠标钩子）')
+    parser.add_argument('--idle-seconds', type=float, default=5.0, help='空闲 CPU 的测量时长（秒）')
+    parser.add_argument('--call-latency-ms', type=float, default=0.0, help='每次系统调用的模拟耗时（毫秒）')
+    parser.add_argument('--frame-rate', type=int, default=60, help='动画帧率上限，0 表示跟随刷新率')
+    parser.add_argument('--bulk-windows', type=int, default=20, help='批量隐藏测试的窗口数')
+    parser.add_argument('--metrics', action='store_true', help='开启热路径性能统计（用于比较统计本身的开销）')
+    args = parser.parse_args()
+
+    report = json.dumps(run(args), indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(report + '\n')
+    else:
+        print(report)
+
+
+if __name__ == '__main__':
+    main()
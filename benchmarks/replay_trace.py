@@ -0,0 +1,68 @@
+"""在模拟桌面上重放录制的输入轨迹
+
+用法：python benchmarks/replay_trace.py trace.ahwt [--speed 4] [--moves] [--baseline old.json] [--output result.json]
+
+轨迹由托盘菜单“性能统计 / 录制输入轨迹”或 --record-trace 启动参数录制。
+报告为 JSON：窗口移动、最终位置、状态转换和延迟直方图；给出 --baseline 时列出与上一次报告不同的结果，
+用于在改动前后重放同一段真实操作，确认行为不变并比较延迟。
+"""
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.input_trace import TraceReplay
+
+# 比较行为时使用的报告项（与时间无关）
+OUTCOME_KEYS = ('windows', 'hidden', 'transitions', 'dropped')
+
+
+def outcome(report):
+    """报告中描述重放结果的部分，移动次数随帧调度略有浮动，不参与比较"""
+    data = {key: report.get(key) for key in OUTCOME_KEYS}
+    data['windows'] = {hwnd: window.get('rect') for hwnd, window in (data['windows'] or {}).items()}
+    return data
+
+
+def compare(report, baseline):
+    """返回结果不同的项和各延迟直方图中位数的变化"""
+    current, previous = outcome(report), outcome(baseline)
+    differences = {key: {'baseline': previous[key], 'replay': current[key]}
+                   for key in OUTCOME_KEYS if current[key] != previous[key]}
+    latency = {}
+    for name, histogram in report.get('latency_ms', {}).items():
+        old = baseline.get('latency_ms', {}).get(name)
+        if old is not None:
+            latency[name] = {'baseline_p50': old.get('p50'), 'replay_p50': histogram.get('p50'),
+                             'baseline_max': old.get('max'), 'replay_max': histogram.get('max')}
+    return {'same_outcome': not differences, 'differences': differences, 'latency_ms': latency}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='在模拟桌面上重放录制的输入轨迹')
+    parser.add_argument('trace', help='轨迹文件')
+    parser.add_argument('--speed', type=float, default=1.0, help='重放倍速，大于 1 时加速')
+    parser.add_argument('--moves', action='store_true', help='报告中附带每次窗口移动（按录制时间，毫秒）')
+    parser.add_argument('--baseline', help='上一次的重放报告，比较结果和延迟')
+    parser.add_argument('--output', help='报告写入的文件，默认输出到标准输出')
+    args = parser.parse_args()
+
+    report = TraceReplay(args.trace, args.speed).run(move_log=args.moves)
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            report['comparison'] = compare(report, json.load(f))
+
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+    if args.baseline and not report['comparison']['same_outcome']:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,50 +1,73 @@
+import io
 from PIL import Image, ImageDraw
 
+# 托盘图标尺寸，预渲染为 PNG 嵌入 modules/icon_data.py，程序启动时不再用 PIL 绘制
+TRAY_ICON_SIZE = 64
+
+def draw_water_icon(size):
+    """绘制水字形状的图标"""
+    image = Image.new('RGBA', size, color=(0, 0, 0, 0))
+    draw = ImageDraw.Draw(image)
+    
+    # 计算缩放比例
+    scale = size[0] / 64.0
+    
+    # 绘制类似甲骨文中"水"字的图形
+    # 主体部分
+    points = [
+        (int(32 * scale), int(10 * scale)),  # 顶部中心
+        (int(15 * scale), int(25 * scale)),  # 左上
+        (int(20 * scale), int(32 * scale)),  # 左中
+        (int(15 * scale), int(40 * scale)),  # 左下
+        (int(32 * scale), int(50 * scale)),  # 底部中心
+        (int(49 * scale), int(40 * scale)),  # 右下
+        (int(44 * scale), int(32 * scale)),  # 右中
+        (int(49 * scale), int(25 * scale)),  # 右上
+        (int(32 * scale), int(10 * scale))   # 回到顶部中心
+    ]
+    
+    # 绘制外边框（白色）
+    line_width = max(1, int(3 * scale))
+    draw.line(points, fill=(255, 255, 255), width=line_width)
+    
+    # 绘制内部波浪线（白色）
+    wave_points = [
+        (int(25 * scale), int(28 * scale)),
+        (int(32 * scale), int(33 * scale)),
+        (int(39 * scale), int(28 * scale)),
+        (int(32 * scale), int(38 * scale)),
+        (int(25 * scale), int(33 * scale))
+    ]
+    wave_width = max(1, int(2 * scale))
+    draw.line(wave_points, fill=(255, 255, 255), width=wave_width)
+    
+    return image
+
 def create_water_icon():
     """创建水字形状的图标"""
     sizes = [(16, 16), (32, 32), (48, 48), (64, 64), (128, 128), (256, 256)]
-    images = []
-    
-    for size in sizes:
-        image = Image.new('RGBA', size, color=(0, 0, 0, 0))
-        draw = ImageDraw.Draw(image)
-        
-        # 计算缩放比例
-        scale = size[0] / 64.0
-        
-        # 绘制类似甲骨文中"水"字的图形
-        # 主体部分
-        points = [
-            (int(32 * scale), int(10 * scale)),  # 顶部中心
-            (int(15 * scale), int(25 * scale)),  # 左上
-            (int(20 * scale), int(32 * scale)),  # 左中
-            (int(15 * scale), int(40 * scale)),  # 左下
-            (int(32 * scale), int(50 * scale)),  # 底部中心
-            (int(49 * scale), int(40 * scale)),  # 右下
-            (int(44 * scale), int(32 * scale)),  # 右中
-            (int(49 * scale), int(25 * scale)),  # 右上
-            (int(32 * scale), int(10 * scale))   # 回到顶部中心
-        ]
-        
-        # 绘制外边框（白色）
-        line_width = max(1, int(3 * scale))
-        draw.line(points, fill=(255, 255, 255), width=line_width)
-        
-        # 绘制内部波浪线（白色）
-        wave_points = [
-            (int(25 * scale), int(28 * scale)),
-            (int(32 * scale), int(33 * scale)),
-            (int(39 * scale), int(28 * scale)),
-            (int(32 * scale), int(38 * scale)),
-            (int(25 * scale), int(33 * scale))
-        ]
-        wave_width = max(1, int(2 * scale))
-        draw.line(wave_points, fill=(255, 255, 255), width=wave_width)
-        
-        images.append(image)
+    images = [draw_water_icon(size) for size in sizes]
     
     # 保存为ICO文件
     images[0].save('icon.ico', format='ICO', sizes=sizes, append_images=images[1:])
 
+def create_tray_icon_data():
+    """把托盘图标预渲染为 PNG，写入 modules/icon_data.py"""
+    buffer = io.BytesIO()
+    draw_water_icon((TRAY_ICON_SIZE, TRAY_ICON_SIZE)).save(buffer, format='PNG', optimize=True)
+    data = buffer.getvalue()
+    
+    lines = ['# 由 create_icon.py 生成，请勿手动修改', '']
+    lines.append(f'TRAY_ICON_SIZE = {TRAY_ICON_SIZE}')
+    lines.append('')
+    lines.append('# 托盘图标（PNG）')
+    lines.append('TRAY_ICON_PNG = (')
+    for i in range(0, len(data), 32):
+        lines.append(f'    {data[i:i + 32]!r}')
+    lines.append(')')
+    with open('modules/icon_data.py', 'w', encoding='utf-8', newline='\r\n') as f:
+        f.write('\n'.join(lines) + '\n')
+
 if __name__ == '__main__':
-    create_water_icon() 
\ No newline at end of file
+    create_water_icon()
+    create_tray_icon_data() 
\ No newline at end of file
@@ -1,6 +1,18 @@
-from .window_manager import WindowManager
-from .animation_controller import AnimationController
-from .input_handler import InputHandler
-from .tray_icon import TrayIcon
+# 按需导入各模块，使只依赖部分模块（例如模拟桌面和基准测试）时不必加载 Windows 专用依赖
+_EXPORTS = {
+    'WindowManager': '.window_manager',
+    'AnimationController': '.animation_controller',
+    'InputHandler': '.input_handler',
+    'TrayIcon': '.tray_icon',
+}
 
-__all__ = ['WindowManager', 'AnimationController', 'InputHandler', 'TrayIcon'] 
\ No newline at end of file
+__all__ = ['WindowManager', 'AnimationController', 'InputHandler', 'TrayIcon']
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import importlib
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,85 @@
+import threading
+from collections import OrderedDict
+
+
+class ActionQueue:
+    """工作线程的动作队列
+
+    键盘钩子、光标事件源等回调只调用 put，不会阻塞：
+    - 带 key 的动作与队列中同一 key 的未处理动作合并，后来的覆盖先前的（保留原来的排队位置）；
+      tag 相同的两个动作互相抵消（例如对同一窗口连按两次同一快捷键）
+    - 带 key 的动作在队列已满（maxsize）时直接丢弃并计数，回调永远不会等待工作线程
+    - 不带 key 的动作（内部回调、外部命令）总是入队，不参与合并和丢弃
+    """
+
+    def __init__(self, maxsize=64):
+        self.maxsize = maxsize
+        self.items = OrderedDict()
+        self.condition = threading.Condition()
+        # 已取出但还未执行完的动作数
+        self.active = 0
+        # 统计：入队、合并、抵消、因队列已满丢弃的动作数
+        self.queued = 0
+        self.coalesced = 0
+        self.cancelled = 0
+        self.dropped = 0
+
+    def put(self, item, key=None, tag=None):
+        """排入动作，返回是否入队（合并也算入队）"""
+        with self.condition:
+            if key is not None:
+                pending = self.items.get(key)
+                if pending is not None:
+                    if tag is not None and pending[1] == tag:
+                        del self.items[key]
+                        self.cancelled += 1
+                    else:
+                        self.items[key] = (item, tag)
+                        self.coalesced += 1
+                    return True
+                if len(self.items) >= self.maxsize:
+                    self.dropped += 1
+                    return False
+            else:
+                # 不参与合并的动作使用唯一的 key
+                key = object()
+            self.items[key] = (item, tag)
+            self.queued += 1
+            self.condition.notify()
+            return True
+
+    def get(self):
+        """取出最早的动作，队列为空时阻塞等待"""
+        with self.condition:
+            while not self.items:
+                self.condition.wait()
+            _, (item, tag) = self.items.popitem(last=False)
+            self.active += 1
+            return item
+
+    def task_done(self):
+        """get 取出的动作执行完毕"""
+        with self.condition:
+            self.active -= 1
+
+    def empty(self):
+        """队列是否为空"""
+        return not self.items
+
+    def idle(self):
+        """队列为空且没有正在执行的动作"""
+        return not self.items and not self.active
+
+    def __len__(self):
+        return len(self.items)
+
+    def stats(self):
+        """返回统计数据"""
+        with self.condition:
+            return {
+                'pending': len(self.items),
+                'queued': self.queued,
+                'coalesced': self.coalesced,
+                'cancelled': self.cancelled,
+                'dropped': self.dropped,
+            }
@@ -1,5 +1,7 @@
-import time
 from .window_manager import WindowManager
+from . import easing
+from .animation_scheduler import AnimationScheduler, AnimationHandle, AnimationGroup
+from .window_reconciler import WindowReconciler
 
 class AnimationController:
     def __init__(self, window_manager: WindowManager):
@@ -8,12 +10,17 @@ class AnimationController:
         self.animation_enabled = False
         # 动画速度（倍率）
         self.animation_speed = 1.0
-        # 动画步数（越大越平滑，但可能更耗性能）
-        self.animation_steps = 30
-        # 每步时间间隔（毫秒）
-        self.animation_interval = 8
+        # 动画时长（毫秒，1.0x 速度下），位置按经过的时间计算，负载高时丢帧而不是拖长动画
+        self.animation_duration = 240
+        # 帧率上限（越高越平滑，但可能更耗性能），0 表示跟随显示器刷新率
+        self.frame_rate = 60
         # 动画曲线类型
-        self.animation_curve = 'ease'  # 'linear', 'ease', 'ease-in', 'ease-out'
+        self.animation_curve = 'ease'  # 'linear', 'ease', 'ease-in', 'ease-out'，或贝塞尔/弹簧参数
+        self.compiled_curve = easing.compile_curve(easing.normalize_spec(self.animation_curve))
+        # 动画调度器，所有窗口动画都在它的帧循环线程上推进
+        self.scheduler = AnimationScheduler(self)
+        # 隐藏窗口位置校正，窗口被其他程序移走时移回
+        self.reconciler = WindowReconciler(self)
         
     def set_animation_enabled(self, enabled):
         """设置动画开关"""
@@ -23,20 +30,38 @@ class AnimationController:
         """设置动画速度"""
         self.animation_speed = speed
 
-    def set_animation_quality(self, steps, interval):
+    def set_animation_quality(self, frame_rate):
         """设置动画质量
         
         Args:
-            steps: 动画步数（10-60）
-            interval: 每步时间间隔（1-20毫秒）
+            frame_rate: 帧率上限（10-240），0 表示跟随显示器刷新率
         """
-        self.animation_steps = max(10, min(60, steps))
-        self.animation_interval = max(1, min(20, interval))
+        self.frame_rate = 0 if frame_rate <= 0 else max(10, min(240, frame_rate))
+
+    def get_animation_duration(self):
+        """获取当前速度下的动画时长（秒）"""
+        return self.animation_duration / self.animation_speed / 1000
+
+    def get_frame_interval(self):
+        """获取帧间隔（秒），不超过显示器刷新率；跟随刷新率时返回 None"""
+        if self.frame_rate == 0:
+            return None
+        refresh_rate = self.window_manager.get_refresh_rate()
+        return 1.0 / min(self.frame_rate, refresh_rate)
 
     def set_animation_curve(self, curve_type):
-        """设置动画曲线类型"""
-        if curve_type in ['linear', 'ease', 'ease-in', 'ease-out']:
-            self.animation_curve = curve_type
+        """设置动画曲线类型
+
+        Args:
+            curve_type: 'linear'、'ease'、'ease-in'、'ease-out'，
+                或 ('cubic-bezier', x1, y1, x2, y2)、('spring', stiffness, damping[, mass])
+        """
+        try:
+            spec = easing.normalize_spec(curve_type)
+        except (ValueError, TypeError):
+            return
+        self.animation_curve = curve_type
+        self.compiled_curve = easing.compile_curve(spec)
 
     def get_curve_value(self, progress):
         """根据动画曲线类型计算插值
@@ -44,60 +69,61 @@ class AnimationController:
         Args:
             progress: 动画进度（0-1）
         Returns:
-            插值后的进度值（0-1）
+            插值后的进度值（0-1，弹簧曲线可能略超出）
         """
-        if self.animation_curve == 'linear':
-            return progress
-        elif self.animation_curve == 'ease':
-            # 使用三次贝塞尔曲线
-            return progress * progress * (3 - 2 * progress)
-        elif self.animation_curve == 'ease-in':
-            # 缓入
-            return progress * progress
-        elif self.animation_curve == 'ease-out':
-            # 缓出
-            return 1 - (1 - progress) * (1 - progress)
-        return progress
+        return self.compiled_curve.value(progress)
+
+    def get_trajectory(self, dx, dy, frames):
+        """获取位移 (dx, dy) 分 frames 帧完成时每帧相对起点的偏移"""
+        return easing.get_trajectory(self.compiled_curve.spec, dx, dy, frames)
 
     def animate_window(self, hwnd, start_x, start_y, end_x, end_y):
-        """使用动画移动窗口"""
-        if not self.animation_enabled:
+        """使用动画移动窗口
+
+        立即返回 AnimationHandle，不阻塞调用线程。
+        若该窗口已有进行中的动画，则从其当前位置转向新目标；
+        没有进行中的动画且已在目标位置时不移动窗口，直接返回已完成的句柄。
+        窗口规则可以对个别程序关闭或强制开启动画。
+        """
+        if (start_x, start_y) == (end_x, end_y) and not self.scheduler.is_animating(hwnd):
+            handle = AnimationHandle(hwnd, end_x, end_y)
+            handle._finish(AnimationHandle.COMPLETED)
+            return handle
+        animate = self.window_manager.rules.profile(hwnd).animate
+        if animate is None:
+            animate = self.animation_enabled
+        if not animate:
             # 如果动画被禁用，直接移动到目标位置
-            self.window_manager.set_window_pos(hwnd, end_x, end_y)
-            return
-            
-        interval = self.animation_interval / self.animation_speed
-        
-        for i in range(self.animation_steps + 1):
-            progress = i / self.animation_steps
-            eased_progress = self.get_curve_value(progress)
-            
-            x = int(start_x + (end_x - start_x) * eased_progress)
-            y = int(start_y + (end_y - start_y) * eased_progress)
-            
-            self.window_manager.set_window_pos(hwnd, x, y)
-            time.sleep(interval / 1000)  # 转换为秒
-
-    def verify_window_hidden(self, hwnd, direction, start_x, start_y, end_x, end_y, retries=3):
-        """验证窗口是否成功隐藏，如果没有则重试"""
-        for _ in range(retries):
+            self.scheduler.cancel_window(hwnd)
+            handle = AnimationHandle(hwnd, end_x, end_y)
+            group = self.scheduler.active_group()
+            if group is not None:
+                # 组内的移动在组结束时一起提交
+                group.defer_move(handle)
+                return handle
             try:
-                rect = self.window_manager.get_window_rect(hwnd)
-                current_x, current_y = rect['x'], rect['y']
-                
-                # 检查窗口位置是否符合预期的隐藏位置（允许5像素误差）
-                if abs(current_x - end_x) <= 5 and abs(current_y - end_y) <= 5:
-                    return True
-                    
-                # 如果位置不对，重新尝试隐藏
-                if self.animation_enabled:
-                    self.animate_window(hwnd, current_x, current_y, end_x, end_y)
-                    time.sleep(0.1)  # 等待动画完成
-                else:
-                    self.window_manager.set_window_pos(hwnd, end_x, end_y)
-                
+                self.window_manager.set_window_pos(hwnd, end_x, end_y)
+                handle._finish(AnimationHandle.COMPLETED)
             except Exception as e:
-                print(f"验证窗口隐藏时出错: {e}")
-                return False
-                
-        return False 
\ No newline at end of file
+                handle._finish(AnimationHandle.FAILED, e)
+            return handle
+
+        return self.scheduler.start_animation(hwnd, start_x, start_y, end_x, end_y)
+
+    def frame_group(self):
+        """返回 AnimationGroup，with 块内启动的窗口移动在同一帧开始
+
+        用法：
+            with animation_controller.frame_group():
+                animation_controller.animate_window(...)
+        """
+        return AnimationGroup(self)
+
+    def is_animating(self, hwnd):
+        """窗口是否正在动画中"""
+        return self.scheduler.is_animating(hwnd)
+
+    def stop(self):
+        """停止所有动画和位置校正"""
+        self.reconciler.stop()
+        self.scheduler.stop()
@@ -0,0 +1,330 @@
+import threading
+import time
+
+
+class AnimationHandle:
+    """窗口动画句柄
+
+    调用方拿到句柄后立即返回，可以等待完成、取消，或注册完成回调。
+    """
+
+    RUNNING = 'running'
+    COMPLETED = 'completed'
+    CANCELLED = 'cancelled'
+    RETARGETED = 'retargeted'
+    FAILED = 'failed'
+
+    def __init__(self, hwnd, end_x, end_y):
+        self.hwnd = hwnd
+        self.target = (end_x, end_y)
+        self.state = self.RUNNING
+        self.error = None
+        self.scheduler = None
+        self._event = threading.Event()
+        self._callbacks = []
+        self._lock = threading.Lock()
+
+    @property
+    def completed(self):
+        """是否已到达目标位置"""
+        return self.state == self.COMPLETED
+
+    def done(self):
+        """动画是否已结束（无论结果如何）"""
+        return self._event.is_set()
+
+    def wait(self, timeout=None):
+        """等待动画结束，返回是否已结束"""
+        return self._event.wait(timeout)
+
+    def cancel(self):
+        """取消动画，窗口停在当前位置"""
+        if self.scheduler is not None:
+            self.scheduler.cancel(self)
+        else:
+            self._finish(self.CANCELLED)
+
+    def add_done_callback(self, callback):
+        """注册完成回调 callback(handle)，已结束时立即调用"""
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return
+        callback(self)
+
+    def _finish(self, state, error=None):
+        """结束动画并触发回调"""
+        with self._lock:
+            if self._event.is_set():
+                return
+            self.state = state
+            self.error = error
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback(self)
+            except Exception as e:
+                print(f"Error in animation callback: {e}")
+
+
+class WindowAnimation:
+    """调度器内部的单个窗口动画"""
+
+    def __init__(self, handle, start_x, start_y, end_x, end_y, start_time, duration, path):
+        self.handle = handle
+        self.start = (start_x, start_y)
+        self.end = (end_x, end_y)
+        self.current = (start_x, start_y)
+        self.start_time = start_time
+        self.duration = duration
+        # 预先计算好的轨迹（相对起点的偏移），帧循环按进度查表
+        self.path = path
+        self.frames = len(path) - 1
+
+
+class AnimationGroup:
+    """一组同时开始的窗口移动
+
+    with 块内由当前线程启动的动画先记在组内，退出时一起加入帧循环，使用相同的起始时间并在同一帧开始推进；
+    动画关闭时块内的直接移动合并为一次批量移动，在退出时提交。
+    块内不持有调度器的锁，帧循环和其他线程照常运行。可以嵌套，只有最外层生效。
+    """
+
+    def __init__(self, animation_controller):
+        self.animation_controller = animation_controller
+        self.scheduler = animation_controller.scheduler
+        # 块内启动的动画 (AnimationHandle, 起点 x, 起点 y, 终点 x, 终点 y)
+        self.animations = []
+        self.moves = []
+        self.nested = False
+
+    def __enter__(self):
+        local = self.scheduler.local
+        group = getattr(local, 'group', None)
+        if group is not None:
+            self.nested = True
+            return group
+        local.group = self
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.nested:
+            return False
+        self.scheduler.local.group = None
+        animations, self.animations = self.animations, []
+        if animations:
+            self.scheduler.add_animations(animations, time.monotonic())
+        self.commit_moves()
+        return False
+
+    def defer_animation(self, handle, start_x, start_y, end_x, end_y):
+        """记录一个动画，退出时与组内其他动画一起开始"""
+        self.animations.append((handle, start_x, start_y, end_x, end_y))
+
+    def defer_move(self, handle):
+        """记录一次直接移动，退出时与组内其他移动一起提交"""
+        self.moves.append(handle)
+
+    def commit_moves(self):
+        moves, self.moves = self.moves, []
+        if not moves:
+            return
+        batch = self.animation_controller.window_manager.begin_batch()
+        for handle in moves:
+            batch.move(handle.hwnd, *handle.target)
+        try:
+            errors = batch.commit()
+        except Exception as e:
+            errors = {handle.hwnd: e for handle in moves}
+        for handle in moves:
+            error = errors.get(handle.hwnd)
+            if error is None:
+                handle._finish(AnimationHandle.COMPLETED)
+            else:
+                handle._finish(AnimationHandle.FAILED, error)
+
+
+class AnimationScheduler:
+    """动画调度器
+
+    由一个专用线程持有所有进行中的窗口动画，每帧统一推进。
+    每帧的位置由动画开始后经过的单调时间决定，系统跟不上时丢帧，动画仍按时结束。
+    没有动画时线程阻塞等待，不产生任何唤醒。
+    """
+
+    def __init__(self, animation_controller):
+        self.animation_controller = animation_controller
+        self.animations = {}
+        self.condition = threading.Condition()
+        self.running = True
+        self.thread = None
+        # 各线程当前的 AnimationGroup（local.group）
+        self.local = threading.local()
+        # 统计：已绘制帧数和因落后而丢弃的帧数
+        self.frames = 0
+        self.dropped_frames = 0
+
+    def start_animation(self, hwnd, start_x, start_y, end_x, end_y):
+        """启动窗口动画，若该窗口已有动画则从当前位置转向新目标；在 AnimationGroup 内时到组结束才开始"""
+        handle = AnimationHandle(hwnd, end_x, end_y)
+        handle.scheduler = self
+        group = self.active_group()
+        if group is not None:
+            group.defer_animation(handle, start_x, start_y, end_x, end_y)
+        else:
+            self.add_animations([(handle, start_x, start_y, end_x, end_y)], time.monotonic())
+        return handle
+
+    def add_animations(self, animations, start_time):
+        """把一组动画 (句柄, 起点 x, 起点 y, 终点 x, 终点 y) 以相同的起始时间加入帧循环，已取消的跳过"""
+        duration = self.animation_controller.get_animation_duration()
+        frames = self.get_frame_count(duration)
+        retargeted = []
+        with self.condition:
+            for handle, start_x, start_y, end_x, end_y in animations:
+                if handle.done():
+                    continue
+                hwnd = handle.hwnd
+                previous = self.animations.get(hwnd)
+                if previous is not None:
+                    start_x, start_y = previous.current
+                    retargeted.append(previous.handle)
+                else:
+                    # 起点来自实际读取的窗口位置，以它为准判断后续移动是否多余
+                    self.animation_controller.window_manager.observe_window_pos(hwnd, start_x, start_y)
+                path = self.animation_controller.get_trajectory(end_x - start_x, end_y - start_y, frames)
+                self.animations[hwnd] = WindowAnimation(
+                    handle, start_x, start_y, end_x, end_y, start_time, duration, path)
+            self.ensure_thread()
+            self.condition.notify()
+        for handle in retargeted:
+            handle._finish(AnimationHandle.RETARGETED)
+
+    def active_group(self):
+        """当前线程所在的 AnimationGroup，不在组内时返回 None"""
+        return getattr(self.local, 'group', None)
+
+    def get_frame_count(self, duration):
+        """按当前帧率计算动画的计划帧数"""
+        interval = self.animation_controller.get_frame_interval()
+        if interval is None:
+            interval = 1.0 / self.animation_controller.window_manager.get_refresh_rate()
+        return max(1, int(round(duration / interval)))
+
+    def cancel(self, handle):
+        """取消指定动画"""
+        with self.condition:
+            animation = self.animations.get(handle.hwnd)
+            if animation is not None and animation.handle is handle:
+                del self.animations[handle.hwnd]
+        handle._finish(AnimationHandle.CANCELLED)
+
+    def cancel_window(self, hwnd):
+        """取消窗口上进行中的动画"""
+        with self.condition:
+            animation = self.animations.pop(hwnd, None)
+        if animation is not None:
+            animation.handle._finish(AnimationHandle.CANCELLED)
+
+    def is_animating(self, hwnd):
+        """窗口是否有进行中的动画"""
+        return hwnd in self.animations
+
+    def ensure_thread(self):
+        """按需启动帧循环线程"""
+        if self.thread is None or not self.thread.is_alive():
+            self.thread = threading.Thread(target=self.run, daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        """停止调度器，取消所有动画"""
+        with self.condition:
+            self.running = False
+            animations = list(self.animations.values())
+            self.animations.clear()
+            self.condition.notify()
+        for animation in animations:
+            animation.handle._finish(AnimationHandle.CANCELLED)
+
+    def run(self):
+        """帧循环"""
+        window_manager = self.animation_controller.window_manager
+        next_frame = time.monotonic()
+        while True:
+            with self.condition:
+                if not self.animations:
+                    while self.running and not self.animations:
+                        self.condition.wait()
+                    next_frame = time.monotonic()
+                if not self.running:
+                    return
+                animations = list(self.animations.values())
+
+            finished = self.advance(animations, time.monotonic())
+            self.frames += 1
+            window_manager.wakeups.tick('animation_frame')
+
+            with self.condition:
+                for animation, state, error in finished:
+                    if self.animations.get(animation.handle.hwnd) is animation:
+                        del self.animations[animation.handle.hwnd]
+            for animation, state, error in finished:
+                animation.handle._finish(state, error)
+
+            next_frame = self.wait_next_frame(next_frame)
+
+    def wait_next_frame(self, next_frame):
+        """等待下一帧的时间点，返回该时间点"""
+        interval = self.animation_controller.get_frame_interval()
+        window_manager = self.animation_controller.window_manager
+        if interval is None:
+            # 跟随显示器刷新：优先等待桌面合成，不可用时按刷新率计时
+            if window_manager.wait_for_vblank():
+                return time.monotonic()
+            interval = 1.0 / window_manager.get_refresh_rate()
+
+        next_frame += interval
+        now = time.monotonic()
+        if now > next_frame:
+            # 落后于计划：跳过错过的帧，保持在原有的帧时间网格上
+            missed = int((now - next_frame) // interval) + 1
+            self.dropped_frames += missed
+            next_frame += missed * interval
+        time.sleep(max(0.0, next_frame - now))
+        return next_frame
+
+    def advance(self, animations, now):
+        """按当前时间推进一帧，返回已结束的动画列表"""
+        finished = []
+        frame = []
+        for animation in animations:
+            if animation.handle.done():
+                continue
+            elapsed = now - animation.start_time
+            progress = 1.0 if animation.duration <= 0 else min(1.0, elapsed / animation.duration)
+            index = animation.frames if progress >= 1.0 else int(progress * animation.frames)
+            offset_x, offset_y = animation.path[index]
+            start_x, start_y = animation.start
+            frame.append((animation, start_x + offset_x, start_y + offset_y, progress >= 1.0))
+
+        # 本帧所有窗口的位置一次性提交
+        window_manager = self.animation_controller.window_manager
+        metrics = window_manager.metrics
+        started = time.perf_counter() if metrics.enabled else None
+        batch = window_manager.begin_batch()
+        for animation, x, y, last in frame:
+            batch.move(animation.handle.hwnd, x, y)
+        errors = batch.commit()
+        if started is not None:
+            metrics.observe('frame_move', started)
+
+        for animation, x, y, last in frame:
+            error = errors.get(animation.handle.hwnd)
+            if error is not None:
+                finished.append((animation, AnimationHandle.FAILED, error))
+                continue
+            animation.current = (x, y)
+            if last:
+                finished.append((animation, AnimationHandle.COMPLETED, None))
+        return finished
@@ -0,0 +1,132 @@
+from .window_batch import DeferPosBackend
+
+
+class DesktopBackend(DeferPosBackend):
+    """桌面后端接口
+
+    WindowManager、AnimationController、InputHandler 用到的所有系统调用都经由后端完成，
+    Windows 下为 Win32Backend，测试和基准测试中为 SimulatedDesktop。
+    矩形统一为 (left, top, right, bottom)。
+    """
+
+    # 窗口
+    def get_foreground_window(self):
+        """当前前台窗口"""
+        raise NotImplementedError
+
+    def is_window(self, hwnd):
+        """窗口句柄是否有效"""
+        raise NotImplementedError
+
+    def get_window_text(self, hwnd):
+        """窗口标题"""
+        raise NotImplementedError
+
+    def get_window_rect(self, hwnd):
+        """窗口矩形"""
+        raise NotImplementedError
+
+    def show_window(self, hwnd, command):
+        """ShowWindow，command 为 'restore'、'minimize'、'minimize_inactive'（不激活其他窗口）、'hide'、'show'（不激活）"""
+        raise NotImplementedError
+
+    def set_window_cloaked(self, hwnd, cloaked):
+        """DWM 隐藏/取消隐藏窗口（保留位置和表面但不参与合成），系统拒绝时退回 ShowWindow 隐藏/显示"""
+        raise NotImplementedError
+
+    # 边缘标签窗口（隐藏方式 cloak/minimize 用来代替边条）
+    def create_edge_tab(self, rect):
+        """在 rect 处创建并显示一个置顶、不激活、不接收鼠标的小窗口，返回其句柄"""
+        raise NotImplementedError
+
+    def move_edge_tab(self, tab, rect):
+        """移动标签窗口"""
+        raise NotImplementedError
+
+    def show_edge_tab(self, tab, visible):
+        """显示/隐藏标签窗口"""
+        raise NotImplementedError
+
+    def destroy_edge_tab(self, tab):
+        """销毁标签窗口"""
+        raise NotImplementedError
+
+    def enumerate_windows(self):
+        """所有可见且有标题的顶层窗口（按 Z 序）"""
+        raise NotImplementedError
+
+    def get_class_name(self, hwnd):
+        """窗口类名，用于诊断"""
+        return ''
+
+    def get_process_name(self, hwnd):
+        """窗口所属进程的可执行文件名，用于诊断"""
+        return ''
+
+    # 前台激活
+    def get_window_thread_id(self, hwnd):
+        """窗口所属线程 ID"""
+        raise NotImplementedError
+
+    def get_current_thread_id(self):
+        """当前线程 ID"""
+        raise NotImplementedError
+
+    def attach_thread_input(self, thread_id, target_thread_id, attach):
+        """关联/解除两个线程的输入状态"""
+        raise NotImplementedError
+
+    def set_window_topmost(self, hwnd, topmost):
+        """把窗口置于/取消置顶层"""
+        raise NotImplementedError
+
+    def set_foreground_window(self, hwnd):
+        """SetForegroundWindow，返回是否成功"""
+        raise NotImplementedError
+
+    def bring_window_to_top(self, hwnd):
+        """BringWindowToTop"""
+        raise NotImplementedError
+
+    # 光标与显示器
+    def get_cursor_pos(self):
+        """光标位置 (x, y)"""
+        raise NotImplementedError
+
+    def enumerate_monitors(self):
+        """返回 Monitor 列表"""
+        raise NotImplementedError
+
+    def get_refresh_rate(self):
+        """显示器刷新率（Hz）"""
+        raise NotImplementedError
+
+    def wait_for_vblank(self):
+        """等待下一次桌面合成，不支持时返回 False"""
+        return False
+
+    # 事件源
+    def create_event_watcher(self):
+        """创建窗口事件监听器（add_listener/start/stop/pause/resume）"""
+        raise NotImplementedError
+
+    def create_cursor_source(self):
+        """创建光标事件源（CursorSource）"""
+        raise NotImplementedError
+
+    def create_virtual_desktops(self):
+        """创建虚拟桌面提供者（current_desktop/window_desktop，见 virtual_desktops），默认只有一个桌面"""
+        from .virtual_desktops import SingleDesktop
+        return SingleDesktop()
+
+    def get_modifier_state(self):
+        """当前按下的修饰键（hotkey_engine 中的 SHIFT/CTRL/ALT/WIN 位），无法获取时返回 None"""
+        return None
+
+    def create_keyboard_listener(self, on_press, on_release):
+        """创建键盘监听器（start/stop），按键对象的 name 属性为键名"""
+        raise NotImplementedError
+
+    def create_command_listener(self, on_connection, address=None):
+        """创建本机命令通道监听器（start/stop），每个客户端连接在新线程上调用 on_connection(连接)"""
+        raise NotImplementedError
@@ -0,0 +1,364 @@
+import json
+import threading
+
+# 隐藏方向
+EDGES = ('left', 'right', 'top', 'bottom')
+
+
+class CommandError(Exception):
+    """命令格式或参数错误"""
+
+
+def encode(message):
+    """把响应编码为一行紧凑的 JSON"""
+    return (json.dumps(message, ensure_ascii=False, separators=(',', ':')) + '\n').encode('utf-8')
+
+
+class ResponseStream:
+    """一个请求的响应流
+
+    响应可能来自不同线程（命令线程、动画帧线程），发送时加锁保证每行完整。
+    begin/end 成对调用，所有操作都结束后 finished 被设置，连接线程才读取下一个请求。
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.lock = threading.Lock()
+        self.pending = 0
+        self.finished = threading.Event()
+        self.broken = False
+
+    def send(self, message):
+        with self.lock:
+            if self.broken:
+                return
+            try:
+                self.connection.send(encode(message))
+            except Exception:
+                # 客户端已断开，后续响应直接丢弃
+                self.broken = True
+
+    def begin(self):
+        with self.lock:
+            self.pending += 1
+
+    def end(self):
+        with self.lock:
+            self.pending -= 1
+            if self.pending == 0:
+                self.finished.set()
+
+
+class CommandProgress:
+    """一条命令涉及的窗口，每个窗口移动结束时发送一行响应，全部结束后发送 done"""
+
+    def __init__(self, stream, command_id, windows, on_done=None):
+        self.stream = stream
+        self.command_id = command_id
+        self.windows = windows
+        self.remaining = len(windows)
+        self.lock = threading.Lock()
+        self.on_done = on_done
+
+    def start(self):
+        self.stream.begin()
+        if not self.windows:
+            self.finish()
+            return
+        for hwnd, handle in self.windows:
+            if handle is None:
+                self.window_done(hwnd, 'completed')
+            else:
+                handle.add_done_callback(
+                    lambda h, hwnd=hwnd: self.window_done(hwnd, h.state, h.error))
+
+    def window_done(self, hwnd, state, error=None):
+        message = {'id': self.command_id, 'hwnd': hwnd, 'state': state}
+        if error is not None:
+            message['error'] = str(error)
+        self.stream.send(message)
+        with self.lock:
+            self.remaining -= 1
+            last = self.remaining == 0
+        if last:
+            self.finish()
+
+    def finish(self):
+        self.stream.send({'id': self.command_id, 'ok': True, 'done': True, 'count': len(self.windows)})
+        if self.on_done is not None:
+            self.on_done()
+        self.stream.end()
+
+
+class CommandServer:
+    """本机命令通道，供脚本批量隐藏/显示窗口
+
+    Windows 下为命名管道 \\\\.\\pipe\\WindowController，模拟桌面下为 Unix 套接字。
+    协议为逐行 JSON，每个请求一行：
+        {"id": 1, "op": "hide", "edge": "left", "hwnd": 123}      按 hwnd / "title"（包含）/ "process"（可执行文件名）选择窗口
+        {"id": 2, "op": "show", "process": "notepad.exe"}         恢复显示匹配的隐藏窗口
+        {"id": 3, "op": "list"}                                   列出隐藏窗口
+        {"id": 4, "op": "restore_all"}                            恢复所有隐藏窗口
+        {"id": 5, "op": "batch", "commands": [...]}               多条命令作为同一组窗口移动执行
+        {"id": 6, "op": "strategy", "strategy": "cloak", "process": "chrome.exe"}
+                                                                  按 "process" / "class"（窗口类名）指定之后隐藏时的隐藏方式，
+                                                                  写入只按该字段匹配的窗口规则，strategy 为 null 时删除该设置
+        {"id": 7, "op": "rules", "rules": [{"process": "game*.exe", "hide": false}, ...]}
+                                                                  整体替换窗口规则（格式见 window_rules），"rules" 省略时只返回当前规则
+    每个窗口移动结束时返回 {"id", "hwnd", "state"}，一条命令的所有窗口结束后返回 {"id", "ok": true, "done": true}；
+    出错时返回 {"id", "ok": false, "error"}。一个请求的响应全部发出后才处理同一连接上的下一个请求。
+    命令在 InputHandler 处理边缘事件的线程上执行，与快捷键、边缘触发的操作共用同一套状态。
+    """
+
+    # 等待一个请求的所有窗口移动结束的最长时间（秒）
+    TIMEOUT = 10.0
+
+    def __init__(self, input_handler, address=None):
+        self.input_handler = input_handler
+        self.window_manager = input_handler.window_manager
+        self.animation_controller = input_handler.animation_controller
+        self.listener = self.window_manager.backend.create_command_listener(self.handle_connection, address)
+
+    @property
+    def address(self):
+        """实际监听的地址（管道名、套接字路径或 (host, port)）"""
+        return self.listener.address
+
+    def start(self):
+        """开始监听，返回是否成功"""
+        return self.listener.start()
+
+    def stop(self):
+        """停止监听"""
+        self.listener.stop()
+
+    def handle_connection(self, connection):
+        """逐行读取请求并依次处理"""
+        buffer = b''
+        try:
+            while True:
+                data = connection.recv()
+                if not data:
+                    break
+                buffer += data
+                while b'\n' in buffer:
+                    line, buffer = buffer.split(b'\n', 1)
+                    if line.strip():
+                        self.handle_request(line, connection)
+        except Exception as e:
+            print(f"Error in command connection: {e}")
+        finally:
+            connection.close()
+
+    def handle_request(self, line, connection):
+        """执行一个请求，等待它的所有响应发出"""
+        stream = ResponseStream(connection)
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise CommandError('request must be an object')
+        except (ValueError, CommandError) as e:
+            stream.send({'id': None, 'ok': False, 'error': f'invalid request: {e}'})
+            return
+        stream.begin()
+        self.input_handler.call_on_event_thread(lambda: self.execute(request, stream))
+        if not stream.finished.wait(self.TIMEOUT):
+            stream.send({'id': request.get('id'), 'ok': False, 'error': 'timeout'})
+            with stream.lock:
+                stream.broken = True
+
+    def execute(self, request, stream):
+        """在事件线程上执行请求"""
+        request_id = request.get('id')
+        try:
+            if request.get('op') == 'batch':
+                commands = request.get('commands')
+                if not isinstance(commands, list):
+                    raise CommandError('batch requires a list of commands')
+            else:
+                commands = [request]
+            results = self.run_commands(commands, stream)
+        except CommandError as e:
+            stream.send({'id': request_id, 'ok': False, 'error': str(e)})
+            stream.end()
+            return
+        except Exception as e:
+            print(f"Error executing command: {e}")
+            stream.send({'id': request_id, 'ok': False, 'error': str(e)})
+            stream.end()
+            return
+
+        if request.get('op') == 'batch':
+            # 所有子命令结束后再发送批次的 done
+            remaining = [len(results)]
+            lock = threading.Lock()
+
+            def command_done():
+                with lock:
+                    remaining[0] -= 1
+                    last = remaining[0] == 0
+                if last:
+                    stream.send({'id': request_id, 'ok': True, 'done': True, 'count': len(results)})
+
+            for command_id, windows in results:
+                CommandProgress(stream, command_id, windows, command_done).start()
+            if not results:
+                stream.send({'id': request_id, 'ok': True, 'done': True, 'count': 0})
+        else:
+            for command_id, windows in results:
+                CommandProgress(stream, command_id, windows).start()
+        stream.end()
+
+    def run_commands(self, commands, stream):
+        """执行一组命令，所有窗口移动在同一组中开始，返回 [(命令 id, [(hwnd, AnimationHandle)])]
+
+        隐藏的窗口先全部登记，再对每个涉及的槽位排列一次。
+        """
+        results = []
+        slots = set()
+        with self.animation_controller.frame_group():
+            for command in commands:
+                if not isinstance(command, dict):
+                    raise CommandError('command must be an object')
+                command_id = command.get('id')
+                op = command.get('op')
+                try:
+                    if op == 'hide':
+                        # 隐藏窗口的移动来自随后的槽位排列，先只记录 hwnd
+                        results.append((command_id, self.hide(command, slots), True))
+                        continue
+                    elif op == 'show':
+                        windows = self.show(self.select_hidden(command), activate_last=True)
+                    elif op == 'restore_all':
+                        windows = self.show(list(self.window_manager.hidden_index), activate_last=False)
+                    elif op == 'list':
+                        stream.send({'id': command_id, 'ok': True, 'windows': self.list_hidden()})
+                        continue
+                    elif op == 'strategy':
+                        stream.send(dict(self.assign_strategy(command), id=command_id, ok=True, done=True))
+                        continue
+                    elif op == 'rules':
+                        stream.send(dict(self.replace_rules(command), id=command_id, ok=True, done=True))
+                        continue
+                    else:
+                        raise CommandError(f'unknown op: {op!r}')
+                except CommandError as e:
+                    stream.send({'id': command_id, 'ok': False, 'error': str(e)})
+                    continue
+                results.append((command_id, windows, False))
+
+            handles = {}
+            for slot in slots:
+                handles.update(self.input_handler.relayout_slot(slot))
+        return [(command_id, [(hwnd, handles.get(hwnd)) for hwnd in windows] if hidden else windows)
+                for command_id, windows, hidden in results]
+
+    def hide(self, command, slots):
+        edge = command.get('edge')
+        if edge not in EDGES:
+            raise CommandError(f'edge must be one of {", ".join(EDGES)}')
+        hwnds = []
+        for hwnd in self.select_windows(command):
+            slot = self.input_handler.hide_window(hwnd, edge, relayout=False)
+            if slot is not None:
+                slots.add(slot)
+                hwnds.append(hwnd)
+        return hwnds
+
+    def show(self, hwnds, activate_last):
+        windows = []
+        for index, hwnd in enumerate(hwnds):
+            location = self.window_manager.find_hidden(hwnd)
+            if location is None:
+                continue
+            activate = activate_last and index == len(hwnds) - 1
+            handle = self.input_handler.show_hidden_window(location[:3], hwnd, activate=activate)
+            windows.append((hwnd, handle))
+        return windows
+
+    def list_hidden(self):
+        snapshot = self.window_manager.state.snapshot
+        windows = []
+        for (monitor_id, edge, desktop), stack in snapshot.stacks.items():
+            for hwnd, title in stack:
+                windows.append({
+                    'hwnd': hwnd,
+                    'title': title,
+                    'monitor': monitor_id,
+                    'edge': edge,
+                    'desktop': desktop,
+                    'shown': hwnd in snapshot.shown,
+                    'phase': snapshot.windows[hwnd].phase,
+                    'strategy': snapshot.windows[hwnd].strategy,
+                })
+        return windows
+
+    def assign_strategy(self, command):
+        """strategy 命令：写入只设置隐藏方式的窗口规则"""
+        class_name = command.get('class')
+        process = command.get('process')
+        if not class_name and not process:
+            raise CommandError('a selector (class or process) is required')
+        for key, value in (('class', class_name), ('process', process)):
+            if value is not None and not isinstance(value, str):
+                raise CommandError(f'{key} must be a string')
+        try:
+            return {'count': self.window_manager.rules.assign_strategy(command.get('strategy'), process, class_name)}
+        except ValueError as e:
+            raise CommandError(str(e))
+
+    def replace_rules(self, command):
+        rules = self.window_manager.rules
+        if 'rules' not in command:
+            return {'rules': rules.rules()}
+        if not isinstance(command['rules'], list):
+            raise CommandError('rules must be a list')
+        try:
+            return {'count': rules.set_rules(command['rules'])}
+        except ValueError as e:
+            raise CommandError(str(e))
+
+    def select_windows(self, command):
+        """按 hwnd / title / process 选择顶层窗口"""
+        if 'hwnd' in command:
+            hwnd = self.command_hwnd(command)
+            if not self.window_manager.is_window_valid(hwnd):
+                raise CommandError(f'invalid hwnd: {hwnd!r}')
+            return [hwnd]
+        return self.match(command, self.window_manager.backend.enumerate_windows())
+
+    def select_hidden(self, command):
+        """按 hwnd / title / process 选择隐藏窗口"""
+        hidden = list(self.window_manager.hidden_index)
+        if 'hwnd' in command:
+            hwnd = self.command_hwnd(command)
+            return [hwnd] if hwnd in hidden else []
+        return self.match(command, hidden)
+
+    @staticmethod
+    def command_hwnd(command):
+        """命令中的 hwnd，必须是整数（JSON 的 true/false 在 Python 中也是 int，不接受）"""
+        hwnd = command['hwnd']
+        if not isinstance(hwnd, int) or isinstance(hwnd, bool):
+            raise CommandError(f'invalid hwnd: {hwnd!r}')
+        return hwnd
+
+    def match(self, command, hwnds):
+        title = command.get('title')
+        process = command.get('process')
+        if not title and not process:
+            raise CommandError('a selector (hwnd, title or process) is required')
+        backend = self.window_manager.backend
+        title = title.casefold() if title else None
+        process = process.casefold() if process else None
+        matched = []
+        for hwnd in hwnds:
+            try:
+                if title is not None and title not in backend.get_window_text(hwnd).casefold():
+                    continue
+                if process is not None and backend.get_process_name(hwnd).casefold() != process:
+                    continue
+            except Exception:
+                continue
+            matched.append(hwnd)
+        return matched
@@ -0,0 +1,163 @@
+import math
+from functools import lru_cache
+
+# 查找表采样点数，插值误差远小于一个像素
+TABLE_SIZE = 256
+
+
+class CompiledCurve:
+    """编译后的缓动曲线
+
+    曲线在编译时采样为查找表，运行时每帧只做一次查表和线性插值。
+    """
+
+    def __init__(self, spec, table):
+        self.spec = spec
+        self.table = table
+        self.last_index = len(table) - 1
+
+    def value(self, progress):
+        """根据进度（0-1）返回插值后的进度"""
+        if progress <= 0.0:
+            return self.table[0]
+        if progress >= 1.0:
+            return self.table[-1]
+        position = progress * self.last_index
+        index = int(position)
+        fraction = position - index
+        low = self.table[index]
+        return low + (self.table[index + 1] - low) * fraction
+
+
+def sample(function):
+    """按均匀进度采样函数，生成查找表"""
+    last = TABLE_SIZE - 1
+    return tuple(function(i / last) for i in range(TABLE_SIZE))
+
+
+def cubic_bezier_table(x1, y1, x2, y2):
+    """生成三次贝塞尔曲线 (0,0)-(x1,y1)-(x2,y2)-(1,1) 的查找表"""
+    def coordinate(t, p1, p2):
+        inverse = 1 - t
+        return 3 * inverse * inverse * t * p1 + 3 * inverse * t * t * p2 + t * t * t
+
+    def solve_t(x):
+        # x(t) 在 x1、x2 位于 [0,1] 时单调，二分求解
+        low, high = 0.0, 1.0
+        for _ in range(40):
+            middle = (low + high) / 2
+            if coordinate(middle, x1, x2) < x:
+                low = middle
+            else:
+                high = middle
+        return (low + high) / 2
+
+    return sample(lambda x: coordinate(solve_t(x), y1, y2))
+
+
+def spring_table(stiffness, damping, mass):
+    """生成阻尼弹簧曲线的查找表
+
+    弹簧从 0 出发、以 1 为平衡位置，曲线时长取到振幅衰减到千分之一为止。
+    """
+    omega = math.sqrt(stiffness / mass)
+    zeta = damping / (2 * math.sqrt(stiffness * mass))
+    if zeta < 1:
+        decay = zeta * omega
+        damped = omega * math.sqrt(1 - zeta * zeta)
+
+        def position(t):
+            envelope = math.exp(-decay * t)
+            return 1 - envelope * (math.cos(damped * t) + decay / damped * math.sin(damped * t))
+    elif zeta == 1:
+        decay = omega
+
+        def position(t):
+            return 1 - math.exp(-omega * t) * (1 + omega * t)
+    else:
+        root = math.sqrt(zeta * zeta - 1)
+        slow = omega * (zeta - root)
+        fast = omega * (zeta + root)
+        decay = slow
+
+        def position(t):
+            return 1 - (fast * math.exp(-slow * t) - slow * math.exp(-fast * t)) / (fast - slow)
+
+    settle_time = math.log(1000) / decay
+    table = list(sample(lambda progress: position(progress * settle_time)))
+    table[-1] = 1.0
+    return tuple(table)
+
+
+# 内置曲线，保持原有的计算公式
+NAMED_CURVES = {
+    'linear': lambda p: p,
+    'ease': lambda p: p * p * (3 - 2 * p),
+    'ease-in': lambda p: p * p,
+    'ease-out': lambda p: 1 - (1 - p) * (1 - p),
+}
+
+
+def normalize_spec(curve):
+    """把曲线描述规范化为可哈希的元组
+
+    支持：
+        'linear' / 'ease' / 'ease-in' / 'ease-out'
+        ('cubic-bezier', x1, y1, x2, y2)，x1、x2 须在 0-1 之间
+        ('spring', stiffness, damping[, mass])
+    无效描述抛出 ValueError。
+    """
+    if isinstance(curve, str):
+        if curve not in NAMED_CURVES:
+            raise ValueError(f"unknown curve: {curve}")
+        return (curve,)
+    kind, *params = curve
+    params = tuple(float(p) for p in params)
+    if kind == 'cubic-bezier':
+        if len(params) != 4 or not (0 <= params[0] <= 1 and 0 <= params[2] <= 1):
+            raise ValueError(f"invalid cubic-bezier: {curve}")
+        return (kind,) + params
+    if kind == 'spring':
+        if len(params) == 2:
+            params += (1.0,)
+        if len(params) != 3 or min(params) <= 0:
+            raise ValueError(f"invalid spring: {curve}")
+        return (kind,) + params
+    raise ValueError(f"unknown curve: {curve}")
+
+
+@lru_cache(maxsize=32)
+def compile_curve(spec):
+    """编译曲线，相同参数只编译一次"""
+    kind = spec[0]
+    if kind in NAMED_CURVES:
+        table = sample(NAMED_CURVES[kind])
+    elif kind == 'cubic-bezier':
+        table = cubic_bezier_table(*spec[1:])
+    else:
+        table = spring_table(*spec[1:])
+    return CompiledCurve(spec, table)
+
+
+@lru_cache(maxsize=128)
+def get_trajectory(spec, dx, dy, frames):
+    """获取一段动画的整条轨迹
+
+    返回 frames + 1 个相对起点的整数偏移 (x, y)，最后一个点恰好为 (dx, dy)。
+    同一窗口反复隐藏/显示时距离和帧数相同，直接复用缓存的轨迹。
+    """
+    curve = compile_curve(spec)
+    points = []
+    for i in range(frames + 1):
+        eased_progress = curve.value(i / frames)
+        points.append((int(dx * eased_progress), int(dy * eased_progress)))
+    points[-1] = (dx, dy)
+    return tuple(points)
+
+
+def cache_info():
+    """返回曲线和轨迹缓存的命中统计"""
+    return {
+        'curves': compile_curve.cache_info()._asdict(),
+        'trajectories': get_trajectory.cache_info()._asdict(),
+    }
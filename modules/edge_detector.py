@@ -0,0 +1,450 @@
+import threading
+import time
+
+from .edge_intent import EdgeIntent
+
+
+class EdgeDetector:
+    """屏幕边缘穿越检测器
+
+    由光标事件源逐点驱动，只在光标进入/离开边缘触发带、或离开被监视的窗口区域时产生事件。
+    触发带来自显示器拓扑的边缘索引，事件的 key 为槽位 (显示器, 方向)。
+    光标不在任何触发带内、不靠近边缘且没有被监视的区域时，每个点只做一次索引查找。
+    feed 返回建议的下一次采样间隔，轮询式光标源据此调整采样频率。
+
+    事件按 EdgeIntent 判断意图后才产生：
+    - 进入：光标在触发带内停留 dwell 秒后产生，中途离开（擦过边缘）则忽略；
+      快速撞向边缘时立即产生，按速度预计即将到达有隐藏窗口的边缘时提前产生
+    - 离开：光标离开触发带/窗口区域再加上滞回余量后，等待 hide_grace 秒仍未回来才产生
+    停留和宽限期由定时器完成，光标静止（鼠标钩子不再回调）时也能按时产生事件。
+    """
+
+    EDGE_ENTER = 'edge_enter'
+    EDGE_LEAVE = 'edge_leave'
+    RECT_LEAVE = 'rect_leave'
+
+    # 采样间隔（秒）：靠近边缘或有监视区域时用 FAST，远离边缘时用 SLOW；
+    # 光标静止超过 IDLE_AFTER 秒后各降一档（FAST 降为 SLOW，SLOW 降为 IDLE）
+    FAST_INTERVAL = 1 / 125
+    SLOW_INTERVAL = 1 / 30
+    IDLE_INTERVAL = 1 / 5
+    IDLE_AFTER = 1.0
+
+    def __init__(self, topology, intent=None):
+        self.listeners = []
+        self.active_slots = frozenset()
+        # 被监视的区域 {key: (left, top, right, bottom)}，写入时整体替换，读取无需加锁
+        self.watched_rects = {}
+        self.rect_inside = {}
+        self.lock = threading.Lock()
+        self.topology = topology
+        self.intent = intent or EdgeIntent()
+        # occupied(槽位) 返回该边缘是否有隐藏窗口，只对有窗口的边缘做提前显示
+        self.occupied = None
+        self.position = None
+        self.last_position = None
+        self.last_moved = 0.0
+        # 等待停留时间的进入 {槽位: Timer}，等待宽限期的离开 {(事件, key): Timer}
+        self.dwelling = {}
+        self.leaving = {}
+        # 统计：提前显示、擦过边缘被忽略的进入、宽限期内回来而取消的离开
+        self.predicted = 0
+        self.brushed = 0
+        self.cancelled_leaves = 0
+
+    def set_topology(self, topology):
+        """显示器拓扑变化后切换到新的边缘索引"""
+        self.topology = topology
+
+    def add_listener(self, callback):
+        """注册事件回调 callback(event, key, x, y)"""
+        self.listeners.append(callback)
+
+    def watch_rect(self, key, rect, require_enter=False):
+        """监视窗口区域，光标离开时产生 rect_leave 事件
+
+        require_enter 为 True 时，光标要先进入过该区域，之后离开才产生事件。
+        """
+        with self.lock:
+            watched = dict(self.watched_rects)
+            watched[key] = (rect['x'], rect['y'], rect['x'] + rect['width'], rect['y'] + rect['height'])
+            if require_enter:
+                self.rect_inside[key] = False
+            else:
+                self.rect_inside.pop(key, None)
+            self.cancel_leave((self.RECT_LEAVE, key), count=False)
+            self.watched_rects = watched
+
+    def unwatch_rect(self, key):
+        """停止监视窗口区域"""
+        with self.lock:
+            self.cancel_leave((self.RECT_LEAVE, key), count=False)
+            if key not in self.watched_rects:
+                return
+            watched = dict(self.watched_rects)
+            del watched[key]
+            self.rect_inside.pop(key, None)
+            self.watched_rects = watched
+
+    def reset(self):
+        """清除光标所在触发带的状态和所有定时器，光标跟踪挂起时调用"""
+        with self.lock:
+            for timer in list(self.dwelling.values()) + list(self.leaving.values()):
+                timer.cancel()
+            self.dwelling.clear()
+            self.leaving.clear()
+            self.active_slots = frozenset()
+            self.position = None
+            self.last_position = None
+            self.intent.forget()
+
+    def pending(self):
+        """是否有等待中的停留或离开"""
+        return bool(self.dwelling or self.leaving)
+
+    def slots_at(self, x, y):
+        """返回坐标所在触发带对应的槽位集合"""
+        return self.topology.hit_test(x, y)
+
+    def feed(self, x, y):
+        """输入一个光标位置，返回建议的下一次采样间隔（秒）"""
+        self.position = (x, y)
+        slots = self.topology.hit_test(x, y)
+        watched = self.watched_rects
+        if (not slots and not watched and not self.active_slots and not self.dwelling
+                and not self.topology.is_near_edge(x, y)):
+            self.intent.forget()
+            return self.cadence(x, y)
+
+        self.intent.track(time.monotonic(), x, y)
+        events = []
+        with self.lock:
+            self.update_edges(slots, x, y, events)
+            self.update_rects(watched, x, y, events)
+        for event in events:
+            self.emit(*event)
+        return self.cadence(x, y)
+
+    def update_edges(self, slots, x, y, events):
+        """更新触发带状态（需持有锁）"""
+        intent = self.intent
+        topology = self.topology
+        # 已显示的边缘在加宽 edge_margin 的范围内仍算在内
+        inside = set(slots)
+        for slot in self.active_slots:
+            if slot not in inside and topology.in_band(slot, x, y, intent.edge_margin):
+                inside.add(slot)
+
+        for slot in inside:
+            if slot in self.active_slots:
+                self.cancel_leave((self.EDGE_LEAVE, slot))
+            elif slot not in self.dwelling:
+                if intent.dwell <= 0 or intent.deliberate(slot[1]):
+                    self.activate(slot, x, y, events)
+                else:
+                    self.start_timer(self.dwelling, slot, intent.dwell, self.on_dwell)
+        for slot in [slot for slot in self.dwelling if slot not in inside]:
+            self.dwelling.pop(slot).cancel()
+            self.brushed += 1
+        for slot in self.active_slots - inside:
+            self.schedule_leave((self.EDGE_LEAVE, slot), intent.hide_grace, events)
+
+        if self.occupied is not None and intent.predicting():
+            for slot, hit_x, hit_y in topology.predict_hits(x, y, intent.vx, intent.vy, intent.predict_ahead):
+                if slot in self.active_slots or slot in inside or not self.occupied(slot):
+                    continue
+                self.activate(slot, hit_x, hit_y, events)
+                self.predicted += 1
+                # 预测落空（光标没有到达）时按离开处理
+                self.schedule_leave((self.EDGE_LEAVE, slot), intent.predict_ahead * 2 + intent.hide_grace, events)
+
+    def update_rects(self, watched, x, y, events):
+        """更新被监视区域的状态（需持有锁）"""
+        margin = self.intent.rect_margin
+        for key, rect in watched.items():
+            if self.rect_inside.get(key) is False:
+                # 还未进入过（或已离开）：进入区域本身才算进入
+                if self.in_rect(rect, x, y, 0):
+                    self.rect_inside[key] = True
+                continue
+            if self.in_rect(rect, x, y, margin):
+                self.rect_inside[key] = True
+                self.cancel_leave((self.RECT_LEAVE, key))
+            else:
+                self.schedule_leave((self.RECT_LEAVE, key), self.intent.hide_grace, events)
+
+    @staticmethod
+    def in_rect(rect, x, y, margin):
+        left, top, right, bottom = rect
+        return left - margin <= x <= right + margin and top - margin <= y <= bottom + margin
+
+    def activate(self, slot, x, y, events):
+        """产生进入事件（需持有锁）"""
+        timer = self.dwelling.pop(slot, None)
+        if timer is not None:
+            timer.cancel()
+        self.active_slots = self.active_slots | {slot}
+        events.append((self.EDGE_ENTER, slot, x, y))
+
+    def start_timer(self, timers, key, delay, callback):
+        """启动定时器 callback(key, timer)（需持有锁）"""
+        timer = threading.Timer(delay, lambda: callback(key, timer))
+        timer.daemon = True
+        timers[key] = timer
+        timer.start()
+
+    def schedule_leave(self, key, delay, events):
+        """宽限期后产生离开事件，已在等待时不重复安排；没有宽限期时立即产生（需持有锁）"""
+        if key in self.leaving:
+            return
+        if delay <= 0:
+            event = self.leave(key)
+            if event is not None:
+                events.append(event)
+            return
+        self.start_timer(self.leaving, key, delay, self.on_leave)
+
+    def cancel_leave(self, key, count=True):
+        """光标在宽限期内回来，取消离开（需持有锁）"""
+        timer = self.leaving.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+            if count:
+                self.cancelled_leaves += 1
+
+    def leave(self, key):
+        """按光标当前位置确认离开，返回要产生的事件，光标已回来时返回 None（需持有锁）"""
+        event, target = key
+        if self.position is None:
+            return None
+        x, y = self.position
+        if event == self.EDGE_LEAVE:
+            if target not in self.active_slots or self.topology.in_band(target, x, y, self.intent.edge_margin):
+                return None
+            self.active_slots = self.active_slots - {target}
+        else:
+            rect = self.watched_rects.get(target)
+            if rect is None or self.in_rect(rect, x, y, self.intent.rect_margin):
+                return None
+            self.rect_inside[target] = False
+        return event, target, x, y
+
+    def on_dwell(self, slot, timer):
+        """停留时间到：光标仍在触发带内则产生进入事件"""
+        events = []
+        with self.lock:
+            if self.dwelling.get(slot) is not timer:
+                return
+            del self.dwelling[slot]
+            if self.position is not None and slot in self.topology.hit_test(*self.position):
+                self.activate(slot, *self.position, events)
+            else:
+                self.brushed += 1
+        for event in events:
+            self.emit(*event)
+
+    def on_leave(self, key, timer):
+        """宽限期结束：光标仍未回来则产生离开事件"""
+        with self.lock:
+            if self.leaving.get(key) is not timer:
+                return
+            del self.leaving[key]
+            event = self.leave(key)
+        if event is not None:
+            self.emit(*event)
+
+    def stats(self):
+        """返回意图判断的统计"""
+        return {
+            'predicted': self.predicted,
+            'brushed': self.brushed,
+            'cancelled_leaves': self.cancelled_leaves,
+        }
+
+    def cadence(self, x, y):
+        """根据光标位置给出下一次采样间隔"""
+        now = time.monotonic()
+        if (x, y) != self.last_position:
+            self.last_position = (x, y)
+            self.last_moved = now
+        near = (self.watched_rects or self.active_slots or self.dwelling
+                or self.topology.is_near_edge(x, y))
+        if now - self.last_moved >= self.IDLE_AFTER:
+            return self.SLOW_INTERVAL if near else self.IDLE_INTERVAL
+        return self.FAST_INTERVAL if near else self.SLOW_INTERVAL
+
+    def emit(self, event, key, x, y):
+        """分发事件"""
+        for callback in self.listeners:
+            try:
+                callback(event, key, x, y)
+            except Exception as e:
+                print(f"Error in edge listener: {e}")
+
+
+class CursorSource:
+    """光标位置事件源接口
+
+    start 时传入回调 callback(x, y)，之后每次光标移动（或每次采样）都调用一次。
+    start/stop 可以反复调用：没有隐藏窗口时光标跟踪整体挂起。
+    """
+
+    def __init__(self):
+        self.callback = None
+
+    def start(self, callback):
+        """开始产生光标事件"""
+        self.callback = callback
+
+    def stop(self):
+        """停止产生光标事件"""
+        self.callback = None
+
+
+class PynputCursorSource(CursorSource):
+    """基于 pynput 鼠标监听（Windows 下为低级鼠标钩子）的光标事件源"""
+
+    def __init__(self):
+        super().__init__()
+        self.listener = None
+
+    def start(self, callback):
+        super().start(callback)
+        self.install_hook()
+
+    def stop(self):
+        self.remove_hook()
+        super().stop()
+
+    def install_hook(self):
+        """安装鼠标钩子"""
+        from pynput import mouse
+
+        self.listener = mouse.Listener(on_move=self.on_move)
+        self.listener.start()
+
+    def remove_hook(self):
+        """卸载鼠标钩子"""
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+
+    def on_move(self, x, y):
+        """钩子回调，只转发坐标"""
+        callback = self.callback
+        if callback is not None:
+            callback(x, y)
+
+
+class PollingCursorSource(CursorSource):
+    """按自适应频率轮询光标位置的事件源
+
+    回调返回下一次采样间隔：靠近边缘时高频采样，远离边缘时低频，光标静止时更低。
+    与鼠标钩子不同，光标快速移动时唤醒次数不随鼠标回报率增长。
+    """
+
+    def __init__(self, get_cursor_pos):
+        super().__init__()
+        self.get_cursor_pos = get_cursor_pos
+        self.thread = None
+        self.stopped = threading.Event()
+
+    def start(self, callback):
+        super().start(callback)
+        if self.thread is not None and self.thread.is_alive() and not self.stopped.is_set():
+            return
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, args=(self.stopped,), daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        super().stop()
+
+    def run(self, stopped):
+        """采样循环"""
+        interval = EdgeDetector.SLOW_INTERVAL
+        while not stopped.is_set():
+            callback = self.callback
+            if callback is None:
+                break
+            try:
+                x, y = self.get_cursor_pos()
+                interval = callback(x, y) or EdgeDetector.SLOW_INTERVAL
+            except Exception:
+                # 安全桌面（锁屏、UAC）下读取光标会失败，降低频率等待恢复
+                interval = EdgeDetector.IDLE_INTERVAL
+            stopped.wait(interval)
+
+
+class HybridCursorSource(PynputCursorSource):
+    """由鼠标钩子驱动，只在靠近边缘时改为轮询的光标事件源（Windows 下默认使用）
+
+    远离边缘时完全由钩子回调驱动，光标不动时不做任何工作。检测器要求高频采样
+    （靠近有触发带的边缘、有监视区域或等待停留）时启动轮询线程，期间钩子回调直接返回，
+    事件频率不随鼠标回报率增长；检测器不再要求高频采样（离开边缘或光标静止）时停止轮询，交回钩子。
+    """
+
+    def __init__(self, get_cursor_pos):
+        super().__init__()
+        self.get_cursor_pos = get_cursor_pos
+        self.lock = threading.Lock()
+        self.polling = False
+        self.stopped = threading.Event()
+
+    def stop(self):
+        with self.lock:
+            self.stopped.set()
+            self.polling = False
+        super().stop()
+
+    def on_move(self, x, y):
+        """钩子回调：轮询期间直接返回，否则转发坐标，检测器要求高频采样时开始轮询"""
+        callback = self.callback
+        if callback is None or self.polling:
+            return
+        interval = callback(x, y)
+        if interval is not None and interval <= EdgeDetector.FAST_INTERVAL:
+            self.start_polling()
+
+    def start_polling(self):
+        """启动轮询线程"""
+        with self.lock:
+            if self.polling or self.callback is None:
+                return
+            self.polling = True
+            self.stopped = threading.Event()
+            threading.Thread(target=self.run, args=(self.stopped,), daemon=True).start()
+
+    def run(self, stopped):
+        """轮询循环，检测器不再要求高频采样时退出"""
+        interval = EdgeDetector.FAST_INTERVAL
+        while not stopped.wait(interval):
+            callback = self.callback
+            if callback is None:
+                break
+            try:
+                x, y = self.get_cursor_pos()
+                interval = callback(x, y) or EdgeDetector.SLOW_INTERVAL
+            except Exception:
+                # 安全桌面（锁屏、UAC）下读取光标会失败，交回钩子
+                break
+            if interval > EdgeDetector.FAST_INTERVAL:
+                break
+        with self.lock:
+            if self.stopped is stopped:
+                self.polling = False
+
+
+class SyntheticCursorSource(CursorSource):
+    """合成光标事件源，用于在非 Windows 环境下驱动检测器"""
+
+    def move(self, x, y):
+        """模拟一次光标移动"""
+        if self.callback is not None:
+            self.callback(x, y)
+
+    def play(self, points):
+        """按顺序回放一组光标位置"""
+        for x, y in points:
+            self.move(x, y)
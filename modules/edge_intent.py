@@ -0,0 +1,62 @@
+class EdgeIntent:
+    """边缘触发的意图判断：参数和光标速度估计
+
+    dwell：光标在触发带内停留多久（秒）才显示窗口，擦过边缘不会触发；快速撞向边缘时不等待
+    edge_margin：已显示的边缘，光标要离开触发带再往里 edge_margin 像素才算离开（滞回）
+    rect_margin：临时显示的窗口，光标要离开窗口区域 rect_margin 像素以外才算离开（滞回）
+    hide_grace：离开后再等多久（秒）才隐藏，期间回来则取消
+    predict_speed：朝边缘移动的速度（像素/秒）不低于它时视为有意触发
+    predict_ahead：按当前速度预计在多长时间（秒）内到达有隐藏窗口的边缘时提前开始显示
+    """
+
+    # 速度的指数平滑系数，和两次采样间隔超过多久（秒）时速度作废
+    SMOOTHING = 0.5
+    STALE_AFTER = 0.1
+
+    def __init__(self, dwell=0.08, edge_margin=12, rect_margin=8, hide_grace=0.2,
+                 predict_speed=1500, predict_ahead=0.05):
+        self.dwell = dwell
+        self.edge_margin = edge_margin
+        self.rect_margin = rect_margin
+        self.hide_grace = hide_grace
+        self.predict_speed = predict_speed
+        self.predict_ahead = predict_ahead
+        self.last_sample = None
+        self.vx = 0.0
+        self.vy = 0.0
+
+    def track(self, now, x, y):
+        """输入一个光标采样，更新速度估计（像素/秒）"""
+        last = self.last_sample
+        self.last_sample = (now, x, y)
+        if last is None or now - last[0] > self.STALE_AFTER:
+            self.vx = self.vy = 0.0
+            return
+        elapsed = now - last[0]
+        if elapsed <= 0:
+            return
+        smoothing = self.SMOOTHING
+        self.vx += smoothing * ((x - last[1]) / elapsed - self.vx)
+        self.vy += smoothing * ((y - last[2]) / elapsed - self.vy)
+
+    def forget(self):
+        """光标远离所有边缘，丢弃速度估计"""
+        self.last_sample = None
+
+    def speed_toward(self, edge):
+        """当前朝 edge 方向移动的速度（像素/秒），背离时为负"""
+        if edge == 'left':
+            return -self.vx
+        if edge == 'right':
+            return self.vx
+        if edge == 'top':
+            return -self.vy
+        return self.vy
+
+    def deliberate(self, edge):
+        """是否正快速撞向该边缘"""
+        return self.speed_toward(edge) >= self.predict_speed
+
+    def predicting(self):
+        """速度是否足以做到达预测"""
+        return self.predict_ahead > 0 and max(abs(self.vx), abs(self.vy)) >= self.predict_speed
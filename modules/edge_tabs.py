@@ -0,0 +1,140 @@
+import ctypes
+import queue
+import threading
+from ctypes import wintypes
+
+WM_QUIT = 0x0012
+WM_NCHITTEST = 0x0084
+HTTRANSPARENT = -1
+WM_APP = 0x8000
+# 发给标签线程的创建/销毁请求
+WM_APP_CREATE = WM_APP + 1
+WM_APP_DESTROY = WM_APP + 2
+
+WS_EX_TOPMOST = 0x00000008
+WS_EX_TRANSPARENT = 0x00000020
+WS_EX_TOOLWINDOW = 0x00000080
+WS_EX_LAYERED = 0x00080000
+WS_EX_NOACTIVATE = 0x08000000
+# 标签窗口：置顶、不出现在任务栏、不激活、鼠标穿透的半透明条
+TAB_EX_STYLE = WS_EX_TOPMOST | WS_EX_TOOLWINDOW | WS_EX_NOACTIVATE | WS_EX_LAYERED | WS_EX_TRANSPARENT
+WS_POPUP = 0x80000000
+COLOR_HIGHLIGHT = 13
+LWA_ALPHA = 0x2
+TAB_ALPHA = 200
+HWND_TOPMOST = -1
+SWP_NOACTIVATE = 0x0010
+SW_HIDE = 0
+SW_SHOWNOACTIVATE = 4
+
+
+class EdgeTabHost:
+    """边缘标签窗口的宿主线程
+
+    窗口必须由运行消息循环的线程创建和销毁，创建/销毁请求通过线程消息交给宿主线程；
+    移动和显示/隐藏直接调用，由系统转发给宿主线程。宿主线程在第一次创建标签时才启动。
+    """
+
+    CLASS_NAME = 'WindowControllerEdgeTab'
+
+    def __init__(self):
+        self.thread = None
+        self.thread_id = None
+        self.started = threading.Event()
+        self.lock = threading.Lock()
+        # 待创建的 (矩形, 结果队列)
+        self.requests = queue.Queue()
+        self.window_class = None
+
+    def ensure_thread(self):
+        """按需启动宿主线程，返回是否可用"""
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, daemon=True)
+                self.thread.start()
+        self.started.wait(2)
+        return self.thread_id is not None
+
+    def create(self, rect):
+        """创建并显示标签窗口，返回句柄，失败时返回 0"""
+        if not self.ensure_thread():
+            return 0
+        result = queue.Queue(1)
+        self.requests.put((rect, result))
+        ctypes.windll.user32.PostThreadMessageW(self.thread_id, WM_APP_CREATE, 0, 0)
+        try:
+            return result.get(timeout=1)
+        except queue.Empty:
+            return 0
+
+    def move(self, tab, rect):
+        left, top, right, bottom = rect
+        ctypes.windll.user32.SetWindowPos(tab, HWND_TOPMOST, left, top, right - left, bottom - top,
+                                          SWP_NOACTIVATE)
+
+    def show(self, tab, visible):
+        ctypes.windll.user32.ShowWindow(tab, SW_SHOWNOACTIVATE if visible else SW_HIDE)
+
+    def destroy(self, tab):
+        if tab and self.thread_id is not None:
+            ctypes.windll.user32.PostThreadMessageW(self.thread_id, WM_APP_DESTROY, tab, 0)
+
+    def stop(self):
+        """结束宿主线程，所有标签窗口随之销毁"""
+        if self.thread_id is not None:
+            ctypes.windll.user32.PostThreadMessageW(self.thread_id, WM_QUIT, 0, 0)
+
+    def run(self):
+        """注册窗口类并运行消息循环"""
+        import win32gui
+
+        user32 = ctypes.windll.user32
+        try:
+            window_class = win32gui.WNDCLASS()
+            window_class.lpszClassName = self.CLASS_NAME
+            window_class.lpfnWndProc = {WM_NCHITTEST: self.on_hit_test}
+            window_class.hInstance = win32gui.GetModuleHandle(None)
+            window_class.hbrBackground = win32gui.GetSysColorBrush(COLOR_HIGHLIGHT)
+            self.window_class = win32gui.RegisterClass(window_class)
+            self.thread_id = ctypes.windll.kernel32.GetCurrentThreadId()
+        except Exception as e:
+            print(f"Error registering edge tab class: {e}")
+            return
+        finally:
+            self.started.set()
+
+        msg = wintypes.MSG()
+        while user32.GetMessageW(ctypes.byref(msg), None, 0, 0) > 0:
+            if msg.message == WM_APP_CREATE:
+                self.create_pending(win32gui)
+                continue
+            if msg.message == WM_APP_DESTROY:
+                user32.DestroyWindow(msg.wParam)
+                continue
+            user32.TranslateMessage(ctypes.byref(msg))
+            user32.DispatchMessageW(ctypes.byref(msg))
+        self.thread_id = None
+
+    def create_pending(self, win32gui):
+        """在宿主线程上创建所有待创建的标签窗口"""
+        while True:
+            try:
+                rect, result = self.requests.get_nowait()
+            except queue.Empty:
+                return
+            left, top, right, bottom = rect
+            try:
+                tab = win32gui.CreateWindowEx(
+                    TAB_EX_STYLE, self.window_class, '', WS_POPUP,
+                    left, top, right - left, bottom - top, 0, 0, win32gui.GetModuleHandle(None), None)
+                win32gui.SetLayeredWindowAttributes(tab, 0, TAB_ALPHA, LWA_ALPHA)
+                ctypes.windll.user32.ShowWindow(tab, SW_SHOWNOACTIVATE)
+            except Exception as e:
+                print(f"Error creating edge tab: {e}")
+                tab = 0
+            result.put(tab)
+
+    @staticmethod
+    def on_hit_test(hwnd, message, wparam, lparam):
+        """鼠标穿透到下方的窗口"""
+        return HTTRANSPARENT
@@ -0,0 +1,170 @@
+import threading
+import time
+
+# 激活方式，从开销最小到最大
+TIER_DIRECT = 'direct'
+TIER_ATTACH = 'attach'
+TIER_TOPMOST = 'topmost'
+TIERS = (TIER_DIRECT, TIER_ATTACH, TIER_TOPMOST)
+
+
+class TierStats:
+    """一种激活方式的尝试次数、成功次数和累计耗时"""
+
+    __slots__ = ('attempts', 'successes', 'total')
+
+    def __init__(self):
+        self.attempts = 0
+        self.successes = 0
+        self.total = 0.0
+
+    def to_dict(self):
+        return {
+            'attempts': self.attempts,
+            'successes': self.successes,
+            'win_rate': round(self.successes / self.attempts, 3) if self.attempts else None,
+            'mean_ms': round(self.total / self.attempts * 1000, 3) if self.attempts else None,
+        }
+
+
+class ForegroundActivator:
+    """分级的前台激活
+
+    窗口已经在前台时什么都不做；否则从开销最小的方式开始尝试，失败后逐级升级：
+    - direct：只调用 SetForegroundWindow
+    - attach：关联前台线程的输入状态后 SetForegroundWindow、BringWindowToTop
+    - topmost：完整流程（关联输入、还原窗口、临时置顶、SetForegroundWindow、BringWindowToTop）
+    每种方式之后检查前台窗口确认是否成功。按可执行文件记住上次成功的方式，下次直接从它开始，
+    每 RETRY_INTERVAL 次再从最便宜的方式试一次，前台锁解除后可以降级。
+    目标窗口的进程名按 hwnd 缓存，每次用当前的线程 ID 校验（hwnd 被复用时重新查询），窗口销毁时丢弃；
+    查询失败的结果和当前前台窗口的信息不缓存。
+    """
+
+    # 记住的方式高于最便宜的方式时，每隔多少次激活重新从最便宜的方式开始尝试
+    RETRY_INTERVAL = 8
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.lock = threading.Lock()
+        # {hwnd: (线程 ID, 进程名)}
+        self.windows = {}
+        # {进程名: 上次成功的方式在 TIERS 中的序号}
+        self.process_tiers = {}
+        # {进程名: 从记住的方式开始激活的次数}，到 RETRY_INTERVAL 时从最便宜的方式重试
+        self.tier_uses = {}
+        self.stats = {tier: TierStats() for tier in TIERS}
+        # 统计：已在前台而跳过、所有方式都失败的次数
+        self.skipped = 0
+        self.failed = 0
+
+    def activate(self, hwnd):
+        """把窗口切换到前台，返回成功的方式名（已在前台为 'already'），全部失败时返回 None"""
+        backend = self.backend
+        foreground = backend.get_foreground_window()
+        if foreground == hwnd:
+            with self.lock:
+                self.skipped += 1
+            return 'already'
+
+        thread_id, process = self.describe(hwnd)
+        with self.lock:
+            first = self.process_tiers.get(process, 0)
+            if first:
+                uses = self.tier_uses.get(process, 0) + 1
+                if uses >= self.RETRY_INTERVAL:
+                    first = uses = 0
+                self.tier_uses[process] = uses
+        for index in range(first, len(TIERS)):
+            tier = TIERS[index]
+            started = time.perf_counter()
+            try:
+                succeeded = self.run_tier(tier, hwnd, thread_id, foreground)
+            except Exception as e:
+                print(f"Error activating window ({tier}): {e}")
+                succeeded = False
+            elapsed = time.perf_counter() - started
+            with self.lock:
+                stats = self.stats[tier]
+                stats.attempts += 1
+                stats.total += elapsed
+                if succeeded:
+                    stats.successes += 1
+                    if process:
+                        self.process_tiers[process] = index
+                        if not index:
+                            self.tier_uses.pop(process, None)
+            if succeeded:
+                return tier
+        with self.lock:
+            self.failed += 1
+        return None
+
+    def run_tier(self, tier, hwnd, thread_id, foreground):
+        """执行一种激活方式，返回窗口是否已在前台"""
+        backend = self.backend
+        if tier == TIER_DIRECT:
+            backend.set_foreground_window(hwnd)
+            return backend.get_foreground_window() == hwnd
+
+        # 前台窗口随时在变，线程 ID 每次重新查询
+        foreground_thread = backend.get_window_thread_id(foreground) if foreground else 0
+        current_thread = backend.get_current_thread_id()
+        attached = [(thread, foreground_thread) for thread in (thread_id, current_thread)
+                    if foreground_thread and thread and thread != foreground_thread]
+        for thread, target in attached:
+            backend.attach_thread_input(thread, target, True)
+        try:
+            if tier == TIER_TOPMOST:
+                backend.show_window(hwnd, 'restore')
+                backend.set_window_topmost(hwnd, True)
+            backend.set_foreground_window(hwnd)
+            backend.bring_window_to_top(hwnd)
+            if tier == TIER_TOPMOST:
+                # 恢复窗口Z序
+                backend.set_window_topmost(hwnd, False)
+        finally:
+            for thread, target in reversed(attached):
+                backend.attach_thread_input(thread, target, False)
+        return backend.get_foreground_window() == hwnd
+
+    def describe(self, hwnd):
+        """窗口的 (线程 ID, 进程名)
+
+        线程 ID 每次查询，与缓存中的一致时沿用缓存的进程名；查询失败时返回 (0, '') 且不缓存。
+        """
+        try:
+            thread_id = self.backend.get_window_thread_id(hwnd)
+        except Exception:
+            thread_id = 0
+        if not thread_id:
+            self.forget(hwnd)
+            return 0, ''
+        with self.lock:
+            info = self.windows.get(hwnd)
+        if info is not None and info[0] == thread_id:
+            return info
+        try:
+            process = self.backend.get_process_name(hwnd)
+        except Exception:
+            return thread_id, ''
+        if not process:
+            return thread_id, ''
+        info = (thread_id, process)
+        with self.lock:
+            self.windows[hwnd] = info
+        return info
+
+    def forget(self, hwnd):
+        """丢弃窗口的缓存（窗口已销毁）"""
+        with self.lock:
+            self.windows.pop(hwnd, None)
+
+    def report(self):
+        """返回各方式的胜率和耗时"""
+        with self.lock:
+            return {
+                'tiers': {tier: stats.to_dict() for tier, stats in self.stats.items()},
+                'already_foreground': self.skipped,
+                'failed': self.failed,
+                'process_tiers': {process: TIERS[index] for process, index in self.process_tiers.items()},
+            }
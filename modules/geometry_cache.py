@@ -0,0 +1,119 @@
+import threading
+
+# 最小化窗口的 GetWindowRect 结果（图标位置）的坐标
+ICONIC_POSITION = -32000
+
+
+class CacheEntry:
+    """单个被跟踪窗口的缓存条目"""
+
+    __slots__ = ('generation', 'rect', 'valid')
+
+    def __init__(self):
+        self.generation = 0
+        self.rect = None
+        self.valid = None
+
+
+class GeometryCache:
+    """被跟踪窗口的几何信息缓存
+
+    只缓存主动跟踪的窗口（隐藏/临时显示中的窗口）。条目由系统通知失效，而不是定时刷新：
+    位置变化或隐藏时丢弃缓存的位置，销毁时标记为无效。
+    通知不可用时 enabled 为 False，所有读取直接走系统调用。
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.entries = {}
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def track(self, hwnd):
+        """开始跟踪窗口"""
+        with self.lock:
+            if hwnd not in self.entries:
+                self.entries[hwnd] = CacheEntry()
+
+    def untrack(self, hwnd):
+        """停止跟踪窗口"""
+        with self.lock:
+            self.entries.pop(hwnd, None)
+
+    def get_rect(self, hwnd, loader):
+        """读取窗口位置，未命中时调用 loader(hwnd) 并缓存结果
+
+        返回的字典在多个调用方之间共享，不要修改。
+        """
+        entry = self.entries.get(hwnd) if self.enabled else None
+        if entry is not None:
+            rect = entry.rect
+            if rect is not None:
+                self.hits += 1
+                return rect
+            generation = entry.generation
+        self.misses += 1
+        rect = loader(hwnd)
+        if entry is not None:
+            with self.lock:
+                # 读取期间收到过通知则不缓存，避免存下过期的位置
+                if entry.generation == generation:
+                    entry.rect = rect
+        return rect
+
+    def is_valid(self, hwnd, checker):
+        """判断窗口是否有效，未命中时调用 checker(hwnd) 并缓存结果"""
+        entry = self.entries.get(hwnd) if self.enabled else None
+        if entry is not None:
+            valid = entry.valid
+            if valid is not None:
+                self.hits += 1
+                return valid
+            generation = entry.generation
+        self.misses += 1
+        valid = bool(checker(hwnd))
+        if entry is not None:
+            with self.lock:
+                if entry.generation == generation:
+                    entry.valid = valid
+        return valid
+
+    def moved(self, hwnd, x, y):
+        """本程序移动窗口之前调用：缓存的位置改为目标位置（大小不变）
+
+        位置变化通知是异步送达的，移动后立即读取不能依赖它失效；之后收到的通知（包括被其他程序移回）
+        照常使条目失效。尚未缓存、或缓存的是最小化窗口的图标位置时只丢弃缓存。
+        """
+        entry = self.entries.get(hwnd)
+        if entry is None:
+            return
+        with self.lock:
+            entry.generation += 1
+            rect = entry.rect
+            if rect is None or rect['x'] <= ICONIC_POSITION:
+                entry.rect = None
+            else:
+                entry.rect = {'x': x, 'y': y, 'width': rect['width'], 'height': rect['height']}
+
+    def invalidate(self, hwnd, destroyed=False):
+        """收到通知时使条目失效"""
+        entry = self.entries.get(hwnd)
+        if entry is None:
+            return
+        with self.lock:
+            entry.generation += 1
+            entry.rect = None
+            entry.valid = False if destroyed else None
+            self.invalidations += 1
+
+    def stats(self):
+        """返回命中统计"""
+        return {
+            'enabled': self.enabled,
+            'tracked': len(self.entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'invalidations': self.invalidations,
+        }
@@ -0,0 +1,196 @@
+import json
+import os
+import threading
+
+from .hide_strategies import STRATEGY_OFFSCREEN
+
+# 日志记录：隐藏 ["h", hwnd, 显示器, 方向, 原始x, 原始y, 标题(, 隐藏方式(, 虚拟桌面))]，恢复显示 ["s", hwnd]
+# 隐藏方式为默认的移到屏幕外、虚拟桌面未知时省略，与旧版本的日志兼容
+OP_HIDE = 'h'
+OP_SHOW = 's'
+
+
+def hide_record(hwnd, slot, original_position, title, strategy=STRATEGY_OFFSCREEN):
+    """隐藏记录"""
+    x, y = original_position
+    monitor_id, edge, desktop = slot
+    record = [OP_HIDE, hwnd, monitor_id, edge, x, y, title]
+    if strategy != STRATEGY_OFFSCREEN or desktop is not None:
+        record.append(strategy)
+    if desktop is not None:
+        record.append(desktop)
+    return record
+
+
+def encode(record):
+    """把记录编码为一行紧凑的 JSON"""
+    return json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n'
+
+
+def default_journal_path():
+    """默认的日志文件位置（%LOCALAPPDATA%\\WindowController）"""
+    base = os.environ.get('LOCALAPPDATA') or os.path.expanduser('~')
+    return os.path.join(base, 'WindowController', 'hidden_windows.journal')
+
+
+class JournalEntry:
+    """日志中一个仍处于隐藏状态的窗口"""
+
+    __slots__ = ('hwnd', 'slot', 'title', 'original_position', 'strategy')
+
+    def __init__(self, hwnd, slot, title, original_position, strategy=STRATEGY_OFFSCREEN):
+        self.hwnd = hwnd
+        self.slot = slot
+        self.title = title
+        self.original_position = original_position
+        self.strategy = strategy
+
+
+class HiddenWindowJournal:
+    """隐藏窗口的追加式日志
+
+    每次隐藏/恢复追加一行 JSON，写入后立即交给操作系统（进程崩溃不会丢失），
+    fsync 合并执行：第一条未同步的记录写入后 SYNC_DELAY 秒统一同步一次，空闲时没有任何定时器。
+    记录数超过存活窗口数的 COMPACT_RATIO 倍时重写为只含存活窗口的新文件。
+    程序下次启动时据此把上次留在屏幕外的窗口恢复回来，并压缩日志（同时丢弃崩溃时写了一半的最后一行）。
+    """
+
+    SYNC_DELAY = 1.0
+    COMPACT_MIN_RECORDS = 64
+    COMPACT_RATIO = 4
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.entries = {}
+        self.records = 0
+        self.file = None
+        self.sync_timer = None
+        self.syncs = 0
+        self.compactions = 0
+
+    def load(self):
+        """读取日志，返回仍处于隐藏状态的窗口列表（按隐藏顺序）"""
+        entries = {}
+        records = 0
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # 崩溃时写了一半的最后一行
+                        continue
+                    records += 1
+                    if record[0] == OP_HIDE and len(record) in (7, 8, 9):
+                        hwnd, monitor_id, edge, x, y, title = record[1:7]
+                        strategy = record[7] if len(record) > 7 else STRATEGY_OFFSCREEN
+                        desktop = record[8] if len(record) > 8 else None
+                        entries.pop(hwnd, None)
+                        entries[hwnd] = JournalEntry(hwnd, (monitor_id, edge, desktop), title, (x, y), strategy)
+                    elif record[0] == OP_SHOW:
+                        entries.pop(record[1], None)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"读取隐藏窗口日志失败: {e}")
+        with self.lock:
+            self.entries = entries
+            self.records = records
+        return list(entries.values())
+
+    def record_hide(self, hwnd, slot, title, original_position, strategy=STRATEGY_OFFSCREEN):
+        """记录窗口被隐藏"""
+        with self.lock:
+            self.entries.pop(hwnd, None)
+            self.entries[hwnd] = JournalEntry(hwnd, slot, title, tuple(original_position), strategy)
+            self.append(hide_record(hwnd, slot, original_position, title, strategy))
+
+    def record_show(self, hwnd):
+        """记录窗口已恢复显示"""
+        with self.lock:
+            if self.entries.pop(hwnd, None) is None:
+                return
+            self.append([OP_SHOW, hwnd])
+            if (self.records >= self.COMPACT_MIN_RECORDS
+                    and self.records > self.COMPACT_RATIO * len(self.entries)):
+                self.compact_locked()
+
+    def append(self, record):
+        """追加一条记录（需持有锁）"""
+        try:
+            if self.file is None:
+                os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+                self.file = open(self.path, 'a', encoding='utf-8')
+            self.file.write(encode(record))
+            self.file.flush()
+            self.records += 1
+            self.schedule_sync()
+        except OSError as e:
+            print(f"写入隐藏窗口日志失败: {e}")
+
+    def schedule_sync(self):
+        """安排一次合并的 fsync（需持有锁）"""
+        if self.sync_timer is None:
+            self.sync_timer = threading.Timer(self.SYNC_DELAY, self.sync)
+            self.sync_timer.daemon = True
+            self.sync_timer.start()
+
+    def sync(self):
+        """把已写入的记录同步到磁盘"""
+        with self.lock:
+            self.sync_locked()
+
+    def sync_locked(self):
+        if self.sync_timer is not None:
+            self.sync_timer.cancel()
+            self.sync_timer = None
+        if self.file is None:
+            return
+        try:
+            os.fsync(self.file.fileno())
+            self.syncs += 1
+        except OSError as e:
+            print(f"同步隐藏窗口日志失败: {e}")
+
+    def compact(self):
+        """重写日志，只保留仍隐藏的窗口"""
+        with self.lock:
+            self.compact_locked()
+
+    def compact_locked(self):
+        if self.sync_timer is not None:
+            self.sync_timer.cancel()
+            self.sync_timer = None
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+        temp_path = self.path + '.tmp'
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                for entry in self.entries.values():
+                    f.write(encode(hide_record(entry.hwnd, entry.slot, entry.original_position, entry.title,
+                                               entry.strategy)))
+                f.flush()
+                os.fsync(f.fileno())
+            # 原子替换，任何时刻磁盘上都是完整的旧日志或新日志
+            os.replace(temp_path, self.path)
+            self.records = len(self.entries)
+            self.compactions += 1
+        except OSError as e:
+            print(f"压缩隐藏窗口日志失败: {e}")
+
+    def retain(self, hwnds):
+        """只保留指定窗口的记录并压缩日志"""
+        with self.lock:
+            self.entries = {hwnd: entry for hwnd, entry in self.entries.items() if hwnd in hwnds}
+            self.compact_locked()
+
+    def close(self):
+        """同步并关闭日志"""
+        with self.lock:
+            self.sync_locked()
+            if self.file is not None:
+                self.file.close()
+                self.file = None
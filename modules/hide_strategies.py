@@ -0,0 +1,244 @@
+import threading
+
+# 隐藏方式
+STRATEGY_OFFSCREEN = 'offscreen'   # 移到屏幕外，只留出边条（默认）
+STRATEGY_CLOAK = 'cloak'           # 窗口停在临时显示位置但不参与合成，边缘显示标签窗口
+STRATEGY_MINIMIZE = 'minimize'     # 最小化并记住显示位置，边缘显示标签窗口
+STRATEGIES = (STRATEGY_OFFSCREEN, STRATEGY_CLOAK, STRATEGY_MINIMIZE)
+
+
+class OffscreenStrategy:
+    """移到屏幕外，只留出 visible_part 宽的边条
+
+    各方法先完成对窗口可见性的改变，再返回需要以动画移动到的位置，不需要移动时返回 None。
+    窗口在屏幕外仍然可见，所属程序照常渲染整个窗口，临时显示时整个窗口表面被拖过屏幕。
+    """
+
+    name = STRATEGY_OFFSCREEN
+    # 隐藏期间是否由校正循环保持窗口位置
+    reconciled = True
+
+    def __init__(self, window_manager):
+        self.window_manager = window_manager
+        self.backend = window_manager.backend
+
+    def layout_rect(self, hwnd):
+        """计算隐藏/显示位置时使用的窗口矩形"""
+        return self.window_manager.get_window_rect(hwnd)
+
+    def park(self, hwnd, rect, hidden_position, shown_position):
+        """进入隐藏状态，或在重新排列时保持隐藏"""
+        return hidden_position
+
+    def reveal(self, hwnd, rect, shown_position):
+        """临时显示"""
+        return shown_position
+
+    def conceal(self, hwnd, rect, hidden_position, shown_position):
+        """临时显示后重新隐藏"""
+        return hidden_position
+
+    def restore(self, hwnd, rect, position):
+        """恢复显示到 position"""
+        return position
+
+    def uncover(self, hwnd):
+        """立即撤销对窗口可见性的改变（退出或恢复上次的窗口时），窗口位置由调用方处理"""
+
+    def forget(self, hwnd):
+        """窗口离开叠放，释放相关资源"""
+
+    def stats(self):
+        return {}
+
+
+class EdgeTab:
+    """代替边条显示在边缘上的标签窗口"""
+
+    __slots__ = ('handle', 'rect', 'visible')
+
+    def __init__(self, handle, rect):
+        self.handle = handle
+        self.rect = rect
+        self.visible = True
+
+
+class TabbedStrategy(OffscreenStrategy):
+    """隐藏期间窗口不参与合成，在原本露出边条的位置显示一个轻量的标签窗口
+
+    窗口停在临时显示位置，临时显示时只需让它重新参与合成，不需要移动，
+    也不会把整个窗口表面逐帧拖过屏幕。子类实现 cover/uncover。
+    """
+
+    reconciled = False
+
+    def __init__(self, window_manager):
+        super().__init__(window_manager)
+        self.lock = threading.Lock()
+        # 已被隐藏（cover）的窗口
+        self.covered = set()
+        # {hwnd: EdgeTab}
+        self.tabs = {}
+
+    def cover(self, hwnd, rect, shown_position):
+        """让窗口停在 shown_position 并停止参与合成"""
+        raise NotImplementedError
+
+    def park(self, hwnd, rect, hidden_position, shown_position):
+        if hwnd not in self.covered:
+            self.cover(hwnd, rect, shown_position)
+            self.covered.add(hwnd)
+        self.show_tab(hwnd, rect, hidden_position)
+        return None
+
+    def reveal(self, hwnd, rect, shown_position):
+        self.hide_tab(hwnd)
+        if hwnd in self.covered:
+            self.uncover(hwnd)
+        return shown_position
+
+    def conceal(self, hwnd, rect, hidden_position, shown_position):
+        return self.park(hwnd, rect, hidden_position, shown_position)
+
+    def restore(self, hwnd, rect, position):
+        # forget 会先让仍隐藏的窗口恢复可见
+        self.forget(hwnd)
+        return position
+
+    def show_tab(self, hwnd, rect, hidden_position):
+        """在窗口隐藏位置露出的边条处显示标签窗口，没有露出的部分时隐藏它"""
+        location = self.window_manager.find_hidden(hwnd)
+        strip = None
+        if location is not None:
+            x, y = hidden_position
+            strip = self.window_manager.topology.clip_to_monitor(
+                location[:3], (x, y, x + rect['width'], y + rect['height']))
+        if strip is None:
+            self.hide_tab(hwnd)
+            return
+        with self.lock:
+            tab = self.tabs.get(hwnd)
+        if tab is None:
+            tab = EdgeTab(self.backend.create_edge_tab(strip), strip)
+            with self.lock:
+                self.tabs[hwnd] = tab
+            return
+        if tab.rect != strip:
+            self.backend.move_edge_tab(tab.handle, strip)
+            tab.rect = strip
+        if not tab.visible:
+            self.backend.show_edge_tab(tab.handle, True)
+            tab.visible = True
+
+    def hide_tab(self, hwnd):
+        """隐藏标签窗口（窗口临时显示时会覆盖边缘）"""
+        with self.lock:
+            tab = self.tabs.get(hwnd)
+        if tab is not None and tab.visible:
+            self.backend.show_edge_tab(tab.handle, False)
+            tab.visible = False
+
+    def forget(self, hwnd):
+        # 仍处于隐藏中的窗口（例如出错后被清理）先恢复可见，不能让它一直不可见
+        if hwnd in self.covered:
+            try:
+                self.uncover(hwnd)
+            except Exception as e:
+                print(f"Error uncovering window: {e}")
+        with self.lock:
+            tab = self.tabs.pop(hwnd, None)
+        if tab is not None:
+            try:
+                self.backend.destroy_edge_tab(tab.handle)
+            except Exception as e:
+                print(f"Error destroying edge tab: {e}")
+
+    def stats(self):
+        with self.lock:
+            return {'covered': len(self.covered), 'tabs': len(self.tabs)}
+
+
+class CloakStrategy(TabbedStrategy):
+    """DWM 隐藏（cloak）：窗口保留位置和表面但不参与合成，系统不支持时退回 ShowWindow 隐藏"""
+
+    name = STRATEGY_CLOAK
+
+    def cover(self, hwnd, rect, shown_position):
+        # 先隐藏再移动，移动过程不可见
+        self.backend.set_window_cloaked(hwnd, True)
+        if (rect['x'], rect['y']) != tuple(shown_position):
+            self.window_manager.set_window_pos(hwnd, *shown_position)
+
+    def uncover(self, hwnd):
+        self.covered.discard(hwnd)
+        self.backend.set_window_cloaked(hwnd, False)
+
+
+class MinimizeStrategy(TabbedStrategy):
+    """最小化：先把窗口移到临时显示位置再最小化，还原时回到该位置
+
+    最小化的窗口读到的是图标位置，隐藏期间按记住的几何信息计算位置。
+    """
+
+    name = STRATEGY_MINIMIZE
+
+    def __init__(self, window_manager):
+        super().__init__(window_manager)
+        # {hwnd: 最小化前的窗口矩形}
+        self.geometry = {}
+
+    def layout_rect(self, hwnd):
+        rect = self.geometry.get(hwnd)
+        if rect is not None and hwnd in self.covered:
+            return rect
+        return self.window_manager.get_window_rect(hwnd)
+
+    def cover(self, hwnd, rect, shown_position):
+        x, y = shown_position
+        if (rect['x'], rect['y']) != (x, y):
+            self.window_manager.set_window_pos(hwnd, x, y)
+        self.geometry[hwnd] = {'x': x, 'y': y, 'width': rect['width'], 'height': rect['height']}
+        self.backend.show_window(hwnd, 'minimize_inactive')
+
+    def uncover(self, hwnd):
+        self.covered.discard(hwnd)
+        self.backend.show_window(hwnd, 'show')
+
+    def forget(self, hwnd):
+        super().forget(hwnd)
+        self.geometry.pop(hwnd, None)
+
+
+class HideStrategies:
+    """各隐藏方式的实例和默认隐藏方式
+
+    窗口使用的隐藏方式由窗口规则（WindowRules）的 strategy 设置决定，没有规则设置时使用 default。
+    隐藏方式在窗口隐藏时选定并记入 WindowState，之后修改规则不影响已隐藏的窗口。
+    """
+
+    def __init__(self, window_manager):
+        self.window_manager = window_manager
+        self.strategies = {strategy.name: strategy for strategy in (
+            OffscreenStrategy(window_manager), CloakStrategy(window_manager), MinimizeStrategy(window_manager))}
+        self.default = STRATEGY_OFFSCREEN
+
+    def get(self, name):
+        """按名字取隐藏方式，未知的名字按默认方式处理"""
+        return self.strategies.get(name) or self.strategies[STRATEGY_OFFSCREEN]
+
+    def set_default(self, strategy):
+        """设置没有规则匹配时使用的隐藏方式"""
+        if strategy not in self.strategies:
+            raise ValueError(f'unknown hide strategy: {strategy!r}')
+        self.default = strategy
+
+    def choose(self, hwnd, title=None):
+        """为即将隐藏的窗口选择隐藏方式：读窗口规则的缓存结果，没有规则设置时使用 default"""
+        return self.window_manager.rules.profile(hwnd, title).strategy or self.default
+
+    def stats(self):
+        """返回默认隐藏方式和各隐藏方式当前管理的窗口、标签窗口数"""
+        return {
+            'default': self.default,
+            'strategies': {name: strategy.stats() for name, strategy in self.strategies.items()},
+        }
@@ -0,0 +1,235 @@
+import threading
+import time
+
+# 修饰键位
+SHIFT = 1
+CTRL = 2
+ALT = 4
+WIN = 8
+
+# 按键名（pynput 的 Key.name）到修饰键位
+MODIFIER_KEYS = {
+    'shift': SHIFT, 'shift_l': SHIFT, 'shift_r': SHIFT,
+    'ctrl': CTRL, 'ctrl_l': CTRL, 'ctrl_r': CTRL,
+    'alt': ALT, 'alt_l': ALT, 'alt_r': ALT, 'alt_gr': ALT,
+    'cmd': WIN, 'cmd_l': WIN, 'cmd_r': WIN,
+}
+
+# 绑定字符串中的修饰键名
+MODIFIER_NAMES = {
+    'shift': SHIFT,
+    'ctrl': CTRL, 'control': CTRL,
+    'alt': ALT,
+    'win': WIN, 'cmd': WIN, 'super': WIN,
+}
+
+# 绑定字符串中按键名的别名
+KEY_ALIASES = {
+    'return': 'enter',
+    'escape': 'esc',
+    'del': 'delete',
+    'pgup': 'page_up',
+    'pgdn': 'page_down',
+}
+
+
+def key_name(key):
+    """按键对象的名称：特殊键为 name，字符键为小写字符"""
+    name = getattr(key, 'name', None)
+    if name:
+        return name
+    char = getattr(key, 'char', None)
+    if char:
+        return char.lower()
+    return None
+
+
+def parse_chord(text):
+    """解析一个组合键，例如 'ctrl+shift+h'，返回 (修饰键位, 按键名)"""
+    modifiers = 0
+    key = None
+    for part in text.lower().split('+'):
+        part = part.strip()
+        if not part:
+            raise ValueError(f"invalid hotkey: {text!r}")
+        if part in MODIFIER_NAMES:
+            modifiers |= MODIFIER_NAMES[part]
+        elif key is None:
+            key = KEY_ALIASES.get(part, part)
+        else:
+            raise ValueError(f"hotkey has more than one key: {text!r}")
+    if key is None:
+        raise ValueError(f"hotkey has no key: {text!r}")
+    return modifiers, key
+
+
+def parse_hotkey(spec):
+    """解析快捷键，多个组合键以逗号分隔表示按顺序按下，例如 'ctrl+k, left'"""
+    chords = tuple(parse_chord(part) for part in spec.split(','))
+    if not chords:
+        raise ValueError(f"invalid hotkey: {spec!r}")
+    return chords
+
+
+class HotkeyBinding:
+    """一个快捷键绑定"""
+
+    __slots__ = ('spec', 'chords', 'action', 'repeat')
+
+    def __init__(self, spec, chords, action, repeat):
+        self.spec = spec
+        self.chords = chords
+        self.action = action
+        self.repeat = repeat
+
+
+class HotkeyEngine:
+    """快捷键引擎
+
+    绑定在 bind 时编译为按 (修饰键位, 按键名) 查找的前缀树，按键时只做一次字典查找。
+    多键序列的中间状态在 SEQUENCE_TIMEOUT 秒后失效。
+
+    自动重复：按住不放时系统重复发送按下事件，同一按键在没有释放的情况下、
+    距上次按下不超过 REPEAT_WINDOW 秒的按下视为重复。重复默认忽略；
+    repeat=True 的绑定在重复期间最多每 REPEAT_INTERVAL 秒执行一次。
+
+    修饰键状态：除了按键事件，还会在每次非修饰键按下时用 modifier_state()（若提供）
+    读取系统实际的修饰键状态，丢失的按键释放事件不会让修饰键“卡住”。
+    """
+
+    SEQUENCE_TIMEOUT = 1.0
+    REPEAT_WINDOW = 1.0
+    REPEAT_INTERVAL = 0.25
+
+    def __init__(self, modifier_state=None):
+        self.modifier_state = modifier_state
+        self.bindings = {}
+        self.root = {}
+        self.lock = threading.Lock()
+        self.modifiers = 0
+        # 已按下未释放的非修饰键：按键名 -> 最近一次按下的时间
+        self.pressed = {}
+        # 当前按住的按键触发的绑定和上次执行时间，用于处理重复
+        self.held = {}
+        self.node = self.root
+        self.sequence_deadline = 0.0
+        # 统计：执行次数和被忽略的重复按键次数
+        self.fired = 0
+        self.suppressed = 0
+
+    def bind(self, spec, action, repeat=False):
+        """绑定快捷键，spec 如 'shift+left' 或 'ctrl+k, left'，action 为无参数的回调"""
+        chords = parse_hotkey(spec)
+        with self.lock:
+            self.bindings[chords] = HotkeyBinding(spec, chords, action, repeat)
+            self.compile()
+
+    def unbind(self, spec):
+        """取消绑定"""
+        chords = parse_hotkey(spec)
+        with self.lock:
+            if self.bindings.pop(chords, None) is not None:
+                self.compile()
+
+    def compile(self):
+        """把所有绑定编译为前缀树（需持有锁）"""
+        root = {}
+        for chords, binding in self.bindings.items():
+            node = root
+            for chord in chords[:-1]:
+                child = node.get(chord)
+                if not isinstance(child, dict):
+                    if child is not None:
+                        print(f"快捷键 {binding.spec} 与 {child.spec} 冲突，已忽略后者")
+                    child = node[chord] = {}
+                node = child
+            last = chords[-1]
+            if isinstance(node.get(last), dict):
+                print(f"快捷键 {binding.spec} 是其他快捷键的前缀，已忽略")
+                continue
+            node[last] = binding
+        self.root = root
+        self.node = root
+
+    def on_press(self, key):
+        """处理按键按下，返回是否触发或推进了某个绑定"""
+        name = key_name(key)
+        if name is None:
+            return False
+        modifier = MODIFIER_KEYS.get(name)
+        now = time.monotonic()
+        with self.lock:
+            if modifier is not None:
+                self.modifiers |= modifier
+                return False
+
+            last_press = self.pressed.get(name)
+            self.pressed[name] = now
+            if last_press is not None and now - last_press <= self.REPEAT_WINDOW:
+                binding = self.repeat_binding(name, now)
+                if binding is None:
+                    self.suppressed += 1
+                    return False
+            else:
+                binding = self.match(name, now)
+                if binding is None:
+                    return self.node is not self.root
+                self.held[name] = [binding, now]
+            self.fired += 1
+        try:
+            binding.action()
+        except Exception as e:
+            print(f"Error in hotkey {binding.spec}: {e}")
+        return True
+
+    def on_release(self, key):
+        """处理按键释放"""
+        name = key_name(key)
+        if name is None:
+            return
+        with self.lock:
+            modifier = MODIFIER_KEYS.get(name)
+            if modifier is not None:
+                self.modifiers &= ~modifier
+                return
+            self.pressed.pop(name, None)
+            self.held.pop(name, None)
+
+    def repeat_binding(self, name, now):
+        """按住按键的重复：返回需要再次执行的绑定（需持有锁）"""
+        held = self.held.get(name)
+        if held is None or not held[0].repeat or now - held[1] < self.REPEAT_INTERVAL:
+            return None
+        held[1] = now
+        return held[0]
+
+    def match(self, name, now):
+        """查找按下的组合键对应的绑定，推进多键序列（需持有锁）"""
+        if self.modifier_state is not None:
+            state = self.modifier_state()
+            if state is not None:
+                self.modifiers = state
+        chord = (self.modifiers, name)
+        if self.node is not self.root and now > self.sequence_deadline:
+            self.node = self.root
+        entry = self.node.get(chord)
+        if entry is None and self.node is not self.root:
+            # 序列中断，按新的序列开头重新查找
+            self.node = self.root
+            entry = self.root.get(chord)
+        if entry is None:
+            return None
+        if isinstance(entry, dict):
+            self.node = entry
+            self.sequence_deadline = now + self.SEQUENCE_TIMEOUT
+            return None
+        self.node = self.root
+        return entry
+
+    def reset(self):
+        """清空按键状态"""
+        with self.lock:
+            self.modifiers = 0
+            self.pressed.clear()
+            self.held.clear()
+            self.node = self.root
@@ -0,0 +1,21 @@
+# 由 create_icon.py 生成，请勿手动修改
+
+TRAY_ICON_SIZE = 64
+
+# 托盘图标（PNG）
+TRAY_ICON_PNG = (
+    b'\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR\x00\x00\x00@\x00\x00\x00@\x08\x06\x00\x00\x00\xaaiq'
+    b'\xde\x00\x00\x01\x80IDATx\xda\xedZ\xcd\x1a\x830\x08\x1b\xbc\xff;w\x17\x0f\xceOk\xab$\xe0L'
+    b'.;\xb8Y\xc2?\xac\x9f\x8f \x08\x82 \x08\x82\xc0Gk\xad\xad?3`\xd9\xe4\x7f\x841\xa3\xcb\xe3U'
+    b'\xc8gy\x82W!\x9f\xa5\x04\xcb&nf\xd6{\xf6\x17\x1epF\xf0\x88(\xc3\x1b,\x83|\xcf\xb2\xec\xe4'
+    b'\xe8\x95\xc8\x1f=Gz\x82W"\x9f\xa1\x04\xafF\x9e\xad\x04\xafH\x9e\xa9\x04\xafJ\x9e\xa5\x04C\x11\x8f\xce'
+    b'\xde\xa83\xfc\t\xe4\x91\xbd\x82Usy\xf6\xb9\xfe4\xf2\xd1y\xc1\xa3\x84`\x8f\xb2Q\xe7{t\xecW\xda'
+    b'/P=\x00\xa1\x90\xde;\xb7\xcf\xe8\x1epW\xe0\xd1w\xed\xfd.R\xd9\x1e\x19\x87g\x02\x8f\n\xbe\xfe\xde'
+    b'\x88\xa7\xdd\xc9?\x1e\x9d\x8c\xce\xbe\xd3\x16\x1c\x11\x9f\xb5\xee\xedN\x13\xe5\xfe#\x8d\xcbV1\xb3y&\xa2\xf2'
+    b'@\xa6\xc1\x9e\xe0{\xde0\xea\xd6\x88R\x0b\x1f\x87\xf7\xe2\xdf\x16\x1c\x91c\xae\xc8\x1c\xed\xfe\xbd\xf8_\xef\x04'
+    b'G\xc8!J/e)\xba\xb5\xf8V\t\xbd\xac\x8f\x86#\xad?[\rf+J\xb9ip\xc6zw\xeby'
+    b'\xc9N\xf0J\xa58\xfbo\x00.G\x86\xf5\xd9\xbd\xc7c\x87\xa1\xd2!\x80\x1eRXg\x1bB\x18TH '
+    b'\xce\x82n\x85\xa3\x14\x81|\xbfU\xb7\x10\xda\xc3\x8c\x15\xa3\x11}\x02"\xb4\xa0\xa5\xeb\n\t\xf6e\x89\x94\x1d'
+    b'\xfe\xe8>\x80\xd1c\xbc\xfe\x8aLz\xf7\x96E<m\x16\xb8rC\xe4oQ\xe1\xa6\xa8 \x08\x82 \x08\x82'
+    b' \x08\xef\xc4\x17/?\x94"\xbc\xbc=(\x00\x00\x00\x00IEND\xaeB`\x82'
+)
@@ -1,235 +1,630 @@
+import functools
 import threading
 import time
-import win32api
-import win32gui
-from pynput import keyboard
 from .window_manager import WindowManager
 from .animation_controller import AnimationController
+from .edge_detector import EdgeDetector
+from .hotkey_engine import HotkeyEngine
+from .action_queue import ActionQueue
+from .window_state import HIDING
+from .window_state_machine import REVEAL, HIDE, ARRIVE, PIN, RESTORE
 
 class InputHandler:
-    def __init__(self, window_manager: WindowManager, animation_controller: AnimationController):
+    # 工作线程的动作：快捷键、隐藏窗口被销毁、显示器拓扑变化、虚拟桌面变化、外部命令（边缘事件见 EdgeDetector）
+    HOTKEY = 'hotkey'
+    WINDOW_DESTROYED = 'window_destroyed'
+    TOPOLOGY_CHANGED = 'topology_changed'
+    DESKTOP_CHANGED = 'desktop_changed'
+    CALL = 'call'
+
+    # 默认快捷键：组合键 -> 隐藏方向
+    DIRECTION_HOTKEYS = {
+        'shift+left': 'left',
+        'shift+right': 'right',
+        'shift+up': 'top',
+        'shift+down': 'bottom',
+    }
+
+    def __init__(self, window_manager: WindowManager, animation_controller: AnimationController,
+                 cursor_source=None):
         self.window_manager = window_manager
         self.animation_controller = animation_controller
         self.running = True
-        self.shift_pressed = False
-        self.edge_trigger_size = 5
         
-        # 用于鼠标监控的状态
-        self.shown_windows = set()
-        self.window_positions = {}
+        # 快捷键：Shift+方向键隐藏/显示窗口
+        self.hotkeys = HotkeyEngine(self.window_manager.backend.get_modifier_state)
+        for spec, direction in self.DIRECTION_HOTKEYS.items():
+            self.hotkeys.bind(spec, functools.partial(self.on_direction_hotkey, direction))
+        
+        # 边缘检测：光标事件源只把坐标交给检测器，检测器产生的事件和快捷键一样只排队，由工作线程处理
+        self.edge_detector = EdgeDetector(self.window_manager.topology)
+        self.edge_detector.add_listener(self.on_edge_event)
+        self.edge_detector.occupied = self.edge_occupied
+        self.window_manager.add_topology_listener(self.on_topology_changed)
+        self.window_manager.add_destroy_listener(self.on_window_destroyed)
+        self.window_manager.add_desktop_listener(self.on_desktop_event)
+        # 上一次处理过的当前虚拟桌面
+        self.desktop = None
+        self.reconciler = self.animation_controller.reconciler
+        self.reconciler.add_listener(self.on_uncooperative)
+        self.actions = ActionQueue()
+        backend = self.window_manager.backend
+        self.cursor_source = cursor_source or backend.create_cursor_source()
+        # 光标跟踪和窗口事件监听只在有隐藏窗口时运行
+        self.tracking = False
+        self.tracking_lock = threading.Lock()
+        self.wakeups = self.window_manager.wakeups
+        # 上一次光标采样的时间，仅在开启性能统计时记录
+        self.last_cursor_sample = None
+        # 输入轨迹录制器（见 input_trace），只在录制期间不为 None
+        self.recorder = None
+        # 每个窗口已排队的轮换快捷键数，作为切换快捷键合并键的一部分（只在键盘钩子线程上修改）
+        self.hotkey_epochs = {}
         
         # 启动键盘监听
-        self.keyboard_listener = keyboard.Listener(
-            on_press=self.on_key_press,
-            on_release=self.on_key_release)
+        self.keyboard_listener = backend.create_keyboard_listener(
+            self.on_key_press, self.on_key_release)
         
-        # 启动鼠标监控线程
-        self.mouse_thread = threading.Thread(target=self.monitor_mouse, daemon=True)
+        # 工作线程：所有窗口操作都在这里执行，钩子回调不会被慢窗口拖住
+        self.worker_thread = threading.Thread(target=self.process_actions, daemon=True)
 
     def start(self):
         """启动输入监听"""
         self.keyboard_listener.start()
-        self.mouse_thread.start()
+        self.desktop = self.window_manager.current_desktop()
+        self.worker_thread.start()
+        self.set_tracking(bool(self.window_manager.get_hidden_windows()))
 
     def stop(self):
         """停止输入监听"""
         self.running = False
         if hasattr(self, 'keyboard_listener'):
             self.keyboard_listener.stop()
+        self.cursor_source.stop()
+        self.actions.put(None)
+
+    def set_tracking(self, active):
+        """启动或挂起光标跟踪和窗口事件监听
+
+        挂起后光标源和窗口事件钩子都停止，没有任何后台线程被唤醒，直到下一次隐藏窗口。
+        """
+        with self.tracking_lock:
+            if active == self.tracking and (active or self.window_manager.tracking_parked):
+                return
+            self.tracking = active
+            if active:
+                self.window_manager.resume_tracking()
+                self.cursor_source.start(self.on_cursor_move)
+            else:
+                self.cursor_source.stop()
+                self.edge_detector.reset()
+                self.last_cursor_sample = None
+                self.window_manager.park_tracking()
+
+    def update_tracking(self):
+        """按是否还有隐藏窗口更新跟踪状态"""
+        self.set_tracking(bool(self.window_manager.get_hidden_windows()))
+
+    def on_cursor_move(self, x, y):
+        """光标源回调，返回下一次采样间隔"""
+        self.wakeups.tick('cursor')
+        metrics = self.window_manager.metrics
+        if metrics.enabled:
+            now = time.perf_counter()
+            if self.last_cursor_sample is not None:
+                metrics.add('cursor_sample_gap', (now - self.last_cursor_sample) * 1000)
+            self.last_cursor_sample = now
+        recorder = self.recorder
+        if recorder is not None:
+            recorder.cursor_moved(x, y)
+        return self.edge_detector.feed(x, y)
 
     def on_key_press(self, key):
         """处理按键事件"""
+        self.wakeups.tick('keyboard')
+        metrics = self.window_manager.metrics
+        started = time.perf_counter() if metrics.enabled else None
         try:
-            if key == keyboard.Key.shift:
-                self.shift_pressed = True
-                return
-            
-            if self.shift_pressed and hasattr(key, 'name'):
-                direction_map = {
-                    'left': 'left',
-                    'right': 'right',
-                    'up': 'top',
-                    'down': 'bottom'
-                }
-                
-                if key.name in direction_map:
-                    direction = direction_map[key.name]
-                    hidden_windows = self.window_manager.get_hidden_windows()
-                    if hidden_windows[direction]:
-                        self.show_hidden_window(direction)
-                    else:
-                        self.hide_active_window(direction)
+            self.hotkeys.on_press(key)
         except Exception as e:
             print(f"Error in key handling: {e}")
+        # 在快捷键回调之后录制：快捷键作用的前台窗口先于按键写入轨迹
+        recorder = self.recorder
+        if recorder is not None:
+            recorder.key(key, True)
+        if started is not None:
+            metrics.observe('key_hook_callback', started)
 
     def on_key_release(self, key):
         """处理按键释放事件"""
-        if key == keyboard.Key.shift:
-            self.shift_pressed = False
+        self.wakeups.tick('keyboard')
+        recorder = self.recorder
+        if recorder is not None:
+            recorder.key(key, False)
+        self.hotkeys.on_release(key)
+
+    def on_direction_hotkey(self, direction):
+        """Shift+方向键回调，运行在键盘钩子线程上：只记下当前活动窗口并排队
+
+        同一窗口未处理的隐藏/恢复显示切换按“后来的覆盖先前的”合并，连按两次同一方向互相抵消；
+        其余按键（轮换显示同一边缘的窗口，或隐藏到已有窗口的边缘）不合并，按顺序执行，
+        之后的切换也不会与它之前排队的切换合并。
+        """
+        queued_at = time.perf_counter() if self.window_manager.metrics.enabled else None
+        hwnd = self.window_manager.get_foreground_window()
+        recorder = self.recorder
+        if recorder is not None:
+            recorder.foreground(hwnd)
+        action = (self.HOTKEY, (direction, hwnd), 0, 0, queued_at)
+        epoch = self.hotkey_epochs.get(hwnd, 0)
+        if self.is_hotkey_toggle(direction, hwnd):
+            self.actions.put(action, key=(self.HOTKEY, hwnd, epoch), tag=direction)
+        else:
+            self.hotkey_epochs[hwnd] = epoch + 1
+            self.actions.put(action)
+
+    def is_hotkey_toggle(self, direction, hwnd):
+        """快捷键是否为可以抵消的切换（只读隐藏窗口的状态快照，不做系统调用）
+
+        窗口单独隐藏在该方向的边缘（恢复显示），或窗口未隐藏且该方向的边缘都没有隐藏窗口（隐藏）时，
+        连按两次回到原状；其余情况下第二次按键会轮换显示同一边缘的窗口，每次按键都要执行。
+        """
+        location = self.window_manager.find_hidden(hwnd)
+        if location is not None:
+            return location[1] == direction and len(self.window_manager.get_stack(location[:3])) == 1
+        return not any(slot[1] == direction for slot in self.window_manager.get_hidden_windows())
+
+    def run_direction_hotkey(self, direction, hwnd, queued_at):
+        """在工作线程上执行快捷键，记录从按键到执行完的延迟"""
+        try:
+            self.dispatch_direction_hotkey(direction, hwnd)
+        finally:
+            if queued_at is not None:
+                self.window_manager.metrics.observe('keypress_to_action', queued_at, hwnd)
+
+    def dispatch_direction_hotkey(self, direction, hwnd):
+        """按按下快捷键时的活动窗口 hwnd 的状态执行快捷键对应的操作
+
+        - 窗口已隐藏在该方向：边缘只有它一个时恢复显示，否则轮换显示同一边缘的下一个窗口
+        - 窗口可以隐藏（有标题且没有规则禁止）：加入该方向边缘的叠放栈
+        - 否则：临时显示该方向边缘最近隐藏的窗口
+        """
+        self.window_manager.refresh_desktops()
+        location = self.window_manager.find_hidden(hwnd)
+        if location is not None and location[1] == direction:
+            slot = location[:3]
+            if len(self.window_manager.get_stack(slot)) == 1:
+                self.show_hidden_window(slot, hwnd)
+            else:
+                self.cycle_stack(slot, hwnd)
+            return
+        
+        title = self.window_manager.get_window_text(hwnd) if location is None else ''
+        if title and self.window_manager.rules.profile(hwnd, title).hide:
+            try:
+                self.hide_window(hwnd, direction)
+            except Exception as e:
+                print(f"Error hiding window: {e}")
+            return
+        
+        slot = self.find_hotkey_slot(direction)
+        if slot is not None:
+            self.cycle_stack(slot, None)
+
+    def find_hotkey_slot(self, direction):
+        """查找快捷键应显示的槽位：优先光标所在显示器，其次当前活动窗口所在显示器"""
+        hidden_windows = self.window_manager.get_hidden_windows()
+        if not hidden_windows:
+            return None
+        x, y = self.window_manager.get_cursor_pos()
+        slot = self.window_manager.resolve_slot(direction, {'x': x, 'y': y, 'width': 1, 'height': 1})
+        if slot in hidden_windows:
+            return slot
+        hwnd = self.window_manager.get_foreground_window()
+        if hwnd and self.window_manager.is_window_valid(hwnd):
+            slot = self.window_manager.resolve_slot(direction, self.window_manager.get_window_rect(hwnd))
+            if slot in hidden_windows:
+                return slot
+        return None
 
     def hide_active_window(self, direction):
         """隐藏当前活动窗口"""
         try:
-            hwnd = self.window_manager.user32.GetForegroundWindow()
-            hidden_windows = self.window_manager.get_hidden_windows()
-            
-            if hidden_windows[direction]:
-                return
-            
-            title = win32gui.GetWindowText(hwnd)
-            if not title:
-                return
-                
-            rect = self.window_manager.get_window_rect(hwnd)
-            self.window_manager.original_positions[hwnd] = (rect['x'], rect['y'])
-            
-            end_x, end_y = self.window_manager.calculate_hidden_position(direction, rect)
-            if self.animation_controller.animation_enabled:
-                self.animation_controller.animate_window(hwnd, rect['x'], rect['y'], end_x, end_y)
-            else:
-                self.window_manager.set_window_pos(hwnd, end_x, end_y)
-            
-            self.window_manager.set_hidden_window(direction, (hwnd, title))
-            
+            self.hide_window(self.window_manager.get_foreground_window(), direction)
         except Exception as e:
             print(f"Error hiding window: {e}")
 
-    def show_hidden_window(self, direction):
-        """显示指定方向的窗口"""
+    def hide_window(self, hwnd, direction, relayout=True, slot=None):
+        """把窗口隐藏到 direction 方向的边缘，返回所在槽位，不能隐藏时返回 None
+
+        relayout 为 False 时只登记窗口，由调用方随后对槽位调用 relayout_slot（批量隐藏时每个槽位只排列一次）。
+        slot 给出时隐藏到该槽位 (显示器, 方向, 虚拟桌面)，不按窗口位置选择（重放轨迹时使用）。
+        """
+        title = self.window_manager.get_window_text(hwnd)
+        if not title or self.window_manager.find_hidden(hwnd) is not None:
+            return None
+        profile = self.window_manager.rules.profile(hwnd, title)
+        if not profile.hide:
+            return None
+            
+        rect = self.window_manager.get_window_rect(hwnd)
+        # 槽位属于窗口所在的虚拟桌面（固定在所有桌面上的窗口属于当前桌面）
+        if slot is None:
+            slot = self.window_manager.resolve_slot(direction, rect, self.window_manager.window_desktop(hwnd))
+        if slot is None:
+            return None
+        
+        strategy = self.window_manager.hide_strategies.choose(hwnd, title)
+        # 先恢复窗口事件监听，再开始跟踪窗口，避免漏掉期间的位置变化
+        self.set_tracking(True)
+        self.window_manager.push_hidden_window(slot, (hwnd, title), (rect['x'], rect['y']), strategy)
+        
+        # 新窗口和同一边缘已有的窗口一起按叠放方式排列
+        if relayout:
+            self.relayout_slot(slot)
+        return slot
+
+    def show_hidden_window(self, slot, hwnd=None, activate=True):
+        """恢复显示槽位中的窗口（默认最近隐藏的一个），返回移动的 AnimationHandle，失败时返回 None
+
+        activate 为 False 时不把窗口切换到前台（批量恢复时只激活最后一个）。
+        """
         try:
-            hidden_windows = self.window_manager.get_hidden_windows()
-            if not hidden_windows[direction]:
-                return
+            stack = self.window_manager.get_stack(slot)
+            if not stack:
+                return None
+            if hwnd is None:
+                hwnd = stack[-1][0]
                 
-            hwnd = hidden_windows[direction][0]
-            rect = self.window_manager.get_window_rect(hwnd)
+            strategy = self.window_manager.get_strategy(hwnd)
+            rect = strategy.layout_rect(hwnd)
             
-            if hwnd in self.window_manager.original_positions:
-                end_x, end_y = self.window_manager.original_positions[hwnd]
-                del self.window_manager.original_positions[hwnd]
+            state = self.window_manager.get_window_state(hwnd)
+            if state is not None and state.original_position is not None:
+                end_x, end_y = state.original_position
             else:
-                width, height = rect['width'], rect['height']
-                end_x = (self.window_manager.screen_width - width) // 2
-                end_y = (self.window_manager.screen_height - height) // 2
+                end_x, end_y = self.window_manager.get_restore_position(slot, rect)
             
-            self.window_manager.force_foreground_window(hwnd)
-            if self.animation_controller.animation_enabled:
-                self.animation_controller.animate_window(hwnd, rect['x'], rect['y'], end_x, end_y)
-            else:
-                self.window_manager.set_window_pos(hwnd, end_x, end_y)
-            self.window_manager.set_hidden_window(direction, None)
+            # 窗口已被其他路径恢复显示（或被固定）时不再重复处理
+            if self.window_manager.transition(hwnd, RESTORE) is None:
+                return None
+            end_x, end_y = strategy.restore(hwnd, rect, (end_x, end_y))
+            if activate:
+                self.window_manager.force_foreground_window(hwnd)
+            handle = self.animation_controller.animate_window(hwnd, rect['x'], rect['y'], end_x, end_y)
+            self.cleanup_window(slot, hwnd)
+            return handle
             
         except Exception as e:
             print(f"Error showing window: {e}")
+            return None
 
-    def monitor_mouse(self):
-        """监控鼠标位置"""
+    def cycle_stack(self, slot, current):
+        """在同一边缘叠放的窗口之间轮换临时显示"""
+        stack = self.window_manager.get_stack(slot)
+        if not stack:
+            return
+        if current is None:
+            next_index = len(stack) - 1
+        else:
+            next_index = (self.window_manager.find_hidden(current)[-1] - 1) % len(stack)
+            if self.window_manager.is_shown(current):
+                self.start_temp_hide(slot, current, self.window_manager.get_window_rect(current))
+        hwnd = stack[next_index][0]
+        if hwnd == current or not self.validate_hidden_window(slot, hwnd):
+            return
+        # 键盘触发的临时显示要等光标进入过窗口后，离开时才自动隐藏
+        self.show_window_temp(slot, hwnd, self.window_rect(hwnd), require_enter=True)
+
+    def relayout_slot(self, slot):
+        """按叠放方式重新排列槽位中未临时显示的隐藏窗口，返回 {hwnd: AnimationHandle}（已在位的窗口不包含在内）"""
+        handles = {}
+        for hwnd, title in self.window_manager.get_stack(slot):
+            if self.window_manager.is_shown(hwnd):
+                continue
+            try:
+                strategy = self.window_manager.get_strategy(hwnd)
+                rect = strategy.layout_rect(hwnd)
+                end_x, end_y = self.window_manager.get_hidden_position(hwnd, rect)
+                target = strategy.park(hwnd, rect, (end_x, end_y), self.get_temp_show_position(slot, rect))
+                handle = self.move_window(hwnd, rect, target)
+                if handle is not None:
+                    handles[hwnd] = handle
+                if self.window_manager.get_phase(hwnd) == HIDING:
+                    self.track_arrival(hwnd, handle)
+                if strategy.reconciled:
+                    self.reconciler.expect(hwnd, end_x, end_y)
+            except Exception as e:
+                print(f"Error arranging hidden window: {e}")
+        return handles
+
+    def on_edge_event(self, event, key, x, y):
+        """边缘检测器回调，运行在光标事件源的线程上，只负责排队
+
+        同一边缘的进入/离开、同一窗口的离开事件未处理时只保留最新的一个。
+        """
+        queued_at = time.perf_counter() if self.window_manager.metrics.enabled else None
+        if event == EdgeDetector.RECT_LEAVE:
+            coalesce_key = (event, key)
+        else:
+            coalesce_key = ('edge', key)
+        self.actions.put((event, key, x, y, queued_at), key=coalesce_key)
+
+    def process_actions(self):
+        """工作线程：依次执行排队的动作，没有动作时阻塞等待"""
         while self.running:
+            item = self.actions.get()
+            if item is None:
+                break
+            self.wakeups.tick('edge_event')
+            event, key, x, y, queued_at = item
             try:
-                x, y = win32api.GetCursorPos()
-                hidden_windows = self.window_manager.get_hidden_windows()
-                
-                for direction, window_info in list(hidden_windows.items()):
-                    if window_info is None:
-                        continue
-                        
-                    hwnd = window_info[0]
-                    
-                    if not self.window_manager.is_window_valid(hwnd):
-                        self.cleanup_window(direction, hwnd)
-                        continue
-                    
-                    try:
-                        rect = self.window_manager.get_window_rect(hwnd)
-                        
-                        if hwnd in self.shown_windows:
-                            if self.check_window_moved(hwnd, rect):
-                                continue
-                        
-                        if self.should_show_window(direction, x, y):
-                            self.show_window_temp(direction, hwnd, rect)
-                        elif hwnd in self.shown_windows:
-                            self.hide_window_temp(direction, hwnd, rect, x, y)
-                            
-                    except Exception:
-                        self.cleanup_window(direction, hwnd)
-                        
+                self.run_action(event, key, x, y, queued_at)
             except Exception as e:
                 if self.running:
-                    print(f"Error in mouse monitoring: {e}")
-                
-            time.sleep(0.1)
+                    print(f"Error processing action: {e}")
+            finally:
+                self.actions.task_done()
+
+    def run_action(self, event, key, x, y, queued_at):
+        """执行一个动作"""
+        if event == EdgeDetector.EDGE_ENTER:
+            hwnd = self.on_edge_enter(self.window_manager.desktop_slot(key), x, y)
+            if queued_at is not None and hwnd is not None:
+                self.window_manager.metrics.observe('edge_to_reveal', queued_at, hwnd)
+        elif event == EdgeDetector.EDGE_LEAVE:
+            self.on_edge_leave(self.window_manager.desktop_slot(key), x, y)
+        elif event == EdgeDetector.RECT_LEAVE:
+            self.on_rect_leave(key, x, y)
+        elif event == self.HOTKEY:
+            self.run_direction_hotkey(*key, queued_at)
+        elif event == self.TOPOLOGY_CHANGED:
+            self.apply_topology(key)
+        elif event == self.DESKTOP_CHANGED:
+            self.apply_desktop_change()
+        elif event == self.WINDOW_DESTROYED:
+            self.on_window_gone(*key)
+        elif event == self.CALL:
+            key()
+
+    def on_window_destroyed(self, hwnd, state):
+        """隐藏窗口被销毁的回调，运行在事件监听线程上：状态已被移除，只需排队整理其余窗口"""
+        self.hotkey_epochs.pop(hwnd, None)
+        self.actions.put((self.WINDOW_DESTROYED, (state.slot, hwnd), 0, 0, None),
+                         key=(self.WINDOW_DESTROYED, hwnd))
+
+    def on_window_gone(self, slot, hwnd):
+        """在工作线程上整理已销毁窗口所在的边缘"""
+        self.edge_detector.unwatch_rect(hwnd)
+        self.relayout_slot(slot)
+        if not self.window_manager.get_hidden_windows():
+            self.set_tracking(False)
+
+    def call_on_event_thread(self, func):
+        """在工作线程上执行 func，与快捷键、边缘事件、隐藏动画回调串行"""
+        self.actions.put((self.CALL, func, 0, 0, None))
+
+    def validate_hidden_window(self, slot, hwnd):
+        """检查隐藏窗口是否仍然有效，无效时清理"""
+        if self.window_manager.is_window_valid(hwnd):
+            return True
+        self.cleanup_window(slot, hwnd)
+        return False
+
+    def on_edge_enter(self, slot, x, y):
+        """光标进入边缘触发带，显示光标位置下方的隐藏窗口，返回开始显示的窗口"""
+        window_info = self.window_manager.hidden_window_at(slot, x, y)
+        if window_info is None:
+            return None
+        hwnd = window_info[0]
+        if not self.validate_hidden_window(slot, hwnd):
+            return None
+        try:
+            rect = self.window_rect(hwnd)
+            if self.window_manager.is_shown(hwnd):
+                self.check_window_moved(hwnd, rect)
+                return None
+            self.show_window_temp(slot, hwnd, rect)
+            return hwnd
+        except Exception:
+            self.cleanup_window(slot, hwnd)
+
+    def on_edge_leave(self, slot, x, y):
+        """光标离开边缘触发带，隐藏该边缘上光标已不在其中的临时显示窗口"""
+        for hwnd, title in self.window_manager.get_stack(slot):
+            if self.window_manager.is_shown(hwnd) and self.validate_hidden_window(slot, hwnd):
+                self.try_hide_window_temp(slot, hwnd, x, y)
+
+    def on_rect_leave(self, hwnd, x, y):
+        """光标离开临时显示的窗口"""
+        slot = self.find_slot(hwnd)
+        if slot is None:
+            self.edge_detector.unwatch_rect(hwnd)
+            return
+        if self.should_show_window(slot, x, y):
+            # 仍在该槽位的触发带内，等离开触发带时再处理
+            return
+        if self.validate_hidden_window(slot, hwnd):
+            self.try_hide_window_temp(slot, hwnd, x, y)
+
+    def try_hide_window_temp(self, slot, hwnd, x, y):
+        """在窗口未被手动移动时尝试临时隐藏"""
+        try:
+            rect = self.window_manager.get_window_rect(hwnd)
+            if self.check_window_moved(hwnd, rect):
+                return
+            self.hide_window_temp(slot, hwnd, rect, x, y)
+            if self.window_manager.is_shown(hwnd):
+                # 光标仍在窗口实际区域内，按实际区域重新监视
+                self.edge_detector.watch_rect(hwnd, rect)
+        except Exception:
+            self.cleanup_window(slot, hwnd)
 
-    def cleanup_window(self, direction, hwnd):
-        """清理窗口相关数据"""
-        self.window_manager.set_hidden_window(direction, None)
-        self.shown_windows.discard(hwnd)
-        self.window_positions.pop(hwnd, None)
+    def find_slot(self, hwnd):
+        """查找窗口所在的隐藏槽位 (显示器, 方向, 虚拟桌面)"""
+        location = self.window_manager.find_hidden(hwnd)
+        return location[:3] if location is not None else None
+
+    def cleanup_window(self, slot, hwnd):
+        """清理窗口相关数据，并重新排列同一边缘的其余窗口"""
+        in_stack = self.window_manager.remove_hidden_window(hwnd) is not None
+        self.reconciler.release(hwnd)
+        self.edge_detector.unwatch_rect(hwnd)
+        self.window_manager.forget_window(hwnd)
+        if in_stack:
+            self.relayout_slot(slot)
+            if not self.window_manager.get_hidden_windows():
+                self.set_tracking(False)
 
     def check_window_moved(self, hwnd, rect):
         """检查窗口是否被手动移动"""
-        original_pos = self.window_positions.get(hwnd)
+        if self.animation_controller.is_animating(hwnd):
+            # 动画途中的位置不代表用户拖动
+            return False
+        original_pos = self.window_manager.get_shown_position(hwnd)
         if original_pos:
             dx = abs(original_pos[0] - rect['x'])
             dy = abs(original_pos[1] - rect['y'])
             if dx > 20 or dy > 20:
-                # 找到对应的方向
-                hidden_windows = self.window_manager.get_hidden_windows()
-                direction = next(k for k, v in hidden_windows.items() if v and v[0] == hwnd)
-                self.cleanup_window(direction, hwnd)
+                self.window_manager.transition(hwnd, PIN)
+                # 找到对应的槽位
+                slot = self.find_slot(hwnd)
+                if slot is not None:
+                    self.cleanup_window(slot, hwnd)
+                else:
+                    self.edge_detector.unwatch_rect(hwnd)
                 return True
         return False
 
-    def should_show_window(self, direction, x, y):
-        """判断是否应该显示窗口"""
-        if direction == 'left':
-            return x < self.edge_trigger_size
-        elif direction == 'right':
-            return x >= self.window_manager.screen_width - self.edge_trigger_size
-        elif direction == 'top':
-            return y < self.edge_trigger_size
-        else:  # bottom
-            return y >= self.window_manager.screen_height - self.edge_trigger_size
-
-    def show_window_temp(self, direction, hwnd, rect):
-        """临时显示窗口"""
-        if hwnd not in self.shown_windows and self.window_manager.is_window_valid(hwnd):
-            end_x, end_y = self.get_temp_show_position(direction, rect)
-            self.window_manager.force_foreground_window(hwnd)
-            if self.animation_controller.animation_enabled:
-                self.animation_controller.animate_window(hwnd, rect['x'], rect['y'], end_x, end_y)
-            else:
-                self.window_manager.set_window_pos(hwnd, end_x, end_y)
-            self.shown_windows.add(hwnd)
-            self.window_positions[hwnd] = (end_x, end_y)
+    def edge_occupied(self, slot):
+        """当前虚拟桌面上该边缘是否有隐藏窗口，边缘检测器只对这样的边缘按光标速度提前显示"""
+        return bool(self.window_manager.get_stack(self.window_manager.desktop_slot(slot)))
 
-    def hide_window_temp(self, direction, hwnd, rect, mouse_x, mouse_y):
+    def should_show_window(self, slot, x, y):
+        """判断光标是否位于槽位的边缘触发带内"""
+        return slot[:2] in self.edge_detector.slots_at(x, y)
+
+    def show_window_temp(self, slot, hwnd, rect, require_enter=False):
+        """临时显示窗口（已在显示中时什么都不做）"""
+        if self.window_manager.is_shown(hwnd) or not self.window_manager.is_window_valid(hwnd):
+            return
+        end_x, end_y = self.get_temp_show_position(slot, rect)
+        if self.window_manager.transition(hwnd, REVEAL, (end_x, end_y)) is None:
+            return
+        self.reconciler.release(hwnd)
+        end_x, end_y = self.window_manager.get_strategy(hwnd).reveal(hwnd, rect, (end_x, end_y))
+        self.window_manager.force_foreground_window(hwnd)
+        handle = self.animation_controller.animate_window(hwnd, rect['x'], rect['y'], end_x, end_y)
+        self.track_arrival(hwnd, handle)
+        self.edge_detector.watch_rect(hwnd, {
+            'x': end_x, 'y': end_y,
+            'width': rect['width'], 'height': rect['height']}, require_enter)
+
+    def hide_window_temp(self, slot, hwnd, rect, mouse_x, mouse_y):
         """临时隐藏窗口"""
         if not (rect['x'] <= mouse_x <= rect['x'] + rect['width'] and 
                 rect['y'] <= mouse_y <= rect['y'] + rect['height']):
-            end_x, end_y = self.window_manager.calculate_hidden_position(direction, rect)
-            
             if self.window_manager.is_window_valid(hwnd):
-                if self.animation_controller.animation_enabled:
-                    self.animation_controller.animate_window(hwnd, rect['x'], rect['y'], end_x, end_y)
-                else:
-                    self.window_manager.set_window_pos(hwnd, end_x, end_y)
-                
-                if self.animation_controller.verify_window_hidden(
-                    hwnd, direction, rect['x'], rect['y'], end_x, end_y):
-                    self.shown_windows.remove(hwnd)
-                    self.window_positions.pop(hwnd, None)
-                else:
-                    print(f"窗口 {win32gui.GetWindowText(hwnd)} 隐藏失败")
-                    self.cleanup_window(direction, hwnd)
+                self.start_temp_hide(slot, hwnd, rect)
+
+    def start_temp_hide(self, slot, hwnd, rect):
+        """把临时显示的窗口移回叠放位置"""
+        end_x, end_y = self.window_manager.get_hidden_position(hwnd, rect)
+        shown_position = self.window_manager.get_shown_position(hwnd) or self.get_temp_show_position(slot, rect)
+        # 先更新状态再启动动画，动画途中光标回到边缘可立即转向显示
+        if self.window_manager.transition(hwnd, HIDE) is None:
+            return
+        self.edge_detector.unwatch_rect(hwnd)
+        strategy = self.window_manager.get_strategy(hwnd)
+        target = strategy.conceal(hwnd, rect, (end_x, end_y), shown_position)
+        handle = self.move_window(hwnd, rect, target)
+        self.track_arrival(hwnd, handle)
+        if strategy.reconciled:
+            # 动画结束后由校正循环确认窗口到位
+            self.reconciler.expect(hwnd, end_x, end_y)
+
+    def window_rect(self, hwnd):
+        """计算隐藏窗口位置时使用的矩形（最小化隐藏的窗口按最小化前的几何信息）"""
+        return self.window_manager.get_strategy(hwnd).layout_rect(hwnd)
 
-    def get_temp_show_position(self, direction, rect):
+    def move_window(self, hwnd, rect, target):
+        """以动画把窗口移到隐藏方式给出的位置，不需要移动时返回 None"""
+        if target is None:
+            return None
+        if tuple(target) == (rect['x'], rect['y']) and not self.animation_controller.is_animating(hwnd):
+            return None
+        return self.animation_controller.animate_window(hwnd, rect['x'], rect['y'], *target)
+
+    def track_arrival(self, hwnd, handle):
+        """移动到达目标后推进窗口状态（revealing → peeking，hiding → hidden），handle 为 None 表示已在目标位置"""
+        if handle is None:
+            self.window_manager.transition(hwnd, ARRIVE)
+        else:
+            handle.add_done_callback(functools.partial(self.on_move_done, hwnd))
+
+    def on_move_done(self, hwnd, handle):
+        """移动结束回调：被取消或转向的移动不推进状态，由新的移动负责"""
+        if handle.completed:
+            self.window_manager.transition(hwnd, ARRIVE)
+
+    def on_uncooperative(self, hwnd):
+        """校正循环放弃了某个窗口（运行在校正线程上），交给工作线程处理"""
+        self.call_on_event_thread(functools.partial(self.give_up_window, hwnd))
+
+    def give_up_window(self, hwnd):
+        """窗口反复被其他程序移出隐藏位置：不再隐藏它"""
+        slot = self.find_slot(hwnd)
+        if slot is None or self.window_manager.is_shown(hwnd):
+            return
+        print(f"窗口 {self.window_manager.get_window_text(hwnd)} 隐藏失败")
+        self.window_manager.transition(hwnd, RESTORE)
+        self.cleanup_window(slot, hwnd)
+
+    def get_temp_show_position(self, slot, rect):
         """获取临时显示位置"""
-        if direction == 'left':
-            return 0, rect['y']
-        elif direction == 'right':
-            return self.window_manager.screen_width - rect['width'], rect['y']
-        elif direction == 'top':
-            return rect['x'], 0
-        else:  # bottom
-            return rect['x'], self.window_manager.screen_height - rect['height']
\ No newline at end of file
+        return self.window_manager.get_temp_show_position(slot, rect)
+
+    def on_topology_changed(self, topology):
+        """显示器拓扑变化回调，交给鼠标线程处理"""
+        self.actions.put((self.TOPOLOGY_CHANGED, topology, 0, 0, None), key=(self.TOPOLOGY_CHANGED,))
+
+    def on_desktop_event(self, hwnd):
+        """窗口被 shell 隐藏/取消隐藏的回调，运行在事件监听线程上：合并后交给工作线程检查"""
+        self.actions.put((self.DESKTOP_CHANGED, None, 0, 0, None), key=(self.DESKTOP_CHANGED,))
+
+    def apply_desktop_change(self):
+        """切换虚拟桌面或窗口被移到其他桌面后整理隐藏窗口
+
+        所在桌面变化的隐藏窗口移到新桌面的同一边缘，两边重新排列；
+        切换了桌面时，不在当前桌面上的临时显示窗口移回叠放位置，边缘触发状态重新开始。
+        只有收到通知的窗口会重新查询所在桌面，其余读缓存。
+        """
+        window_manager = self.window_manager
+        slots = set()
+        for hwnd, state in window_manager.state.snapshot.windows.items():
+            desktop = window_manager.window_desktop(hwnd)
+            if desktop is None or desktop == state.slot[2]:
+                continue
+            previous = window_manager.move_hidden_window(hwnd, state.slot[:2] + (desktop,))
+            if previous is not None:
+                slots.update((previous, state.slot[:2] + (desktop,)))
+        desktop = window_manager.current_desktop()
+        if desktop != self.desktop:
+            self.desktop = desktop
+            self.edge_detector.reset()
+        for hwnd in window_manager.state.snapshot.shown:
+            slot = self.find_slot(hwnd)
+            if slot is not None and slot[2] != desktop:
+                self.start_temp_hide(slot, hwnd, self.window_rect(hwnd))
+        for slot in slots:
+            self.relayout_slot(slot)
+
+    def apply_topology(self, topology):
+        """切换到新的显示器拓扑：所在边缘已不存在的隐藏窗口恢复显示，其余重新排列"""
+        self.edge_detector.set_topology(topology)
+        for slot, stack in self.window_manager.get_hidden_windows().items():
+            if slot[:2] not in topology.segments_by_slot:
+                for hwnd, title in stack:
+                    self.show_hidden_window(slot, hwnd)
+            else:
+                self.relayout_slot(slot)
\ No newline at end of file
@@ -0,0 +1,626 @@
+import functools
+import json
+import os
+import queue
+import threading
+import time
+
+from .hotkey_engine import key_name
+from .window_events import EVENT_OBJECT_DESTROY, EVENT_OBJECT_LOCATIONCHANGE
+
+# 轨迹文件：MAGIC、版本号，之后是一条接一条的记录
+# 记录：类型（1 字节）、距上一条记录的时间（微秒，变长整数）、按 FORMATS 编码的字段
+MAGIC = b'AHWT'
+VERSION = 1
+
+# 录制开始时的快照：设置（JSON）、显示器、窗口（含所在虚拟桌面）、隐藏中的窗口（按叠放顺序，
+# 槽位为显示器、方向、虚拟桌面），START 标记快照结束。虚拟桌面未知时为空字符串
+SETTINGS = 1
+MONITOR = 2
+WINDOW = 3
+HIDDEN = 4
+START = 5
+# 输入：按键按下/释放（按键名）、光标位置（相对上一个位置的偏移）、前台窗口变化、
+# 窗口被用户或所属程序移动/改变大小、窗口销毁
+KEY_DOWN = 6
+KEY_UP = 7
+CURSOR = 8
+FOREGROUND = 9
+GEOMETRY = 10
+DESTROY = 11
+
+# 字段编码：u 无符号变长整数，s 有符号变长整数（zigzag），t UTF-8 字符串（长度 + 内容）
+FORMATS = {
+    SETTINGS: 't',
+    MONITOR: 'tssssssssuu',
+    WINDOW: 'usssstttt',
+    HIDDEN: 'uttt',
+    START: '',
+    KEY_DOWN: 't',
+    KEY_UP: 't',
+    CURSOR: 'ss',
+    FOREGROUND: 'u',
+    GEOMETRY: 'ussss',
+    DESTROY: 'u',
+}
+
+# 录制的边缘意图参数（见 EdgeIntent）
+INTENT_SETTINGS = ('dwell', 'edge_margin', 'rect_margin', 'hide_grace', 'predict_speed', 'predict_ahead')
+# 最小化窗口的 GetWindowRect 结果（图标位置）的横坐标
+ICONIC_X = -32000
+
+
+def default_trace_path():
+    """默认的轨迹文件位置（%LOCALAPPDATA%\\WindowController\\traces，按开始时间命名）"""
+    base = os.environ.get('LOCALAPPDATA') or os.path.expanduser('~')
+    return os.path.join(base, 'WindowController', 'traces', time.strftime('trace-%Y%m%d-%H%M%S.ahwt'))
+
+
+def write_varint(out, value):
+    while value >= 0x80:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def encode_record(tag, delta, values):
+    """编码一条记录，delta 为距上一条记录的微秒数"""
+    out = bytearray((tag,))
+    write_varint(out, delta)
+    for kind, value in zip(FORMATS[tag], values):
+        if kind == 'u':
+            write_varint(out, value)
+        elif kind == 's':
+            write_varint(out, value << 1 if value >= 0 else (-value << 1) - 1)
+        else:
+            data = value.encode('utf-8')
+            write_varint(out, len(data))
+            out += data
+    return bytes(out)
+
+
+class TraceReader:
+    """从轨迹文件的内容中逐条解码记录"""
+
+    def __init__(self, data):
+        self.data = data
+        self.position = 0
+
+    def varint(self):
+        value = shift = 0
+        while True:
+            byte = self.data[self.position]
+            self.position += 1
+            value |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                return value
+            shift += 7
+
+    def signed(self):
+        value = self.varint()
+        return -((value + 1) >> 1) if value & 1 else value >> 1
+
+    def text(self):
+        length = self.varint()
+        end = self.position + length
+        if end > len(self.data):
+            raise IndexError('truncated string')
+        value = self.data[self.position:end].decode('utf-8')
+        self.position = end
+        return value
+
+    def record(self):
+        """下一条记录 (类型, 微秒差, 字段)"""
+        tag = self.data[self.position]
+        self.position += 1
+        fields = FORMATS.get(tag)
+        if fields is None:
+            raise ValueError(f'unknown record type {tag}')
+        delta = self.varint()
+        readers = {'u': self.varint, 's': self.signed, 't': self.text}
+        return tag, delta, tuple(readers[kind]() for kind in fields)
+
+
+def read_trace(path):
+    """读取轨迹文件，返回 [(距录制开始的秒数, 类型, 字段), ...]
+
+    光标记录还原为绝对坐标。录制中途崩溃时最后一条记录可能不完整，丢弃它。
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    if data[:len(MAGIC)] != MAGIC:
+        raise ValueError('not an input trace file')
+    if data[len(MAGIC)] != VERSION:
+        raise ValueError(f'unsupported trace version {data[len(MAGIC)]}')
+    reader = TraceReader(data)
+    reader.position = len(MAGIC) + 1
+    records = []
+    elapsed = 0
+    cursor_x = cursor_y = 0
+    while reader.position < len(data):
+        try:
+            tag, delta, values = reader.record()
+        except (IndexError, UnicodeDecodeError):
+            break
+        elapsed += delta
+        if tag == CURSOR:
+            cursor_x += values[0]
+            cursor_y += values[1]
+            values = (cursor_x, cursor_y)
+        records.append((elapsed / 1e6, tag, values))
+    return records
+
+
+class TraceRecorder:
+    """把 InputHandler 收到的原始输入录制为紧凑的二进制轨迹文件
+
+    开始时写入设置、显示器、窗口和隐藏中的窗口的快照，之后记录按键、光标采样、快捷键作用的前台窗口，
+    以及不是由本程序引起的窗口移动/改变大小和窗口销毁，每条记录带有微秒级的时间。
+    钩子和事件回调只把原始输入和时间放入队列，查询窗口信息和写文件都在录制线程上进行，
+    不会拖慢键盘钩子。只在录制期间挂到 InputHandler 上，不录制时输入路径上没有任何额外开销。
+    """
+
+    def __init__(self, input_handler):
+        self.input_handler = input_handler
+        self.window_manager = input_handler.window_manager
+        self.backend = self.window_manager.backend
+        self.file = None
+        self.path = None
+        self.started = None
+        self.queue = None
+        self.thread = None
+        # 上一条记录的时间（微秒）、上一次的光标位置
+        self.last_time = 0
+        self.cursor = (0, 0)
+        # {hwnd: 最后录制的窗口矩形}
+        self.windows = {}
+        self.records = 0
+        self.listening = False
+
+    @property
+    def recording(self):
+        return self.file is not None
+
+    def start(self, path):
+        """开始录制到 path（正在录制时先结束上一段），返回 path"""
+        self.stop()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if not self.listening:
+            self.window_manager.window_events.add_listener(self.on_win_event)
+            self.listening = True
+        file = open(path, 'wb')
+        file.write(MAGIC + bytes((VERSION,)))
+        self.path = path
+        self.started = time.perf_counter()
+        self.last_time = 0
+        self.cursor = (0, 0)
+        self.windows = {}
+        self.records = 0
+        self.file = file
+        try:
+            self.write_snapshot()
+        except Exception:
+            self.file = None
+            file.close()
+            raise
+        self.queue = queue.SimpleQueue()
+        self.thread = threading.Thread(target=self.run, args=(self.queue,), daemon=True)
+        self.thread.start()
+        self.input_handler.recorder = self
+        return path
+
+    def stop(self):
+        """结束录制（先写完队列中的输入），返回轨迹文件路径，未在录制时返回 None"""
+        self.input_handler.recorder = None
+        thread, self.thread = self.thread, None
+        if thread is not None:
+            self.queue.put(None)
+            thread.join()
+        file, self.file = self.file, None
+        if file is None:
+            return None
+        file.close()
+        return self.path
+
+    def run(self, inputs):
+        """录制线程：按收到的顺序处理队列中的输入"""
+        while True:
+            item = inputs.get()
+            if item is None:
+                return
+            try:
+                self.process(*item)
+            except Exception as e:
+                print(f"Error recording input trace: {e}")
+
+    def process(self, at, tag, first, second):
+        if tag in (KEY_DOWN, KEY_UP):
+            name = key_name(first)
+            if name is not None:
+                self.write(tag, name, at=at)
+        elif tag == CURSOR:
+            self.move_cursor(first, second, at)
+        elif tag == FOREGROUND:
+            self.note_foreground(first, at)
+        elif first == EVENT_OBJECT_DESTROY:
+            # 窗口事件 (事件, hwnd)
+            if self.windows.pop(second, None) is not None:
+                self.write(DESTROY, second, at=at)
+        elif first == EVENT_OBJECT_LOCATIONCHANGE and second in self.windows:
+            try:
+                rect = self.backend.get_window_rect(second)
+            except Exception:
+                return
+            self.observe_window(second, rect, at)
+
+    def write(self, tag, *values, at=None):
+        """写入一条记录，at 为输入发生时的 time.perf_counter()，默认为现在（录制线程或开始录制时调用）"""
+        now = int(((time.perf_counter() if at is None else at) - self.started) * 1e6)
+        delta = max(0, now - self.last_time)
+        self.last_time += delta
+        self.file.write(encode_record(tag, delta, values))
+        self.records += 1
+
+    def settings(self):
+        """影响输入处理结果的全部设置"""
+        window_manager = self.window_manager
+        animation = self.input_handler.animation_controller
+        intent = self.input_handler.edge_detector.intent
+        return {
+            'animation': {
+                'enabled': animation.animation_enabled,
+                'speed': animation.animation_speed,
+                'duration': animation.animation_duration,
+                'frame_rate': animation.frame_rate,
+                'curve': animation.animation_curve,
+            },
+            'refresh_rate': window_manager.get_refresh_rate(),
+            'desktop': window_manager.current_desktop(),
+            'visible_part': window_manager.visible_part,
+            'edge_trigger_size': window_manager.edge_trigger_size,
+            'stacking': window_manager.stacking,
+            'cascade_step': window_manager.cascade_step,
+            'intent': {name: getattr(intent, name) for name in INTENT_SETTINGS},
+            'strategies': {'default': window_manager.hide_strategies.default},
+            'rules': window_manager.rules.rules(),
+        }
+
+    def write_snapshot(self):
+        """写入录制开始时的快照"""
+        window_manager = self.window_manager
+        self.write(SETTINGS, json.dumps(self.settings(), ensure_ascii=False, separators=(',', ':')))
+        for monitor in window_manager.topology.monitors:
+            self.write(MONITOR, str(monitor.id), *monitor.bounds, *monitor.work_area, monitor.dpi,
+                       int(monitor.primary))
+
+        # 隐藏中的窗口按原位置和隐藏时使用的大小记录，重放时重新隐藏
+        snapshot = window_manager.state.snapshot
+        for hwnd, state in snapshot.windows.items():
+            try:
+                rect = window_manager.hide_strategies.get(state.strategy).layout_rect(hwnd)
+            except Exception:
+                continue
+            x, y = state.original_position or (rect['x'], rect['y'])
+            self.add_window(hwnd, (x, y, x + rect['width'], y + rect['height']))
+        for hwnd in self.backend.enumerate_windows():
+            if hwnd not in snapshot.windows:
+                self.add_window(hwnd)
+        for slot, stack in snapshot.stacks.items():
+            for hwnd, title in stack:
+                if hwnd in self.windows:
+                    monitor_id, edge, desktop = slot
+                    self.write(HIDDEN, hwnd, str(monitor_id), edge, desktop or '')
+
+        self.note_foreground(self.backend.get_foreground_window())
+        self.move_cursor(*self.backend.get_cursor_pos())
+        self.write(START)
+
+    def add_window(self, hwnd, rect=None, at=None):
+        """录制一个窗口，返回是否成功"""
+        try:
+            if rect is None:
+                rect = tuple(self.backend.get_window_rect(hwnd))
+                if rect[0] <= ICONIC_X:
+                    return False
+            title = self.backend.get_window_text(hwnd)
+            class_name = self.backend.get_class_name(hwnd)
+            process = self.backend.get_process_name(hwnd)
+        except Exception:
+            return False
+        desktop = self.window_manager.desktops.window_desktop(hwnd) or ''
+        self.windows[hwnd] = rect
+        self.write(WINDOW, hwnd, *rect, title, class_name, process, desktop, at=at)
+        return True
+
+    def own_move(self, hwnd, rect):
+        """窗口的这次位置变化是否由本程序引起（动画中，或停在本程序最后设置的位置且大小未变）"""
+        if self.input_handler.animation_controller.is_animating(hwnd):
+            return True
+        previous = self.windows.get(hwnd)
+        return (previous is not None and self.window_manager.last_position(hwnd) == rect[:2]
+                and previous[2] - previous[0] == rect[2] - rect[0]
+                and previous[3] - previous[1] == rect[3] - rect[1])
+
+    def observe_window(self, hwnd, rect, at=None):
+        """窗口的当前矩形：不是本程序引起的变化写入 GEOMETRY 记录"""
+        rect = tuple(rect)
+        if rect[0] <= ICONIC_X or rect == self.windows.get(hwnd):
+            return
+        own = self.own_move(hwnd, rect)
+        self.windows[hwnd] = rect
+        if not own:
+            self.write(GEOMETRY, hwnd, *rect, at=at)
+
+    def note_foreground(self, hwnd, at=None):
+        """写入 FOREGROUND 记录，新窗口先录制，已知窗口补录期间的位置变化
+
+        本程序自己也会激活窗口（临时显示时），快捷键作用的窗口在钩子线程上读取时一起记录，
+        重放时快捷键作用于同一个窗口。没有隐藏窗口时窗口事件监听挂起，收不到窗口移动通知，
+        这里检查一次该窗口的位置。
+        """
+        if hwnd and hwnd not in self.windows:
+            if not self.add_window(hwnd, at=at):
+                hwnd = 0
+        elif hwnd:
+            try:
+                self.observe_window(hwnd, self.backend.get_window_rect(hwnd), at)
+            except Exception:
+                pass
+        self.write(FOREGROUND, hwnd, at=at)
+
+    def move_cursor(self, x, y, at=None):
+        """写入光标记录"""
+        last_x, last_y = self.cursor
+        self.cursor = (x, y)
+        self.write(CURSOR, x - last_x, y - last_y, at=at)
+
+    # 以下回调运行在键盘钩子/光标源/事件监听线程上，只排队
+    def key(self, key, pressed):
+        self.queue.put((time.perf_counter(), KEY_DOWN if pressed else KEY_UP, key, None))
+
+    def foreground(self, hwnd):
+        """快捷键作用的前台窗口（InputHandler 已在钩子线程上读取）"""
+        self.queue.put((time.perf_counter(), FOREGROUND, hwnd, None))
+
+    def cursor_moved(self, x, y):
+        self.queue.put((time.perf_counter(), CURSOR, x, y))
+
+    def on_win_event(self, event, hwnd):
+        """窗口事件回调，只关心已录制的窗口"""
+        if self.thread is not None and hwnd in self.windows:
+            self.queue.put((time.perf_counter(), GEOMETRY, event, hwnd))
+
+
+class TraceReplay:
+    """在模拟桌面上按录制的时间重放轨迹，报告窗口移动和延迟
+
+    按快照建立与录制时相同设置、显示器和窗口的 SimulatedDesktop，重新隐藏快照中的隐藏窗口，
+    然后把每条输入记录按时间交给模拟桌面，由完整的 InputHandler/AnimationController 处理。
+    speed 大于 1 时加速重放：输入间隔、动画时长和帧间隔、边缘意图的各个时间参数按同一倍率缩短，
+    判断结果与原速重放相同，只是更快跑完。
+    """
+
+    IDLE_TIMEOUT = 5.0
+
+    def __init__(self, trace, speed=1.0):
+        if speed <= 0:
+            raise ValueError('speed must be positive')
+        self.records = read_trace(trace) if isinstance(trace, (str, os.PathLike)) else list(trace)
+        self.speed = speed
+        # {录制时的 hwnd: 模拟桌面上的 hwnd}
+        self.windows = {}
+        self.desktop = None
+        self.window_manager = None
+        self.animation_controller = None
+        self.input_handler = None
+
+    def split(self):
+        """把记录分为快照和输入两部分，输入的时间从 START 算起"""
+        for position, (at, tag, values) in enumerate(self.records):
+            if tag == START:
+                return self.records[:position], [
+                    (when - at, tag, values) for when, tag, values in self.records[position + 1:]]
+        raise ValueError('trace has no START record')
+
+    def setup(self, snapshot):
+        """按快照建立模拟桌面和输入处理"""
+        from .animation_controller import AnimationController
+        from .edge_intent import EdgeIntent
+        from .input_handler import InputHandler
+        from .monitor_topology import Monitor
+        from .simulated_backend import SimulatedDesktop
+        from .window_manager import WindowManager
+
+        speed = self.speed
+        settings = {}
+        monitors = []
+        for at, tag, values in snapshot:
+            if tag == SETTINGS:
+                settings = json.loads(values[0])
+            elif tag == MONITOR:
+                monitors.append(Monitor(values[0], values[1:5], values[5:9], values[9], bool(values[10])))
+        # 帧间隔也按倍率缩短（帧率上限为 240）
+        refresh_rate = settings.get('refresh_rate') or 60
+        desktop = self.desktop = SimulatedDesktop(monitors or None, refresh_rate * speed, cursor_mode='hook')
+        if settings.get('desktop'):
+            desktop.desktops = [settings['desktop']]
+            desktop.current_desktop = settings['desktop']
+
+        window_manager = self.window_manager = WindowManager(desktop)
+        window_manager.visible_part = settings.get('visible_part', window_manager.visible_part)
+        window_manager.edge_trigger_size = settings.get('edge_trigger_size', window_manager.edge_trigger_size)
+        window_manager.set_stacking(settings.get('stacking', window_manager.stacking))
+        window_manager.cascade_step = settings.get('cascade_step', window_manager.cascade_step)
+        window_manager.rebuild_topology()
+        strategies = settings.get('strategies', {})
+        window_manager.hide_strategies.set_default(strategies.get('default', window_manager.hide_strategies.default))
+        window_manager.rules.set_rules(settings.get('rules', []))
+
+        animation_controller = self.animation_controller = AnimationController(window_manager)
+        animation = settings.get('animation', {})
+        animation_controller.set_animation_enabled(animation.get('enabled', False))
+        animation_controller.set_animation_speed(animation.get('speed', 1.0) * speed)
+        animation_controller.animation_duration = animation.get('duration', animation_controller.animation_duration)
+        animation_controller.set_animation_quality(
+            animation.get('frame_rate', animation_controller.frame_rate) * speed)
+        animation_controller.set_animation_curve(animation.get('curve', animation_controller.animation_curve))
+
+        input_handler = self.input_handler = InputHandler(window_manager, animation_controller)
+        intent = input_handler.edge_detector.intent
+        for name, value in settings.get('intent', {}).items():
+            if name in INTENT_SETTINGS:
+                setattr(intent, name, value)
+        # 时间参数按倍率缩短，速度阈值按倍率提高，像素参数不变
+        intent.dwell /= speed
+        intent.hide_grace /= speed
+        intent.predict_ahead /= speed
+        intent.predict_speed *= speed
+        intent.STALE_AFTER = EdgeIntent.STALE_AFTER / speed
+
+        hidden = []
+        for at, tag, values in snapshot:
+            if tag == WINDOW:
+                self.create_window(values)
+            elif tag == HIDDEN:
+                hidden.append(values)
+            elif tag == FOREGROUND:
+                desktop.activate(self.windows.get(values[0], 0))
+            elif tag == CURSOR:
+                desktop.cursor = values
+
+        window_manager.metrics.enable(desktop)
+        window_manager.start()
+        input_handler.start()
+        for hwnd, monitor_id, edge, on in hidden:
+            if hwnd not in self.windows:
+                continue
+            # 录制时的槽位；显示器不在重放的拓扑中时按窗口位置重新选择
+            slot = (monitor_id, edge, on or desktop.current_desktop)
+            if slot[:2] not in window_manager.topology.segments_by_slot:
+                slot = None
+            input_handler.call_on_event_thread(
+                functools.partial(input_handler.hide_window, self.windows[hwnd], edge, slot=slot))
+        self.wait_idle()
+
+    def create_window(self, values):
+        hwnd, left, top, right, bottom, title, class_name, process, on = values
+        desktop = self.desktop
+        created = self.windows[hwnd] = desktop.create_window(
+            title, (left, top, right, bottom), foreground=False, class_name=class_name, process=process)
+        if on:
+            if on not in desktop.desktops:
+                desktop.desktops.append(on)
+            desktop.move_window_to_desktop(created, on)
+
+    def apply(self, tag, values):
+        """把一条输入记录交给模拟桌面"""
+        desktop = self.desktop
+        if tag == KEY_DOWN:
+            desktop.press_key(values[0])
+        elif tag == KEY_UP:
+            desktop.release_key(values[0])
+        elif tag == CURSOR:
+            desktop.move_cursor(*values)
+        elif tag == FOREGROUND:
+            desktop.activate(self.windows.get(values[0], 0))
+        elif tag == WINDOW:
+            self.create_window(values)
+        elif tag == GEOMETRY:
+            hwnd = self.windows.get(values[0])
+            if hwnd is not None:
+                desktop.set_window_rect(hwnd, values[1:])
+        elif tag == DESTROY:
+            hwnd = self.windows.get(values[0])
+            if hwnd is not None:
+                desktop.destroy_window(hwnd)
+
+    def wait_idle(self):
+        """等待所有动画、停留/宽限期和排队的动作都结束"""
+        deadline = time.monotonic() + self.IDLE_TIMEOUT
+        scheduler = self.animation_controller.scheduler
+        detector = self.input_handler.edge_detector
+        actions = self.input_handler.actions
+
+        def idle():
+            return not scheduler.animations and not detector.pending() and actions.idle()
+
+        while time.monotonic() < deadline:
+            if idle():
+                time.sleep(0.01)
+                if idle():
+                    return True
+            time.sleep(0.002)
+        return False
+
+    def run(self, move_log=False):
+        """重放整个轨迹，返回报告；move_log 为 True 时附带每次窗口移动（按录制时间，毫秒）"""
+        snapshot, events = self.split()
+        self.setup(snapshot)
+        try:
+            return self.play(events, move_log)
+        finally:
+            self.input_handler.stop()
+            self.animation_controller.stop()
+            self.window_manager.stop()
+
+    def play(self, events, move_log):
+        desktop = self.desktop
+        window_manager = self.window_manager
+        speed = self.speed
+        transitions_before = window_manager.transitions.stats()['transitions']
+        desktop.reset_counters()
+        window_manager.metrics.reset()
+
+        lag = []
+        started = time.perf_counter()
+        started_monotonic = time.monotonic()
+        for at, tag, values in events:
+            due = started + at / speed
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            lag.append(max(0.0, time.perf_counter() - due) * 1000)
+            self.apply(tag, values)
+        idle = self.wait_idle()
+        elapsed = time.perf_counter() - started
+
+        recorded = {hwnd: original for original, hwnd in self.windows.items()}
+        moves = list(desktop.moves)
+        windows = {}
+        for moved_at, hwnd, x, y in moves:
+            entry = windows.setdefault(str(recorded.get(hwnd, hwnd)), {'moves': 0})
+            entry['moves'] += 1
+        for hwnd, original in recorded.items():
+            window = desktop.windows.get(hwnd)
+            if window is not None:
+                windows.setdefault(str(original), {'moves': 0})['rect'] = list(window.rect)
+
+        snapshot = window_manager.state.snapshot
+        transitions = window_manager.transitions.stats()
+        report = {
+            'speed': speed,
+            'events': len(events),
+            'trace_s': round(events[-1][0], 3) if events else 0.0,
+            'replay_s': round(elapsed, 3),
+            'idle': idle,
+            'lag_ms': {'mean': round(sum(lag) / len(lag), 3) if lag else 0.0,
+                       'max': round(max(lag), 3) if lag else 0.0},
+            'moves': len(moves),
+            'windows': windows,
+            'hidden': [{'hwnd': recorded.get(hwnd, hwnd), 'slot': list(location[:3]), 'index': location[-1],
+                        'phase': snapshot.windows[hwnd].phase}
+                       for hwnd, location in snapshot.index.items()],
+            'transitions': {name: count - transitions_before.get(name, 0)
+                            for name, count in transitions['transitions'].items()
+                            if count != transitions_before.get(name, 0)},
+            'dropped': transitions['dropped'],
+            'latency_ms': window_manager.metrics.snapshot()['histograms_ms'],
+            'calls': dict(sorted(desktop.calls.items())),
+        }
+        if move_log:
+            report['move_log'] = [
+                [round((moved_at - started_monotonic) * speed * 1000, 3), recorded.get(hwnd, hwnd), x, y]
+                for moved_at, hwnd, x, y in moves]
+        return report
@@ -0,0 +1,204 @@
+import os
+import socket
+import tempfile
+import threading
+
+# Windows 下命令通道的命名管道
+PIPE_NAME = r'\\.\pipe\WindowController'
+PIPE_BUFFER_SIZE = 65536
+# 拒绝来自其他计算机的连接
+PIPE_REJECT_REMOTE_CLIENTS = 0x00000008
+ERROR_BROKEN_PIPE = 109
+ERROR_PIPE_CONNECTED = 535
+
+
+def default_socket_address():
+    """模拟桌面的命令通道地址：Unix 套接字路径，不支持 AF_UNIX 时为本机 TCP 端口"""
+    if hasattr(socket, 'AF_UNIX'):
+        return os.path.join(tempfile.gettempdir(), f'window_controller_{os.getpid()}.sock')
+    return ('127.0.0.1', 0)
+
+
+class NamedPipeConnection:
+    """命名管道上的一个客户端连接"""
+
+    def __init__(self, pipe):
+        self.pipe = pipe
+
+    def recv(self):
+        """读取数据，客户端断开时返回 b''"""
+        import pywintypes
+        import win32file
+
+        try:
+            _, data = win32file.ReadFile(self.pipe, PIPE_BUFFER_SIZE)
+            return data
+        except pywintypes.error:
+            return b''
+
+    def send(self, data):
+        import win32file
+
+        win32file.WriteFile(self.pipe, data)
+
+    def close(self):
+        import pywintypes
+        import win32file
+        import win32pipe
+
+        try:
+            win32file.FlushFileBuffers(self.pipe)
+            win32pipe.DisconnectNamedPipe(self.pipe)
+        except pywintypes.error:
+            pass
+        win32file.CloseHandle(self.pipe)
+
+
+class NamedPipeListener:
+    """命名管道监听器
+
+    每接受一个客户端就为下一个客户端创建新的管道实例，连接在各自的线程上处理。
+    等待连接时线程阻塞在 ConnectNamedPipe 上，不产生任何唤醒。
+    """
+
+    def __init__(self, on_connection, name=PIPE_NAME):
+        self.on_connection = on_connection
+        self.address = name
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        """启动监听线程"""
+        if self.running:
+            return True
+        self.running = True
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+        return True
+
+    def run(self):
+        import pywintypes
+        import win32pipe
+
+        while self.running:
+            try:
+                pipe = win32pipe.CreateNamedPipe(
+                    self.address,
+                    win32pipe.PIPE_ACCESS_DUPLEX,
+                    win32pipe.PIPE_TYPE_BYTE | win32pipe.PIPE_READMODE_BYTE | win32pipe.PIPE_WAIT
+                    | PIPE_REJECT_REMOTE_CLIENTS,
+                    win32pipe.PIPE_UNLIMITED_INSTANCES,
+                    PIPE_BUFFER_SIZE, PIPE_BUFFER_SIZE, 0, None)
+            except pywintypes.error as e:
+                print(f"创建命令管道失败: {e}")
+                self.running = False
+                return
+            try:
+                win32pipe.ConnectNamedPipe(pipe, None)
+            except pywintypes.error as e:
+                if e.winerror != ERROR_PIPE_CONNECTED:
+                    NamedPipeConnection(pipe).close()
+                    continue
+            connection = NamedPipeConnection(pipe)
+            if not self.running:
+                connection.close()
+                return
+            threading.Thread(target=self.on_connection, args=(connection,), daemon=True).start()
+
+    def stop(self):
+        """停止监听：自己连接一次管道，唤醒阻塞在 ConnectNamedPipe 上的线程"""
+        if not self.running:
+            return
+        self.running = False
+        import pywintypes
+        import win32file
+
+        try:
+            handle = win32file.CreateFile(
+                self.address, win32file.GENERIC_READ | win32file.GENERIC_WRITE,
+                0, None, win32file.OPEN_EXISTING, 0, None)
+            win32file.CloseHandle(handle)
+        except pywintypes.error:
+            pass
+
+
+class SocketConnection:
+    """套接字上的一个客户端连接"""
+
+    def __init__(self, sock):
+        self.sock = sock
+
+    def recv(self):
+        """读取数据，客户端断开时返回 b''"""
+        try:
+            return self.sock.recv(PIPE_BUFFER_SIZE)
+        except OSError:
+            return b''
+
+    def send(self, data):
+        self.sock.sendall(data)
+
+    def close(self):
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+
+
+class SocketListener:
+    """Unix 套接字（或本机 TCP）监听器，供模拟桌面使用"""
+
+    def __init__(self, on_connection, address):
+        self.on_connection = on_connection
+        self.address = address
+        self.sock = None
+        self.thread = None
+
+    def start(self):
+        """开始监听，返回是否成功；TCP 端口为 0 时 address 更新为实际端口"""
+        if self.sock is not None:
+            return True
+        unix = isinstance(self.address, str)
+        try:
+            sock = socket.socket(socket.AF_UNIX if unix else socket.AF_INET, socket.SOCK_STREAM)
+            if unix and os.path.exists(self.address):
+                os.unlink(self.address)
+            sock.bind(self.address)
+            sock.listen()
+        except OSError as e:
+            print(f"启动命令通道失败: {e}")
+            return False
+        if not unix:
+            self.address = sock.getsockname()[:2]
+        self.sock = sock
+        self.thread = threading.Thread(target=self.run, args=(sock,), daemon=True)
+        self.thread.start()
+        return True
+
+    def run(self, sock):
+        while True:
+            try:
+                client, _ = sock.accept()
+            except OSError:
+                return
+            threading.Thread(target=self.on_connection, args=(SocketConnection(client),),
+                             daemon=True).start()
+
+    def stop(self):
+        """停止监听并删除套接字文件"""
+        sock, self.sock = self.sock, None
+        if sock is None:
+            return
+        try:
+            # shutdown 才能唤醒阻塞在 accept 上的线程
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        sock.close()
+        if self.thread is not None:
+            self.thread.join(1.0)
+        if isinstance(self.address, str):
+            try:
+                os.unlink(self.address)
+            except OSError:
+                pass
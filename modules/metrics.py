@@ -0,0 +1,300 @@
+import bisect
+import json
+import threading
+import time
+
+# 被统计调用次数和耗时的后端方法
+API_METHODS = (
+    'begin', 'defer', 'end', 'move',
+    'get_foreground_window', 'is_window', 'get_window_text', 'get_window_rect', 'show_window',
+    'get_window_thread_id', 'get_current_thread_id', 'attach_thread_input', 'set_window_topmost',
+    'set_foreground_window', 'bring_window_to_top',
+    'get_cursor_pos', 'enumerate_monitors', 'get_refresh_rate',
+)
+
+# 直方图桶上限（毫秒），最后一个桶收集所有更大的值
+BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024)
+
+
+class Histogram:
+    """固定分桶的延迟直方图（毫秒）"""
+
+    __slots__ = ('counts', 'count', 'total', 'max')
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, value):
+        self.counts[bisect.bisect_left(BUCKETS, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, p):
+        """按桶估计分位数（返回所在桶的上限）"""
+        if not self.count:
+            return None
+        rank = p / 100 * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return BUCKETS[index] if index < len(BUCKETS) else self.max
+        return self.max
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'mean': round(self.total / self.count, 3) if self.count else None,
+            'p50': self.percentile(50),
+            'p95': self.percentile(95),
+            'p99': self.percentile(99),
+            'max': round(self.max, 3),
+            'buckets': {('<=%g' % bound if index < len(BUCKETS) else '>%g' % BUCKETS[-1]): count
+                        for index, (bound, count) in enumerate(zip(BUCKETS + (None,), self.counts))
+                        if count},
+        }
+
+
+class SlowOperation:
+    """一次较慢的操作"""
+
+    __slots__ = ('name', 'duration', 'hwnd', 'window_class', 'process', 'at')
+
+    def __init__(self, name, duration, hwnd, window_class, process, at):
+        self.name = name
+        self.duration = duration
+        self.hwnd = hwnd
+        self.window_class = window_class
+        self.process = process
+        self.at = at
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'duration_ms': round(self.duration, 3),
+            'hwnd': self.hwnd,
+            'window_class': self.window_class,
+            'process': self.process,
+            'age_s': round(time.monotonic() - self.at, 1),
+        }
+
+
+class Metrics:
+    """热路径性能统计
+
+    默认关闭，关闭时各埋点只做一次 enabled 判断；开启时在后端实例上安装计时包装，
+    关闭时移除包装，调用重新直达后端方法。
+    记录：各阶段延迟直方图、每个后端 API 的调用次数和累计耗时、最近 SLOW_WINDOW 秒内最慢的 SLOWEST 次操作。
+    """
+
+    SLOWEST = 20
+    SLOW_WINDOW = 300.0
+
+    def __init__(self):
+        self.enabled = False
+        self.lock = threading.Lock()
+        self.backend = None
+        self.reset()
+
+    def reset(self):
+        """清空统计"""
+        with self.lock:
+            self.histograms = {}
+            self.api_calls = {}
+            self.api_time = {}
+            self.slowest = []
+            self.started = time.monotonic()
+
+    def enable(self, backend):
+        """开启统计，并为后端方法安装计时包装"""
+        if self.enabled:
+            return
+        self.backend = backend
+        for name in API_METHODS:
+            method = getattr(backend, name, None)
+            if method is not None:
+                setattr(backend, name, self.wrap_api(name, method))
+        self.enabled = True
+
+    def disable(self):
+        """关闭统计，移除后端方法上的包装"""
+        if not self.enabled:
+            return
+        self.enabled = False
+        for name in API_METHODS:
+            self.backend.__dict__.pop(name, None)
+        self.backend = None
+
+    def wrap_api(self, name, method):
+        perf_counter = time.perf_counter
+
+        def timed(*args):
+            started = perf_counter()
+            try:
+                return method(*args)
+            finally:
+                elapsed = (perf_counter() - started) * 1000
+                with self.lock:
+                    self.api_calls[name] = self.api_calls.get(name, 0) + 1
+                    self.api_time[name] = self.api_time.get(name, 0.0) + elapsed
+
+        timed.__name__ = name
+        return timed
+
+    def observe(self, name, started, hwnd=None):
+        """记录从 started（time.perf_counter()）到现在的耗时
+
+        hwnd 不为空且耗时进入最慢列表时，查询窗口类名和进程名一起记录。
+        """
+        elapsed = (time.perf_counter() - started) * 1000
+        self.add(name, elapsed)
+        if hwnd is not None:
+            self.note_slow(name, elapsed, hwnd)
+        return elapsed
+
+    def add(self, name, value):
+        """向直方图加入一个值（毫秒）"""
+        with self.lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.add(value)
+
+    def note_slow(self, name, duration, hwnd):
+        """候选最慢操作"""
+        now = time.monotonic()
+        with self.lock:
+            self.prune_slowest(now)
+            if len(self.slowest) >= self.SLOWEST and duration <= self.slowest[-1].duration:
+                return
+        # 只有进入列表的操作才查询窗口信息，查询在锁外进行
+        window_class, process = self.describe_window(hwnd)
+        with self.lock:
+            self.slowest.append(SlowOperation(name, duration, hwnd, window_class, process, now))
+            self.slowest.sort(key=lambda op: op.duration, reverse=True)
+            del self.slowest[self.SLOWEST:]
+
+    def prune_slowest(self, now):
+        """丢弃超出时间窗口的记录（需持有锁）"""
+        if any(now - op.at > self.SLOW_WINDOW for op in self.slowest):
+            self.slowest = [op for op in self.slowest if now - op.at <= self.SLOW_WINDOW]
+
+    def describe_window(self, hwnd):
+        backend = self.backend
+        if backend is None:
+            return '', ''
+        try:
+            return backend.get_class_name(hwnd), backend.get_process_name(hwnd)
+        except Exception:
+            return '', ''
+
+    def snapshot(self, extra=None):
+        """返回可序列化为 JSON 的统计快照"""
+        now = time.monotonic()
+        with self.lock:
+            self.prune_slowest(now)
+            data = {
+                'enabled': self.enabled,
+                'uptime_s': round(now - self.started, 1),
+                'histograms_ms': {name: h.to_dict() for name, h in sorted(self.histograms.items())},
+                'api': {name: {'calls': count, 'total_ms': round(self.api_time.get(name, 0.0), 3)}
+                        for name, count in sorted(self.api_calls.items())},
+                'slowest': [op.to_dict() for op in self.slowest],
+            }
+        if extra:
+            data.update(extra)
+        return data
+
+
+class MetricsServer:
+    """只监听本机的 JSON 统计接口，GET 任意路径返回 snapshot() 的结果"""
+
+    def __init__(self, snapshot, host='127.0.0.1', port=47800):
+        self.snapshot = snapshot
+        self.host = host
+        self.port = port
+        self.server = None
+
+    def start(self):
+        """启动服务线程，返回是否成功"""
+        if self.server is not None:
+            return True
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        snapshot = self.snapshot
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = json.dumps(snapshot(), ensure_ascii=False, indent=2).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        try:
+            self.server = ThreadingHTTPServer((self.host, self.port), Handler)
+        except OSError as e:
+            print(f"启动统计接口失败: {e}")
+            return False
+        self.port = self.server.server_address[1]
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return True
+
+    def stop(self):
+        """停止服务"""
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+
+class MetricsService:
+    """统计开关、快照和本机 JSON 接口
+
+    快照中除 Metrics 的数据外，还包括唤醒次数、几何缓存命中率和动画帧统计。
+    """
+
+    def __init__(self, window_manager, animation_controller, port=47800):
+        self.window_manager = window_manager
+        self.animation_controller = animation_controller
+        self.metrics = window_manager.metrics
+        self.server = MetricsServer(self.snapshot, port=port)
+
+    @property
+    def enabled(self):
+        return self.metrics.enabled
+
+    def set_enabled(self, enabled):
+        """开启或关闭统计和 JSON 接口"""
+        if enabled:
+            self.metrics.reset()
+            self.metrics.enable(self.window_manager.backend)
+            self.server.start()
+        else:
+            self.server.stop()
+            self.metrics.disable()
+
+    def snapshot(self):
+        scheduler = self.animation_controller.scheduler
+        return self.metrics.snapshot({
+            'endpoint': f'http://{self.server.host}:{self.server.port}/' if self.server.server else None,
+            'wakeups_per_second': {source: round(rate, 3)
+                                   for source, rate in self.window_manager.wakeups.rates().items()},
+            'geometry_cache': self.window_manager.geometry_cache.stats(),
+            'foreground_activation': self.window_manager.activator.report(),
+            'reconciler': self.animation_controller.reconciler.stats(),
+            'window_transitions': self.window_manager.transitions.stats(),
+            'hide_strategies': self.window_manager.hide_strategies.stats(),
+            'window_rules': self.window_manager.rules.stats(),
+            'virtual_desktops': self.window_manager.desktops.stats(),
+            'animation': {'frames': scheduler.frames, 'dropped_frames': scheduler.dropped_frames},
+        })
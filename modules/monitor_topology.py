@@ -0,0 +1,387 @@
+EDGES = ('left', 'right', 'top', 'bottom')
+
+# 同一边缘多个隐藏窗口的叠放方式：沿边平铺 / 层叠错开
+STACKING_TILED = 'tiled'
+STACKING_CASCADE = 'cascade'
+
+
+class Monitor:
+    """单个显示器
+
+    bounds 与 work_area 均为 (left, top, right, bottom)，right/bottom 不包含在内。
+    """
+
+    __slots__ = ('id', 'bounds', 'work_area', 'dpi', 'primary')
+
+    def __init__(self, monitor_id, bounds, work_area=None, dpi=96, primary=False):
+        self.id = monitor_id
+        self.bounds = tuple(bounds)
+        self.work_area = tuple(work_area) if work_area is not None else self.bounds
+        self.dpi = dpi
+        self.primary = primary
+
+    @property
+    def scale(self):
+        """相对 96 DPI 的缩放比例"""
+        return self.dpi / 96.0
+
+    def contains(self, x, y):
+        """坐标是否在显示器内"""
+        left, top, right, bottom = self.bounds
+        return left <= x < right and top <= y < bottom
+
+    def __repr__(self):
+        return f"Monitor({self.id!r}, {self.bounds})"
+
+
+class EdgeSegment:
+    """显示器边缘上暴露在外（不与其他显示器相邻）的一段
+
+    position 为边缘所在的坐标（左右边为 x，上下边为 y），start/end 为沿边方向的范围。
+    """
+
+    __slots__ = ('monitor', 'edge', 'position', 'start', 'end', 'slot')
+
+    def __init__(self, monitor, edge, position, start, end):
+        self.monitor = monitor
+        self.edge = edge
+        self.position = position
+        self.start = start
+        self.end = end
+        self.slot = (monitor.id, edge)
+
+    @property
+    def vertical(self):
+        """是否为竖直边（左/右）"""
+        return self.edge in ('left', 'right')
+
+    def scaled(self, size):
+        """按所在显示器的 DPI 缩放的像素数（设置值按 96 DPI 给出），至少为 1"""
+        return max(1, int(round(size * self.monitor.scale)))
+
+    def band(self, trigger_size):
+        """边缘触发带 (left, top, right, bottom)"""
+        if self.edge == 'left':
+            return (self.position, self.start, self.position + trigger_size, self.end)
+        if self.edge == 'right':
+            return (self.position - trigger_size, self.start, self.position, self.end)
+        if self.edge == 'top':
+            return (self.start, self.position, self.end, self.position + trigger_size)
+        return (self.start, self.position - trigger_size, self.end, self.position)
+
+    def __repr__(self):
+        return f"EdgeSegment({self.slot!r}, {self.position}, {self.start}-{self.end})"
+
+
+def subtract_intervals(start, end, covered):
+    """从 [start, end) 中减去一组区间，返回剩余区间列表"""
+    pieces = [(start, end)]
+    for cover_start, cover_end in covered:
+        remaining = []
+        for piece_start, piece_end in pieces:
+            if cover_end <= piece_start or cover_start >= piece_end:
+                remaining.append((piece_start, piece_end))
+                continue
+            if piece_start < cover_start:
+                remaining.append((piece_start, cover_start))
+            if cover_end < piece_end:
+                remaining.append((cover_end, piece_end))
+        pieces = remaining
+    return pieces
+
+
+class MonitorTopology:
+    """多显示器拓扑
+
+    由显示器列表构建，预先计算所有暴露在外的边缘段，并把它们的触发带登记到网格索引中，
+    光标坐标到隐藏槽位的映射只需一次字典查找。只在显示器配置变化时重建。
+    触发带宽度和隐藏后露出的边条宽度按 96 DPI 给出，按边缘所在显示器的 DPI 缩放。
+    拓扑中的槽位为 (显示器, 方向)；隐藏窗口的槽位还带有虚拟桌面，传入时只取前两项。
+    """
+
+    CELL_SIZE = 64
+    # 距暴露边缘多近算"靠近边缘"（像素），用于决定光标采样频率
+    NEAR_DISTANCE = 160
+
+    def __init__(self, monitors, trigger_size=5):
+        self.monitors = list(monitors)
+        self.monitors_by_id = {monitor.id: monitor for monitor in self.monitors}
+        self.trigger_size = trigger_size
+        self.primary = next((m for m in self.monitors if m.primary), self.monitors[0])
+        self.segments = self.build_segments()
+        self.segments_by_slot = {}
+        for segment in self.segments:
+            self.segments_by_slot.setdefault(segment.slot, []).append(segment)
+        self.band_index = self.build_band_index()
+        self.near_cells = frozenset(
+            cell for segment in self.segments for cell in self.cells(*segment.band(self.NEAR_DISTANCE)))
+        self.monitor_index = self.build_monitor_index()
+
+    def build_segments(self):
+        """计算每个显示器四条边中暴露在外的部分"""
+        segments = []
+        for monitor in self.monitors:
+            left, top, right, bottom = monitor.bounds
+            edges = (
+                ('left', left, top, bottom),
+                ('right', right, top, bottom),
+                ('top', top, left, right),
+                ('bottom', bottom, left, right),
+            )
+            for edge, position, start, end in edges:
+                covered = []
+                for other in self.monitors:
+                    if other is monitor:
+                        continue
+                    o_left, o_top, o_right, o_bottom = other.bounds
+                    if edge == 'left' and o_right == position:
+                        covered.append((o_top, o_bottom))
+                    elif edge == 'right' and o_left == position:
+                        covered.append((o_top, o_bottom))
+                    elif edge == 'top' and o_bottom == position:
+                        covered.append((o_left, o_right))
+                    elif edge == 'bottom' and o_top == position:
+                        covered.append((o_left, o_right))
+                for piece_start, piece_end in subtract_intervals(start, end, covered):
+                    segments.append(EdgeSegment(monitor, edge, position, piece_start, piece_end))
+        return segments
+
+    def cells(self, left, top, right, bottom):
+        """返回与矩形相交的网格单元"""
+        size = self.CELL_SIZE
+        for cx in range(left // size, (right - 1) // size + 1):
+            for cy in range(top // size, (bottom - 1) // size + 1):
+                yield cx, cy
+
+    def build_band_index(self):
+        """把每段边缘的触发带登记到所覆盖的网格单元"""
+        index = {}
+        for segment in self.segments:
+            band = segment.band(segment.scaled(self.trigger_size))
+            for cell in self.cells(*band):
+                index.setdefault(cell, []).append((band, segment))
+        return {cell: tuple(entries) for cell, entries in index.items()}
+
+    def build_monitor_index(self):
+        """把每个显示器登记到所覆盖的网格单元"""
+        index = {}
+        for monitor in self.monitors:
+            for cell in self.cells(*monitor.bounds):
+                index.setdefault(cell, []).append(monitor)
+        return index
+
+    def hit_test(self, x, y):
+        """返回坐标所在触发带对应的槽位集合（角落处可能有两个）"""
+        entries = self.band_index.get((x // self.CELL_SIZE, y // self.CELL_SIZE))
+        if not entries:
+            return frozenset()
+        return frozenset(segment.slot for (left, top, right, bottom), segment in entries
+                         if left <= x < right and top <= y < bottom)
+
+    def in_band(self, slot, x, y, margin=0):
+        """坐标是否在槽位的触发带（向内加宽 margin 像素）内"""
+        for segment in self.segments_by_slot.get(slot, ()):
+            left, top, right, bottom = segment.band(segment.scaled(self.trigger_size + margin))
+            if left <= x < right and top <= y < bottom:
+                return True
+        return False
+
+    def predict_hits(self, x, y, vx, vy, horizon):
+        """按光标速度 (vx, vy)（像素/秒）预测 horizon 秒内将进入的触发带
+
+        返回 [(槽位, 到达点 x, 到达点 y)]，只考虑光标所在显示器的边缘。
+        """
+        hits = []
+        for segment in self.segments:
+            if not segment.monitor.contains(x, y):
+                continue
+            left, top, right, bottom = segment.band(segment.scaled(self.trigger_size))
+            edge = segment.edge
+            if edge == 'left':
+                distance, speed = x - (right - 1), -vx
+            elif edge == 'right':
+                distance, speed = left - x, vx
+            elif edge == 'top':
+                distance, speed = y - (bottom - 1), -vy
+            else:
+                distance, speed = top - y, vy
+            if distance <= 0 or speed <= 0 or distance > speed * horizon:
+                continue
+            seconds = distance / speed
+            hit_x = min(max(int(round(x + vx * seconds)), left), right - 1)
+            hit_y = min(max(int(round(y + vy * seconds)), top), bottom - 1)
+            along = hit_y if segment.vertical else hit_x
+            if segment.start <= along < segment.end:
+                hits.append((segment.slot, hit_x, hit_y))
+        return hits
+
+    def is_near_edge(self, x, y):
+        """坐标是否靠近某段暴露的边缘（按网格单元判断）"""
+        return (x // self.CELL_SIZE, y // self.CELL_SIZE) in self.near_cells
+
+    def monitor_at(self, x, y):
+        """返回坐标所在的显示器，不在任何显示器内时返回最近的显示器"""
+        for monitor in self.monitor_index.get((x // self.CELL_SIZE, y // self.CELL_SIZE), ()):
+            if monitor.contains(x, y):
+                return monitor
+        return min(self.monitors, key=lambda m: self.distance_to(m.bounds, x, y))
+
+    @staticmethod
+    def distance_to(bounds, x, y):
+        """坐标到矩形的距离平方"""
+        left, top, right, bottom = bounds
+        dx = max(left - x, 0, x - (right - 1))
+        dy = max(top - y, 0, y - (bottom - 1))
+        return dx * dx + dy * dy
+
+    def monitor_for_rect(self, rect):
+        """返回与窗口重叠面积最大的显示器"""
+        x, y = rect['x'], rect['y']
+        right, bottom = x + rect['width'], y + rect['height']
+
+        def overlap(monitor):
+            m_left, m_top, m_right, m_bottom = monitor.bounds
+            width = min(right, m_right) - max(x, m_left)
+            height = min(bottom, m_bottom) - max(y, m_top)
+            return max(0, width) * max(0, height)
+
+        best = max(self.monitors, key=overlap)
+        if overlap(best) > 0:
+            return best
+        return self.monitor_at(x + rect['width'] // 2, y + rect['height'] // 2)
+
+    def resolve_segment(self, direction, rect):
+        """找到窗口向指定方向隐藏时应使用的暴露边缘段
+
+        优先选择与窗口在沿边方向上重叠、且位于该方向一侧最近的边缘段；
+        窗口所在显示器的这条边与其他显示器相邻时，会越过相邻显示器找到外侧边缘。
+        """
+        vertical = direction in ('left', 'right')
+        if vertical:
+            span_start, span_end = rect['y'], rect['y'] + rect['height']
+            center = rect['x'] + rect['width'] // 2
+        else:
+            span_start, span_end = rect['x'], rect['x'] + rect['width']
+            center = rect['y'] + rect['height'] // 2
+        toward_low = direction in ('left', 'top')
+
+        def overlap(segment):
+            return min(span_end, segment.end) - max(span_start, segment.start)
+
+        candidates = [s for s in self.segments if s.edge == direction]
+        if not candidates:
+            return None
+        overlapping = [s for s in candidates if overlap(s) > 0]
+        ahead = [s for s in overlapping
+                 if (s.position <= center if toward_low else s.position >= center)]
+        if ahead:
+            # 同方向上最近的外侧边缘
+            return max(ahead, key=lambda s: s.position) if toward_low else min(ahead, key=lambda s: s.position)
+        if overlapping:
+            return max(overlapping, key=overlap)
+        span_center = (span_start + span_end) // 2
+        return min(candidates, key=lambda s: max(s.start - span_center, 0, span_center - s.end))
+
+    def segment_for_slot(self, slot, rect):
+        """返回槽位中与窗口沿边范围重叠最多的边缘段"""
+        segments = self.segments_by_slot.get(slot[:2])
+        if not segments:
+            return None
+        if len(segments) == 1:
+            return segments[0]
+        if segments[0].vertical:
+            span_start, span_end = rect['y'], rect['y'] + rect['height']
+        else:
+            span_start, span_end = rect['x'], rect['x'] + rect['width']
+        return max(segments, key=lambda s: min(span_end, s.end) - max(span_start, s.start))
+
+    def stack_segment(self, slot):
+        """槽位中用于叠放多个窗口的边缘段（最长的一段）"""
+        segments = self.segments_by_slot.get(slot[:2])
+        if not segments:
+            return None
+        return max(segments, key=lambda s: s.end - s.start)
+
+    def stack_offset(self, segment, length, index, count, stacking, cascade_step):
+        """叠放时第 index 个窗口沿边方向的起始坐标"""
+        if stacking == STACKING_CASCADE:
+            start = segment.start + index * cascade_step
+        else:
+            cell = (segment.end - segment.start) / count
+            start = int(segment.start + index * cell + (cell - length) / 2)
+        return self.clamp_span(start, length, segment)
+
+    def stack_index_at(self, slot, x, y, count, stacking=STACKING_TILED, cascade_step=40):
+        """光标位于槽位边缘时，返回其下方叠放窗口的序号"""
+        if count <= 1:
+            return 0
+        segment = self.stack_segment(slot)
+        if segment is None:
+            return count - 1
+        along = (y if segment.vertical else x) - segment.start
+        if stacking == STACKING_CASCADE:
+            index = along // cascade_step
+        else:
+            index = along * count // (segment.end - segment.start)
+        return int(max(0, min(count - 1, index)))
+
+    def calculate_hidden_position(self, slot, rect, visible_part, index=0, count=1,
+                                  stacking=STACKING_TILED, cascade_step=40):
+        """计算窗口隐藏到槽位边缘时的位置，只留出 visible_part 宽（按显示器 DPI 缩放）的边条
+
+        槽位中只有一个窗口时保持窗口原有的沿边位置；多个窗口时按叠放方式分配位置。
+        """
+        if count > 1:
+            segment = self.stack_segment(slot)
+        else:
+            segment = self.segment_for_slot(slot, rect)
+        if segment is None:
+            return rect['x'], rect['y']
+        visible_part = segment.scaled(visible_part)
+        if segment.vertical:
+            if count > 1:
+                y = self.stack_offset(segment, rect['height'], index, count, stacking, cascade_step)
+            else:
+                y = self.clamp_span(rect['y'], rect['height'], segment)
+            if segment.edge == 'left':
+                return segment.position - rect['width'] + visible_part, y
+            return segment.position - visible_part, y
+        if count > 1:
+            x = self.stack_offset(segment, rect['width'], index, count, stacking, cascade_step)
+        else:
+            x = self.clamp_span(rect['x'], rect['width'], segment)
+        if segment.edge == 'top':
+            return x, segment.position - rect['height'] + visible_part
+        return x, segment.position - visible_part
+
+    @staticmethod
+    def clamp_span(start, length, segment):
+        """把窗口沿边方向的位置限制在边缘段内，避免边条落到显示器之间的空隙里"""
+        if length >= segment.end - segment.start:
+            return segment.start
+        return max(segment.start, min(start, segment.end - length))
+
+    def clip_to_monitor(self, slot, rect):
+        """矩形 (left, top, right, bottom) 在槽位所在显示器内的部分，没有重叠时返回 None"""
+        monitor = self.monitors_by_id.get(slot[0], self.primary)
+        left, top, right, bottom = monitor.bounds
+        clipped = (max(left, rect[0]), max(top, rect[1]), min(right, rect[2]), min(bottom, rect[3]))
+        if clipped[0] >= clipped[2] or clipped[1] >= clipped[3]:
+            return None
+        return clipped
+
+    def get_temp_show_position(self, slot, rect):
+        """计算槽位中的窗口临时显示时的位置（贴着所在显示器工作区的边缘）"""
+        monitor_id, edge = slot[:2]
+        monitor = self.monitors_by_id.get(monitor_id, self.primary)
+        left, top, right, bottom = monitor.work_area
+        if edge in ('left', 'right'):
+            y = max(top, min(rect['y'], bottom - rect['height']))
+            return (left if edge == 'left' else right - rect['width']), y
+        x = max(left, min(rect['x'], right - rect['width']))
+        return x, (top if edge == 'top' else bottom - rect['height'])
+
+    def center_position(self, monitor, rect):
+        """窗口在显示器工作区中居中时的位置"""
+        left, top, right, bottom = monitor.work_area
+        return left + (right - left - rect['width']) // 2, top + (bottom - top - rect['height']) // 2
@@ -0,0 +1,635 @@
+import queue
+import threading
+import time
+from collections import Counter
+from .backend import DesktopBackend
+from .edge_detector import HybridCursorSource, PollingCursorSource, SyntheticCursorSource
+from .monitor_topology import Monitor
+from .hotkey_engine import MODIFIER_KEYS
+from .window_events import (EVENT_OBJECT_DESTROY, EVENT_OBJECT_LOCATIONCHANGE, EVENT_OBJECT_NAMECHANGE,
+                            EVENT_OBJECT_CLOAKED, EVENT_OBJECT_UNCLOAKED, EVENT_DISPLAY_CHANGE)
+
+
+# 最小化窗口的 GetWindowRect 结果（图标位置）
+ICONIC_RECT = (-32000, -32000, -31840, -31972)
+
+
+def rect_area(rect):
+    left, top, right, bottom = rect
+    return max(0, right - left) * max(0, bottom - top)
+
+
+def intersect(a, b):
+    return (max(a[0], b[0]), max(a[1], b[1]), min(a[2], b[2]), min(a[3], b[3]))
+
+
+class SimWindow:
+    """模拟桌面上的一个顶层窗口
+
+    rect 为还原状态下的位置；最小化时 GetWindowRect 返回图标位置。desktop 为所在的虚拟桌面。
+    """
+
+    __slots__ = ('hwnd', 'title', 'rect', 'thread_id', 'visible', 'class_name', 'process',
+                 'cloaked', 'minimized', 'desktop')
+
+    def __init__(self, hwnd, title, rect, thread_id, class_name='SimWindow', process='sim.exe', desktop=None):
+        self.hwnd = hwnd
+        self.title = title
+        self.rect = rect
+        self.thread_id = thread_id
+        self.visible = True
+        self.class_name = class_name
+        self.process = process
+        self.cloaked = False
+        self.minimized = False
+        self.desktop = desktop
+
+    @property
+    def composited(self):
+        """是否参与桌面合成（所属程序也据此判断是否需要继续渲染）"""
+        return self.visible and not self.cloaked and not self.minimized
+
+
+class SimKey:
+    """模拟按键，与 pynput 的按键对象一样通过 name 属性识别"""
+
+    __slots__ = ('name',)
+
+    def __init__(self, name):
+        self.name = name
+
+    def __repr__(self):
+        return f"SimKey({self.name!r})"
+
+
+class SimulatedEventWatcher:
+    """模拟窗口事件监听器，事件由 SimulatedDesktop 分发（见其 event_delay）
+
+    hooks 为 False 时模拟钩子安装失败：start 返回 False，只送达显示器变化。
+    """
+
+    def __init__(self, hooks=True):
+        self.listeners = []
+        self.hooks = hooks
+        self.started = False
+        self.active = False
+        self.paused = False
+
+    def add_listener(self, callback):
+        self.listeners.append(callback)
+
+    def start(self):
+        self.started = True
+        self.active = self.hooks
+        return self.active
+
+    def stop(self):
+        self.started = False
+        self.active = False
+
+    def pause(self):
+        self.paused = True
+
+    def resume(self):
+        self.paused = False
+        return self.active
+
+    def emit(self, event, hwnd):
+        if event == EVENT_DISPLAY_CHANGE:
+            if not self.started:
+                return
+        elif not self.active or self.paused:
+            return
+        for callback in self.listeners:
+            try:
+                callback(event, hwnd)
+            except Exception as e:
+                print(f"Error in WinEvent listener: {e}")
+
+
+class SimulatedHybridCursorSource(HybridCursorSource):
+    """HybridCursorSource 的模拟版本，move_cursor 代替鼠标钩子回调"""
+
+    def install_hook(self):
+        pass
+
+    def remove_hook(self):
+        pass
+
+    def move(self, x, y):
+        self.on_move(x, y)
+
+
+class SimulatedVirtualDesktops:
+    """模拟虚拟桌面提供者，桌面由 SimulatedDesktop.add_desktop/switch_desktop/move_window_to_desktop 控制"""
+
+    def __init__(self, desktop):
+        self.desktop = desktop
+
+    def current_desktop(self):
+        self.desktop.call('GetCurrentVirtualDesktop')
+        return self.desktop.current_desktop
+
+    def window_desktop(self, hwnd):
+        self.desktop.call('GetWindowDesktopId')
+        window = self.desktop.windows.get(hwnd)
+        return window.desktop if window is not None else None
+
+
+class SimulatedKeyboardListener:
+    """模拟键盘监听器，按键由 SimulatedDesktop.press_key/release_key 注入"""
+
+    def __init__(self, on_press, on_release):
+        self.on_press = on_press
+        self.on_release = on_release
+        self.running = False
+
+    def start(self):
+        self.running = True
+
+    def stop(self):
+        self.running = False
+
+
+class SimulatedDesktop(DesktopBackend):
+    """内存中的模拟桌面后端
+
+    维护窗口、光标、显示器和前台窗口，记录每个 API 的调用次数和每次窗口移动的时间，
+    latency 可以为每个 API 配置固定耗时（秒），键 '*' 作用于所有未单独配置的 API，用于模拟慢速的系统调用。
+    用于在没有 Windows 桌面的环境中驱动 WindowManager、AnimationController、InputHandler。
+    cursor_mode 为 'hybrid' 时与 Win32Backend 一样由 move_cursor 代替鼠标钩子、靠近边缘时轮询，
+    'poll' 时始终轮询光标位置，'hook' 时每次 move_cursor 直接推送给光标事件源。
+    event_delay 为 None 时窗口事件在引起它的调用中同步分发；为秒数时与系统的进程外 WinEvent 钩子一样，
+    在单独的线程上延迟这么久再按顺序分发，用于检验依赖通知的缓存在通知送达之前是否正确。
+    win_events 为 False 时模拟 WinEvent 钩子安装失败，只有显示器变化广播照常送达。
+
+    合成开销的近似模型（用于比较隐藏方式）：
+    - 参与合成的窗口，程序持续渲染整个窗口表面（rendering_pixels），屏幕内的部分由 DWM 合成（composited_pixels）
+    - 移动时新进入屏幕的部分、从最小化或隐藏中恢复时屏幕内的全部，都要由程序重绘（repainted）
+    - DWM 隐藏（cloak）的窗口保留表面，取消隐藏不需要重绘
+    """
+
+    # 调用方（本程序）所在线程的 ID
+    CURRENT_THREAD_ID = 1
+
+    def __init__(self, monitors=None, refresh_rate=60, latency=None, cursor_mode='hybrid', event_delay=None,
+                 win_events=True):
+        self.monitors = monitors or [
+            Monitor('SIM1', (0, 0, 1920, 1080), (0, 0, 1920, 1040), primary=True)]
+        self.refresh_rate = refresh_rate
+        self.cursor_mode = cursor_mode
+        self.event_delay = event_delay
+        self.win_events = win_events
+        self.events = None
+        if event_delay is not None:
+            self.events = queue.Queue()
+            threading.Thread(target=self.run_events, daemon=True).start()
+        self.latency = dict(latency or {})
+        self.calls = Counter()
+        self.windows = {}
+        self.foreground = 0
+        self.cursor = (960, 540)
+        self.next_hwnd = 0x1000
+        self.lock = threading.Lock()
+        # 窗口移动记录 (时间, hwnd, x, y)，moved 在每次移动后通知等待者
+        self.moves = []
+        self.moved = threading.Condition(self.lock)
+        self.watchers = []
+        self.cursor_sources = []
+        self.keyboard_listeners = []
+        # 实际按下的按键（与是否送达监听器无关）
+        self.pressed_keys = set()
+        # 前台锁：{进程名: 'attach' | 'topmost'}，模拟 SetForegroundWindow 被系统拒绝的进程，
+        # 'attach' 需要先关联前台线程的输入状态，'topmost' 还需要窗口临时置顶
+        self.foreground_lock = {}
+        # 已关联输入状态的 (线程, 目标线程) 和临时置顶的窗口
+        self.attached_threads = set()
+        self.topmost = set()
+        # 不配合的窗口：{hwnd: (x, y)}，被移走后所属程序立即把它移回该位置
+        self.pinned = {}
+        # 每个窗口被重绘的像素数
+        self.repainted = Counter()
+        # 边缘标签窗口 {句柄: [矩形, 是否可见]}
+        self.tabs = {}
+        self.next_tab = 1
+        # 虚拟桌面
+        self.desktops = ['desktop-1']
+        self.current_desktop = self.desktops[0]
+
+    def call(self, name):
+        """记录一次 API 调用并模拟其耗时"""
+        self.calls[name] += 1
+        delay = self.latency.get(name, self.latency.get('*'))
+        if delay:
+            time.sleep(delay)
+
+    def reset_counters(self):
+        """清空调用计数、移动记录和重绘计数"""
+        with self.lock:
+            self.calls.clear()
+            self.moves = []
+            self.repainted.clear()
+
+    def onscreen_pieces(self, rect):
+        """矩形在各显示器内的部分"""
+        pieces = []
+        for monitor in self.monitors:
+            piece = intersect(rect, monitor.bounds)
+            if rect_area(piece):
+                pieces.append(piece)
+        return pieces
+
+    def exposed_area(self, old_rect, new_rect):
+        """窗口从 old_rect 移到 new_rect 时新进入屏幕的窗口内容面积（按窗口内坐标比较）"""
+        dx, dy = new_rect[0] - old_rect[0], new_rect[1] - old_rect[1]
+        before = [(left + dx, top + dy, right + dx, bottom + dy)
+                  for left, top, right, bottom in self.onscreen_pieces(old_rect)]
+        exposed = 0
+        for piece in self.onscreen_pieces(new_rect):
+            exposed += rect_area(piece) - sum(rect_area(intersect(piece, other)) for other in before)
+        return exposed
+
+    def rendering_pixels(self, hwnds=None):
+        """程序仍在渲染的窗口表面面积（只计参与合成的窗口，包括在屏幕外的部分）"""
+        with self.lock:
+            windows = [self.windows[hwnd] for hwnd in (hwnds or self.windows) if hwnd in self.windows]
+            return sum(rect_area(window.rect) for window in windows if window.composited)
+
+    def composited_pixels(self, hwnds=None, tabs=True):
+        """DWM 合成的屏幕面积：参与合成的窗口在屏幕内的部分，加上可见的标签窗口"""
+        with self.lock:
+            windows = [self.windows[hwnd] for hwnd in (hwnds or self.windows) if hwnd in self.windows]
+            total = sum(sum(rect_area(piece) for piece in self.onscreen_pieces(window.rect))
+                        for window in windows if window.composited)
+            if tabs:
+                total += sum(rect_area(rect) for rect, visible in self.tabs.values() if visible)
+            return total
+
+    # 模拟桌面操作
+    def create_window(self, title, rect, foreground=True, class_name='SimWindow', process='sim.exe'):
+        """在当前虚拟桌面上创建窗口，rect 为 (left, top, right, bottom)，返回 hwnd"""
+        with self.lock:
+            self.next_hwnd += 4
+            hwnd = self.next_hwnd
+            self.windows[hwnd] = SimWindow(hwnd, title, tuple(rect), hwnd >> 2, class_name, process,
+                                           self.current_desktop)
+        if foreground:
+            self.foreground = hwnd
+        return hwnd
+
+    def destroy_window(self, hwnd):
+        """销毁窗口"""
+        with self.lock:
+            self.windows.pop(hwnd, None)
+        if self.foreground == hwnd:
+            self.foreground = 0
+        self.emit(EVENT_OBJECT_DESTROY, hwnd)
+
+    def set_window_title(self, hwnd, title):
+        """修改窗口标题"""
+        window = self.windows.get(hwnd)
+        if window is not None:
+            window.title = title
+            self.emit(EVENT_OBJECT_NAMECHANGE, hwnd)
+
+    def set_window_rect(self, hwnd, rect):
+        """模拟用户或所属程序移动窗口、改变窗口大小（不计入 moves）"""
+        with self.lock:
+            window = self.windows.get(hwnd)
+            if window is None:
+                return
+            window.rect = tuple(rect)
+        self.emit(EVENT_OBJECT_LOCATIONCHANGE, hwnd)
+
+    def add_desktop(self):
+        """新建虚拟桌面，返回其 ID"""
+        desktop = f'desktop-{len(self.desktops) + 1}'
+        self.desktops.append(desktop)
+        return desktop
+
+    def switch_desktop(self, desktop):
+        """切换虚拟桌面：与 shell 一样隐藏原桌面的窗口、取消隐藏新桌面的窗口，并发出对应的通知"""
+        previous, self.current_desktop = self.current_desktop, desktop
+        if previous == desktop:
+            return
+        with self.lock:
+            windows = [(window.hwnd, window.desktop) for window in self.windows.values()]
+        for hwnd, on in windows:
+            if on == previous:
+                self.emit(EVENT_OBJECT_CLOAKED, hwnd)
+        for hwnd, on in windows:
+            if on == desktop:
+                self.emit(EVENT_OBJECT_UNCLOAKED, hwnd)
+        foreground = self.windows.get(self.foreground)
+        if foreground is not None and foreground.desktop != desktop:
+            self.foreground = 0
+
+    def move_window_to_desktop(self, hwnd, desktop):
+        """把窗口移到另一个虚拟桌面，离开或进入当前桌面时发出通知"""
+        window = self.windows.get(hwnd)
+        if window is None or window.desktop == desktop:
+            return
+        previous, window.desktop = window.desktop, desktop
+        if previous == self.current_desktop:
+            self.emit(EVENT_OBJECT_CLOAKED, hwnd)
+        elif desktop == self.current_desktop:
+            self.emit(EVENT_OBJECT_UNCLOAKED, hwnd)
+
+    def pin_window(self, hwnd, x, y):
+        """模拟与重新定位对抗的程序：窗口每次被移动后都立即回到 (x, y)，x 为 None 时取消"""
+        if x is None:
+            self.pinned.pop(hwnd, None)
+        else:
+            self.pinned[hwnd] = (x, y)
+
+    def activate(self, hwnd):
+        """把窗口设为前台窗口"""
+        self.foreground = hwnd
+
+    def set_monitors(self, monitors):
+        """更换显示器配置"""
+        self.monitors = list(monitors)
+        self.emit(EVENT_DISPLAY_CHANGE, None)
+
+    def move_cursor(self, x, y):
+        """移动光标，通知由钩子驱动的光标事件源（轮询的事件源自行读取）"""
+        self.cursor = (x, y)
+        for source in self.cursor_sources:
+            if isinstance(source, (SyntheticCursorSource, SimulatedHybridCursorSource)):
+                source.move(x, y)
+
+    def press_key(self, name):
+        """按下按键，按住不放时再次调用即为系统的自动重复"""
+        self.pressed_keys.add(name)
+        key = SimKey(name)
+        for listener in self.keyboard_listeners:
+            if listener.running:
+                listener.on_press(key)
+
+    def release_key(self, name, deliver=True):
+        """释放按键，deliver 为 False 时模拟丢失的释放事件"""
+        self.pressed_keys.discard(name)
+        if not deliver:
+            return
+        key = SimKey(name)
+        for listener in self.keyboard_listeners:
+            if listener.running:
+                listener.on_release(key)
+
+    def wait_for_move(self, hwnd, since, timeout=1.0):
+        """等待 moves 中第 since 条之后出现该窗口的移动，返回其时间，超时返回 None"""
+        deadline = time.monotonic() + timeout
+        with self.moved:
+            while True:
+                for moved_at, moved_hwnd, x, y in self.moves[since:]:
+                    if moved_hwnd == hwnd:
+                        return moved_at
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self.moved.wait(remaining)
+
+    def emit(self, event, hwnd):
+        if self.events is None:
+            self.deliver(event, hwnd)
+            return
+        self.events.put((time.monotonic() + self.event_delay, event, hwnd))
+
+    def deliver(self, event, hwnd):
+        for watcher in self.watchers:
+            watcher.emit(event, hwnd)
+
+    def run_events(self):
+        """异步分发窗口事件的线程"""
+        while True:
+            due, event, hwnd = self.events.get()
+            delay = due - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            self.deliver(event, hwnd)
+            self.events.task_done()
+
+    def wait_events(self, timeout=1.0):
+        """等待已发出的窗口事件全部送达（异步分发时）"""
+        deadline = time.monotonic() + timeout
+        while self.events is not None and self.events.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.001)
+
+    def apply_move(self, hwnd, x, y):
+        with self.lock:
+            window = self.windows.get(hwnd)
+            if window is None:
+                raise OSError(f"invalid window {hwnd}")
+            left, top, right, bottom = window.rect
+            rect = (x, y, x + right - left, y + bottom - top)
+            if window.minimized:
+                # 移动最小化的窗口只改变图标位置
+                rect = window.rect
+            elif window.composited:
+                self.repainted[hwnd] += self.exposed_area(window.rect, rect)
+            window.rect = rect
+            self.moves.append((time.monotonic(), hwnd, x, y))
+            self.moved.notify_all()
+        self.emit(EVENT_OBJECT_LOCATIONCHANGE, hwnd)
+        pinned = self.pinned.get(hwnd)
+        if pinned is not None and pinned != (x, y):
+            self.apply_move(hwnd, *pinned)
+
+    # DeferPosBackend
+    def begin(self, count):
+        self.call('BeginDeferWindowPos')
+        return []
+
+    def defer(self, batch, hwnd, x, y):
+        self.call('DeferWindowPos')
+        if hwnd not in self.windows:
+            raise OSError(f"invalid window {hwnd}")
+        batch.append((hwnd, x, y))
+        return batch
+
+    def end(self, batch):
+        self.call('EndDeferWindowPos')
+        for hwnd, x, y in batch:
+            self.apply_move(hwnd, x, y)
+
+    def move(self, hwnd, x, y):
+        self.call('SetWindowPos')
+        self.apply_move(hwnd, x, y)
+
+    # DesktopBackend
+    def get_foreground_window(self):
+        self.call('GetForegroundWindow')
+        return self.foreground
+
+    def is_window(self, hwnd):
+        self.call('IsWindow')
+        return hwnd in self.windows
+
+    def get_window_text(self, hwnd):
+        self.call('GetWindowText')
+        window = self.windows.get(hwnd)
+        return window.title if window is not None else ''
+
+    def get_window_rect(self, hwnd):
+        self.call('GetWindowRect')
+        window = self.windows.get(hwnd)
+        if window is None:
+            raise OSError(f"invalid window {hwnd}")
+        return ICONIC_RECT if window.minimized else window.rect
+
+    def show_window(self, hwnd, command):
+        self.call('ShowWindow')
+        with self.lock:
+            window = self.windows.get(hwnd)
+            if window is None:
+                return
+            was_composited = window.composited
+            if command == 'hide':
+                window.visible = False
+            elif command in ('minimize', 'minimize_inactive'):
+                window.visible = True
+                window.minimized = True
+            else:
+                window.visible = True
+                window.minimized = False
+            if window.composited and not was_composited:
+                # 从最小化或隐藏中恢复：屏幕内的部分全部重绘
+                self.repainted[hwnd] += sum(rect_area(piece) for piece in self.onscreen_pieces(window.rect))
+        self.emit(EVENT_OBJECT_LOCATIONCHANGE, hwnd)
+
+    def set_window_cloaked(self, hwnd, cloaked):
+        self.call('DwmSetWindowAttribute')
+        window = self.windows.get(hwnd)
+        if window is not None and window.cloaked != cloaked:
+            window.cloaked = cloaked
+            self.emit(EVENT_OBJECT_CLOAKED if cloaked else EVENT_OBJECT_UNCLOAKED, hwnd)
+
+    def create_edge_tab(self, rect):
+        self.call('CreateWindowEx')
+        with self.lock:
+            tab = self.next_tab
+            self.next_tab += 1
+            self.tabs[tab] = [tuple(rect), True]
+        return tab
+
+    def move_edge_tab(self, tab, rect):
+        self.call('SetWindowPos')
+        with self.lock:
+            if tab in self.tabs:
+                self.tabs[tab][0] = tuple(rect)
+
+    def show_edge_tab(self, tab, visible):
+        self.call('ShowWindow')
+        with self.lock:
+            if tab in self.tabs:
+                self.tabs[tab][1] = visible
+
+    def destroy_edge_tab(self, tab):
+        self.call('DestroyWindow')
+        with self.lock:
+            self.tabs.pop(tab, None)
+
+    def get_class_name(self, hwnd):
+        self.call('GetClassName')
+        window = self.windows.get(hwnd)
+        return window.class_name if window is not None else ''
+
+    def get_process_name(self, hwnd):
+        self.call('QueryFullProcessImageName')
+        window = self.windows.get(hwnd)
+        return window.process if window is not None else ''
+
+    def get_window_thread_id(self, hwnd):
+        self.call('GetWindowThreadProcessId')
+        window = self.windows.get(hwnd)
+        return window.thread_id if window is not None else 0
+
+    def get_current_thread_id(self):
+        self.call('GetCurrentThreadId')
+        return self.CURRENT_THREAD_ID
+
+    def attach_thread_input(self, thread_id, target_thread_id, attach):
+        self.call('AttachThreadInput')
+        if attach:
+            self.attached_threads.add((thread_id, target_thread_id))
+        else:
+            self.attached_threads.discard((thread_id, target_thread_id))
+
+    def set_window_topmost(self, hwnd, topmost):
+        self.call('SetWindowPos')
+        if topmost:
+            self.topmost.add(hwnd)
+        else:
+            self.topmost.discard(hwnd)
+
+    def set_foreground_window(self, hwnd):
+        self.call('SetForegroundWindow')
+        window = self.windows.get(hwnd)
+        if window is None:
+            return False
+        lock = self.foreground_lock.get(window.process)
+        if lock is not None and self.foreground:
+            foreground = self.windows.get(self.foreground)
+            if foreground is not None:
+                if (self.CURRENT_THREAD_ID, foreground.thread_id) not in self.attached_threads:
+                    return False
+                if lock == 'topmost' and hwnd not in self.topmost:
+                    return False
+        self.foreground = hwnd
+        return True
+
+    def bring_window_to_top(self, hwnd):
+        self.call('BringWindowToTop')
+
+    def enumerate_windows(self):
+        self.call('EnumWindows')
+        with self.lock:
+            return [hwnd for hwnd, window in self.windows.items() if window.visible and window.title]
+
+    def get_cursor_pos(self):
+        self.call('GetCursorPos')
+        return self.cursor
+
+    def enumerate_monitors(self):
+        self.call('EnumDisplayMonitors')
+        return list(self.monitors)
+
+    def get_refresh_rate(self):
+        self.call('EnumDisplaySettings')
+        return self.refresh_rate
+
+    def create_virtual_desktops(self):
+        return SimulatedVirtualDesktops(self)
+
+    def create_event_watcher(self):
+        watcher = SimulatedEventWatcher(self.win_events)
+        self.watchers.append(watcher)
+        return watcher
+
+    def create_cursor_source(self):
+        # 每次调用时查找方法，开启统计后安装的计时包装才会生效
+        get_cursor_pos = lambda: self.get_cursor_pos()
+        if self.cursor_mode == 'hybrid':
+            source = SimulatedHybridCursorSource(get_cursor_pos)
+        elif self.cursor_mode == 'poll':
+            source = PollingCursorSource(get_cursor_pos)
+        else:
+            source = SyntheticCursorSource()
+        self.cursor_sources.append(source)
+        return source
+
+    def get_modifier_state(self):
+        self.call('GetAsyncKeyState')
+        state = 0
+        for name in list(self.pressed_keys):
+            state |= MODIFIER_KEYS.get(name, 0)
+        return state
+
+    def create_keyboard_listener(self, on_press, on_release):
+        listener = SimulatedKeyboardListener(on_press, on_release)
+        self.keyboard_listeners.append(listener)
+        return listener
+
+    def create_command_listener(self, on_connection, address=None):
+        from .ipc_transport import SocketListener, default_socket_address
+        return SocketListener(on_connection, address or default_socket_address())
@@ -0,0 +1,60 @@
+import threading
+import time
+
+
+class StartupTimer:
+    """启动耗时统计
+
+    按阶段记录从进程创建到各个启动步骤完成的时间。
+    阶段可能在不同线程上完成（例如托盘在后台线程创建），mark 是线程安全的。
+    """
+
+    def __init__(self, started=None):
+        # 计时起点：主脚本开始执行的时间
+        self.started = time.perf_counter() if started is None else started
+        # 进程创建到主脚本开始执行之间的时间（加载运行库、解释器启动），无法获取时为 None
+        age = get_process_age()
+        self.before_main = None if age is None else max(0.0, age - (time.perf_counter() - self.started))
+        self.phases = []
+        self.last = self.started
+        self.lock = threading.Lock()
+
+    def mark(self, phase):
+        """记录一个阶段完成"""
+        now = time.perf_counter()
+        with self.lock:
+            self.phases.append((phase, now - self.last, now - self.started))
+            self.last = now
+
+    def report(self):
+        """返回启动耗时报告（文本）"""
+        lines = ['启动耗时：']
+        if self.before_main is not None:
+            lines.append(f'  {"进程启动":<16}{self.before_main * 1000:9.1f} ms')
+        with self.lock:
+            phases = list(self.phases)
+        for phase, duration, elapsed in phases:
+            lines.append(f'  {phase:<16}{duration * 1000:9.1f} ms  (累计 {elapsed * 1000:.1f} ms)')
+        return '\n'.join(lines)
+
+
+def get_process_age():
+    """当前进程已运行的时间（秒），仅 Windows 下可用"""
+    try:
+        import ctypes
+        from ctypes import wintypes
+
+        kernel32 = ctypes.windll.kernel32
+        creation, exit_time, kernel, user, now = (wintypes.FILETIME() for _ in range(5))
+        if not kernel32.GetProcessTimes(kernel32.GetCurrentProcess(), ctypes.byref(creation),
+                                        ctypes.byref(exit_time), ctypes.byref(kernel), ctypes.byref(user)):
+            return None
+        kernel32.GetSystemTimePreciseAsFileTime(ctypes.byref(now))
+
+        def to_int(filetime):
+            return (filetime.dwHighDateTime << 32) | filetime.dwLowDateTime
+
+        # FILETIME 以 100 纳秒为单位
+        return max(0.0, (to_int(now) - to_int(creation)) / 1e7)
+    except Exception:
+        return None
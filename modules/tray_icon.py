@@ -1,22 +1,34 @@
+import io
 import threading
-import tkinter as tk
-import pystray
-from PIL import Image, ImageDraw
-import winreg
 import os
 import sys
 from .animation_controller import AnimationController
+from .monitor_topology import STACKING_TILED, STACKING_CASCADE
 
 class TrayIcon:
-    def __init__(self, animation_controller: AnimationController, quit_callback):
+    """系统托盘图标
+
+    pystray、PIL、tkinter、winreg 都在用到时才导入：托盘在 run 启动的后台线程上创建，
+    不会推迟快捷键生效的时间。
+    """
+
+    def __init__(self, animation_controller: AnimationController, quit_callback, startup_timer=None,
+                 metrics_service=None, trace_recorder=None):
         self.animation_controller = animation_controller
+        self.window_manager = animation_controller.window_manager
         self.quit_callback = quit_callback
-        self.create_tray_icon()
+        self.startup_timer = startup_timer
+        self.metrics_service = metrics_service
+        self.trace_recorder = trace_recorder
+        self.tray_icon = None
+        self.stopped = False
         self.startup_reg_name = "WindowControllerA"
         self.app_path = os.path.abspath(sys.argv[0])
 
     def create_tray_icon(self):
         """创建系统托盘图标"""
+        import pystray
+
         menu = (
             pystray.MenuItem("使用说明", self.show_instructions),
             pystray.Menu.SEPARATOR,
@@ -46,30 +58,67 @@ class TrayIcon:
                             pystray.MenuItem("线性", lambda: self.set_curve('linear')),
                             pystray.MenuItem("平滑", lambda: self.set_curve('ease')),
                             pystray.MenuItem("缓入", lambda: self.set_curve('ease-in')),
-                            pystray.MenuItem("缓出", lambda: self.set_curve('ease-out'))
+                            pystray.MenuItem("缓出", lambda: self.set_curve('ease-out')),
+                            pystray.MenuItem("弹性", lambda: self.set_curve(('spring', 170, 20)))
                         )
                     ),
                     pystray.MenuItem("动画质量",
                         pystray.Menu(
-                            pystray.MenuItem("流畅 (60步)", lambda: self.set_quality(60, 8)),
-                            pystray.MenuItem("标准 (30步)", lambda: self.set_quality(30, 8)),
-                            pystray.MenuItem("省电 (15步)", lambda: self.set_quality(15, 12))
+                            pystray.MenuItem("流畅 (跟随刷新率)", lambda: self.set_quality(0)),
+                            pystray.MenuItem("标准 (60帧)", lambda: self.set_quality(60)),
+                            pystray.MenuItem("省电 (30帧)", lambda: self.set_quality(30))
                         )
                     )
                 )
             ),
+            pystray.MenuItem("边缘叠放",
+                pystray.Menu(
+                    pystray.MenuItem(
+                        "平铺",
+                        lambda: self.set_stacking(STACKING_TILED),
+                        checked=lambda item: self.window_manager.stacking == STACKING_TILED
+                    ),
+                    pystray.MenuItem(
+                        "层叠",
+                        lambda: self.set_stacking(STACKING_CASCADE),
+                        checked=lambda item: self.window_manager.stacking == STACKING_CASCADE
+                    )
+                )
+            ),
             pystray.Menu.SEPARATOR,
             pystray.MenuItem(
                 "开机启动",
                 self.toggle_startup,
                 checked=lambda item: self.is_startup_enabled()
             ),
+            pystray.MenuItem(
+                "启动耗时",
+                self.show_startup_report,
+                visible=self.startup_timer is not None
+            ),
+            pystray.MenuItem("性能统计",
+                pystray.Menu(
+                    pystray.MenuItem(
+                        "启用统计",
+                        self.toggle_metrics,
+                        checked=lambda item: self.metrics_service.enabled
+                    ),
+                    pystray.MenuItem("查看统计", self.show_metrics),
+                    pystray.MenuItem(
+                        "录制输入轨迹",
+                        self.toggle_trace,
+                        checked=lambda item: self.trace_recorder.recording,
+                        visible=self.trace_recorder is not None
+                    )
+                ),
+                visible=self.metrics_service is not None
+            ),
             pystray.Menu.SEPARATOR,
             pystray.MenuItem("退出", self.quit_callback)
         )
         
-        # 创建水字形状的图标
-        image = self.create_water_icon()
+        # 加载预渲染的水字形状图标
+        image = self.load_icon_image()
         
         # 创建系统托盘图标
         self.tray_icon = pystray.Icon(
@@ -81,6 +130,8 @@ class TrayIcon:
 
     def is_startup_enabled(self):
         """检查是否已设置开机启动"""
+        import winreg
+
         try:
             key = winreg.OpenKey(
                 winreg.HKEY_CURRENT_USER,
@@ -100,6 +151,8 @@ class TrayIcon:
 
     def toggle_startup(self, icon, item):
         """切换开机启动状态"""
+        import winreg
+
         try:
             key = winreg.OpenKey(
                 winreg.HKEY_CURRENT_USER,
@@ -127,56 +180,29 @@ class TrayIcon:
         except Exception as e:
             print(f"设置开机启动时出错: {e}")
 
-    def create_water_icon(self):
-        """创建水字形状的图标"""
-        image = Image.new('RGBA', (64, 64), color=(255, 255, 255, 0))
-        draw = ImageDraw.Draw(image)
-        
-        # 绘制类似甲骨文中"水"字的图形
-        # 主体部分
-        points = [
-            (32, 10),  # 顶部中心
-            (15, 25),  # 左上
-            (20, 32),  # 左中
-            (15, 40),  # 左下
-            (32, 50),  # 底部中心
-            (49, 40),  # 右下
-            (44, 32),  # 右中
-            (49, 25),  # 右上
-            (32, 10)   # 回到顶部中心
-        ]
-        
-        # 绘制外边框（白色）
-        draw.line(points, fill=(255, 255, 255), width=3)
-        
-        # 绘制内部波浪线（白色）
-        wave_points = [
-            (25, 28),
-            (32, 33),
-            (39, 28),
-            (32, 38),
-            (25, 33)
-        ]
-        draw.line(wave_points, fill=(255, 255, 255), width=2)
-        
-        return image
+    def load_icon_image(self):
+        """加载 create_icon.py 预渲染的托盘图标"""
+        from PIL import Image
+        from .icon_data import TRAY_ICON_PNG
+
+        return Image.open(io.BytesIO(TRAY_ICON_PNG))
 
     def show_instructions(self, icon, item):
         """显示使用说明"""
-        instruction_window = tk.Tk()
-        instruction_window.title("使用说明")
-        instruction_window.geometry("400x450")
-        
         instructions = """
         使用说明：
         
         1. 快捷键操作：
            - Shift + 方向键：隐藏当前窗口到对应方向
-           - 再次 Shift + 方向键：显示该方向的隐藏窗口
+           - 同一边缘可以隐藏多个窗口
+           - 对刚隐藏的窗口再次 Shift + 方向键：显示该窗口
+           - 边缘有多个窗口时，再次 Shift + 方向键依次轮换显示
         
         2. 鼠标触发：
            - 将鼠标移动到屏幕边缘可显示隐藏的窗口
+           - 边缘有多个窗口时，显示鼠标位置对应的那一个
            - 鼠标离开窗口区域后窗口自动隐藏
+           - 拖动临时显示的窗口即可取消隐藏
         
         3. 动画设置：
            - 启用/关闭动画：完全开启或关闭动画效果
@@ -190,10 +216,12 @@ class TrayIcon:
              * 平滑：渐入渐出
              * 缓入：开始慢后来快
              * 缓出：开始快后来慢
+             * 弹性：带轻微回弹的弹簧效果
            - 动画质量：
-             * 流畅：最高质量 (60步)
-             * 标准：平衡性能 (30步)
-             * 省电：性能优先 (15步)
+             * 流畅：跟随显示器刷新率
+             * 标准：平衡性能 (60帧)
+             * 省电：性能优先 (30帧)
+             * 动画时长固定，质量只影响帧率
         
         4. 开机启动：
            - 勾选"开机启动"选项即可设置开机自动运行
@@ -202,12 +230,50 @@ class TrayIcon:
            - 右键点击托盘图标，选择"退出"即可
         """
         
-        text = tk.Text(instruction_window, wrap=tk.WORD, padx=10, pady=10)
-        text.insert("1.0", instructions)
+        self.show_text_window("使用说明", instructions, "400x450")
+
+    def show_startup_report(self, icon, item):
+        """显示启动耗时报告"""
+        if self.startup_timer is not None:
+            self.show_text_window("启动耗时", self.startup_timer.report(), "400x300")
+
+    def toggle_metrics(self, icon, item):
+        """开启或关闭性能统计和本机统计接口"""
+        self.metrics_service.set_enabled(not self.metrics_service.enabled)
+
+    def show_metrics(self, icon, item):
+        """显示性能统计快照"""
+        import json
+
+        content = json.dumps(self.metrics_service.snapshot(), ensure_ascii=False, indent=2)
+        self.show_text_window("性能统计", content, "520x600")
+
+    def toggle_trace(self, icon, item):
+        """开始或结束录制输入轨迹，文件位置见 input_trace.default_trace_path"""
+        from .input_trace import default_trace_path
+
+        try:
+            if self.trace_recorder.recording:
+                print(f"输入轨迹已保存: {self.trace_recorder.stop()}")
+            else:
+                print(f"开始录制输入轨迹: {self.trace_recorder.start(default_trace_path())}")
+        except Exception as e:
+            print(f"Error recording input trace: {e}")
+
+    def show_text_window(self, title, content, geometry):
+        """在只读文本窗口中显示内容"""
+        import tkinter as tk
+
+        window = tk.Tk()
+        window.title(title)
+        window.geometry(geometry)
+        
+        text = tk.Text(window, wrap=tk.WORD, padx=10, pady=10)
+        text.insert("1.0", content)
         text.config(state=tk.DISABLED)
         text.pack(fill=tk.BOTH, expand=True)
         
-        instruction_window.mainloop()
+        window.mainloop()
 
     def set_animation_enabled(self, enabled):
         """设置动画开关"""
@@ -217,21 +283,42 @@ class TrayIcon:
         """设置动画速度"""
         self.animation_controller.set_animation_speed(speed)
 
-    def set_quality(self, steps, interval):
-        """设置动画质量"""
-        self.animation_controller.set_animation_quality(steps, interval)
+    def set_quality(self, frame_rate):
+        """设置动画质量（帧率上限）"""
+        self.animation_controller.set_animation_quality(frame_rate)
+
+    def set_stacking(self, stacking):
+        """设置边缘叠放方式"""
+        self.window_manager.set_stacking(stacking)
 
     def set_curve(self, curve_type):
         """设置动画曲线"""
         self.animation_controller.set_animation_curve(curve_type)
 
     def run(self):
-        """运行系统托盘"""
-        threading.Thread(target=self.tray_icon.run, daemon=True).start()
+        """在后台线程上创建并运行系统托盘"""
+        threading.Thread(target=self.run_tray, daemon=True).start()
+
+    def run_tray(self):
+        """托盘线程"""
+        try:
+            self.create_tray_icon()
+        except Exception as e:
+            print(f"Error creating tray icon: {e}")
+            return
+        if not self.stopped:
+            self.tray_icon.run(setup=self.on_tray_ready)
+
+    def on_tray_ready(self, icon):
+        """托盘图标已创建"""
+        icon.visible = True
+        if self.startup_timer is not None:
+            self.startup_timer.mark('托盘')
 
     def stop(self):
         """停止系统托盘"""
-        if hasattr(self, 'tray_icon'):
+        self.stopped = True
+        if self.tray_icon is not None:
             try:
                 self.tray_icon.visible = False
                 self.tray_icon.stop()
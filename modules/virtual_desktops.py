@@ -0,0 +1,212 @@
+import ctypes
+import threading
+import time
+import uuid
+from ctypes import wintypes
+
+CLSID_VIRTUAL_DESKTOP_MANAGER = 'aa509086-5ca9-4c25-8f95-589d3c07b48a'
+IID_IVIRTUAL_DESKTOP_MANAGER = 'a5cd92ff-29be-454c-8d04-d82879fb3f1b'
+COINIT_APARTMENTTHREADED = 0x2
+CLSCTX_ALL = 0x17
+# IVirtualDesktopManager::GetWindowDesktopId 在虚函数表中的序号（IUnknown 占前 3 个）
+GET_WINDOW_DESKTOP_ID = 4
+# 当前虚拟桌面记录在注册表中的位置（Windows 11 / Windows 10）
+CURRENT_DESKTOP_KEYS = (
+    r'Software\Microsoft\Windows\CurrentVersion\Explorer\VirtualDesktops',
+    r'Software\Microsoft\Windows\CurrentVersion\Explorer\SessionInfo\{session}\VirtualDesktops',
+)
+CURRENT_DESKTOP_VALUE = 'CurrentVirtualDesktop'
+
+
+class GUID(ctypes.Structure):
+    _fields_ = [
+        ('Data1', wintypes.DWORD),
+        ('Data2', wintypes.WORD),
+        ('Data3', wintypes.WORD),
+        ('Data4', ctypes.c_ubyte * 8),
+    ]
+
+    @classmethod
+    def from_string(cls, text):
+        return cls.from_buffer_copy(uuid.UUID(text).bytes_le)
+
+
+def desktop_id(data):
+    """把 16 字节的 GUID 转换为桌面 ID 字符串，空 GUID 返回 None"""
+    data = bytes(data)
+    if len(data) != 16 or not any(data):
+        return None
+    return str(uuid.UUID(bytes_le=data))
+
+
+class SingleDesktop:
+    """不支持虚拟桌面时的提供者：所有窗口都在同一个桌面上"""
+
+    def current_desktop(self):
+        return None
+
+    def window_desktop(self, hwnd):
+        return None
+
+
+class Win32VirtualDesktops:
+    """Windows 虚拟桌面提供者
+
+    窗口所在的桌面由 IVirtualDesktopManager 查询（COM 对象按线程创建）；
+    公开接口不提供当前桌面，从注册表读取 Explorer 记录的当前桌面，读不到时取前台窗口所在的桌面。
+    固定在所有桌面上的窗口、查询失败时返回 None。
+    """
+
+    def __init__(self):
+        self.local = threading.local()
+        self.session = None
+
+    def manager(self):
+        """当前线程的 IVirtualDesktopManager 接口指针"""
+        manager = getattr(self.local, 'manager', None)
+        if manager is None:
+            ole32 = ctypes.windll.ole32
+            # 线程已按其他方式初始化 COM 时返回 RPC_E_CHANGED_MODE，仍可创建对象
+            ole32.CoInitializeEx(None, COINIT_APARTMENTTHREADED)
+            manager = ctypes.c_void_p()
+            result = ole32.CoCreateInstance(
+                ctypes.byref(GUID.from_string(CLSID_VIRTUAL_DESKTOP_MANAGER)), None, CLSCTX_ALL,
+                ctypes.byref(GUID.from_string(IID_IVIRTUAL_DESKTOP_MANAGER)), ctypes.byref(manager))
+            if result != 0:
+                raise OSError(f'CoCreateInstance(VirtualDesktopManager) failed: {result & 0xFFFFFFFF:#x}')
+            self.local.manager = manager
+        return manager
+
+    def window_desktop(self, hwnd):
+        try:
+            manager = self.manager()
+            vtable = ctypes.cast(manager, ctypes.POINTER(ctypes.POINTER(ctypes.c_void_p))).contents
+            prototype = ctypes.WINFUNCTYPE(ctypes.HRESULT, ctypes.c_void_p, wintypes.HWND, ctypes.POINTER(GUID))
+            desktop = GUID()
+            prototype(vtable[GET_WINDOW_DESKTOP_ID])(manager, hwnd, ctypes.byref(desktop))
+            return desktop_id(desktop)
+        except OSError:
+            # 窗口已销毁或不属于任何桌面（工具窗口等）
+            return None
+
+    def current_desktop(self):
+        import winreg
+
+        if self.session is None:
+            session = wintypes.DWORD()
+            kernel32 = ctypes.windll.kernel32
+            kernel32.ProcessIdToSessionId(kernel32.GetCurrentProcessId(), ctypes.byref(session))
+            self.session = session.value
+        for path in CURRENT_DESKTOP_KEYS:
+            try:
+                with winreg.OpenKey(winreg.HKEY_CURRENT_USER, path.format(session=self.session)) as key:
+                    value, _ = winreg.QueryValueEx(key, CURRENT_DESKTOP_VALUE)
+            except OSError:
+                continue
+            desktop = desktop_id(value) if isinstance(value, bytes) else None
+            if desktop is not None:
+                return desktop
+        hwnd = ctypes.windll.user32.GetForegroundWindow()
+        return self.window_desktop(hwnd) if hwnd else None
+
+
+class DesktopMembership:
+    """当前虚拟桌面和窗口所在桌面的缓存
+
+    提供者的查询（COM 调用、读注册表）只在缓存失效后进行一次：切换桌面或把窗口移到其他桌面时，
+    shell 会隐藏/取消隐藏相关的窗口（EVENT_OBJECT_CLOAKED/UNCLOAKED），通知使该窗口的记录和当前桌面失效。
+    光标跟踪和按键处理只读缓存。窗口事件监听挂起期间收不到通知，查询结果只保留 UNNOTIFIED_TTL 秒，
+    处理快捷键前（expire）和恢复监听时全部丢弃。
+    桌面为 None 表示不支持虚拟桌面或桌面未知。
+    """
+
+    # 收不到通知时查询结果的有效期（秒）
+    UNNOTIFIED_TTL = 0.5
+
+    def __init__(self, provider):
+        self.provider = provider
+        self.lock = threading.Lock()
+        self.current = None
+        self.current_valid = False
+        self.current_time = 0.0
+        # {hwnd: (所在桌面, 查询时间)}
+        self.windows = {}
+        # 是否能收到通知
+        self.notified = True
+        # 统计：查询提供者、缓存失效的次数
+        self.queries = 0
+        self.invalidations = 0
+
+    def current_desktop(self):
+        """当前桌面"""
+        if self.current_valid and self.fresh(self.current_time):
+            return self.current
+        desktop = self.query(self.provider.current_desktop)
+        with self.lock:
+            self.current = desktop
+            self.current_valid = True
+            self.current_time = time.monotonic()
+        return desktop
+
+    def window_desktop(self, hwnd):
+        """窗口所在的桌面"""
+        cached = self.windows.get(hwnd)
+        if cached is not None and self.fresh(cached[1]):
+            return cached[0]
+        desktop = self.query(self.provider.window_desktop, hwnd)
+        with self.lock:
+            self.windows[hwnd] = (desktop, time.monotonic())
+        return desktop
+
+    def fresh(self, queried_at):
+        """缓存的查询结果是否仍可使用"""
+        return self.notified or time.monotonic() - queried_at < self.UNNOTIFIED_TTL
+
+    def query(self, func, *args):
+        self.queries += 1
+        try:
+            return func(*args)
+        except Exception as e:
+            print(f"Error querying virtual desktop: {e}")
+            return None
+
+    def invalidate(self, hwnd):
+        """窗口被 shell 隐藏/取消隐藏：它可能换了桌面，当前桌面也可能已切换"""
+        with self.lock:
+            self.windows.pop(hwnd, None)
+            self.current_valid = False
+            self.invalidations += 1
+
+    def forget(self, hwnd):
+        """窗口已销毁"""
+        with self.lock:
+            self.windows.pop(hwnd, None)
+
+    def suspend(self):
+        """窗口事件监听挂起，之后的查询结果只保留 UNNOTIFIED_TTL 秒"""
+        self.notified = False
+        self.expire()
+
+    def expire(self):
+        """收不到通知时丢弃缓存（用户可能刚切换了桌面）；能收到通知时缓存一直有效"""
+        if self.notified:
+            return
+        with self.lock:
+            self.windows = {}
+            self.current_valid = False
+
+    def resume(self):
+        """窗口事件监听恢复，丢弃挂起前的缓存"""
+        with self.lock:
+            self.windows = {}
+            self.current_valid = False
+        self.notified = True
+
+    def stats(self):
+        """返回当前桌面、缓存的窗口数、查询和失效次数"""
+        return {
+            'current': self.current,
+            'cached': len(self.windows),
+            'queries': self.queries,
+            'invalidations': self.invalidations,
+        }
@@ -0,0 +1,34 @@
+import threading
+import time
+
+
+class WakeupCounter:
+    """按来源统计后台线程的唤醒次数
+
+    每个被唤醒的回调或循环调用一次 tick(来源)，用于验证空闲时是否真正不再唤醒。
+    """
+
+    def __init__(self):
+        self.counts = {}
+        self.lock = threading.Lock()
+        self.started = time.monotonic()
+
+    def tick(self, source):
+        """记录一次唤醒"""
+        with self.lock:
+            self.counts[source] = self.counts.get(source, 0) + 1
+
+    def snapshot(self):
+        """返回 (时间, {来源: 次数})"""
+        with self.lock:
+            return time.monotonic(), dict(self.counts)
+
+    def rates(self, since=None):
+        """返回自 since（snapshot 的结果，默认为创建时）以来每秒的唤醒次数"""
+        now, counts = self.snapshot()
+        started, previous = since if since is not None else (self.started, {})
+        elapsed = max(now - started, 1e-9)
+        rates = {source: (count - previous.get(source, 0)) / elapsed
+                 for source, count in counts.items() if count != previous.get(source, 0)}
+        rates['total'] = sum(rates.values())
+        return rates
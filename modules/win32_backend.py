@@ -0,0 +1,199 @@
+import ctypes
+import os
+from ctypes import wintypes
+import win32api
+import win32con
+import win32gui
+from .backend import DesktopBackend
+from .monitor_topology import Monitor
+from .hotkey_engine import SHIFT, CTRL, ALT, WIN
+from .window_batch import Win32DeferPosBackend
+
+PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+DWMWA_CLOAK = 13
+
+# 修饰键的虚拟键码
+MODIFIER_VKS = (
+    (win32con.VK_SHIFT, SHIFT),
+    (win32con.VK_CONTROL, CTRL),
+    (win32con.VK_MENU, ALT),
+    (win32con.VK_LWIN, WIN),
+    (win32con.VK_RWIN, WIN),
+)
+
+SHOW_COMMANDS = {
+    'restore': win32con.SW_RESTORE,
+    'minimize': win32con.SW_MINIMIZE,
+    'minimize_inactive': win32con.SW_SHOWMINNOACTIVE,
+    'hide': win32con.SW_HIDE,
+    'show': win32con.SW_SHOWNOACTIVATE,
+}
+
+
+class Win32Backend(Win32DeferPosBackend, DesktopBackend):
+    """基于 pywin32/ctypes 的 Windows 桌面后端"""
+
+    def __init__(self):
+        super().__init__()
+        self.user32 = ctypes.windll.user32
+        self.edge_tabs = None
+
+    def get_foreground_window(self):
+        return self.user32.GetForegroundWindow()
+
+    def is_window(self, hwnd):
+        return bool(win32gui.IsWindow(hwnd))
+
+    def get_window_text(self, hwnd):
+        return win32gui.GetWindowText(hwnd)
+
+    def get_window_rect(self, hwnd):
+        return win32gui.GetWindowRect(hwnd)
+
+    def show_window(self, hwnd, command):
+        self.user32.ShowWindow(hwnd, SHOW_COMMANDS[command])
+
+    def set_window_cloaked(self, hwnd, cloaked):
+        value = wintypes.BOOL(cloaked)
+        try:
+            result = ctypes.windll.dwmapi.DwmSetWindowAttribute(
+                hwnd, DWMWA_CLOAK, ctypes.byref(value), ctypes.sizeof(value))
+        except Exception:
+            result = -1
+        if result != 0:
+            # 其他进程的窗口通常不允许 cloak，退回隐藏窗口
+            self.user32.ShowWindow(hwnd, win32con.SW_HIDE if cloaked else win32con.SW_SHOWNOACTIVATE)
+
+    def create_edge_tab(self, rect):
+        if self.edge_tabs is None:
+            from .edge_tabs import EdgeTabHost
+            self.edge_tabs = EdgeTabHost()
+        return self.edge_tabs.create(rect)
+
+    def move_edge_tab(self, tab, rect):
+        if tab:
+            self.edge_tabs.move(tab, rect)
+
+    def show_edge_tab(self, tab, visible):
+        if tab:
+            self.edge_tabs.show(tab, visible)
+
+    def destroy_edge_tab(self, tab):
+        if tab:
+            self.edge_tabs.destroy(tab)
+
+    def enumerate_windows(self):
+        hwnds = []
+
+        def collect(hwnd, _):
+            if win32gui.IsWindowVisible(hwnd) and win32gui.GetWindowText(hwnd):
+                hwnds.append(hwnd)
+            return True
+
+        win32gui.EnumWindows(collect, None)
+        return hwnds
+
+    def get_class_name(self, hwnd):
+        return win32gui.GetClassName(hwnd)
+
+    def get_process_name(self, hwnd):
+        pid = wintypes.DWORD()
+        self.user32.GetWindowThreadProcessId(hwnd, ctypes.byref(pid))
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(PROCESS_QUERY_LIMITED_INFORMATION, False, pid.value)
+        if not handle:
+            return ''
+        try:
+            size = wintypes.DWORD(260)
+            buffer = ctypes.create_unicode_buffer(size.value)
+            if not kernel32.QueryFullProcessImageNameW(handle, 0, buffer, ctypes.byref(size)):
+                return ''
+            return os.path.basename(buffer.value)
+        finally:
+            kernel32.CloseHandle(handle)
+
+    def get_window_thread_id(self, hwnd):
+        return self.user32.GetWindowThreadProcessId(hwnd, None)
+
+    def get_current_thread_id(self):
+        return win32api.GetCurrentThreadId()
+
+    def attach_thread_input(self, thread_id, target_thread_id, attach):
+        self.user32.AttachThreadInput(thread_id, target_thread_id, attach)
+
+    def set_window_topmost(self, hwnd, topmost):
+        insert_after = win32con.HWND_TOPMOST if topmost else win32con.HWND_NOTOPMOST
+        self.user32.SetWindowPos(hwnd, insert_after, 0, 0, 0, 0,
+                                 win32con.SWP_NOMOVE | win32con.SWP_NOSIZE | win32con.SWP_SHOWWINDOW)
+
+    def set_foreground_window(self, hwnd):
+        return bool(self.user32.SetForegroundWindow(hwnd))
+
+    def bring_window_to_top(self, hwnd):
+        self.user32.BringWindowToTop(hwnd)
+
+    def get_cursor_pos(self):
+        return win32api.GetCursorPos()
+
+    def enumerate_monitors(self):
+        monitors = []
+        for handle, _, _ in win32api.EnumDisplayMonitors():
+            info = win32api.GetMonitorInfo(handle)
+            monitors.append(Monitor(
+                info['Device'],
+                info['Monitor'],
+                info['Work'],
+                self.get_monitor_dpi(handle),
+                bool(info['Flags'] & win32con.MONITORINFOF_PRIMARY)))
+        return monitors
+
+    def get_monitor_dpi(self, handle):
+        """获取显示器 DPI，系统不支持时返回 96"""
+        try:
+            dpi_x, dpi_y = wintypes.UINT(), wintypes.UINT()
+            result = ctypes.windll.shcore.GetDpiForMonitor(
+                int(handle), 0, ctypes.byref(dpi_x), ctypes.byref(dpi_y))
+            return dpi_x.value if result == 0 else 96
+        except Exception:
+            return 96
+
+    def get_refresh_rate(self):
+        try:
+            settings = win32api.EnumDisplaySettings(None, win32con.ENUM_CURRENT_SETTINGS)
+            return settings.DisplayFrequency if settings.DisplayFrequency > 1 else 60
+        except Exception:
+            return 60
+
+    def wait_for_vblank(self):
+        try:
+            return ctypes.windll.dwmapi.DwmFlush() == 0
+        except Exception:
+            return False
+
+    def create_event_watcher(self):
+        from .window_events import WinEventWatcher
+        return WinEventWatcher()
+
+    def create_cursor_source(self):
+        from .edge_detector import HybridCursorSource
+        # 每次调用时查找方法，开启统计后安装的计时包装才会生效
+        return HybridCursorSource(lambda: self.get_cursor_pos())
+
+    def create_virtual_desktops(self):
+        from .virtual_desktops import Win32VirtualDesktops
+        return Win32VirtualDesktops()
+
+    def get_modifier_state(self):
+        state = 0
+        for vk, modifier in MODIFIER_VKS:
+            if self.user32.GetAsyncKeyState(vk) & 0x8000:
+                state |= modifier
+        return state
+
+    def create_keyboard_listener(self, on_press, on_release):
+        from pynput import keyboard
+        return keyboard.Listener(on_press=on_press, on_release=on_release)
+
+    def create_command_listener(self, on_connection, address=None):
+        from .ipc_transport import NamedPipeListener, PIPE_NAME
+        return NamedPipeListener(on_connection, address or PIPE_NAME)
@@ -0,0 +1,146 @@
+class DeferPosBackend:
+    """窗口定位后端接口
+
+    begin/defer/end 对应一次批量提交，move 用于单个窗口的直接移动。
+    """
+
+    def begin(self, count):
+        """开始一批移动，返回批次句柄"""
+        raise NotImplementedError
+
+    def defer(self, batch, hwnd, x, y):
+        """向批次中加入一次移动，返回新的批次句柄"""
+        raise NotImplementedError
+
+    def end(self, batch):
+        """一次性提交整批移动"""
+        raise NotImplementedError
+
+    def move(self, hwnd, x, y):
+        """直接移动单个窗口"""
+        raise NotImplementedError
+
+
+class Win32DeferPosBackend(DeferPosBackend):
+    """基于 BeginDeferWindowPos/DeferWindowPos/EndDeferWindowPos 的后端"""
+
+    def __init__(self):
+        import win32gui
+        import win32con
+
+        self.win32gui = win32gui
+        self.insert_after = win32con.HWND_TOP
+        self.flags = win32con.SWP_NOSIZE
+
+    def begin(self, count):
+        return self.win32gui.BeginDeferWindowPos(count)
+
+    def defer(self, batch, hwnd, x, y):
+        return self.win32gui.DeferWindowPos(batch, hwnd, self.insert_after, x, y, 0, 0, self.flags)
+
+    def end(self, batch):
+        self.win32gui.EndDeferWindowPos(batch)
+
+    def move(self, hwnd, x, y):
+        self.win32gui.SetWindowPos(hwnd, self.insert_after, x, y, 0, 0, self.flags)
+
+
+class RecordingDeferPosBackend(DeferPosBackend):
+    """记录所有调用的假后端，用于验证批处理行为"""
+
+    def __init__(self, fail_hwnds=()):
+        self.calls = []
+        self.fail_hwnds = set(fail_hwnds)
+        self.next_batch = 0
+
+    def begin(self, count):
+        self.next_batch += 1
+        self.calls.append(('begin', count))
+        return self.next_batch
+
+    def defer(self, batch, hwnd, x, y):
+        if hwnd in self.fail_hwnds:
+            raise OSError(f"invalid window {hwnd}")
+        self.calls.append(('defer', hwnd, x, y))
+        return batch
+
+    def end(self, batch):
+        self.calls.append(('end',))
+
+    def move(self, hwnd, x, y):
+        if hwnd in self.fail_hwnds:
+            raise OSError(f"invalid window {hwnd}")
+        self.calls.append(('move', hwnd, x, y))
+
+
+class WindowPosBatch:
+    """一帧内的窗口移动批次
+
+    同一窗口多次 move 只保留最后一次；目标与上次提交位置相同的移动会被丢弃。
+    给出 geometry_cache 时提交前更新其中缓存的位置，移动失败的窗口丢弃缓存。
+    可作为上下文管理器使用，退出时自动提交。
+    """
+
+    def __init__(self, backend, committed_positions, geometry_cache=None):
+        self.backend = backend
+        self.committed_positions = committed_positions
+        self.geometry_cache = geometry_cache
+        self.pending = {}
+        self.dropped = 0
+
+    def move(self, hwnd, x, y):
+        """登记一次移动"""
+        self.pending[hwnd] = (x, y)
+
+    def commit(self):
+        """提交所有移动，返回 {hwnd: 异常} 形式的失败记录"""
+        moves = []
+        for hwnd, pos in self.pending.items():
+            if self.committed_positions.get(hwnd) == pos:
+                self.dropped += 1
+            else:
+                moves.append((hwnd, pos))
+        self.pending = {}
+
+        if not moves:
+            return {}
+        if self.geometry_cache is not None:
+            for hwnd, (x, y) in moves:
+                self.geometry_cache.moved(hwnd, x, y)
+        if len(moves) == 1:
+            return self.move_each(moves)
+
+        try:
+            batch = self.backend.begin(len(moves))
+            for hwnd, (x, y) in moves:
+                batch = self.backend.defer(batch, hwnd, x, y)
+            self.backend.end(batch)
+        except Exception:
+            # 批次中任一窗口失效都会导致整批失败，退回逐个移动以隔离失败的窗口
+            return self.move_each(moves)
+
+        for hwnd, pos in moves:
+            self.committed_positions[hwnd] = pos
+        return {}
+
+    def move_each(self, moves):
+        """逐个移动窗口"""
+        errors = {}
+        for hwnd, (x, y) in moves:
+            try:
+                self.backend.move(hwnd, x, y)
+                self.committed_positions[hwnd] = (x, y)
+            except Exception as e:
+                self.committed_positions.pop(hwnd, None)
+                if self.geometry_cache is not None:
+                    self.geometry_cache.invalidate(hwnd)
+                errors[hwnd] = e
+        return errors
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        return False
@@ -0,0 +1,192 @@
+import ctypes
+import threading
+from ctypes import wintypes
+
+EVENT_OBJECT_DESTROY = 0x8001
+EVENT_OBJECT_SHOW = 0x8002
+EVENT_OBJECT_HIDE = 0x8003
+EVENT_OBJECT_LOCATIONCHANGE = 0x800B
+EVENT_OBJECT_NAMECHANGE = 0x800C
+# 窗口被 DWM 隐藏/取消隐藏（包括切换虚拟桌面、把窗口移到其他桌面时由 shell 发出）
+EVENT_OBJECT_CLOAKED = 0x8017
+EVENT_OBJECT_UNCLOAKED = 0x8018
+
+WINEVENT_OUTOFCONTEXT = 0x0000
+OBJID_WINDOW = 0
+CHILDID_SELF = 0
+WM_QUIT = 0x0012
+WM_APP = 0x8000
+# 发给监听线程的挂起/恢复钩子请求
+WM_APP_PAUSE = WM_APP + 1
+WM_APP_RESUME = WM_APP + 2
+WM_SETTINGCHANGE = 0x001A
+WM_DISPLAYCHANGE = 0x007E
+SPI_SETWORKAREA = 0x002F
+
+# 显示器配置或工作区变化（由隐藏窗口收到的广播消息转换而来，hwnd 为 None）
+EVENT_DISPLAY_CHANGE = 'display_change'
+
+# 需要监听的事件区间 (min, max)
+HOOKED_RANGES = (
+    (EVENT_OBJECT_DESTROY, EVENT_OBJECT_HIDE),
+    (EVENT_OBJECT_LOCATIONCHANGE, EVENT_OBJECT_NAMECHANGE),
+    (EVENT_OBJECT_CLOAKED, EVENT_OBJECT_UNCLOAKED),
+)
+
+
+class WinEventWatcher:
+    """WinEvent 通知监听线程
+
+    用 SetWinEventHook 监听窗口的位置变化、标题变化、销毁、隐藏和 DWM 隐藏事件，
+    只把顶层窗口对象的事件转发给监听者 callback(event, hwnd)。
+    同一线程上还有一个不可见的顶层窗口接收显示器变化广播，转发为 EVENT_DISPLAY_CHANGE。
+    钩子是全局的，任何窗口移动都会唤醒本线程；没有需要跟踪的窗口时用 pause 卸载钩子，
+    显示器变化广播不受影响。
+    """
+
+    def __init__(self):
+        self.listeners = []
+        self.thread = None
+        self.thread_id = None
+        self.hooks = []
+        self.message_window = None
+        self.started = threading.Event()
+        self.active = False
+        self.paused = False
+        self.resumed = threading.Event()
+        self._proc = None
+
+    def add_listener(self, callback):
+        """注册事件回调 callback(event, hwnd)"""
+        self.listeners.append(callback)
+
+    def start(self):
+        """启动监听线程，返回钩子是否安装成功"""
+        if self.thread is not None:
+            return self.active
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+        self.started.wait(2)
+        return self.active
+
+    def stop(self):
+        """停止监听线程"""
+        if self.thread_id is not None:
+            ctypes.windll.user32.PostThreadMessageW(self.thread_id, WM_QUIT, 0, 0)
+
+    def pause(self):
+        """卸载钩子，停止接收窗口事件"""
+        if self.thread_id is not None and self.active and not self.paused:
+            self.paused = True
+            ctypes.windll.user32.PostThreadMessageW(self.thread_id, WM_APP_PAUSE, 0, 0)
+
+    def resume(self):
+        """重新安装钩子，返回钩子是否可用"""
+        if not self.paused:
+            return self.active
+        self.resumed.clear()
+        self.paused = False
+        ctypes.windll.user32.PostThreadMessageW(self.thread_id, WM_APP_RESUME, 0, 0)
+        self.resumed.wait(1)
+        return self.active and self.resumed.is_set()
+
+    def run(self):
+        """安装钩子并运行消息循环，钩子回调在本线程上执行
+
+        钩子安装失败时窗口事件不可用（调用方不启用依赖通知的缓存），但仍创建接收显示器变化广播的窗口
+        并运行消息循环，显示器配置变化后照常重建拓扑。
+        """
+        user32 = ctypes.windll.user32
+        proc_type = ctypes.WINFUNCTYPE(
+            None, wintypes.HANDLE, wintypes.DWORD, wintypes.HWND,
+            wintypes.LONG, wintypes.LONG, wintypes.DWORD, wintypes.DWORD)
+        user32.SetWinEventHook.restype = wintypes.HANDLE
+        self._proc = proc_type(self.on_win_event)
+        try:
+            self.thread_id = ctypes.windll.kernel32.GetCurrentThreadId()
+            self.active = self.hook()
+        except Exception as e:
+            print(f"Error installing WinEvent hooks: {e}")
+            self.active = False
+        finally:
+            self.started.set()
+
+        if not self.active:
+            self.unhook()
+
+        try:
+            self.create_message_window()
+        except Exception as e:
+            print(f"Error creating display watcher window: {e}")
+
+        msg = wintypes.MSG()
+        while user32.GetMessageW(ctypes.byref(msg), None, 0, 0) > 0:
+            if msg.message == WM_APP_PAUSE:
+                self.unhook()
+                continue
+            if msg.message == WM_APP_RESUME:
+                # 钩子必须在运行消息循环的本线程上安装
+                if not self.hooks:
+                    self.active = self.hook()
+                self.resumed.set()
+                continue
+            user32.TranslateMessage(ctypes.byref(msg))
+            user32.DispatchMessageW(ctypes.byref(msg))
+
+        self.active = False
+        self.unhook()
+
+    def create_message_window(self):
+        """创建接收 WM_DISPLAYCHANGE/WM_SETTINGCHANGE 广播的不可见顶层窗口"""
+        import win32gui
+
+        window_class = win32gui.WNDCLASS()
+        window_class.lpszClassName = 'WindowControllerDisplayWatcher'
+        window_class.lpfnWndProc = {
+            WM_DISPLAYCHANGE: self.on_display_message,
+            WM_SETTINGCHANGE: self.on_display_message,
+        }
+        window_class.hInstance = win32gui.GetModuleHandle(None)
+        atom = win32gui.RegisterClass(window_class)
+        self.message_window = win32gui.CreateWindow(
+            atom, 'WindowControllerDisplayWatcher', 0, 0, 0, 0, 0, 0, 0,
+            window_class.hInstance, None)
+
+    def on_display_message(self, hwnd, message, wparam, lparam):
+        """显示器配置或工作区变化"""
+        if message == WM_DISPLAYCHANGE or wparam == SPI_SETWORKAREA:
+            self.emit(EVENT_DISPLAY_CHANGE, None)
+        return 0
+
+    def hook(self):
+        """安装钩子，返回是否全部安装成功"""
+        user32 = ctypes.windll.user32
+        for event_min, event_max in HOOKED_RANGES:
+            hook = user32.SetWinEventHook(
+                event_min, event_max, None, self._proc, 0, 0, WINEVENT_OUTOFCONTEXT)
+            if hook:
+                self.hooks.append(hook)
+        if len(self.hooks) != len(HOOKED_RANGES):
+            self.unhook()
+            return False
+        return True
+
+    def unhook(self):
+        """卸载所有钩子"""
+        for hook in self.hooks:
+            ctypes.windll.user32.UnhookWinEvent(hook)
+        self.hooks = []
+
+    def on_win_event(self, hook, event, hwnd, id_object, id_child, thread_id, timestamp):
+        """钩子回调，只转发顶层窗口对象的事件"""
+        if id_object != OBJID_WINDOW or id_child != CHILDID_SELF or not hwnd:
+            return
+        self.emit(event, hwnd)
+
+    def emit(self, event, hwnd):
+        """分发事件"""
+        for callback in self.listeners:
+            try:
+                callback(event, hwnd)
+            except Exception as e:
+                print(f"Error in WinEvent listener: {e}")
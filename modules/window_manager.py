@@ -1,73 +1,242 @@
-import win32gui
-import win32con
-import win32api
-import ctypes
-from ctypes import wintypes, POINTER
-import threading
 import time
-import win32process
+
+from .window_batch import WindowPosBatch
+from .geometry_cache import GeometryCache
+from .wakeup_counter import WakeupCounter
+from .metrics import Metrics
+from .window_state import WindowStateStore
+from .window_state_machine import WindowStateMachine
+from .foreground_activator import ForegroundActivator
+from .hide_strategies import HideStrategies, STRATEGY_OFFSCREEN
+from .window_rules import WindowRules
+from .virtual_desktops import DesktopMembership
+from .window_events import (EVENT_OBJECT_DESTROY, EVENT_OBJECT_HIDE, EVENT_OBJECT_LOCATIONCHANGE,
+                            EVENT_OBJECT_NAMECHANGE, EVENT_OBJECT_CLOAKED, EVENT_OBJECT_UNCLOAKED,
+                            EVENT_DISPLAY_CHANGE)
+from .monitor_topology import MonitorTopology, STACKING_TILED
 
 class WindowManager:
-    def __init__(self):
-        self.user32 = ctypes.windll.user32
-        self.screen_width = win32api.GetSystemMetrics(0)
-        self.screen_height = win32api.GetSystemMetrics(1)
-        
-        # 维护隐藏窗口字典
-        self.hidden_windows = {
-            'left': None,
-            'right': None,
-            'top': None,
-            'bottom': None
-        }
-        self.original_positions = {}
+    def __init__(self, backend=None, journal=None):
+        if backend is None:
+            from .win32_backend import Win32Backend
+            backend = Win32Backend()
+        # 所有系统调用都经由桌面后端完成
+        self.backend = backend
         self.visible_part = 10
+        self.edge_trigger_size = 5
+        
+        # 多显示器拓扑，只在显示器配置变化时重建
+        self.topology = MonitorTopology(self.enumerate_monitors(), self.edge_trigger_size)
+        self.topology_listeners = []
         
-        # 初始化临时显示窗口的集合和位置字典
-        self.shown_windows = set()
-        self.window_positions = {}
+        # 隐藏窗口的全部状态（叠放栈、反向索引、原始位置、临时显示位置），读取时使用不可变快照
+        self.state = WindowStateStore()
+        # 隐藏窗口的状态转换（临时显示、移回、恢复等）
+        self.transitions = WindowStateMachine(self.state)
+        # 窗口被销毁时的回调 callback(hwnd, WindowState)，运行在事件监听线程上
+        self.destroy_listeners = []
+        # 隐藏/恢复记录写入日志（HiddenWindowJournal），程序退出或崩溃后下次启动时据此恢复窗口
+        self.journal = journal
+        # 叠放方式：'tiled' 沿边平铺，'cascade' 层叠错开 cascade_step 像素
+        self.stacking = STACKING_TILED
+        self.cascade_step = 40
+        
+        # 每个窗口最后一次提交的位置，用于批量移动和丢弃无效移动；收到位置变化通知后移到 settled_positions，
+        # 窗口可能已被其他程序移走，下一次移动不能当作重复移动丢弃
+        self.committed_positions = {}
+        self.settled_positions = {}
+        self.refresh_rate = None
+        
+        # 被跟踪窗口的几何缓存，由 WinEvent 通知失效
+        self.geometry_cache = GeometryCache()
+        self.window_events = self.backend.create_event_watcher()
+        # 各后台线程的唤醒次数
+        self.wakeups = WakeupCounter()
+        # 热路径性能统计，默认关闭
+        self.metrics = Metrics()
+        # 分级前台激活，按进程记住有效的激活方式
+        self.activator = ForegroundActivator(self.backend)
+        # 隐藏方式（移到屏幕外/DWM 隐藏/最小化），窗口使用哪一种由窗口规则的 strategy 设置决定
+        self.hide_strategies = HideStrategies(self)
+        # 按进程名、窗口类名、标题匹配的窗口规则（从不隐藏、边条宽度、动画、隐藏方式）
+        self.rules = WindowRules(self.backend)
+        # 当前虚拟桌面和窗口所在桌面的缓存，隐藏窗口的槽位按桌面区分
+        self.desktops = DesktopMembership(self.backend.create_virtual_desktops())
+        # 可能切换了虚拟桌面或有窗口被移到其他桌面时的回调 callback(hwnd)，运行在事件监听线程上
+        self.desktop_listeners = []
+        # 没有隐藏窗口时窗口事件监听挂起
+        self.tracking_parked = False
+        self.window_events.add_listener(self.on_win_event)
+
+    def start(self):
+        """启动窗口事件监听，成功后才启用几何缓存"""
+        available = self.window_events.start()
+        if not available:
+            self.desktops.suspend()
+        if self.tracking_parked:
+            self.window_events.pause()
+        else:
+            self.geometry_cache.enabled = available
+
+    def stop(self):
+        """停止窗口事件监听，关闭日志"""
+        self.geometry_cache.enabled = False
+        self.window_events.stop()
+        if self.journal is not None:
+            self.journal.close()
+
+    def park_tracking(self):
+        """没有需要跟踪的窗口时挂起窗口事件监听，几何信息改为直接读取"""
+        self.tracking_parked = True
+        self.geometry_cache.enabled = False
+        self.window_events.pause()
+        self.rules.suspend()
+        self.desktops.suspend()
+
+    def resume_tracking(self):
+        """恢复窗口事件监听，钩子可用时重新启用几何缓存"""
+        self.tracking_parked = False
+        self.geometry_cache.enabled = self.window_events.resume()
+        self.rules.resume()
+        if self.geometry_cache.enabled:
+            self.desktops.resume()
+
+    def on_win_event(self, event, hwnd):
+        """窗口事件回调，运行在事件监听线程上"""
+        self.wakeups.tick('win_event')
+        if event == EVENT_OBJECT_DESTROY:
+            self.geometry_cache.invalidate(hwnd, destroyed=True)
+            self.committed_positions.pop(hwnd, None)
+            self.settled_positions.pop(hwnd, None)
+            self.activator.forget(hwnd)
+            self.rules.forget(hwnd)
+            self.desktops.forget(hwnd)
+            state = self.state.snapshot.windows.get(hwnd)
+            if state is not None:
+                self.purge_window(hwnd, state)
+        elif event in (EVENT_OBJECT_LOCATIONCHANGE, EVENT_OBJECT_HIDE):
+            self.geometry_cache.invalidate(hwnd)
+            position = self.committed_positions.pop(hwnd, None)
+            if position is not None:
+                self.settled_positions[hwnd] = position
+        elif event == EVENT_OBJECT_NAMECHANGE:
+            self.rules.forget(hwnd)
+        elif event in (EVENT_OBJECT_CLOAKED, EVENT_OBJECT_UNCLOAKED):
+            self.desktops.invalidate(hwnd)
+            for callback in self.desktop_listeners:
+                try:
+                    callback(hwnd)
+                except Exception as e:
+                    print(f"Error in desktop listener: {e}")
+        elif event == EVENT_DISPLAY_CHANGE:
+            self.rebuild_topology()
+
+    def add_destroy_listener(self, callback):
+        """注册隐藏窗口被销毁时的回调 callback(hwnd, WindowState)"""
+        self.destroy_listeners.append(callback)
+
+    def add_desktop_listener(self, callback):
+        """注册虚拟桌面可能变化时的回调 callback(hwnd)"""
+        self.desktop_listeners.append(callback)
+
+    def current_desktop(self):
+        """当前虚拟桌面（缓存），不支持虚拟桌面时为 None"""
+        return self.desktops.current_desktop()
+
+    def refresh_desktops(self):
+        """收不到窗口事件通知时丢弃虚拟桌面缓存，在处理快捷键前调用"""
+        self.desktops.expire()
+
+    def window_desktop(self, hwnd):
+        """窗口所在的虚拟桌面（缓存），固定在所有桌面上或未知时为 None
+
+        当前桌面未知时不区分桌面，所有窗口都按 None 处理。
+        """
+        if self.current_desktop() is None:
+            return None
+        return self.desktops.window_desktop(hwnd)
+
+    def purge_window(self, hwnd, state):
+        """隐藏窗口被销毁：立即移除它的状态，再通知监听者整理其余窗口"""
+        if self.remove_hidden_window(hwnd) is None:
+            return
+        self.forget_window(hwnd)
+        for callback in self.destroy_listeners:
+            try:
+                callback(hwnd, state)
+            except Exception as e:
+                print(f"Error in destroy listener: {e}")
+
+    def enumerate_monitors(self):
+        """枚举所有显示器及其工作区和 DPI"""
+        return self.backend.enumerate_monitors()
+
+    def add_topology_listener(self, callback):
+        """注册显示器拓扑变化回调 callback(topology)"""
+        self.topology_listeners.append(callback)
+
+    def rebuild_topology(self):
+        """重新枚举显示器并通知监听者"""
+        try:
+            topology = MonitorTopology(self.enumerate_monitors(), self.edge_trigger_size)
+        except Exception as e:
+            print(f"Error rebuilding monitor topology: {e}")
+            return
+        self.topology = topology
+        for callback in self.topology_listeners:
+            try:
+                callback(topology)
+            except Exception as e:
+                print(f"Error in topology listener: {e}")
 
     def is_window_valid(self, hwnd):
         """检查窗口是否有效"""
         try:
-            return win32gui.IsWindow(hwnd)
+            return self.geometry_cache.is_valid(hwnd, self.backend.is_window)
         except:
             return False
 
     def force_foreground_window(self, hwnd):
-        """强制将窗口设置为前台窗口"""
+        """将窗口设置为前台窗口，返回成功的激活方式（见 ForegroundActivator）"""
+        started = time.perf_counter() if self.metrics.enabled else None
         try:
-            # 获取当前前台窗口信息
-            foreground_hwnd = self.user32.GetForegroundWindow()
-            foreground_thread = self.user32.GetWindowThreadProcessId(foreground_hwnd, None)
-            target_thread = self.user32.GetWindowThreadProcessId(hwnd, None)
-            current_thread = win32api.GetCurrentThreadId()
-            
-            # 将线程输入状态关联
-            self.user32.AttachThreadInput(target_thread, foreground_thread, True)
-            self.user32.AttachThreadInput(current_thread, foreground_thread, True)
-            
-            # 激活窗口
-            self.user32.ShowWindow(hwnd, win32con.SW_RESTORE)
-            self.user32.SetWindowPos(hwnd, win32con.HWND_TOPMOST, 0, 0, 0, 0, 
-                                   win32con.SWP_NOMOVE | win32con.SWP_NOSIZE | win32con.SWP_SHOWWINDOW)
-            self.user32.SetForegroundWindow(hwnd)
-            self.user32.BringWindowToTop(hwnd)
-            
-            # 恢复窗口Z序
-            self.user32.SetWindowPos(hwnd, win32con.HWND_NOTOPMOST, 0, 0, 0, 0,
-                                   win32con.SWP_NOMOVE | win32con.SWP_NOSIZE | win32con.SWP_SHOWWINDOW)
-            
-            # 解除线程输入状态关联
-            self.user32.AttachThreadInput(current_thread, foreground_thread, False)
-            self.user32.AttachThreadInput(target_thread, foreground_thread, False)
-            
+            return self.activator.activate(hwnd)
         except Exception as e:
             print(f"Error forcing foreground window: {e}")
+            return None
+        finally:
+            if started is not None:
+                self.metrics.observe('foreground_activation', started, hwnd)
+
+    def get_refresh_rate(self):
+        """获取显示器刷新率（Hz）"""
+        if self.refresh_rate is None:
+            self.refresh_rate = self.backend.get_refresh_rate()
+        return self.refresh_rate
+
+    def wait_for_vblank(self):
+        """等待下一次桌面合成（与显示器刷新对齐），不可用时返回 False"""
+        return self.backend.wait_for_vblank()
+
+    def get_foreground_window(self):
+        """获取当前前台窗口"""
+        return self.backend.get_foreground_window()
+
+    def get_window_text(self, hwnd):
+        """获取窗口标题"""
+        return self.backend.get_window_text(hwnd)
+
+    def get_cursor_pos(self):
+        """获取光标位置"""
+        return self.backend.get_cursor_pos()
 
     def get_window_rect(self, hwnd):
-        """获取窗口位置和大小"""
-        rect = win32gui.GetWindowRect(hwnd)
+        """获取窗口位置和大小（被跟踪的窗口优先读缓存，返回值不要修改）"""
+        return self.geometry_cache.get_rect(hwnd, self.read_window_rect)
+
+    def read_window_rect(self, hwnd):
+        """从系统读取窗口位置和大小"""
+        rect = self.backend.get_window_rect(hwnd)
         return {
             'x': rect[0],
             'y': rect[1],
@@ -76,78 +245,223 @@ class WindowManager:
         }
 
     def set_window_pos(self, hwnd, x, y):
-        """设置窗口位置"""
-        win32gui.SetWindowPos(hwnd, win32con.HWND_TOP, x, y, 
-                            0, 0, win32con.SWP_NOSIZE)
-
-    def calculate_hidden_position(self, direction, rect):
-        """计算窗口隐藏位置"""
-        if direction == 'right':
-            return self.screen_width - self.visible_part, rect['y']
-        elif direction == 'left':
-            return -rect['width'] + self.visible_part, rect['y']
-        elif direction == 'top':
-            return rect['x'], -rect['height'] + self.visible_part
-        else:  # bottom
-            return rect['x'], self.screen_height - self.visible_part
+        """设置窗口位置，同时更新几何缓存（位置变化通知是异步的）"""
+        self.geometry_cache.moved(hwnd, x, y)
+        try:
+            self.backend.move(hwnd, x, y)
+        except Exception:
+            self.geometry_cache.invalidate(hwnd)
+            raise
+        self.committed_positions[hwnd] = (x, y)
+
+    def begin_batch(self):
+        """开始一批窗口移动
+
+        用法：
+            with window_manager.begin_batch() as batch:
+                batch.move(hwnd, x, y)
+        退出时统一提交，多个窗口通过 DeferWindowPos 一次完成。
+        """
+        return WindowPosBatch(self.backend, self.committed_positions, self.geometry_cache)
+
+    def resolve_slot(self, direction, rect, desktop=None):
+        """获取窗口向指定方向隐藏时使用的槽位 (显示器, 方向, 虚拟桌面)，desktop 为 None 时使用当前桌面"""
+        segment = self.topology.resolve_segment(direction, rect)
+        if segment is None:
+            return None
+        return segment.slot + (desktop or self.current_desktop(),)
+
+    def desktop_slot(self, slot):
+        """拓扑中的槽位 (显示器, 方向) 在当前虚拟桌面上对应的隐藏槽位"""
+        return slot + (self.current_desktop(),)
+
+    def calculate_hidden_position(self, slot, rect, index=0, count=1, visible_part=None):
+        """计算窗口隐藏位置，visible_part 为 None 时使用全局的边条宽度"""
+        return self.topology.calculate_hidden_position(
+            slot, rect, visible_part or self.visible_part, index, count, self.stacking, self.cascade_step)
+
+    def get_hidden_position(self, hwnd, rect):
+        """按窗口在所在边缘中的叠放序号和窗口规则的边条宽度计算隐藏位置"""
+        snapshot = self.state.snapshot
+        location = snapshot.index[hwnd]
+        slot, index = location[:3], location[3]
+        return self.calculate_hidden_position(slot, rect, index, len(snapshot.stacks[slot]),
+                                              self.rules.profile(hwnd).visible_part)
+
+    def set_stacking(self, stacking):
+        """设置同一边缘多个窗口的叠放方式"""
+        self.stacking = stacking
+
+    @property
+    def hidden_windows(self):
+        """当前快照中的叠放栈 {(显示器, 方向, 虚拟桌面): ((hwnd, 标题), ...)}（只读）"""
+        return self.state.snapshot.stacks
+
+    @property
+    def hidden_index(self):
+        """当前快照中的反向索引 {hwnd: (显示器, 方向, 虚拟桌面, 序号)}（只读）"""
+        return self.state.snapshot.index
 
     def get_hidden_windows(self):
-        """获取隐藏窗口"""
-        return self.hidden_windows
-
-    def set_hidden_window(self, direction, window_info):
-        """设置隐藏窗口"""
-        self.hidden_windows[direction] = window_info
-
-    def show_window_temp(self, direction, hwnd, rect):
-        """临时显示窗口"""
-        if hwnd not in self.shown_windows and self.is_window_valid(hwnd):
-            end_x, end_y = self.get_temp_show_position(direction, rect)
-            
-            # 先设置窗口位置
-            self.set_window_pos(hwnd, end_x, end_y)
-            
-            # 确保窗口可见
-            win32gui.ShowWindow(hwnd, win32con.SW_RESTORE)
-            
-            # 强制激活窗口
-            self.force_foreground_window(hwnd)
-            
-            self.shown_windows.add(hwnd)
-            self.window_positions[hwnd] = (end_x, end_y)
-
-    def hide_window_temp(self, direction, hwnd, rect, mouse_x, mouse_y):
-        """临时隐藏窗口"""
-        if not (rect['x'] <= mouse_x <= rect['x'] + rect['width'] and 
-                rect['y'] <= mouse_y <= rect['y'] + rect['height']):
-            end_x, end_y = self.calculate_hidden_position(direction, rect)
-            
-            if self.is_window_valid(hwnd):
-                # 先设置窗口位置
-                self.set_window_pos(hwnd, end_x, end_y)
-                
-                # 验证窗口是否成功隐藏
-                new_rect = self.get_window_rect(hwnd)
-                if abs(new_rect['x'] - end_x) <= 5 and abs(new_rect['y'] - end_y) <= 5:
-                    self.shown_windows.remove(hwnd)
-                    self.window_positions.pop(hwnd, None)
-                else:
-                    print(f"窗口 {win32gui.GetWindowText(hwnd)} 隐藏失败")
-                    self.cleanup_window(direction, hwnd)
-
-    def cleanup_window(self, direction, hwnd):
-        """清理窗口相关数据"""
-        self.hidden_windows[direction] = None
-        self.shown_windows.discard(hwnd)
-        self.window_positions.pop(hwnd, None)
-
-    def get_temp_show_position(self, direction, rect):
+        """获取隐藏窗口（只读快照）"""
+        return self.state.snapshot.stacks
+
+    def get_stack(self, slot):
+        """获取槽位中按隐藏顺序排列的窗口列表"""
+        return self.state.snapshot.stacks.get(slot, ())
+
+    def find_hidden(self, hwnd):
+        """查找隐藏窗口所在的 (显示器, 方向, 虚拟桌面, 序号)，不存在时返回 None"""
+        return self.state.snapshot.index.get(hwnd)
+
+    def get_window_state(self, hwnd):
+        """隐藏窗口的 WindowState，不存在时返回 None"""
+        return self.state.snapshot.windows.get(hwnd)
+
+    def is_shown(self, hwnd):
+        """隐藏窗口是否处于临时显示状态"""
+        return hwnd in self.state.snapshot.shown
+
+    def get_shown_position(self, hwnd):
+        """临时显示窗口的显示位置，未临时显示时返回 None"""
+        return self.state.snapshot.shown.get(hwnd)
+
+    def transition(self, hwnd, event, shown_position=None):
+        """按状态转换表推进隐藏窗口的状态，返回新的 WindowState；请求不改变任何状态时返回 None"""
+        return self.transitions.request(hwnd, event, shown_position)
+
+    def get_phase(self, hwnd):
+        """隐藏窗口当前的状态，不在叠放中时返回 None"""
+        return self.transitions.phase(hwnd)
+
+    def get_strategy(self, hwnd):
+        """隐藏窗口使用的隐藏方式，不在叠放中时返回默认的移到屏幕外"""
+        state = self.state.snapshot.windows.get(hwnd)
+        return self.hide_strategies.get(state.strategy if state is not None else STRATEGY_OFFSCREEN)
+
+    def push_hidden_window(self, slot, window_info, original_position=None, strategy=STRATEGY_OFFSCREEN):
+        """把窗口加入槽位的叠放栈顶，original_position 为恢复显示时要回到的位置，strategy 为隐藏方式"""
+        hwnd, title = window_info
+        if original_position is not None:
+            original_position = tuple(original_position)
+        self.state.push(slot, hwnd, title, original_position, strategy)
+        self.geometry_cache.track(hwnd)
+        if self.journal is not None and original_position is not None:
+            self.journal.record_hide(hwnd, slot, title, original_position, strategy)
+
+    def move_hidden_window(self, hwnd, slot):
+        """把隐藏窗口移到另一个槽位（例如窗口被移到了其他虚拟桌面），返回原槽位"""
+        previous = self.state.snapshot.windows.get(hwnd)
+        state = self.state.move(hwnd, slot)
+        if state is None:
+            return None
+        if self.journal is not None and state.original_position is not None:
+            self.journal.record_hide(hwnd, slot, state.title, state.original_position, state.strategy)
+        return previous.slot
+
+    def remove_hidden_window(self, hwnd):
+        """从所在槽位移除窗口（释放隐藏方式占用的资源），返回原槽位"""
+        state = self.state.remove(hwnd)
+        if state is None:
+            return None
+        self.hide_strategies.get(state.strategy).forget(hwnd)
+        if self.journal is not None:
+            self.journal.record_show(hwnd)
+        return state.slot
+
+    def restore_all_hidden(self):
+        """把所有隐藏窗口（包括临时显示中的）一次性移回原位置，返回恢复的窗口数"""
+        windows = list(self.state.snapshot.windows.values())
+        restored = 0
+        batch = self.begin_batch()
+        for state in windows:
+            try:
+                if self.is_window_valid(state.hwnd):
+                    strategy = self.hide_strategies.get(state.strategy)
+                    position = state.original_position
+                    if position is None:
+                        position = self.get_restore_position(state.slot, strategy.layout_rect(state.hwnd))
+                    # 先恢复可见（最小化的窗口还原后才能移动）
+                    strategy.forget(state.hwnd)
+                    batch.move(state.hwnd, *position)
+                    restored += 1
+            except Exception as e:
+                print(f"Error restoring window: {e}")
+        errors = batch.commit()
+        for state in windows:
+            self.remove_hidden_window(state.hwnd)
+            self.forget_window(state.hwnd)
+        if self.journal is not None:
+            self.journal.compact()
+        return restored - len(errors)
+
+    def attach_journal(self, journal, restore=True):
+        """接上隐藏日志：先按日志处理上次运行时留下的窗口，再补记接上之前已隐藏的窗口，返回处理的窗口数
+
+        启动时快捷键先生效，日志随后才读取，期间用快捷键隐藏的窗口在这里补记。
+        """
+        recovered = self.recover_hidden_windows(restore, journal)
+        self.journal = journal
+        for state in list(self.state.snapshot.windows.values()):
+            if state.original_position is not None and state.hwnd not in journal.entries:
+                journal.record_hide(state.hwnd, state.slot, state.title, state.original_position, state.strategy)
+        return recovered
+
+    def recover_hidden_windows(self, restore=True, journal=None):
+        """按日志（默认为已接上的日志）处理上次运行时留下的隐藏窗口，返回处理的窗口数
+
+        restore 为 True 时把它们一次性移回原位置；为 False 时重新接管：
+        所在边缘仍存在的窗口重新加入叠放栈，其余的移回原位置。
+        窗口句柄可能已被系统复用，只处理标题与记录一致的窗口。
+        """
+        journal = journal or self.journal
+        if journal is None:
+            return 0
+        entries = [entry for entry in journal.load()
+                   if self.backend.is_window(entry.hwnd)
+                   and self.backend.get_window_text(entry.hwnd) == entry.title]
+        batch = self.begin_batch()
+        for entry in entries:
+            # DWM 隐藏/最小化的窗口先恢复可见，重新接管时再按隐藏方式隐藏
+            self.hide_strategies.get(entry.strategy).uncover(entry.hwnd)
+            if not restore and entry.slot[:2] in self.topology.segments_by_slot:
+                self.push_hidden_window(entry.slot, (entry.hwnd, entry.title), entry.original_position,
+                                        entry.strategy)
+            else:
+                batch.move(entry.hwnd, *entry.original_position)
+        batch.commit()
+        # 日志只保留重新接管的窗口
+        journal.retain(self.hidden_index)
+        return len(entries)
+
+    def hidden_window_at(self, slot, x, y):
+        """返回光标在槽位边缘时其下方的隐藏窗口"""
+        stack = self.state.snapshot.stacks.get(slot)
+        if not stack:
+            return None
+        index = self.topology.stack_index_at(slot, x, y, len(stack), self.stacking, self.cascade_step)
+        return stack[index]
+
+    def observe_window_pos(self, hwnd, x, y):
+        """记录实际读到的窗口位置，使已提交位置与窗口真实位置保持一致"""
+        self.committed_positions[hwnd] = (x, y)
+
+    def last_position(self, hwnd):
+        """本程序最后为窗口设置的位置（包括位置变化通知已送达的），没有时返回 None"""
+        position = self.committed_positions.get(hwnd)
+        return position if position is not None else self.settled_positions.get(hwnd)
+
+    def forget_window(self, hwnd):
+        """丢弃窗口的已提交位置记录和几何缓存"""
+        self.committed_positions.pop(hwnd, None)
+        self.settled_positions.pop(hwnd, None)
+        self.geometry_cache.untrack(hwnd)
+
+    def get_temp_show_position(self, slot, rect):
         """获取临时显示位置"""
-        if direction == 'left':
-            return 0, rect['y']
-        elif direction == 'right':
-            return self.screen_width - rect['width'], rect['y']
-        elif direction == 'top':
-            return rect['x'], 0
-        else:  # bottom
-            return rect['x'], self.screen_height - rect['height']
\ No newline at end of file
+        return self.topology.get_temp_show_position(slot, rect)
+
+    def get_restore_position(self, slot, rect):
+        """没有记录原始位置时，窗口恢复到槽位所在显示器的中央"""
+        monitor = self.topology.monitors_by_id.get(slot[0], self.topology.primary)
+        return self.topology.center_position(monitor, rect)
\ No newline at end of file
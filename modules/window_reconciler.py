@@ -0,0 +1,206 @@
+import threading
+import time
+
+from .window_events import EVENT_OBJECT_DESTROY, EVENT_OBJECT_LOCATIONCHANGE
+
+
+class Expectation:
+    """一个窗口的期望位置和校正状态"""
+
+    __slots__ = ('x', 'y', 'failures', 'due')
+
+    def __init__(self, x, y, due):
+        self.x = x
+        self.y = y
+        # 连续校正失败的次数
+        self.failures = 0
+        # 下一次检查的时间，None 表示已到位，等窗口位置变化的通知再检查
+        self.due = due
+
+
+class WindowReconciler:
+    """隐藏窗口位置的校正循环
+
+    记录每个隐藏窗口的期望位置，与实际位置（窗口位置变化通知到达后，经几何缓存读取）比较，
+    只对偏离的窗口发出校正移动，同一轮的校正通过一次批量移动提交。
+    同一窗口连续校正失败时按指数退避（BASE_DELAY、2 倍、4 倍……）再检查，
+    超过 MAX_FAILURES 次后标记为“不配合”，不再校正并通知监听者。
+    检查和校正都在自己的线程上进行，不阻塞调用方；没有待检查的窗口时线程阻塞等待，不产生唤醒。
+    """
+
+    # 位置误差容限（像素）
+    TOLERANCE = 5
+    BASE_DELAY = 0.1
+    MAX_FAILURES = 3
+    # 窗口仍在动画中时的复查间隔（秒）
+    ANIMATING_DELAY = 0.05
+    # 收到位置变化通知后等待窗口稳定的时间（秒）
+    SETTLE_DELAY = 0.05
+
+    def __init__(self, animation_controller):
+        self.animation_controller = animation_controller
+        self.window_manager = animation_controller.window_manager
+        self.expected = {}
+        self.uncooperative = set()
+        self.listeners = []
+        self.condition = threading.Condition()
+        self.running = True
+        self.thread = None
+        # 统计：检查、校正、退避后仍失败的次数
+        self.checks = 0
+        self.corrections = 0
+        self.failures = 0
+        self.window_manager.window_events.add_listener(self.on_win_event)
+
+    def add_listener(self, callback):
+        """注册窗口被标记为不配合时的回调 callback(hwnd)，运行在校正线程上"""
+        self.listeners.append(callback)
+
+    def expect(self, hwnd, x, y):
+        """记录窗口的期望位置，SETTLE_DELAY 后检查一次（批量提交的移动届时已完成）；不配合的窗口忽略"""
+        with self.condition:
+            if hwnd in self.uncooperative:
+                return
+            expectation = self.expected.get(hwnd)
+            if expectation is not None and (expectation.x, expectation.y) == (x, y):
+                if expectation.due is None:
+                    expectation.due = time.monotonic() + self.SETTLE_DELAY
+            else:
+                self.expected[hwnd] = Expectation(x, y, time.monotonic() + self.SETTLE_DELAY)
+            self.ensure_thread()
+            self.condition.notify()
+
+    def release(self, hwnd):
+        """窗口不再需要保持在期望位置（恢复显示、临时显示或被移出叠放）"""
+        with self.condition:
+            self.expected.pop(hwnd, None)
+
+    def forget(self, hwnd):
+        """丢弃窗口的所有记录（窗口已销毁）"""
+        with self.condition:
+            self.expected.pop(hwnd, None)
+            self.uncooperative.discard(hwnd)
+
+    def is_uncooperative(self, hwnd):
+        """窗口是否已被标记为不配合"""
+        return hwnd in self.uncooperative
+
+    def on_win_event(self, event, hwnd):
+        """窗口事件回调：已到位的窗口位置变化时安排一次检查，正在退避的窗口保持原计划"""
+        if event == EVENT_OBJECT_DESTROY:
+            self.forget(hwnd)
+        elif event == EVENT_OBJECT_LOCATIONCHANGE:
+            with self.condition:
+                expectation = self.expected.get(hwnd)
+                if expectation is None or expectation.due is not None:
+                    return
+                expectation.due = time.monotonic() + self.SETTLE_DELAY
+                self.ensure_thread()
+                self.condition.notify()
+
+    def ensure_thread(self):
+        """按需启动校正线程（需持有 condition）"""
+        if self.running and (self.thread is None or not self.thread.is_alive()):
+            self.thread = threading.Thread(target=self.run, daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        """停止校正线程"""
+        with self.condition:
+            self.running = False
+            self.condition.notify()
+
+    def run(self):
+        """校正循环：等到最早的检查时间，取出所有到期的窗口一起检查"""
+        while True:
+            with self.condition:
+                while self.running:
+                    now = time.monotonic()
+                    due = [expectation.due for expectation in self.expected.values()
+                           if expectation.due is not None]
+                    if due and min(due) <= now:
+                        break
+                    self.condition.wait(min(due) - now if due else None)
+                if not self.running:
+                    return
+                batch = []
+                for hwnd, expectation in self.expected.items():
+                    if expectation.due is not None and expectation.due <= now:
+                        expectation.due = None
+                        batch.append((hwnd, expectation))
+            self.window_manager.wakeups.tick('reconcile')
+            try:
+                self.reconcile(batch)
+            except Exception as e:
+                print(f"Error reconciling windows: {e}")
+
+    def reconcile(self, batch):
+        """检查一批窗口的实际位置，对偏离的窗口批量发出校正移动"""
+        window_manager = self.window_manager
+        animation_controller = self.animation_controller
+        retry = []
+        corrections = []
+        for hwnd, expectation in batch:
+            if animation_controller.is_animating(hwnd):
+                retry.append((hwnd, expectation, self.ANIMATING_DELAY))
+                continue
+            try:
+                rect = window_manager.get_window_rect(hwnd)
+            except Exception:
+                # 窗口已失效，由销毁通知清理
+                self.release(hwnd)
+                continue
+            self.checks += 1
+            if (abs(rect['x'] - expectation.x) <= self.TOLERANCE
+                    and abs(rect['y'] - expectation.y) <= self.TOLERANCE):
+                expectation.failures = 0
+                continue
+            corrections.append((hwnd, expectation, rect))
+
+        given_up = []
+        if corrections:
+            moves = window_manager.begin_batch()
+            for hwnd, expectation, rect in corrections:
+                if expectation.failures >= self.MAX_FAILURES:
+                    given_up.append((hwnd, expectation))
+                    continue
+                # 以实际位置为准，避免批次把校正当作重复移动丢弃
+                window_manager.observe_window_pos(hwnd, rect['x'], rect['y'])
+                moves.move(hwnd, expectation.x, expectation.y)
+                expectation.failures += 1
+                retry.append((hwnd, expectation, self.BASE_DELAY * 2 ** (expectation.failures - 1)))
+            self.corrections += len(moves.pending)
+            for hwnd, error in moves.commit().items():
+                print(f"校正窗口位置失败: {error}")
+
+        with self.condition:
+            now = time.monotonic()
+            for hwnd, expectation, delay in retry:
+                # 期间期望位置被更新或撤销时以新的为准
+                if self.expected.get(hwnd) is expectation:
+                    expectation.due = now + delay
+            marked = []
+            for hwnd, expectation in given_up:
+                if self.expected.get(hwnd) is expectation:
+                    del self.expected[hwnd]
+                    self.uncooperative.add(hwnd)
+                    marked.append(hwnd)
+            self.failures += len(marked)
+
+        for hwnd in marked:
+            for callback in self.listeners:
+                try:
+                    callback(hwnd)
+                except Exception as e:
+                    print(f"Error in reconciler listener: {e}")
+
+    def stats(self):
+        """返回统计数据"""
+        with self.condition:
+            return {
+                'expected': len(self.expected),
+                'uncooperative': len(self.uncooperative),
+                'checks': self.checks,
+                'corrections': self.corrections,
+                'given_up': self.failures,
+            }
@@ -0,0 +1,266 @@
+import json
+import os
+import re
+import threading
+
+from .hide_strategies import STRATEGIES
+
+# 匹配键 "进程名\x1f类名\x1f标题" 中的字段分隔符
+SEPARATOR = '\x1f'
+# 规则可以设置的项：从不隐藏 / 隐藏后露出的边条宽度（像素）/ 是否使用动画 / 隐藏方式（见 hide_strategies）
+SETTINGS = {
+    'hide': bool,
+    'visible_part': int,
+    'animate': bool,
+    'strategy': str,
+}
+
+
+def default_rules_path():
+    """默认的规则文件位置（%LOCALAPPDATA%\\WindowController\\rules.json）"""
+    base = os.environ.get('LOCALAPPDATA') or os.path.expanduser('~')
+    return os.path.join(base, 'WindowController', 'rules.json')
+
+
+def glob_to_regex(pattern):
+    """把通配符模式（* 任意个字符，? 一个字符）转换为不跨字段的正则表达式"""
+    parts = []
+    for char in pattern:
+        if char == '*':
+            parts.append(f'[^{SEPARATOR}]*')
+        elif char == '?':
+            parts.append(f'[^{SEPARATOR}]')
+        else:
+            parts.append(re.escape(char))
+    return ''.join(parts)
+
+
+class WindowProfile:
+    """一个窗口适用的设置，None 表示使用全局设置"""
+
+    __slots__ = ('hide', 'visible_part', 'animate', 'strategy', 'rule')
+
+    def __init__(self, hide=True, visible_part=None, animate=None, strategy=None, rule=None):
+        self.hide = hide
+        self.visible_part = visible_part
+        self.animate = animate
+        self.strategy = strategy
+        # 生效的规则序号，没有规则匹配时为 None
+        self.rule = rule
+
+
+DEFAULT_PROFILE = WindowProfile()
+
+
+class WindowRule:
+    """一条规则：进程名、窗口类名、标题的通配符模式（不区分大小写，省略表示任意）和要应用的设置"""
+
+    __slots__ = ('process', 'class_name', 'title', 'settings')
+
+    def __init__(self, process=None, class_name=None, title=None, **settings):
+        for name, value in settings.items():
+            expected = SETTINGS.get(name)
+            if expected is None:
+                raise ValueError(f'unknown rule setting: {name!r}')
+            if not isinstance(value, expected) or (expected is int and isinstance(value, bool)):
+                raise ValueError(f'{name} must be {expected.__name__}')
+        if settings.get('visible_part', 1) < 1:
+            raise ValueError('visible_part must be at least 1')
+        if settings.get('strategy', STRATEGIES[0]) not in STRATEGIES:
+            raise ValueError(f'unknown hide strategy: {settings["strategy"]!r}')
+        self.process = process
+        self.class_name = class_name
+        self.title = title
+        self.settings = settings
+
+    @classmethod
+    def from_dict(cls, data):
+        """从规则文件/命令中的对象创建，类名的键为 "class\""""
+        if not isinstance(data, dict):
+            raise ValueError('rule must be an object')
+        data = dict(data)
+        patterns = {key: data.pop(key, None) for key in ('process', 'class', 'title')}
+        for key, value in patterns.items():
+            if value is not None and not isinstance(value, str):
+                raise ValueError(f'{key} must be a string')
+        return cls(patterns['process'], patterns['class'], patterns['title'], **data)
+
+    def to_dict(self):
+        data = {key: value for key, value in (
+            ('process', self.process), ('class', self.class_name), ('title', self.title)) if value is not None}
+        data.update(self.settings)
+        return data
+
+    def pattern(self):
+        """整条匹配键的正则表达式"""
+        any_field = f'[^{SEPARATOR}]*'
+        return SEPARATOR.join(glob_to_regex(value) if value is not None else any_field
+                              for value in (self.process, self.class_name, self.title))
+
+
+class CompiledRules:
+    """编译后的规则集
+
+    所有规则合并为一个带命名分组的正则表达式，对匹配键只做一次匹配；
+    按规则顺序第一个匹配的规则生效，不匹配时使用默认设置。
+    needs 为至少一条规则限定了的字段，其余字段不需要查询。
+    """
+
+    __slots__ = ('rules', 'profiles', 'matcher', 'needs')
+
+    def __init__(self, rules):
+        self.rules = tuple(rules)
+        self.profiles = [WindowProfile(rule=index, **rule.settings) for index, rule in enumerate(self.rules)]
+        self.needs = frozenset(field for rule in self.rules for field, value in (
+            ('process', rule.process), ('class', rule.class_name), ('title', rule.title)) if value is not None)
+        self.matcher = None
+        if self.rules:
+            self.matcher = re.compile('|'.join(
+                f'(?P<r{index}>{rule.pattern()})' for index, rule in enumerate(self.rules)), re.IGNORECASE)
+
+    def match(self, process, class_name, title):
+        """返回第一个匹配的规则的 WindowProfile"""
+        if self.matcher is None:
+            return DEFAULT_PROFILE
+        key = SEPARATOR.join(value.replace(SEPARATOR, ' ') for value in (process, class_name, title))
+        match = self.matcher.fullmatch(key)
+        if match is None:
+            return DEFAULT_PROFILE
+        return self.profiles[int(match.lastgroup[1:])]
+
+
+class WindowRules:
+    """按进程名、窗口类名、标题匹配的窗口规则，结果按 hwnd 缓存
+
+    规则整体替换时编译一次。每个窗口第一次用到时求值（规则没有限定的字段不查询），之后直接读缓存；
+    窗口标题变化（NAMECHANGE 通知，或调用方传入的标题与求值时不同）、窗口销毁时失效。
+    窗口事件监听挂起期间收不到这些通知：期间涉及标题的缓存只在调用方传入相同标题时使用，
+    恢复监听时丢弃已销毁窗口的缓存。没有规则时不做任何查询。
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.lock = threading.Lock()
+        self.compiled = CompiledRules(())
+        # {hwnd: (求值时的标题（规则不涉及标题时为 None）, WindowProfile, CompiledRules)}
+        self.cache = {}
+        # 是否能收到标题变化和销毁通知
+        self.notified = True
+        # 统计：求值、缓存失效的次数
+        self.evaluations = 0
+        self.invalidations = 0
+
+    def set_rules(self, rules):
+        """整体替换规则（WindowRule 或规则对象的列表），返回规则数；格式错误时抛出 ValueError"""
+        rules = [rule if isinstance(rule, WindowRule) else WindowRule.from_dict(rule) for rule in rules]
+        compiled = CompiledRules(rules)
+        with self.lock:
+            self.compiled = compiled
+            self.cache = {}
+        return len(rules)
+
+    def assign_strategy(self, strategy, process=None, class_name=None):
+        """为进程名、窗口类名（各自一条规则）指定隐藏方式，strategy 为 None 时删除该设置
+
+        已有只按同一字段匹配的规则时修改它，否则在规则末尾追加，不影响前面已匹配到该窗口的规则。
+        """
+        with self.lock:
+            rules = list(self.compiled.rules)
+            for field, value in (('class_name', class_name), ('process', process)):
+                if not value:
+                    continue
+                selector = {'process': None, 'class_name': None, 'title': None, field: value}
+                index = next((index for index, rule in enumerate(rules) if all(
+                    getattr(rule, name) == pattern for name, pattern in selector.items())), None)
+                settings = dict(rules[index].settings) if index is not None else {}
+                settings.pop('strategy', None)
+                if strategy is not None:
+                    settings['strategy'] = strategy
+                rule = WindowRule(selector['process'], selector['class_name'], **settings) if settings else None
+                if index is None:
+                    if rule is not None:
+                        rules.append(rule)
+                elif rule is None:
+                    del rules[index]
+                else:
+                    rules[index] = rule
+            self.compiled = CompiledRules(rules)
+            self.cache = {}
+        return len(rules)
+
+    def load(self, path):
+        """从 JSON 文件读取规则列表，文件不存在时不做任何事，返回规则数"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                rules = json.load(f)
+            if not isinstance(rules, list):
+                raise ValueError('rules file must contain a list')
+            return self.set_rules(rules)
+        except FileNotFoundError:
+            return 0
+        except (OSError, ValueError) as e:
+            print(f"读取窗口规则失败: {e}")
+            return 0
+
+    def rules(self):
+        """当前规则（规则对象的列表）"""
+        return [rule.to_dict() for rule in self.compiled.rules]
+
+    def profile(self, hwnd, title=None):
+        """窗口适用的 WindowProfile；调用方已读取标题时传入 title，标题与缓存时不同则重新求值"""
+        compiled = self.compiled
+        if compiled.matcher is None:
+            return DEFAULT_PROFILE
+        entry = self.cache.get(hwnd)
+        if (entry is not None and entry[2] is compiled
+                and (entry[0] is None or entry[0] == title or (title is None and self.notified))):
+            return entry[1]
+
+        needs = compiled.needs
+        backend = self.backend
+        try:
+            if 'title' in needs:
+                if title is None:
+                    title = backend.get_window_text(hwnd)
+            else:
+                title = None
+            process = backend.get_process_name(hwnd) if 'process' in needs else ''
+            class_name = backend.get_class_name(hwnd) if 'class' in needs else ''
+        except Exception:
+            # 窗口已失效，不缓存
+            return DEFAULT_PROFILE
+        profile = compiled.match(process, class_name, title or '')
+        with self.lock:
+            self.evaluations += 1
+            if self.compiled is compiled:
+                self.cache[hwnd] = (title, profile, compiled)
+        return profile
+
+    def forget(self, hwnd):
+        """丢弃窗口的缓存（标题变化或窗口已销毁）"""
+        if self.cache.pop(hwnd, None) is not None:
+            self.invalidations += 1
+
+    def clear_cache(self):
+        """清空所有缓存"""
+        with self.lock:
+            self.cache = {}
+
+    def suspend(self):
+        """窗口事件监听挂起，之后收不到标题变化和销毁通知"""
+        self.notified = False
+
+    def resume(self):
+        """窗口事件监听恢复，丢弃挂起期间已销毁的窗口的缓存"""
+        with self.lock:
+            self.cache = {hwnd: entry for hwnd, entry in self.cache.items() if self.backend.is_window(hwnd)}
+        self.notified = True
+
+    def stats(self):
+        """返回规则数、缓存的窗口数、求值和失效次数"""
+        return {
+            'rules': len(self.compiled.rules),
+            'cached': len(self.cache),
+            'evaluations': self.evaluations,
+            'invalidations': self.invalidations,
+        }
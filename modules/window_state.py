@@ -0,0 +1,181 @@
+import threading
+import time
+
+from .hide_strategies import STRATEGY_OFFSCREEN
+
+# 隐藏窗口的状态，转换规则见 window_state_machine
+HIDDEN = 'hidden'
+REVEALING = 'revealing'
+PEEKING = 'peeking'
+HIDING = 'hiding'
+# 终止状态：被用户拖出后留在原处 / 恢复显示，随后从叠放中移除
+PINNED = 'pinned'
+RESTORED = 'restored'
+# 处于临时显示中的状态
+SHOWN_PHASES = frozenset((REVEALING, PEEKING))
+
+
+class WindowState:
+    """一个隐藏窗口的状态（不可变，修改时整体替换）"""
+
+    __slots__ = ('hwnd', 'title', 'slot', 'original_position', 'shown_position', 'phase', 'entered',
+                 'strategy')
+
+    def __init__(self, hwnd, title, slot, original_position=None, shown_position=None,
+                 phase=HIDING, entered=None, strategy=STRATEGY_OFFSCREEN):
+        self.hwnd = hwnd
+        self.title = title
+        self.slot = slot
+        # 恢复显示时要回到的位置，未知时为 None
+        self.original_position = original_position
+        # 临时显示时的位置，未临时显示时为 None
+        self.shown_position = shown_position
+        # 当前状态和进入该状态的时间（time.monotonic）
+        self.phase = phase
+        self.entered = time.monotonic() if entered is None else entered
+        # 隐藏方式（见 hide_strategies），隐藏时选定
+        self.strategy = strategy
+
+    @property
+    def shown(self):
+        """是否处于临时显示状态"""
+        return self.shown_position is not None
+
+    def replace(self, **changes):
+        values = {name: getattr(self, name) for name in self.__slots__}
+        values.update(changes)
+        return WindowState(**values)
+
+
+class StateSnapshot:
+    """某一时刻全部隐藏窗口状态的只读快照
+
+    stacks: {(显示器, 方向, 虚拟桌面): ((hwnd, 标题), ...)}，每个桌面的每条边按隐藏顺序叠放
+    index: {hwnd: (显示器, 方向, 虚拟桌面, 序号)}
+    windows: {hwnd: WindowState}
+    shown: {hwnd: 临时显示位置}
+    快照创建后不再修改，读取方可以直接遍历，不需要加锁或复制。
+    """
+
+    __slots__ = ('stacks', 'index', 'windows', 'shown', 'version')
+
+    def __init__(self, stacks, index, windows, shown, version):
+        self.stacks = stacks
+        self.index = index
+        self.windows = windows
+        self.shown = shown
+        self.version = version
+
+
+EMPTY = StateSnapshot({}, {}, {}, {}, 0)
+
+
+class WindowStateStore:
+    """所有隐藏窗口状态的唯一存放处
+
+    写操作加锁串行执行，每次写入生成新的快照（写时复制）；读操作只读取当前快照的引用，不加锁。
+    隐藏窗口通常只有几个到几十个，每次写入复制几个小字典的开销可以忽略。
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.snapshot = EMPTY
+
+    def push(self, slot, hwnd, title, original_position=None, strategy=STRATEGY_OFFSCREEN):
+        """把窗口加入槽位的叠放栈顶"""
+        with self.lock:
+            current = self.snapshot
+            if hwnd in current.windows:
+                return
+            stacks = dict(current.stacks)
+            index = dict(current.index)
+            self.append(stacks, index, slot, hwnd, title)
+            windows = dict(current.windows)
+            windows[hwnd] = WindowState(hwnd, title, slot, original_position, strategy=strategy)
+            self.publish(stacks, index, windows, current.shown)
+
+    def remove(self, hwnd):
+        """从所在槽位移除窗口，返回移除前的 WindowState，不存在时返回 None"""
+        with self.lock:
+            current = self.snapshot
+            state = current.windows.get(hwnd)
+            if state is None:
+                return None
+            stacks = dict(current.stacks)
+            index = dict(current.index)
+            self.detach(stacks, index, state)
+            windows = dict(current.windows)
+            del windows[hwnd]
+            shown = current.shown
+            if hwnd in shown:
+                shown = dict(shown)
+                del shown[hwnd]
+            self.publish(stacks, index, windows, shown)
+            return state
+
+    def move(self, hwnd, slot):
+        """把窗口移到另一个槽位的叠放栈顶（保留其余状态），返回新的 WindowState，不存在时返回 None"""
+        with self.lock:
+            current = self.snapshot
+            state = current.windows.get(hwnd)
+            if state is None:
+                return None
+            stacks = dict(current.stacks)
+            index = dict(current.index)
+            self.detach(stacks, index, state)
+            self.append(stacks, index, slot, hwnd, state.title)
+            windows = dict(current.windows)
+            windows[hwnd] = state.replace(slot=slot)
+            self.publish(stacks, index, windows, current.shown)
+            return windows[hwnd]
+
+    def update(self, hwnd, expected_phase, **changes):
+        """窗口仍处于 expected_phase 状态时修改其字段，返回新的 WindowState，否则返回 None（比较并交换）"""
+        with self.lock:
+            current = self.snapshot
+            state = current.windows.get(hwnd)
+            if state is None or state.phase != expected_phase:
+                return None
+            updated = state.replace(**changes)
+            windows = dict(current.windows)
+            windows[hwnd] = updated
+            shown = current.shown
+            if updated.shown_position != state.shown_position:
+                shown = dict(shown)
+                if updated.shown_position is None:
+                    del shown[hwnd]
+                else:
+                    shown[hwnd] = updated.shown_position
+            self.publish(current.stacks, current.index, windows, shown)
+            return updated
+
+    def clear(self):
+        """清空所有状态，返回清空前的快照"""
+        with self.lock:
+            current = self.snapshot
+            self.publish({}, {}, {}, {})
+            return current
+
+    @staticmethod
+    def append(stacks, index, slot, hwnd, title):
+        """把窗口放到槽位的栈顶（修改传入的副本）"""
+        stack = stacks.get(slot, ()) + ((hwnd, title),)
+        stacks[slot] = stack
+        index[hwnd] = slot + (len(stack) - 1,)
+
+    @staticmethod
+    def detach(stacks, index, state):
+        """从所在槽位取出窗口并重新编号后面的窗口（修改传入的副本）"""
+        slot = state.slot
+        position = index.pop(state.hwnd)[-1]
+        stack = stacks[slot][:position] + stacks[slot][position + 1:]
+        if stack:
+            stacks[slot] = stack
+            for number in range(position, len(stack)):
+                index[stack[number][0]] = slot + (number,)
+        else:
+            del stacks[slot]
+
+    def publish(self, stacks, index, windows, shown):
+        """发布新快照（需持有锁）"""
+        self.snapshot = StateSnapshot(stacks, index, windows, shown, self.snapshot.version + 1)
@@ -0,0 +1,124 @@
+import threading
+import time
+
+from .window_state import HIDDEN, REVEALING, PEEKING, HIDING, PINNED, RESTORED, SHOWN_PHASES
+
+# 事件
+REVEAL = 'reveal'      # 临时显示
+HIDE = 'hide'          # 移回叠放位置
+ARRIVE = 'arrive'      # 移动到达目标
+PIN = 'pin'            # 临时显示中被用户拖走
+RESTORE = 'restore'    # 恢复显示
+
+# 状态转换表：(当前状态, 事件) -> 新状态，表中没有的请求不改变任何状态
+TRANSITIONS = {
+    (HIDING, ARRIVE): HIDDEN,
+    (HIDDEN, REVEAL): REVEALING,
+    # 移回途中光标又回到边缘：直接转向显示
+    (HIDING, REVEAL): REVEALING,
+    (REVEALING, ARRIVE): PEEKING,
+    (REVEALING, HIDE): HIDING,
+    (PEEKING, HIDE): HIDING,
+    (PEEKING, PIN): PINNED,
+    (HIDDEN, RESTORE): RESTORED,
+    (HIDING, RESTORE): RESTORED,
+    (REVEALING, RESTORE): RESTORED,
+    (PEEKING, RESTORE): RESTORED,
+}
+
+
+class PhaseDuration:
+    """在某一状态中停留时间的累计"""
+
+    __slots__ = ('count', 'total', 'max')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'mean_ms': round(self.total / self.count * 1000, 3) if self.count else None,
+            'max_ms': round(self.max * 1000, 3),
+        }
+
+
+class WindowStateMachine:
+    """隐藏窗口的状态机
+
+    hidden → revealing → peeking → hiding → hidden，以及终止状态 pinned、restored。
+    状态保存在 WindowStateStore 中，request 按 TRANSITIONS 推进：
+    表中有的转换以比较并交换的方式写入，调用方只在转换成功时移动窗口；
+    其他请求（例如对显示中的窗口再次显示、对已隐藏的窗口再次隐藏）直接丢弃并计数。
+    记录每种转换的次数和离开每个状态前的停留时间，用于衡量来回抖动。
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self.lock = threading.Lock()
+        # {(原状态, 新状态): 次数}
+        self.counts = {}
+        # {状态: PhaseDuration}
+        self.durations = {}
+        # {(状态, 事件): 被丢弃的请求数}
+        self.dropped = {}
+
+    def request(self, hwnd, event, shown_position=None):
+        """请求状态转换，成功时返回新的 WindowState，请求不改变任何状态时返回 None
+
+        转为临时显示（revealing）时 shown_position 为显示位置，其余状态的显示位置总是 None。
+        """
+        requested = shown_position
+        while True:
+            state = self.store.snapshot.windows.get(hwnd)
+            if state is None:
+                return None
+            phase = TRANSITIONS.get((state.phase, event))
+            if phase is None:
+                with self.lock:
+                    key = (state.phase, event)
+                    self.dropped[key] = self.dropped.get(key, 0) + 1
+                return None
+            # 每次重试都按最新的状态重新计算，不沿用上一次读到的显示位置
+            if phase not in SHOWN_PHASES:
+                shown_position = None
+            elif requested is None:
+                shown_position = state.shown_position
+            else:
+                shown_position = requested
+            now = time.monotonic()
+            updated = self.store.update(hwnd, state.phase, phase=phase, entered=now,
+                                        shown_position=shown_position)
+            if updated is not None:
+                break
+            # 期间被其他线程改变了状态，按新状态重新判断
+        with self.lock:
+            key = (state.phase, phase)
+            self.counts[key] = self.counts.get(key, 0) + 1
+            duration = self.durations.get(state.phase)
+            if duration is None:
+                duration = self.durations[state.phase] = PhaseDuration()
+            duration.add(now - state.entered)
+        return updated
+
+    def phase(self, hwnd):
+        """窗口当前的状态，不在叠放中时返回 None"""
+        state = self.store.snapshot.windows.get(hwnd)
+        return state.phase if state is not None else None
+
+    def stats(self):
+        """返回各转换的次数、各状态的停留时间和被丢弃的请求数"""
+        with self.lock:
+            return {
+                'transitions': {f'{old}->{new}': count for (old, new), count in sorted(self.counts.items())},
+                'durations': {phase: duration.to_dict() for phase, duration in sorted(self.durations.items())},
+                'dropped': {f'{phase}+{event}': count for (phase, event), count in sorted(self.dropped.items())},
+            }
@@ -0,0 +1,63 @@
+"""ActionQueue：按 key 合并、按 tag 抵消、队列满时丢弃、idle"""
+from modules.action_queue import ActionQueue
+
+
+def drain(queue):
+    items = []
+    while not queue.empty():
+        items.append(queue.get())
+        queue.task_done()
+    return items
+
+
+def test_same_key_replaces_pending_action_in_place():
+    queue = ActionQueue()
+    queue.put('a1', key='a')
+    queue.put('b', key='b')
+    queue.put('a2', key='a')
+    assert drain(queue) == ['a2', 'b']
+    assert queue.stats()['coalesced'] == 1
+
+
+def test_same_tag_cancels_pending_action():
+    queue = ActionQueue()
+    queue.put('toggle', key='window', tag='left')
+    queue.put('toggle', key='window', tag='left')
+    assert drain(queue) == []
+    assert queue.stats()['cancelled'] == 1
+
+
+def test_different_tag_replaces_pending_action():
+    queue = ActionQueue()
+    queue.put('left', key='window', tag='left')
+    queue.put('right', key='window', tag='right')
+    assert drain(queue) == ['right']
+
+
+def test_keyed_actions_dropped_when_full():
+    queue = ActionQueue(maxsize=2)
+    assert queue.put(1, key=1)
+    assert queue.put(2, key=2)
+    assert not queue.put(3, key=3)
+    # 不带 key 的动作总是入队
+    assert queue.put(4)
+    assert queue.stats()['dropped'] == 1
+    assert drain(queue) == [1, 2, 4]
+
+
+def test_unkeyed_actions_never_coalesce():
+    queue = ActionQueue()
+    queue.put('x')
+    queue.put('x')
+    assert drain(queue) == ['x', 'x']
+
+
+def test_idle_waits_for_running_action():
+    queue = ActionQueue()
+    assert queue.idle()
+    queue.put('a')
+    assert not queue.idle()
+    queue.get()
+    assert queue.empty() and not queue.idle()
+    queue.task_done()
+    assert queue.idle()
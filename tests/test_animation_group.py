@@ -0,0 +1,60 @@
+"""AnimationGroup：组内的动画在退出时一起开始，块内不阻塞其他线程"""
+import threading
+
+from modules.animation_controller import AnimationController
+from modules.simulated_backend import SimulatedDesktop
+from modules.window_manager import WindowManager
+
+
+def controller():
+    desktop = SimulatedDesktop(cursor_mode='hook')
+    animation_controller = AnimationController(WindowManager(desktop))
+    animation_controller.set_animation_enabled(True)
+    animation_controller.animation_duration = 50
+    return desktop, animation_controller
+
+
+def test_group_animations_start_together_on_exit():
+    desktop, animation_controller = controller()
+    scheduler = animation_controller.scheduler
+    first = desktop.create_window('First', (0, 0, 400, 300))
+    second = desktop.create_window('Second', (500, 0, 900, 300))
+    with animation_controller.frame_group():
+        handles = [animation_controller.animate_window(first, 0, 0, -390, 0),
+                   animation_controller.animate_window(second, 500, 0, 500, 500)]
+        assert not scheduler.animations
+    animations = [scheduler.animations[hwnd] for hwnd in (first, second)]
+    assert animations[0].start_time == animations[1].start_time
+    assert all(handle.wait(2.0) and handle.completed for handle in handles)
+    assert desktop.windows[first].rect[:2] == (-390, 0)
+    assert desktop.windows[second].rect[:2] == (500, 500)
+    animation_controller.stop()
+
+
+def test_group_does_not_block_other_threads():
+    desktop, animation_controller = controller()
+    grouped = desktop.create_window('Grouped', (0, 0, 400, 300))
+    other = desktop.create_window('Other', (500, 0, 900, 300))
+    results = []
+    with animation_controller.frame_group():
+        animation_controller.animate_window(grouped, 0, 0, -390, 0)
+        thread = threading.Thread(target=lambda: results.append(
+            animation_controller.animate_window(other, 500, 0, 500, 500).wait(2.0)))
+        thread.start()
+        thread.join(3.0)
+        # 其他线程的动画在组结束前已经完成
+        assert results == [True]
+        assert not animation_controller.is_animating(grouped)
+    animation_controller.stop()
+
+
+def test_cancelled_before_exit_is_not_started():
+    desktop, animation_controller = controller()
+    hwnd = desktop.create_window('Window', (0, 0, 400, 300))
+    with animation_controller.frame_group():
+        handle = animation_controller.animate_window(hwnd, 0, 0, -390, 0)
+        handle.cancel()
+    assert handle.state == handle.CANCELLED
+    assert not animation_controller.is_animating(hwnd)
+    assert desktop.windows[hwnd].rect[:2] == (0, 0)
+    animation_controller.stop()
@@ -0,0 +1,35 @@
+"""命令通道的窗口选择"""
+import pytest
+
+from modules.animation_controller import AnimationController
+from modules.command_server import CommandError, CommandServer
+from modules.input_handler import InputHandler
+from modules.simulated_backend import SimulatedDesktop
+from modules.window_manager import WindowManager
+
+
+def server():
+    desktop = SimulatedDesktop(cursor_mode='hook')
+    window_manager = WindowManager(desktop)
+    input_handler = InputHandler(window_manager, AnimationController(window_manager))
+    return desktop, input_handler, CommandServer(input_handler)
+
+
+@pytest.mark.parametrize('hwnd', [True, False, '4096', 1.0, None])
+def test_hwnd_must_be_an_integer(hwnd):
+    _, _, command_server = server()
+    with pytest.raises(CommandError):
+        command_server.select_windows({'hwnd': hwnd})
+    with pytest.raises(CommandError):
+        command_server.select_hidden({'hwnd': hwnd})
+
+
+def test_select_by_hwnd():
+    desktop, input_handler, command_server = server()
+    hwnd = desktop.create_window('Window', (100, 100, 500, 400))
+    assert command_server.select_windows({'hwnd': hwnd}) == [hwnd]
+    assert command_server.select_hidden({'hwnd': hwnd}) == []
+    input_handler.hide_window(hwnd, 'left')
+    assert command_server.select_hidden({'hwnd': hwnd}) == [hwnd]
+    with pytest.raises(CommandError):
+        command_server.select_windows({'hwnd': hwnd + 1})
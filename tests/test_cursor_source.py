@@ -0,0 +1,90 @@
+"""钩子驱动、靠近边缘时轮询的光标事件源"""
+import time
+
+from modules.edge_detector import EdgeDetector
+from modules.metrics import Metrics
+from modules.simulated_backend import SimulatedDesktop, SimulatedHybridCursorSource
+
+
+class Cursor:
+    """光标位置和检测器的替身：x 小于 near 时要求高频采样"""
+
+    def __init__(self, near=100):
+        self.position = (960, 540)
+        self.near = near
+        self.samples = []
+
+    def get_cursor_pos(self):
+        return self.position
+
+    def feed(self, x, y):
+        self.samples.append((x, y))
+        return EdgeDetector.FAST_INTERVAL if x < self.near else EdgeDetector.SLOW_INTERVAL
+
+
+def wait_until(predicate, timeout=1.0):
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.005)
+    return predicate()
+
+
+def test_hook_driven_away_from_edge():
+    cursor = Cursor()
+    source = SimulatedHybridCursorSource(cursor.get_cursor_pos)
+    source.start(cursor.feed)
+    source.move(900, 500)
+    time.sleep(0.1)
+    assert cursor.samples == [(900, 500)]
+    assert not source.polling
+    source.stop()
+
+
+def test_polls_near_edge_and_hands_back_to_hook():
+    cursor = Cursor()
+    source = SimulatedHybridCursorSource(cursor.get_cursor_pos)
+    source.start(cursor.feed)
+    cursor.position = (50, 500)
+    source.move(50, 500)
+    assert source.polling
+    assert wait_until(lambda: len(cursor.samples) >= 5)
+    # 轮询期间钩子回调被忽略
+    count = len(cursor.samples)
+    source.move(40, 500)
+    assert (40, 500) not in cursor.samples[count:]
+
+    cursor.position = (900, 500)
+    assert wait_until(lambda: not source.polling)
+    count = len(cursor.samples)
+    time.sleep(0.1)
+    assert len(cursor.samples) == count
+    source.move(800, 500)
+    assert cursor.samples[-1] == (800, 500)
+    source.stop()
+
+
+def test_stop_ends_polling():
+    cursor = Cursor()
+    source = SimulatedHybridCursorSource(cursor.get_cursor_pos)
+    source.start(cursor.feed)
+    cursor.position = (50, 500)
+    source.move(50, 500)
+    source.stop()
+    assert not source.polling
+    time.sleep(0.02)
+    count = len(cursor.samples)
+    time.sleep(0.05)
+    assert len(cursor.samples) == count
+
+
+def test_polling_is_counted_once_metrics_enabled():
+    desktop = SimulatedDesktop(cursor_mode='poll')
+    # 事件源先于开启统计创建（与程序启动顺序一致）
+    source = desktop.create_cursor_source()
+    metrics = Metrics()
+    metrics.enable(desktop)
+    cursor = Cursor()
+    source.start(cursor.feed)
+    assert wait_until(lambda: metrics.api_calls.get('get_cursor_pos', 0) > 0)
+    source.stop()
+    metrics.disable()
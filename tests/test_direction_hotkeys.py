@@ -0,0 +1,56 @@
+"""方向快捷键排队：只有隐藏/恢复显示的切换合并和抵消，轮换按顺序执行"""
+from modules.animation_controller import AnimationController
+from modules.input_handler import InputHandler
+from modules.simulated_backend import SimulatedDesktop
+from modules.window_manager import WindowManager
+
+
+def session():
+    desktop = SimulatedDesktop(cursor_mode='hook')
+    window_manager = WindowManager(desktop)
+    # 不启动工作线程，快捷键只排队
+    input_handler = InputHandler(window_manager, AnimationController(window_manager))
+    return desktop, input_handler
+
+
+def press(desktop, input_handler, hwnd, direction):
+    desktop.activate(hwnd)
+    input_handler.on_direction_hotkey(direction)
+
+
+def queued(input_handler):
+    return [item for item, tag in input_handler.actions.items.values()]
+
+
+def test_repeated_hide_toggle_cancels():
+    desktop, input_handler = session()
+    hwnd = desktop.create_window('Window', (100, 100, 500, 400))
+    press(desktop, input_handler, hwnd, 'left')
+    press(desktop, input_handler, hwnd, 'left')
+    assert queued(input_handler) == []
+    press(desktop, input_handler, hwnd, 'left')
+    press(desktop, input_handler, hwnd, 'right')
+    assert [item[1] for item in queued(input_handler)] == [('right', hwnd)]
+
+
+def test_cycle_presses_are_queued_in_order():
+    desktop, input_handler = session()
+    first = desktop.create_window('First', (100, 100, 500, 400))
+    second = desktop.create_window('Second', (100, 100, 500, 400))
+    input_handler.hide_window(first, 'left')
+    input_handler.hide_window(second, 'left')
+    for _ in range(3):
+        press(desktop, input_handler, second, 'left')
+    assert [item[1] for item in queued(input_handler)] == [('left', second)] * 3
+
+
+def test_toggle_does_not_merge_across_cycle():
+    desktop, input_handler = session()
+    hidden = desktop.create_window('Hidden', (100, 100, 500, 400))
+    other = desktop.create_window('Other', (100, 100, 500, 400))
+    input_handler.hide_window(hidden, 'left')
+    press(desktop, input_handler, other, 'right')
+    # 左侧已有隐藏窗口：隐藏后再按是轮换，不能抵消
+    press(desktop, input_handler, other, 'left')
+    press(desktop, input_handler, other, 'right')
+    assert [item[1] for item in queued(input_handler)] == [('right', other), ('left', other), ('right', other)]
@@ -0,0 +1,70 @@
+"""缓动曲线查找表与轨迹缓存：端点、单调性、插值精度和按曲线参数命中的缓存"""
+import pytest
+
+from modules import easing
+from modules.easing import NAMED_CURVES, compile_curve, get_trajectory, normalize_spec
+
+MONOTONIC = ['linear', 'ease', 'ease-in', 'ease-out', ('cubic-bezier', 0.25, 0.1, 0.25, 1.0),
+             ('spring', 170, 60)]
+ALL = MONOTONIC + [('spring', 170, 10)]
+PROGRESS = [i / 1000 for i in range(1001)]
+
+
+@pytest.mark.parametrize('curve', ALL)
+def test_endpoints(curve):
+    compiled = compile_curve(normalize_spec(curve))
+    assert compiled.value(0.0) == pytest.approx(0.0, abs=1e-9)
+    assert compiled.value(1.0) == 1.0
+    assert compiled.value(-0.5) == compiled.value(0.0)
+    assert compiled.value(1.5) == 1.0
+
+
+@pytest.mark.parametrize('curve', MONOTONIC)
+def test_monotonic(curve):
+    compiled = compile_curve(normalize_spec(curve))
+    values = [compiled.value(p) for p in PROGRESS]
+    assert all(later >= earlier for earlier, later in zip(values, values[1:]))
+
+
+def test_underdamped_spring_overshoots():
+    compiled = compile_curve(normalize_spec(('spring', 170, 10)))
+    assert max(compiled.value(p) for p in PROGRESS) > 1.0
+
+
+@pytest.mark.parametrize('name', sorted(NAMED_CURVES))
+def test_table_matches_formula(name):
+    compiled = compile_curve(normalize_spec(name))
+    formula = NAMED_CURVES[name]
+    assert max(abs(compiled.value(p) - formula(p)) for p in PROGRESS) < 1e-4
+
+
+@pytest.mark.parametrize('curve', ['bounce', ('cubic-bezier', 1.5, 0, 0.5, 1), ('spring', 0, 10),
+                                   ('cubic-bezier', 0.1, 0.2)])
+def test_invalid_specs_are_rejected(curve):
+    with pytest.raises(ValueError):
+        normalize_spec(curve)
+
+
+def test_trajectory_ends_exactly_at_target():
+    path = get_trajectory(normalize_spec('ease-out'), -397, 13, 17)
+    assert len(path) == 18
+    assert path[0] == (0, 0)
+    assert path[-1] == (-397, 13)
+    xs = [x for x, _ in path]
+    assert all(later <= earlier for earlier, later in zip(xs, xs[1:]))
+
+
+def test_trajectory_cache_is_keyed_by_spec():
+    get_trajectory.cache_clear()
+    compile_curve.cache_clear()
+    first = get_trajectory(normalize_spec('ease'), -390, 0, 12)
+    assert get_trajectory(normalize_spec('ease'), -390, 0, 12) is first
+    assert easing.cache_info()['trajectories']['hits'] == 1
+    # 参数相同的曲线描述规范化后共用缓存，不同曲线各自计算
+    assert get_trajectory(normalize_spec(('spring', 170, 26)), -390, 0, 12) is \
+        get_trajectory(normalize_spec(('spring', 170, 26, 1)), -390, 0, 12)
+    assert get_trajectory(normalize_spec('linear'), -390, 0, 12) != first
+    info = easing.cache_info()
+    assert info['trajectories']['hits'] == 2
+    assert info['trajectories']['misses'] == 3
+    assert info['curves']['misses'] == 3
@@ -0,0 +1,104 @@
+"""EdgeIntent：停留时间、滞回和按速度提前显示，用合成光标流驱动 EdgeDetector"""
+import time
+
+import pytest
+
+from modules import edge_detector
+from modules.edge_detector import EdgeDetector, SyntheticCursorSource
+from modules.edge_intent import EdgeIntent
+from modules.monitor_topology import Monitor, MonitorTopology
+
+LEFT = ('SIM1', 'left')
+
+
+class Clock:
+    """检测器估计光标速度用的时钟，由测试推进"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(edge_detector, 'time', clock)
+    return clock
+
+
+def detector(occupied=True, **intent):
+    topology = MonitorTopology([Monitor('SIM1', (0, 0, 1920, 1080), primary=True)], 5)
+    detector = EdgeDetector(topology, EdgeIntent(**intent))
+    detector.occupied = lambda slot: occupied
+    events = []
+    detector.add_listener(lambda event, key, x, y: events.append((event, key)))
+    source = SyntheticCursorSource()
+    source.start(detector.feed)
+    return detector, source, events
+
+
+def play(clock, source, points, step=0.008):
+    """每隔 step 秒输入一个光标位置"""
+    for x, y in points:
+        clock.now += step
+        source.move(x, y)
+
+
+def test_dwell_reveals_after_cursor_rests_in_band(clock):
+    detector_, source, events = detector(dwell=0.05)
+    play(clock, source, [(300, 500), (200, 500), (100, 500), (2, 500)], step=0.1)
+    assert events == []
+    time.sleep(0.15)
+    assert events == [(EdgeDetector.EDGE_ENTER, LEFT)]
+
+
+def test_brushing_the_edge_does_not_reveal(clock):
+    detector_, source, events = detector(dwell=0.05)
+    play(clock, source, [(100, 500), (2, 500), (100, 500)], step=0.1)
+    time.sleep(0.15)
+    assert events == []
+    assert detector_.brushed == 1
+
+
+def test_fast_move_into_edge_skips_dwell(clock):
+    detector_, source, events = detector(occupied=False, dwell=1.0)
+    play(clock, source, [(300, 500), (200, 500), (100, 500), (2, 500)])
+    assert events == [(EdgeDetector.EDGE_ENTER, LEFT)]
+
+
+def test_hysteresis_keeps_edge_until_cursor_leaves_margin(clock):
+    detector_, source, events = detector(dwell=0, edge_margin=12, hide_grace=0.05)
+    play(clock, source, [(2, 500)], step=1)
+    assert events == [(EdgeDetector.EDGE_ENTER, LEFT)]
+    # 离开触发带但仍在滞回余量内
+    play(clock, source, [(10, 500), (15, 500)], step=1)
+    time.sleep(0.1)
+    assert events == [(EdgeDetector.EDGE_ENTER, LEFT)]
+    # 离开余量后在宽限期内回来，离开被取消
+    play(clock, source, [(40, 500), (10, 500)], step=1)
+    time.sleep(0.1)
+    assert len(events) == 1
+    assert detector_.cancelled_leaves == 1
+    play(clock, source, [(40, 500)], step=1)
+    time.sleep(0.1)
+    assert events[-1] == (EdgeDetector.EDGE_LEAVE, LEFT)
+
+
+def test_velocity_prediction_reveals_before_reaching_occupied_edge(clock):
+    detector_, source, events = detector(dwell=1.0, predict_ahead=0.05)
+    # 靠近边缘后约 3750 像素/秒朝左边缘移动，0.05 秒内将到达
+    play(clock, source, [(180, 500), (150, 500), (120, 500)])
+    assert events == [(EdgeDetector.EDGE_ENTER, LEFT)]
+    assert detector_.predicted == 1
+
+
+def test_no_prediction_for_empty_edge_or_slow_approach(clock):
+    detector_, source, events = detector(occupied=False, dwell=1.0, predict_ahead=0.05)
+    play(clock, source, [(180, 500), (150, 500), (120, 500)])
+    assert events == []
+    detector_, source, events = detector(dwell=1.0, predict_ahead=0.05)
+    play(clock, source, [(200, 500), (190, 500), (180, 500), (170, 500)])
+    assert events == []
+    assert detector_.predicted == 0
@@ -0,0 +1,49 @@
+"""ForegroundActivator：目标窗口信息的缓存与校验，以及记住的激活方式定期降级重试"""
+from modules.foreground_activator import ForegroundActivator, TIER_DIRECT, TIER_ATTACH
+from modules.simulated_backend import SimulatedDesktop
+
+
+def activator_with(process='locked.exe'):
+    desktop = SimulatedDesktop()
+    other = desktop.create_window('Other', (600, 100, 1000, 400))
+    hwnd = desktop.create_window('Window', (100, 100, 500, 400), process=process)
+    desktop.activate(other)
+    return desktop, ForegroundActivator(desktop), hwnd, other
+
+
+def test_foreground_window_is_not_cached():
+    desktop, activator, hwnd, other = activator_with()
+    assert activator.activate(hwnd) == TIER_DIRECT
+    assert other not in activator.windows
+    assert activator.windows[hwnd] == (desktop.windows[hwnd].thread_id, 'locked.exe')
+
+
+def test_failed_lookup_is_not_cached():
+    desktop, activator, hwnd, _ = activator_with()
+    assert activator.describe(12345) == (0, '')
+    assert 12345 not in activator.windows
+
+
+def test_reused_hwnd_is_described_again():
+    desktop, activator, hwnd, _ = activator_with()
+    activator.describe(hwnd)
+    window = desktop.windows[hwnd]
+    # 句柄被属于另一个进程的新窗口复用
+    window.thread_id += 1000
+    window.process = 'other.exe'
+    assert activator.describe(hwnd) == (window.thread_id, 'other.exe')
+
+
+def test_remembered_tier_is_retried_from_cheapest():
+    desktop, activator, hwnd, other = activator_with()
+    desktop.foreground_lock['locked.exe'] = 'attach'
+    assert activator.activate(hwnd) == TIER_ATTACH
+    # 前台锁解除后，记住的方式仍然生效，直到定期重试发现最便宜的方式已可用
+    del desktop.foreground_lock['locked.exe']
+    results = []
+    for _ in range(ForegroundActivator.RETRY_INTERVAL):
+        desktop.activate(other)
+        results.append(activator.activate(hwnd))
+    assert results[:-1] == [TIER_ATTACH] * (ForegroundActivator.RETRY_INTERVAL - 1)
+    assert results[-1] == TIER_DIRECT
+    assert activator.report()['process_tiers'] == {'locked.exe': TIER_DIRECT}
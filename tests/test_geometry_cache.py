@@ -0,0 +1,67 @@
+"""几何缓存与本程序自己的窗口移动（窗口事件异步送达）"""
+from modules.simulated_backend import SimulatedDesktop
+from modules.window_manager import WindowManager
+
+# 模拟的 WinEvent 送达延迟，足够让移动后的读取先于通知发生
+EVENT_DELAY = 0.2
+
+
+def tracked_window(rect=(100, 100, 500, 400)):
+    desktop = SimulatedDesktop(event_delay=EVENT_DELAY)
+    manager = WindowManager(desktop)
+    manager.start()
+    hwnd = desktop.create_window('Window', rect)
+    manager.geometry_cache.track(hwnd)
+    # 读取一次，使位置进入缓存
+    manager.get_window_rect(hwnd)
+    return desktop, manager, hwnd
+
+
+def test_set_window_pos_updates_cached_rect():
+    desktop, manager, hwnd = tracked_window()
+    manager.set_window_pos(hwnd, 300, 200)
+    assert manager.get_window_rect(hwnd) == {'x': 300, 'y': 200, 'width': 400, 'height': 300}
+    desktop.wait_events()
+    assert manager.get_window_rect(hwnd) == {'x': 300, 'y': 200, 'width': 400, 'height': 300}
+
+
+def test_batch_commit_updates_cached_rects():
+    desktop, manager, first = tracked_window()
+    second = desktop.create_window('Other', (0, 0, 200, 100))
+    manager.geometry_cache.track(second)
+    manager.get_window_rect(second)
+    with manager.begin_batch() as batch:
+        batch.move(first, -390, 100)
+        batch.move(second, 50, 60)
+    assert manager.get_window_rect(first)['x'] == -390
+    assert manager.get_window_rect(second) == {'x': 50, 'y': 60, 'width': 200, 'height': 100}
+
+
+def test_late_event_invalidates_window_moved_back():
+    desktop, manager, hwnd = tracked_window()
+    desktop.pin_window(hwnd, 100, 100)
+    manager.set_window_pos(hwnd, 300, 200)
+    desktop.wait_events()
+    assert manager.get_window_rect(hwnd)['x'] == 100
+
+
+def test_failed_move_drops_cached_rect():
+    desktop, manager, hwnd = tracked_window()
+    desktop.destroy_window(hwnd)
+    with manager.begin_batch() as batch:
+        batch.move(hwnd, 300, 200)
+    assert manager.geometry_cache.entries[hwnd].rect is None
+
+
+def test_move_back_after_external_move_is_not_dropped():
+    desktop, manager, hwnd = tracked_window()
+    manager.set_window_pos(hwnd, 300, 200)
+    desktop.wait_events()
+    # 其他程序把窗口移走，位置变化通知送达后同一目标位置的移动不再被当作重复移动
+    desktop.set_window_rect(hwnd, (100, 100, 500, 400))
+    desktop.wait_events()
+    with manager.begin_batch() as batch:
+        batch.move(hwnd, 300, 200)
+    assert batch.dropped == 0
+    assert desktop.windows[hwnd].rect == (300, 200, 700, 500)
+    assert manager.last_position(hwnd) == (300, 200)
@@ -0,0 +1,93 @@
+"""HiddenWindowJournal：读取、压缩、崩溃时写了一半的最后一行，以及启动时按日志恢复窗口"""
+from modules.hidden_journal import HiddenWindowJournal
+from modules.simulated_backend import SimulatedDesktop
+from modules.window_manager import WindowManager
+
+SLOT = ('SIM1', 'left', 'desktop-1')
+
+
+def lines(path):
+    with open(path, encoding='utf-8') as f:
+        return f.read().splitlines()
+
+
+def test_load_returns_windows_still_hidden(tmp_path):
+    path = str(tmp_path / 'hidden.journal')
+    journal = HiddenWindowJournal(path)
+    journal.record_hide(1, SLOT, 'First', (100, 100))
+    journal.record_hide(2, ('SIM1', 'top', None), 'Second', (200, 50), 'minimize')
+    journal.record_hide(3, SLOT, 'Third', (300, 300))
+    journal.record_show(3)
+    journal.close()
+
+    entries = HiddenWindowJournal(path).load()
+    assert [(e.hwnd, e.slot, e.title, e.original_position, e.strategy) for e in entries] == [
+        (1, SLOT, 'First', (100, 100), 'offscreen'),
+        (2, ('SIM1', 'top', None), 'Second', (200, 50), 'minimize'),
+    ]
+
+
+def test_truncated_last_line_is_ignored(tmp_path):
+    path = tmp_path / 'hidden.journal'
+    journal = HiddenWindowJournal(str(path))
+    journal.record_hide(1, SLOT, 'First', (100, 100))
+    journal.close()
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('["h",2,"SIM1","le')
+
+    journal = HiddenWindowJournal(str(path))
+    assert [e.hwnd for e in journal.load()] == [1]
+    journal.compact()
+    assert len(lines(path)) == 1
+    assert [e.hwnd for e in HiddenWindowJournal(str(path)).load()] == [1]
+
+
+def test_compaction_keeps_only_live_windows(tmp_path):
+    path = str(tmp_path / 'hidden.journal')
+    journal = HiddenWindowJournal(path)
+    journal.COMPACT_MIN_RECORDS = 8
+    journal.record_hide(1, SLOT, 'Kept', (100, 100))
+    for hwnd in range(2, 10):
+        journal.record_hide(hwnd, SLOT, 'Window', (100, 100))
+        journal.record_show(hwnd)
+    journal.close()
+    assert journal.compactions >= 1
+    assert len(lines(path)) < 8
+    assert [e.hwnd for e in HiddenWindowJournal(path).load()] == [1]
+
+
+def previous_run(tmp_path, desktop, windows):
+    """上次运行留下的日志：windows 为 [(hwnd, 标题, 原始位置)]"""
+    path = str(tmp_path / 'hidden.journal')
+    journal = HiddenWindowJournal(path)
+    for hwnd, title, position in windows:
+        journal.record_hide(hwnd, SLOT, title, position)
+    journal.close()
+    return HiddenWindowJournal(path)
+
+
+def test_replay_restores_windows_left_offscreen(tmp_path):
+    desktop = SimulatedDesktop()
+    hidden = desktop.create_window('Hidden', (-390, 100, 10, 400))
+    reused = desktop.create_window('Reused', (-390, 500, 10, 800))
+    # 句柄被系统复用：标题与记录不一致的窗口不处理
+    journal = previous_run(tmp_path, desktop, [(hidden, 'Hidden', (100, 100)), (reused, 'Old title', (100, 500))])
+    window_manager = WindowManager(desktop)
+    assert window_manager.attach_journal(journal) == 1
+    assert desktop.windows[hidden].rect == (100, 100, 500, 400)
+    assert desktop.windows[reused].rect == (-390, 500, 10, 800)
+    assert window_manager.get_hidden_windows() == {}
+    window_manager.stop()
+    assert HiddenWindowJournal(journal.path).load() == []
+
+
+def test_replay_can_take_windows_over(tmp_path):
+    desktop = SimulatedDesktop()
+    hidden = desktop.create_window('Hidden', (-390, 100, 10, 400))
+    journal = previous_run(tmp_path, desktop, [(hidden, 'Hidden', (100, 100))])
+    window_manager = WindowManager(desktop)
+    assert window_manager.attach_journal(journal, restore=False) == 1
+    assert window_manager.find_hidden(hidden)[:3] == SLOT
+    assert window_manager.get_window_state(hidden).original_position == (100, 100)
+    window_manager.stop()
+    assert [e.hwnd for e in HiddenWindowJournal(journal.path).load()] == [hidden]
@@ -0,0 +1,55 @@
+"""隐藏方式由窗口规则选择，strategy 命令写入规则"""
+from modules.simulated_backend import SimulatedDesktop
+from modules.window_manager import WindowManager
+
+
+def manager_with_window(process):
+    desktop = SimulatedDesktop()
+    manager = WindowManager(desktop)
+    hwnd = desktop.create_window('Window', (100, 100, 500, 400), process=process)
+    return desktop, manager, hwnd
+
+
+def test_choose_reads_cached_profile():
+    desktop, manager, hwnd = manager_with_window('chrome.exe')
+    manager.rules.set_rules([{'process': 'chrome.exe', 'strategy': 'cloak'}])
+    assert manager.hide_strategies.choose(hwnd) == 'cloak'
+    assert desktop.calls['QueryFullProcessImageName'] == 1
+    desktop.reset_counters()
+    assert manager.hide_strategies.choose(hwnd) == 'cloak'
+    assert sum(desktop.calls.values()) == 0
+
+
+def test_choose_uses_default_without_rule():
+    _, manager, hwnd = manager_with_window('notepad.exe')
+    manager.rules.set_rules([{'process': 'chrome.exe', 'strategy': 'cloak'}])
+    manager.hide_strategies.set_default('minimize')
+    assert manager.hide_strategies.choose(hwnd) == 'minimize'
+
+
+def test_assign_strategy_writes_and_removes_rule():
+    _, manager, hwnd = manager_with_window('chrome.exe')
+    rules = manager.rules
+    rules.set_rules([{'process': 'game*.exe', 'hide': False}, {'process': 'chrome.exe', 'visible_part': 3}])
+    rules.assign_strategy('cloak', process='chrome.exe')
+    assert rules.rules()[1] == {'process': 'chrome.exe', 'visible_part': 3, 'strategy': 'cloak'}
+    assert manager.hide_strategies.choose(hwnd) == 'cloak'
+
+    rules.assign_strategy('minimize', class_name='Chrome_WidgetWin_1')
+    assert rules.rules()[2] == {'class': 'Chrome_WidgetWin_1', 'strategy': 'minimize'}
+
+    rules.assign_strategy(None, class_name='Chrome_WidgetWin_1')
+    rules.assign_strategy(None, process='chrome.exe')
+    assert rules.rules() == [{'process': 'game*.exe', 'hide': False}, {'process': 'chrome.exe', 'visible_part': 3}]
+    assert manager.hide_strategies.choose(hwnd) == 'offscreen'
+
+
+def test_assign_strategy_rejects_unknown_strategy():
+    _, manager, _ = manager_with_window('chrome.exe')
+    try:
+        manager.rules.assign_strategy('fade', process='chrome.exe')
+    except ValueError:
+        pass
+    else:
+        raise AssertionError('unknown strategy accepted')
+    assert manager.rules.rules() == []
@@ -0,0 +1,70 @@
+"""HotkeyEngine：自动重复的抑制和 repeat=True 绑定的限速"""
+import pytest
+
+from modules import hotkey_engine
+from modules.hotkey_engine import HotkeyEngine
+from modules.simulated_backend import SimKey
+
+
+class Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(hotkey_engine, 'time', clock)
+    return clock
+
+
+def engine_with(spec, repeat=False):
+    engine = HotkeyEngine()
+    fired = []
+    engine.bind(spec, lambda: fired.append(spec), repeat=repeat)
+    return engine, fired
+
+
+def press_shift_left(engine):
+    engine.on_press(SimKey('shift'))
+    return engine.on_press(SimKey('left'))
+
+
+def test_held_key_fires_once(clock):
+    engine, fired = engine_with('shift+left')
+    assert press_shift_left(engine)
+    for _ in range(5):
+        clock.now += 0.03
+        assert not engine.on_press(SimKey('left'))
+    assert fired == ['shift+left']
+    assert engine.suppressed == 5
+
+
+def test_release_allows_next_press(clock):
+    engine, fired = engine_with('shift+left')
+    press_shift_left(engine)
+    engine.on_release(SimKey('left'))
+    clock.now += 0.03
+    assert engine.on_press(SimKey('left'))
+    assert fired == ['shift+left'] * 2
+
+
+def test_lost_release_expires_after_repeat_window(clock):
+    engine, fired = engine_with('shift+left')
+    press_shift_left(engine)
+    clock.now += HotkeyEngine.REPEAT_WINDOW + 0.1
+    assert engine.on_press(SimKey('left'))
+    assert len(fired) == 2
+
+
+def test_repeat_binding_is_rate_limited(clock):
+    engine, fired = engine_with('shift+left', repeat=True)
+    press_shift_left(engine)
+    for _ in range(20):
+        clock.now += 0.03
+        engine.on_press(SimKey('left'))
+    # 0.6 秒内按 REPEAT_INTERVAL 限速
+    assert len(fired) == 1 + int(20 * 0.03 / HotkeyEngine.REPEAT_INTERVAL)
@@ -0,0 +1,79 @@
+"""输入轨迹：在模拟桌面上录制后重放，最终窗口位置和隐藏状态与录制时一致"""
+import time
+
+import pytest
+
+from modules.animation_controller import AnimationController
+from modules.input_handler import InputHandler
+from modules.input_trace import TraceRecorder, TraceReplay
+from modules.simulated_backend import SimulatedDesktop
+from modules.window_manager import WindowManager
+
+
+def wait_idle(input_handler, animation_controller, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if (not animation_controller.scheduler.animations and not input_handler.edge_detector.pending()
+                and input_handler.actions.idle()):
+            time.sleep(0.01)
+            if input_handler.actions.idle():
+                return True
+        time.sleep(0.002)
+    return False
+
+
+def hotkey(desktop, hwnd, direction):
+    desktop.activate(hwnd)
+    desktop.press_key('shift')
+    desktop.press_key(direction)
+    desktop.release_key(direction)
+    desktop.release_key('shift')
+
+
+def record(path):
+    """录制一段操作，返回录制结束时的 {标题: 窗口矩形} 和隐藏窗口的 {标题: 槽位}"""
+    desktop = SimulatedDesktop(cursor_mode='hook')
+    window_manager = WindowManager(desktop)
+    animation_controller = AnimationController(window_manager)
+    input_handler = InputHandler(window_manager, animation_controller)
+    window_manager.start()
+    input_handler.start()
+    desktop.move_cursor(960, 540)
+    first = desktop.create_window('First', (100, 100, 900, 700))
+    second = desktop.create_window('Second', (300, 100, 900, 500))
+    recorder = TraceRecorder(input_handler)
+    recorder.start(path)
+    try:
+        for hwnd, direction, moved in ((first, 'left', None), (second, 'right', (320, 120, 920, 520)),
+                                       (first, 'left', None)):
+            if moved is not None:
+                # 其他程序移动窗口，录制为 GEOMETRY 记录
+                desktop.set_window_rect(hwnd, moved)
+                time.sleep(0.02)
+            hotkey(desktop, hwnd, direction)
+            assert wait_idle(input_handler, animation_controller)
+    finally:
+        recorder.stop()
+        input_handler.stop()
+        animation_controller.stop()
+        window_manager.stop()
+    rects = {window.title: window.rect for window in desktop.windows.values()}
+    hidden = {desktop.windows[hwnd].title: location[:3]
+              for hwnd, location in window_manager.state.snapshot.index.items()}
+    return rects, hidden
+
+
+@pytest.mark.parametrize('speed', [1, 4])
+def test_replay_reproduces_final_window_positions(tmp_path, speed):
+    path = str(tmp_path / 'session.ahwt')
+    rects, hidden = record(path)
+    assert hidden == {'Second': ('SIM1', 'right', 'desktop-1')}
+    assert rects['First'] == (100, 100, 900, 700)
+
+    replay = TraceReplay(path, speed)
+    report = replay.run()
+    assert report['idle']
+    windows = replay.desktop.windows
+    assert {windows[hwnd].title: windows[hwnd].rect for hwnd in replay.windows.values()} == rects
+    assert {windows[replay.windows[entry['hwnd']]].title: tuple(entry['slot'])
+            for entry in report['hidden']} == hidden
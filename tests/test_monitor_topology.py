@@ -0,0 +1,107 @@
+"""MonitorTopology：暴露边缘、触发带命中、隐藏方向解析与隐藏位置（含混合 DPI）"""
+from modules.monitor_topology import Monitor, MonitorTopology
+from modules.simulated_backend import SimulatedDesktop
+from modules.window_manager import WindowManager
+
+PRIMARY = Monitor('A', (0, 0, 1920, 1080), primary=True)
+
+
+def topology(*others, trigger_size=6):
+    return MonitorTopology((PRIMARY,) + others, trigger_size)
+
+
+def rect(x, y, width=400, height=300):
+    return {'x': x, 'y': y, 'width': width, 'height': height}
+
+
+def exposed(topo):
+    return sorted((s.slot, s.position, s.start, s.end) for s in topo.segments)
+
+
+def test_single_monitor_exposes_all_edges():
+    topo = topology()
+    assert exposed(topo) == [
+        (('A', 'bottom'), 1080, 0, 1920),
+        (('A', 'left'), 0, 0, 1080),
+        (('A', 'right'), 1920, 0, 1080),
+        (('A', 'top'), 0, 0, 1920),
+    ]
+    assert topo.hit_test(0, 0) == {('A', 'left'), ('A', 'top')}
+    assert topo.hit_test(1919, 500) == {('A', 'right')}
+    assert topo.hit_test(1913, 500) == set()
+
+
+def test_side_by_side_hides_shared_edge():
+    topo = topology(Monitor('B', (1920, 0, 3840, 1080)))
+    slots = {s.slot for s in topo.segments}
+    assert ('A', 'right') not in slots and ('B', 'left') not in slots
+    assert topo.hit_test(1919, 500) == set()
+    assert topo.hit_test(1920, 500) == set()
+    # 向右隐藏时越过相邻显示器找到外侧边缘
+    segment = topo.resolve_segment('right', rect(100, 100))
+    assert segment.slot == ('B', 'right')
+    assert topo.calculate_hidden_position(segment.slot, rect(100, 100), 10) == (3830, 100)
+
+
+def test_stacked_monitors():
+    topo = topology(Monitor('B', (0, -1080, 1920, 0)))
+    assert topo.hit_test(500, 0) == set()
+    assert topo.hit_test(500, -1080) == {('B', 'top')}
+    segment = topo.resolve_segment('top', rect(100, 100))
+    assert segment.slot == ('B', 'top')
+    assert topo.calculate_hidden_position(segment.slot, rect(100, 100), 10) == (100, -1370)
+
+
+def test_gapped_monitors_keep_both_edges():
+    topo = topology(Monitor('B', (2000, 0, 3920, 1080)))
+    assert topo.hit_test(1919, 500) == {('A', 'right')}
+    assert topo.hit_test(2000, 500) == {('B', 'left')}
+    assert topo.resolve_segment('right', rect(100, 100)).slot == ('A', 'right')
+    assert topo.resolve_segment('left', rect(2500, 100)).slot == ('B', 'left')
+
+
+def test_offset_monitor_leaves_partial_edge():
+    topo = topology(Monitor('B', (1920, 200, 3840, 1280)))
+    assert [(s.start, s.end) for s in topo.segments_by_slot[('A', 'right')]] == [(0, 200)]
+    assert topo.hit_test(1919, 100) == {('A', 'right')}
+    assert topo.hit_test(1919, 500) == set()
+    # 窗口沿边范围与暴露部分重叠时使用这段边缘，位置限制在段内
+    assert topo.resolve_segment('right', rect(100, 0, 400, 150)).slot == ('A', 'right')
+    assert topo.resolve_segment('right', rect(100, 500)).slot == ('B', 'right')
+    assert topo.calculate_hidden_position(('A', 'right'), rect(100, 100), 10) == (1910, 0)
+
+
+def test_negative_origin_monitor():
+    topo = topology(Monitor('B', (-1920, -200, 0, 880)))
+    assert topo.hit_test(-1920, 500) == {('B', 'left')}
+    assert topo.hit_test(-1, 500) == set()
+    assert topo.hit_test(-500, -200) == {('B', 'top')}
+    segment = topo.resolve_segment('left', rect(100, 100))
+    assert segment.slot == ('B', 'left')
+    assert topo.calculate_hidden_position(segment.slot, rect(100, 100), 10) == (-2310, 100)
+    assert topo.monitor_at(-10, 100).id == 'B'
+    assert topo.monitor_at(-10, 950).id == 'A'
+
+
+def test_mixed_dpi_scales_band_and_visible_part():
+    topo = topology(Monitor('B', (1920, 0, 3840, 1080), dpi=144))
+    # 96 DPI 下 6 像素，144 DPI 下 9 像素
+    assert topo.hit_test(5, 500) == {('A', 'left')}
+    assert topo.hit_test(6, 500) == set()
+    assert topo.hit_test(3831, 500) == {('B', 'right')}
+    assert topo.hit_test(3830, 500) == set()
+    assert topo.in_band(('B', 'right'), 3831, 500)
+    assert topo.calculate_hidden_position(('A', 'left'), rect(100, 100), 10) == (-390, 100)
+    assert topo.calculate_hidden_position(('B', 'right'), rect(2000, 100), 10) == (3825, 100)
+
+
+def test_display_change_rebuilds_topology_without_hooks():
+    desktop = SimulatedDesktop(win_events=False)
+    window_manager = WindowManager(desktop)
+    window_manager.start()
+    assert not window_manager.geometry_cache.enabled
+    desktop.set_monitors([PRIMARY, Monitor('B', (1920, 0, 3840, 1080))])
+    desktop.wait_events()
+    assert {m.id for m in window_manager.topology.monitors} == {'A', 'B'}
+    assert window_manager.topology.hit_test(1919, 500) == set()
+    window_manager.stop()
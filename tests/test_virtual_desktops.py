@@ -0,0 +1,180 @@
+"""DesktopMembership：缓存、通知失效、挂起期间不使用缓存，以及按桌面区分的槽位"""
+from modules.animation_controller import AnimationController
+from modules.input_handler import InputHandler
+from modules.simulated_backend import SimulatedDesktop
+from modules.virtual_desktops import DesktopMembership
+from modules.window_manager import WindowManager
+
+
+class FakeDesktops:
+    """记录查询次数的虚拟桌面提供者"""
+
+    def __init__(self):
+        self.current = 'desktop-1'
+        self.windows = {}
+        self.queries = 0
+
+    def current_desktop(self):
+        self.queries += 1
+        return self.current
+
+    def window_desktop(self, hwnd):
+        self.queries += 1
+        return self.windows.get(hwnd)
+
+
+def membership():
+    provider = FakeDesktops()
+    provider.windows = {1: 'desktop-1', 2: 'desktop-2'}
+    return provider, DesktopMembership(provider)
+
+
+def test_queries_are_cached():
+    provider, desktops = membership()
+    for _ in range(3):
+        assert desktops.current_desktop() == 'desktop-1'
+        assert desktops.window_desktop(1) == 'desktop-1'
+    assert provider.queries == 2
+
+
+def test_cloak_notification_invalidates_window_and_current_desktop():
+    provider, desktops = membership()
+    desktops.current_desktop()
+    desktops.window_desktop(1)
+    desktops.window_desktop(2)
+    # 切换桌面：shell 隐藏/取消隐藏窗口
+    provider.current = 'desktop-2'
+    provider.windows[1] = 'desktop-2'
+    desktops.invalidate(1)
+    assert desktops.current_desktop() == 'desktop-2'
+    assert desktops.window_desktop(1) == 'desktop-2'
+    queries = provider.queries
+    assert desktops.window_desktop(2) == 'desktop-2'
+    assert provider.queries == queries
+
+
+def test_suspended_reads_are_cached_briefly():
+    provider, desktops = membership()
+    desktops.current_desktop()
+    desktops.window_desktop(1)
+    desktops.suspend()
+    # 挂起期间收不到通知，挂起前的缓存不再使用
+    provider.current = 'desktop-2'
+    provider.windows[1] = 'desktop-3'
+    assert desktops.current_desktop() == 'desktop-2'
+    assert desktops.window_desktop(1) == 'desktop-3'
+    # 有效期内重复读取不再查询
+    queries = provider.queries
+    desktops.current_desktop()
+    desktops.window_desktop(1)
+    assert provider.queries == queries
+    # 过期后重新查询
+    desktops.UNNOTIFIED_TTL = 0
+    desktops.current_desktop()
+    desktops.window_desktop(1)
+    assert provider.queries == queries + 2
+
+
+def test_expire_drops_cache_only_while_suspended():
+    provider, desktops = membership()
+    desktops.current_desktop()
+    desktops.expire()
+    desktops.current_desktop()
+    assert provider.queries == 1
+    desktops.suspend()
+    desktops.current_desktop()
+    provider.current = 'desktop-2'
+    desktops.expire()
+    assert desktops.current_desktop() == 'desktop-2'
+    assert provider.queries == 3
+
+
+def test_resume_drops_cache():
+    provider, desktops = membership()
+    desktops.current_desktop()
+    desktops.window_desktop(1)
+    desktops.suspend()
+    provider.current = 'desktop-2'
+    provider.windows[1] = 'desktop-2'
+    desktops.resume()
+    assert desktops.stats()['cached'] == 0
+    assert desktops.current_desktop() == 'desktop-2'
+    assert desktops.window_desktop(1) == 'desktop-2'
+    queries = provider.queries
+    desktops.current_desktop()
+    desktops.window_desktop(1)
+    assert provider.queries == queries
+
+
+def test_provider_errors_read_as_unknown():
+    class Broken(FakeDesktops):
+        def window_desktop(self, hwnd):
+            raise OSError('COM call failed')
+
+    desktops = DesktopMembership(Broken())
+    assert desktops.window_desktop(1) is None
+
+
+def session():
+    desktop = SimulatedDesktop(cursor_mode='hook')
+    window_manager = WindowManager(desktop)
+    window_manager.start()
+    input_handler = InputHandler(window_manager, AnimationController(window_manager))
+    return desktop, window_manager, input_handler
+
+
+def test_switch_desktop_updates_cached_membership():
+    desktop, window_manager, _ = session()
+    hwnd = desktop.create_window('Window', (100, 100, 500, 400))
+    assert window_manager.current_desktop() == 'desktop-1'
+    assert window_manager.window_desktop(hwnd) == 'desktop-1'
+    second = desktop.add_desktop()
+    desktop.switch_desktop(second)
+    assert window_manager.current_desktop() == second
+    desktop.switch_desktop('desktop-1')
+    desktop.move_window_to_desktop(hwnd, second)
+    assert window_manager.current_desktop() == 'desktop-1'
+    assert window_manager.window_desktop(hwnd) == second
+    assert window_manager.desktops.invalidations >= 3
+
+
+def test_hidden_slots_are_per_desktop():
+    desktop, window_manager, input_handler = session()
+    first = desktop.create_window('First', (100, 100, 500, 400))
+    second_desktop = desktop.add_desktop()
+    desktop.switch_desktop(second_desktop)
+    second = desktop.create_window('Second', (100, 100, 500, 400))
+    desktop.switch_desktop('desktop-1')
+
+    slots = {input_handler.hide_window(first, 'left'), input_handler.hide_window(second, 'left')}
+    assert slots == {('SIM1', 'left', 'desktop-1'), ('SIM1', 'left', second_desktop)}
+    edge = ('SIM1', 'left')
+    assert [hwnd for hwnd, _ in window_manager.get_stack(window_manager.desktop_slot(edge))] == [first]
+    desktop.switch_desktop(second_desktop)
+    assert [hwnd for hwnd, _ in window_manager.get_stack(window_manager.desktop_slot(edge))] == [second]
+    input_handler.stop()
+
+
+def test_parked_tracking_reads_provider_directly():
+    desktop, window_manager, _ = session()
+    assert window_manager.current_desktop() == 'desktop-1'
+    window_manager.park_tracking()
+    second = desktop.add_desktop()
+    # 挂起期间收不到 CLOAKED/UNCLOAKED 通知
+    desktop.switch_desktop(second)
+    assert window_manager.desktops.invalidations == 0
+    assert window_manager.current_desktop() == second
+
+
+def test_hotkey_rereads_desktop_while_parked():
+    desktop, window_manager, input_handler = session()
+    window_manager.park_tracking()
+    hwnd = desktop.create_window('Window', (100, 100, 500, 400))
+    assert window_manager.window_desktop(hwnd) == 'desktop-1'
+    second = desktop.add_desktop()
+    desktop.switch_desktop(second)
+    desktop.move_window_to_desktop(hwnd, second)
+    # 有效期内读缓存，快捷键处理前丢弃
+    assert window_manager.window_desktop(hwnd) == 'desktop-1'
+    input_handler.dispatch_direction_hotkey('left', hwnd)
+    assert input_handler.find_slot(hwnd) == ('SIM1', 'left', second)
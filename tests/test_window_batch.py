@@ -0,0 +1,58 @@
+"""WindowPosBatch：合并、丢弃无效移动、批量失败时退回逐个移动"""
+from modules.window_batch import RecordingDeferPosBackend, WindowPosBatch
+
+
+def test_moves_are_committed_as_one_batch():
+    backend = RecordingDeferPosBackend()
+    batch = WindowPosBatch(backend, {})
+    batch.move(1, 10, 20)
+    batch.move(2, 30, 40)
+    assert batch.commit() == {}
+    assert backend.calls == [('begin', 2), ('defer', 1, 10, 20), ('defer', 2, 30, 40), ('end',)]
+
+
+def test_single_move_skips_defer():
+    backend = RecordingDeferPosBackend()
+    batch = WindowPosBatch(backend, {})
+    batch.move(1, 10, 20)
+    batch.commit()
+    assert backend.calls == [('move', 1, 10, 20)]
+
+
+def test_last_move_per_window_wins():
+    backend = RecordingDeferPosBackend()
+    batch = WindowPosBatch(backend, {})
+    batch.move(1, 10, 20)
+    batch.move(1, 50, 60)
+    batch.commit()
+    assert backend.calls == [('move', 1, 50, 60)]
+
+
+def test_move_to_committed_position_is_dropped():
+    backend = RecordingDeferPosBackend()
+    committed = {}
+    with WindowPosBatch(backend, committed) as batch:
+        batch.move(1, 10, 20)
+    assert committed == {1: (10, 20)}
+    backend.calls.clear()
+
+    with WindowPosBatch(backend, committed) as batch:
+        batch.move(1, 10, 20)
+    assert backend.calls == []
+    assert batch.dropped == 1
+
+
+def test_failed_batch_falls_back_to_individual_moves():
+    backend = RecordingDeferPosBackend(fail_hwnds={2})
+    committed = {2: (0, 0)}
+    batch = WindowPosBatch(backend, committed)
+    batch.move(1, 10, 20)
+    batch.move(2, 30, 40)
+    batch.move(3, 50, 60)
+    errors = batch.commit()
+    assert list(errors) == [2]
+    assert isinstance(errors[2], OSError)
+    assert ('move', 1, 10, 20) in backend.calls and ('move', 3, 50, 60) in backend.calls
+    assert ('end',) not in backend.calls
+    # 失败的窗口不再记录提交位置，下次移动不会被当成无效移动丢弃
+    assert committed == {1: (10, 20), 3: (50, 60)}
@@ -0,0 +1,77 @@
+"""WindowReconciler：偏离期望位置时校正，校正失败时指数退避，最终标记为不配合"""
+import time
+
+from modules.animation_controller import AnimationController
+from modules.simulated_backend import SimulatedDesktop
+from modules.window_manager import WindowManager
+
+HIDDEN = (-390, 100)
+
+
+def wait_until(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.005)
+    return predicate()
+
+
+def reconciled_window():
+    desktop = SimulatedDesktop()
+    window_manager = WindowManager(desktop)
+    window_manager.start()
+    animation_controller = AnimationController(window_manager)
+    reconciler = animation_controller.reconciler
+    hwnd = desktop.create_window('Window', (100, 100, 500, 400))
+    window_manager.geometry_cache.track(hwnd)
+    window_manager.set_window_pos(hwnd, *HIDDEN)
+    return desktop, reconciler, hwnd
+
+
+def corrections(desktop, hwnd):
+    return [moved_at for moved_at, moved_hwnd, x, y in desktop.moves if moved_hwnd == hwnd and (x, y) == HIDDEN]
+
+
+def test_window_in_place_is_not_moved():
+    desktop, reconciler, hwnd = reconciled_window()
+    reconciler.expect(hwnd, *HIDDEN)
+    assert wait_until(lambda: reconciler.stats()['checks'] >= 1)
+    assert len(corrections(desktop, hwnd)) == 1
+    assert reconciler.stats()['corrections'] == 0
+    reconciler.stop()
+
+
+def test_moved_window_is_put_back():
+    desktop, reconciler, hwnd = reconciled_window()
+    reconciler.expect(hwnd, *HIDDEN)
+    assert wait_until(lambda: reconciler.stats()['checks'] >= 1)
+    # 其他程序把窗口移回屏幕内，位置变化通知触发检查
+    desktop.set_window_rect(hwnd, (100, 100, 500, 400))
+    assert wait_until(lambda: desktop.windows[hwnd].rect[:2] == HIDDEN)
+    assert reconciler.stats()['corrections'] == 1
+    assert not reconciler.is_uncooperative(hwnd)
+    reconciler.stop()
+
+
+def test_window_that_snaps_back_backs_off_then_is_given_up():
+    desktop, reconciler, hwnd = reconciled_window()
+    reconciler.BASE_DELAY = 0.05
+    given_up = []
+    reconciler.add_listener(given_up.append)
+    reconciler.expect(hwnd, *HIDDEN)
+    assert wait_until(lambda: reconciler.stats()['checks'] >= 1)
+    # 所属程序把窗口移回屏幕内，之后每次被移动都立即回去
+    desktop.pin_window(hwnd, 100, 100)
+    desktop.set_window_rect(hwnd, (100, 100, 500, 400))
+    assert wait_until(lambda: given_up == [hwnd])
+    assert reconciler.is_uncooperative(hwnd)
+    moves = corrections(desktop, hwnd)[1:]
+    assert len(moves) == reconciler.MAX_FAILURES
+    gaps = [later - earlier for earlier, later in zip(moves, moves[1:])]
+    assert gaps[0] >= reconciler.BASE_DELAY
+    assert gaps[1] >= 2 * reconciler.BASE_DELAY
+    assert reconciler.stats()['given_up'] == 1
+    # 不配合的窗口不再校正
+    reconciler.expect(hwnd, *HIDDEN)
+    time.sleep(0.2)
+    assert len(corrections(desktop, hwnd)) == reconciler.MAX_FAILURES + 1
+    reconciler.stop()
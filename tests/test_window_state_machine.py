@@ -0,0 +1,87 @@
+"""WindowStateMachine：按转换表推进，其余请求丢弃并计数"""
+import pytest
+
+from modules.animation_controller import AnimationController
+from modules.input_handler import InputHandler
+from modules.simulated_backend import SimulatedDesktop
+from modules.window_manager import WindowManager
+
+from modules.window_state import WindowStateStore, HIDDEN, REVEALING, PEEKING, HIDING, PINNED, RESTORED
+from modules.window_state_machine import WindowStateMachine, TRANSITIONS, REVEAL, HIDE, ARRIVE, PIN, RESTORE
+
+PHASES = (HIDDEN, REVEALING, PEEKING, HIDING, PINNED, RESTORED)
+EVENTS = (REVEAL, HIDE, ARRIVE, PIN, RESTORE)
+SLOT = ('SIM1', 'left', 'desktop-1')
+
+
+def machine_in(phase, hwnd=1):
+    store = WindowStateStore()
+    store.push(SLOT, hwnd, 'Window', (100, 100))
+    store.update(hwnd, HIDING, phase=phase, entered=0.0,
+                 shown_position=(0, 100) if phase in (REVEALING, PEEKING) else None)
+    return store, WindowStateMachine(store)
+
+
+@pytest.mark.parametrize('phase', PHASES)
+@pytest.mark.parametrize('event', EVENTS)
+def test_transition_table(phase, event):
+    store, machine = machine_in(phase)
+    expected = TRANSITIONS.get((phase, event))
+    state = machine.request(1, event, shown_position=(0, 100))
+    if expected is None:
+        assert state is None
+        assert machine.phase(1) == phase
+        assert machine.stats()['dropped'] == {f'{phase}+{event}': 1}
+    else:
+        assert state.phase == expected == machine.phase(1)
+        assert machine.stats()['transitions'] == {f'{phase}->{expected}': 1}
+
+
+def test_shown_position_only_kept_while_shown():
+    store, machine = machine_in(HIDDEN)
+    assert machine.request(1, REVEAL, shown_position=(0, 100)).shown_position == (0, 100)
+    assert store.snapshot.shown == {1: (0, 100)}
+    # 到达时沿用显示位置
+    assert machine.request(1, ARRIVE).shown_position == (0, 100)
+    assert machine.request(1, HIDE).shown_position is None
+    assert store.snapshot.shown == {}
+
+
+def test_unknown_window_is_ignored():
+    _, machine = machine_in(HIDDEN)
+    assert machine.request(2, REVEAL) is None
+    assert machine.stats()['dropped'] == {}
+
+
+def test_retry_recomputes_shown_position_from_fresh_state():
+    store, machine = machine_in(REVEALING)
+    update = store.update
+
+    def racing_update(hwnd, expected_phase, **changes):
+        # 第一次写入前另一个线程让窗口移回后又转向显示到新位置（revealing，显示位置不同）
+        store.update = update
+        update(hwnd, REVEALING, phase=HIDING, shown_position=None)
+        update(hwnd, HIDING, phase=REVEALING, shown_position=(7, 100))
+        return None
+
+    store.update = racing_update
+    state = machine.request(1, ARRIVE)
+    assert state.phase == PEEKING
+    assert state.shown_position == (7, 100)
+
+
+def test_show_hidden_window_skips_window_already_restored():
+    desktop = SimulatedDesktop()
+    window_manager = WindowManager(desktop)
+    input_handler = InputHandler(window_manager, AnimationController(window_manager))
+    other = desktop.create_window('Other', (600, 100, 1000, 400))
+    hwnd = desktop.create_window('Window', (100, 100, 500, 400))
+    slot = input_handler.hide_window(hwnd, 'left')
+    desktop.activate(other)
+    # 另一条路径已经恢复了窗口，RESTORE 请求被丢弃
+    assert window_manager.transition(hwnd, RESTORE).phase == RESTORED
+    desktop.reset_counters()
+    assert input_handler.show_hidden_window(slot, hwnd) is None
+    assert desktop.calls['SetForegroundWindow'] == 0
+    assert desktop.get_foreground_window() == other
+    assert window_manager.transitions.stats()['dropped'] == {f'{RESTORED}+{RESTORE}': 1}
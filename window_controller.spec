@@ -7,7 +7,10 @@ a = Analysis(
     pathex=[],
     binaries=[],
     datas=[],
-    hiddenimports=['win32api', 'win32gui', 'win32con', 'win32process', 'pystray._win32'],
+    hiddenimports=['win32api', 'win32gui', 'win32con', 'win32process', 'pystray._win32',
+                   # modules 包按需导入各模块，需要显式列出
+                   'modules.window_manager', 'modules.animation_controller',
+                   'modules.input_handler', 'modules.tray_icon'],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
@@ -20,20 +23,17 @@ a = Analysis(
 
 pyz = PYZ(a.pure, a.zipped_data, cipher=block_cipher)
 
+# 目录模式：单文件模式每次启动都要把运行库解压到临时目录，拖慢冷启动
 exe = EXE(
     pyz,
     a.scripts,
-    a.binaries,
-    a.zipfiles,
-    a.datas,
     [],
+    exclude_binaries=True,
     name='WindowController',
     debug=False,
     bootloader_ignore_signals=False,
     strip=False,
     upx=True,
-    upx_exclude=[],
-    runtime_tmpdir=None,
     console=False,
     disable_windowed_traceback=False,
     target_arch=None,
@@ -41,4 +41,15 @@ exe = EXE(
     entitlements_file=None,
     icon='icon.ico',  # 如果有图标文件的话
     uac_admin=True,  # 请求管理员权限
+)
+
+coll = COLLECT(
+    exe,
+    a.binaries,
+    a.zipfiles,
+    a.datas,
+    strip=False,
+    upx=True,
+    upx_exclude=[],
+    name='WindowController',
 ) 
\ No newline at end of file
@@ -1,33 +1,106 @@
-import tkinter as tk
+import time
+
+# 启动计时起点，尽量早于其他导入
+STARTED = time.perf_counter()
+
 import os
-from modules import WindowManager, AnimationController, InputHandler, TrayIcon
+import sys
+import threading
+from modules.startup_timer import StartupTimer
 
 class WindowController:
-    def __init__(self):
+    def __init__(self, startup_timer=None):
         # 初始化运行标志
         self.running = True
+        self.stopped = threading.Event()
+        
+        # 启动顺序：先让快捷键生效，日志、规则、窗口事件监听和系统托盘随后启动，
+        # 其余模块在快捷键生效后才导入
+        timer = self.startup_timer = startup_timer or StartupTimer()
+        self.shutdown_lock = threading.Lock()
+        self.shut_down = False
+        from modules import WindowManager, AnimationController, InputHandler
+        timer.mark('导入')
         
         # 初始化各个模块
         self.window_manager = WindowManager()
+        timer.mark('窗口管理')
         self.animation_controller = AnimationController(self.window_manager)
-        self.input_handler = InputHandler(self.window_manager, self.animation_controller)
-        self.tray_icon = TrayIcon(self.animation_controller, self.quit_app)
+        timer.mark('动画')
         
         # 启动输入监听
+        self.input_handler = InputHandler(self.window_manager, self.animation_controller)
         self.input_handler.start()
+        timer.mark('快捷键')
+        
+        from modules import TrayIcon
+        from modules.hidden_journal import HiddenWindowJournal, default_journal_path
+        from modules.window_rules import default_rules_path
+        from modules.metrics import MetricsService
+        from modules.command_server import CommandServer
+        from modules.input_trace import TraceRecorder, default_trace_path
+        timer.mark('导入其余模块')
+        
+        # 读取窗口规则；上次退出或崩溃时仍隐藏的窗口一次性移回原位置
+        self.window_manager.rules.load(default_rules_path())
+        recovered = self.window_manager.attach_journal(HiddenWindowJournal(default_journal_path()))
+        if recovered:
+            print(f"已恢复上次隐藏的 {recovered} 个窗口")
+        timer.mark('恢复窗口')
+        
+        # 启动窗口事件监听
+        self.window_manager.start()
+        timer.mark('窗口事件')
+        
+        # 启动本机命令通道，供脚本批量隐藏/显示窗口
+        self.command_server = CommandServer(self.input_handler)
+        self.command_server.start()
+        timer.mark('命令通道')
+        
+        # 性能统计默认关闭，可在托盘菜单中开启，或用 --metrics 启动时直接开启
+        self.metrics_service = MetricsService(self.window_manager, self.animation_controller)
+        if '--metrics' in sys.argv:
+            self.metrics_service.set_enabled(True)
         
-        # 启动系统托盘
+        # 输入轨迹录制默认关闭，可在托盘菜单中开始，或用 --record-trace 启动时直接开始
+        self.trace_recorder = TraceRecorder(self.input_handler)
+        if '--record-trace' in sys.argv:
+            print(f"开始录制输入轨迹: {self.trace_recorder.start(default_trace_path())}")
+        
+        # 在后台线程上启动系统托盘
+        self.tray_icon = TrayIcon(self.animation_controller, self.quit_app, timer, self.metrics_service,
+                                  self.trace_recorder)
         self.tray_icon.run()
+        
+        if '--startup-report' in sys.argv:
+            print(timer.report())
 
     def quit_app(self, icon=None, item=None):
-        """退出应用程序"""
+        """请求退出：只唤醒主线程，由 run 统一清理（托盘线程上调用）"""
+        self.running = False
+        self.stopped.set()
+
+    def shutdown(self):
+        """清理并退出进程，只执行一次"""
+        with self.shutdown_lock:
+            if self.shut_down:
+                return
+            self.shut_down = True
         try:
-            # 设置退出标志
-            self.running = False
-            
-            # 停止输入监听
+            # 结束轨迹录制，停止命令通道和输入监听
+            self.trace_recorder.stop()
+            self.command_server.stop()
             self.input_handler.stop()
             
+            # 停止所有动画
+            self.animation_controller.stop()
+            
+            # 所有隐藏窗口一次性移回原位置
+            self.window_manager.restore_all_hidden()
+            
+            # 停止窗口事件监听，同步并关闭日志
+            self.window_manager.stop()
+            
             # 停止系统托盘
             self.tray_icon.stop()
             
@@ -36,23 +109,28 @@ class WindowController:
             
         except Exception as e:
             print(f"Error during quit: {e}")
+            try:
+                self.window_manager.restore_all_hidden()
+            except Exception:
+                pass
             os._exit(1)
 
     def run(self):
         """运行程序"""
         try:
-            # 创建一个隐藏的tkinter窗口来保持程序运行
-            root = tk.Tk()
-            root.withdraw()
-            root.mainloop()
+            # 键盘、鼠标钩子和托盘都在各自的线程上运行，主线程只需等待退出
+            self.stopped.wait()
+        except KeyboardInterrupt:
+            pass
         except Exception as e:
             print(f"Error in main loop: {e}")
         finally:
-            self.quit_app()
+            self.running = False
+            self.shutdown()
 
 if __name__ == "__main__":
     try:
-        app = WindowController()
+        app = WindowController(StartupTimer(STARTED))
         app.run()
     except Exception as e:
         print(f"Program error: {e}")